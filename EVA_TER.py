@@ -34,96 +34,12 @@ def set_default_chrome_profile():
 # MODEL 1: TRAINING DATA (unchanged - keeping all patterns)
 # ============================================================================
 
-MODEL1_TRAINING_DATA = [
-        # App launching/closing (kept separate)
-    ("open application", "OPEN_APP"),
-    ("launch program", "OPEN_APP"),
-    ("start software", "OPEN_APP"),
-    ("run app", "OPEN_APP"),
-    ("open app", "OPEN_APP"),
-    ("open chrome", "OPEN_APP"),
-    ("launch spotify", "OPEN_APP"),
-    
-    ("close application", "CLOSE_APP"),
-    ("close this", "CLOSE_APP"),
-    ("close window", "CLOSE_APP"),
-    ("exit application", "CLOSE_APP"),
-    ("quit app", "CLOSE_APP"),
-    
-    # ✅ NEW: File and folder operations (separate command type)
-    ("open file", "FILE_FOLDER_OPERATION"),
-    ("open folder", "FILE_FOLDER_OPERATION"),
-    ("open document", "FILE_FOLDER_OPERATION"),
-    ("launch file", "FILE_FOLDER_OPERATION"),
-    ("open my documents", "FILE_FOLDER_OPERATION"),
-    ("open downloads folder", "FILE_FOLDER_OPERATION"),
-    ("open desktop", "FILE_FOLDER_OPERATION"),
-    ("show file", "FILE_FOLDER_OPERATION"),
-    ("browse to folder", "FILE_FOLDER_OPERATION"),
-    ("open pictures", "FILE_FOLDER_OPERATION"),
-    ("open videos folder", "FILE_FOLDER_OPERATION"),
-    ("open music", "FILE_FOLDER_OPERATION"),
-    ("show folder", "FILE_FOLDER_OPERATION"),
-    ("browse file", "FILE_FOLDER_OPERATION"),
-
-    # Text & Input
-    ("type text", "TYPE_TEXT"),
-    ("write something", "TYPE_TEXT"),
-    ("enter text", "TYPE_TEXT"),
-
-    # Mouse actions
-    ("click on something", "MOUSE_CLICK"),
-    ("click here", "MOUSE_CLICK"),
-    ("right click", "MOUSE_RIGHTCLICK"),
-    ("double click", "MOUSE_DOUBLECLICK"),
-
-    # Window & System
-    ("maximize window", "WINDOW_ACTION"),
-    ("minimize window", "WINDOW_ACTION"),
-    ("fullscreen mode", "WINDOW_ACTION"),
-    ("take screenshot", "SYSTEM"),
-    ("lock screen", "SYSTEM"),
-
-    # Keyboard shortcuts
-    ("copy", "KEYBOARD"),
-    ("paste", "KEYBOARD"),
-    ("save", "KEYBOARD"),
-    ("undo", "KEYBOARD"),
-
-    # Complex commands (consolidated into fewer types)
-    ("open app and search", "APP_WITH_ACTION"),
-    ("launch app and type", "APP_WITH_ACTION"),
-    ("open app and play", "APP_WITH_ACTION"),
-    ("start app and compose", "APP_WITH_ACTION"),
-
-    # Media commands (consolidated)
-    ("play music", "MEDIA_CONTROL"),
-    ("play video", "MEDIA_CONTROL"),
-    ("stream music", "MEDIA_CONTROL"),
-    ("stream video", "MEDIA_CONTROL"),
-
-    # ADD NEW PATTERNS (simpler - no message content):
-("send whatsapp to", "SEND_MESSAGE"),
-("send message to", "SEND_MESSAGE"),
-("whatsapp to", "SEND_MESSAGE"),
-("email to", "SEND_MESSAGE"),
-("post on social", "SEND_MESSAGE"),
-("message to", "SEND_MESSAGE"),
-("whatsapp mom", "SEND_MESSAGE"),
-("email john", "SEND_MESSAGE"),
-
-    # Web commands (unified)
-    ("search for something", "WEB_SEARCH"),
-    ("google something", "WEB_SEARCH"),
-    ("youtube search", "WEB_SEARCH"),
-    ("open youtube", "WEB_SEARCH"),
-    ("profile work search python", "WEB_SEARCH"),
-    ("with profile personal search", "WEB_SEARCH"),
-    ("chrome profile dev open youtube", "WEB_SEARCH"),
-    ("open gmail", "WEB_SEARCH"),
-    ("go to facebook", "WEB_SEARCH"),
-    ("search amazon", "WEB_SEARCH"),
-]
+from models.intent_data import CORE_TRAINING_DATA as MODEL1_TRAINING_DATA
+from models.pattern_matcher import PatternMatcher
+from models.keyword_extractor import extract_keywords
+
+# Patterns tokenized once; scores match calculate_tfidf_similarity exactly
+MODEL1_MATCHER = PatternMatcher(MODEL1_TRAINING_DATA)
 
 # ============================================================================
 # REUSABLE STEP TEMPLATES (DRY principle)
@@ -287,247 +203,13 @@ MODEL2_STEP_RULES = {
 }
 
 # ============================================================================
-# HELPER FUNCTIONS (reusable extraction logic)
-# ============================================================================
-
-def extract_profile_name(text):
-    """Extract Chrome profile name from text"""
-    patterns = [
-        r'with chrome profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
-        r'chrome profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
-        r'with profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
-        r'use profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
-        r'profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
-    ]
-
-    for pattern in patterns:
-        match = re.search(pattern, text.lower())
-        if match:
-            return match.group(1).strip()
-
-    return DEFAULT_CHROME_PROFILE or "Default"
-
-def extract_website_and_action(text):
-    """Extract website URL and search query from text"""
-    websites = {
-        'youtube': 'youtube.com', 'google': 'google.com', 'gmail': 'mail.google.com',
-        'facebook': 'facebook.com', 'twitter': 'twitter.com', 'instagram': 'instagram.com',
-        'linkedin': 'linkedin.com', 'github': 'github.com', 'reddit': 'reddit.com',
-        'amazon': 'amazon.com', 'netflix': 'netflix.com', 'spotify': 'open.spotify.com',
-    }
-
-    text_l = text.lower()
-    website = 'google.com'  # default
-
-    # Detect website
-    for keyword, url in websites.items():
-        if keyword in text_l:
-            website = url
-            break
-
-    # Extract query (remove profile, website names, command words)
-    query_text = text_l
-    for pattern in [r'with chrome profile [\w\s]+', r'chrome profile [\w\s]+', r'profile [\w\s]+']:
-        query_text = re.sub(pattern, '', query_text)
-
-    skip_words = {'with', 'chrome', 'search', 'for', 'open', 'go', 'to', 'on', 'in', 'and', 
-                  'youtube', 'google', 'gmail', 'facebook', 'profile'}
-    query_words = [w for w in query_text.split() if w not in skip_words and w.strip()]
-
-    return website, ' '.join(query_words) if query_words else None
-
-def extract_app_name(words, trigger_words):
-    """Extract app name after trigger words"""
-    for trigger in trigger_words:
-        if trigger in words:
-            idx = words.index(trigger)
-            app_words = [w for w in words[idx+1:] if w not in ['app', 'application', 'program']]
-            if app_words:
-                return ' '.join(app_words)
-    return None
-
-def extract_text_after_keywords(words, keywords, skip_words):
-    """Generic function to extract text after certain keywords"""
-    for keyword in keywords:
-        if keyword in words:
-            idx = words.index(keyword)
-            text_words = [w for w in words[idx+1:] if w not in skip_words]
-            if text_words:
-                return ' '.join(text_words)
-    return None
-def extract_file_or_folder_path(words, raw_command):
-    """
-    Detect if command is for file/folder and extract path/name.
-    Returns: (is_file_operation, target_name, target_type, is_known_folder)
-    """
-    # File/folder indicators
-    file_indicators = ['file', 'document', 'doc', 'pdf', 'image', 'video', 'folder', 'directory']
-    
-    # Common folder names with full paths
-    common_folders = {
-        'documents': r'%USERPROFILE%\Documents',
-        'downloads': r'%USERPROFILE%\Downloads',
-        'desktop': r'%USERPROFILE%\Desktop',
-        'pictures': r'%USERPROFILE%\Pictures',
-        'videos': r'%USERPROFILE%\Videos',
-        'music': r'%USERPROFILE%\Music',
-    }
-    
-    is_file_operation = any(indicator in words for indicator in file_indicators)
-    
-    if not is_file_operation:
-        return False, None, None, False  # ✅ FIXED: Return 4 values
-    
-    # Check for common folder names
-    for folder_keyword, folder_path in common_folders.items():
-        if folder_keyword in words:
-            return True, folder_path, 'folder', True  # ✅ Return 4 values: is_file_op, path, type, is_known
-    
-    # Extract custom file/folder name (needs search)
-    skip_words = {'open', 'file', 'folder', 'document', 'my', 'the', 'launch', 'show', 'browse', 'to'}
-    target_words = [w for w in words if w not in skip_words]
-    
-    if target_words:
-        target_name = ' '.join(target_words)
-        target_type = 'folder' if 'folder' in words or 'directory' in words else 'file'
-        return True, target_name, target_type, False  # ✅ Return 4 values: is_file_op, name, type, NOT known (needs search)
-    
-    return False, None, None, False  # ✅ FIXED: Return 4 values
-
-
-
-# ============================================================================
-# KEYWORD EXTRACTION (simplified using helpers)
+# KEYWORD EXTRACTION (shared grammar in models/keyword_extractor.py)
 # ============================================================================
 
 def extract_keywords_by_command_type(raw_command, command_type):
-    """Unified keyword extraction using helper functions"""
-    raw_command_lower = raw_command.lower().strip()
-    words = raw_command_lower.split()
-
-    extracted = {
-    'app_name': None, 
-    'search_query': None, 
-    'text_content': None,
-    'action_target': None, 
-    'keyboard_shortcut': None, 
-    'system_action': None,
-    'window_action': None, 
-    'profile_name': None, 
-    'website': None,
-    'media_query': None, 
-    'recipient': None, 
-    'message_content': None,
-    'action_content': None,
-    'is_file_operation': False,
-    'file_path': None,
-    'target_type': None,
-    'is_known_folder': False,
-    'needs_search': False,
-    'search_target': None,
-    # ✅ NEW:
-    'has_message_content': False,
-}
-
-
-    # OPEN_APP / CLOSE_APP
-        # OPEN_APP / CLOSE_APP (now handles files/folders too)
-    
-        # ✅ SIMPLIFIED: OPEN_APP (no file/folder logic)
-    if command_type == "OPEN_APP":
-        trigger = ['open', 'launch', 'start', 'run']
-        extracted['app_name'] = extract_app_name(words, trigger) or ('chrome' if 'chrome' in words else 'current')
-    
-    # ✅ SIMPLIFIED: CLOSE_APP (no file/folder logic)
-    elif command_type == "CLOSE_APP":
-        trigger = ['close', 'exit', 'quit']
-        extracted['app_name'] = extract_app_name(words, trigger) or 'current'
-    
-    # ✅ NEW: FILE_FOLDER_OPERATION (dedicated handler)
-    elif command_type == "FILE_FOLDER_OPERATION":
-        is_file_op, target_name, target_type, is_known = extract_file_or_folder_path(words, raw_command_lower)
-        
-        extracted['is_file_operation'] = True
-        extracted['is_known_folder'] = is_known
-        extracted['needs_search'] = not is_known
-        extracted['target_type'] = target_type
-        
-        if is_known:
-            # Known folder - use direct path
-            extracted['file_path'] = target_name
-        else:
-            # Unknown file/folder - will search
-            extracted['search_target'] = target_name
-    
-
-
-    # WEB_SEARCH
-    elif command_type == "WEB_SEARCH":
-        extracted['profile_name'] = extract_profile_name(raw_command_lower)
-        website, query = extract_website_and_action(raw_command_lower)
-        extracted['website'] = website
-        extracted['search_query'] = query
-
-    # TYPE_TEXT
-    elif command_type == "TYPE_TEXT":
-        extracted['text_content'] = extract_text_after_keywords(words, ['type', 'write', 'enter'], {'text', 'message'})
-
-    # MOUSE_CLICK
-    elif command_type in ["MOUSE_CLICK", "MOUSE_RIGHTCLICK", "MOUSE_DOUBLECLICK"]:
-        skip = {'click', 'on', 'here', 'it', 'this', 'right', 'double'}
-        extracted['action_target'] = ' '.join([w for w in words if w not in skip]) or 'current'
-
-    # WINDOW_ACTION
-    elif command_type == "WINDOW_ACTION":
-        extracted['window_action'] = 'maximize' if any(w in words for w in ['maximize', 'fullscreen']) else 'minimize'
-
-    # KEYBOARD
-    elif command_type == "KEYBOARD":
-        shortcuts = {'copy': 'ctrl+c', 'paste': 'ctrl+v', 'save': 'ctrl+s', 'undo': 'ctrl+z'}
-        for word, shortcut in shortcuts.items():
-            if word in words:
-                extracted['keyboard_shortcut'] = shortcut
-                break
-
-    # SYSTEM
-    elif command_type == "SYSTEM":
-        extracted['system_action'] = 'screenshot' if 'screenshot' in words or 'capture' in words else 'lock'
-
-    # APP_WITH_ACTION (consolidated: search/type/play/compose)
-    elif command_type == "APP_WITH_ACTION":
-        if 'and' in words:
-            and_idx = words.index('and')
-            extracted['app_name'] = extract_app_name(words[:and_idx], ['open', 'launch', 'start'])
-            extracted['action_content'] = ' '.join([w for w in words[and_idx+1:] if w not in ['search', 'type', 'play']])
-
-    # MEDIA_CONTROL (consolidated: music/video streaming)
-    elif command_type == "MEDIA_CONTROL":
-        apps = ['spotify', 'netflix', 'youtube', 'vlc']
-        extracted['app_name'] = next((app for app in apps if app in words), 'spotify')
-        extracted['media_query'] = ' '.join([w for w in words if w not in ['play', 'stream', 'music', 'video', extracted['app_name']]])
-
-    # SEND_MESSAGE (consolidated: WhatsApp/email/social)
-    elif command_type == "SEND_MESSAGE":
-    # 1. Detect which messaging app
-        apps_map = {
-        'whatsapp': 'whatsapp', 
-        'email': 'outlook', 
-        'social': 'facebook',
-        'twitter': 'twitter',
-        'instagram': 'instagram',
-        'telegram': 'telegram',
-    }
-        extracted['app_name'] = next((v for k, v in apps_map.items() if k in raw_command_lower), 'whatsapp')
-    
-    # 2. Extract FULL recipient (supports multi-word names like "john smith")
-    if 'to' in words:
-        to_idx = words.index('to')
-        recipient_words = words[to_idx + 1:]
-        if recipient_words:
-            extracted['recipient'] = ' '.join(recipient_words)
-    
-    # 3. Message content e
-    return extracted
+    """Keyword extraction (shared grammar, EVA_TER dialect)"""
+    return extract_keywords(raw_command, command_type, dialect='eva_ter',
+                            default_profile=DEFAULT_CHROME_PROFILE or "Default")
 
 # ============================================================================
 # STEP GENERATION (handles conditional steps)
@@ -636,6 +318,39 @@ def generate_steps_model2(command_type, extracted_keywords):
 # MODEL 1: TF-IDF SIMILARITY
 # ============================================================================
 
+_gemini_planner = None
+
+
+def plan_steps_with_gemini(command_type, extracted_keywords, raw_command):
+    """
+    StepGenerator plan for a command type without a step template, grounded
+    in a summary of the current screen (None if Gemini is unavailable)
+    """
+    global _gemini_planner
+    try:
+        import config
+        from models.step_generator import StepGenerator, to_action_steps
+        from vision.screen_analyzer import ScreenAnalyzer
+        from vision.screenshot_handler import ScreenshotHandler
+
+        if _gemini_planner is None:
+            _gemini_planner = (ScreenshotHandler(), ScreenAnalyzer(config.GEMINI_API_KEY),
+                               StepGenerator(config.GEMINI_API_KEY))
+        screenshot_handler, screen_analyzer, step_generator = _gemini_planner
+
+        # No OmniParser in the terminal harness: window title, or Gemini on the screenshot
+        screenshot_path = screenshot_handler.capture()
+        command_data = {
+            'raw_command': raw_command,
+            'classification': {'category': command_type, 'entities': extracted_keywords},
+            'screen_summary': screen_analyzer.get_screen_summary(screenshot_path, None),
+        }
+        print(f"🖥️  Screen: {command_data['screen_summary']}")
+        return to_action_steps(step_generator.generate(command_data))
+    except Exception as e:
+        print(f"⚠️  Gemini step planning failed: {e}")
+        return None
+
 def calculate_tfidf_similarity(str1, str2):
     """Calculate similarity between two strings"""
     words1, words2 = str1.lower().split(), str2.lower().split()
@@ -645,21 +360,8 @@ def calculate_tfidf_similarity(str1, str2):
     return min(1.0, similarity + order_bonus)
 
 def process_command_model1(input_text):
-    """Model 1: Command type classifier"""
-    best_match, highest_similarity = None, 0
-
-    for pattern, cmd_type in MODEL1_TRAINING_DATA:
-        similarity = calculate_tfidf_similarity(input_text, pattern)
-        if similarity > highest_similarity:
-            highest_similarity = similarity
-            best_match = (pattern, cmd_type)
-
-    return {
-        "input": input_text,
-        "command_type": best_match[1],
-        "confidence": highest_similarity,
-        "training_pattern": best_match[0],
-    } if best_match else None
+    """Model 1: Command type classifier (nearest training pattern)"""
+    return MODEL1_MATCHER.match(input_text)
 
 # ============================================================================
 # PIPELINE & UI
@@ -817,6 +519,10 @@ def test_unified_pipeline(input_text):
         print("\n🔄 STEP 3: Step Generation...")
         print("-" * 80)
         steps = generate_steps_model2(model1_result['command_type'], extracted_keywords)
+        if model1_result['command_type'] not in MODEL2_STEP_RULES:
+            steps = plan_steps_with_gemini(
+                model1_result['command_type'], extracted_keywords, model1_result['input']
+            ) or steps
         print("✅ Generated Steps:")
         step_count = 0
         for step in steps:
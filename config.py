@@ -3,10 +3,16 @@ from dotenv import load_dotenv
 import logging
 load_dotenv()
 CHROME_PROFILE_NAME = "Profile 2"
+# Gemini traffic mode: "live" | "record" (proxy + cassette) | "replay" (offline, see utils/gemini_cassette.py)
+GEMINI_MODE = os.getenv('GEMINI_MODE', 'live').lower()
+
 # API Keys
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY not found in .env file. Please get a key from Google AI Studio and add it to your .env file.")
+    if GEMINI_MODE == 'replay':
+        GEMINI_API_KEY = 'replay'  # Never sent anywhere but the local replay server
+    else:
+        raise ValueError("GEMINI_API_KEY not found in .env file. Please get a key from Google AI Studio and add it to your .env file.")
 
 # Wake Word
 WAKE_WORD = "eva"
@@ -36,6 +42,120 @@ GEMINI_FALLBACK_MODELS = [
 ]
 GEMINI_TEMPERATURE = 0.3
 GEMINI_MAX_RETRIES = 3
+GEMINI_BASE_URL = os.getenv('GEMINI_BASE_URL')  # e.g. http://127.0.0.1:8765 for utils.fake_gemini_server
+
+# Model router (rolling latency / error rate per model, circuit breaker on quota errors)
+MODEL_ROUTER_WINDOW = 20
+MODEL_ROUTER_FAILURE_THRESHOLD = 3  # consecutive quota errors before a circuit opens
+MODEL_ROUTER_COOLDOWN = 30  # seconds before a half-open probe
+
+# Shared Gemini client service (pooled connections, deadlines, hedged requests)
+GEMINI_CALL_DEADLINE = 20  # seconds, end to end including fallbacks
+GEMINI_VISION_DEADLINE = 25
+GEMINI_HEDGE_ENABLED = True  # fire a second model once the first exceeds its p90 latency
+GEMINI_MAX_CONNECTIONS = 10
+GEMINI_BATCH_WINDOW_MS = 5  # small text requests arriving this close together share one call
+GEMINI_BATCH_MAX_ITEMS = 8  # 1 disables micro-batching
+
+# Record / replay (GEMINI_MODE=record|replay)
+GEMINI_CASSETTE = os.getenv('GEMINI_CASSETTE', os.path.join(BASE_DIR, 'cache', 'gemini_cassette.jsonl'))
+GEMINI_REPLAY_LATENCY = float(os.getenv('GEMINI_REPLAY_LATENCY')) if os.getenv('GEMINI_REPLAY_LATENCY') else None  # None = recorded
+GEMINI_REPLAY_QUOTA_RATE = float(os.getenv('GEMINI_REPLAY_QUOTA_RATE', '0'))
+GEMINI_REPLAY_ERROR_RATE = float(os.getenv('GEMINI_REPLAY_ERROR_RATE', '0'))
+GEMINI_REPLAY_SEED = int(os.getenv('GEMINI_REPLAY_SEED', '0'))
+
+# YOLO detection profile (written by `python -m vision.param_sweep`)
+DETECTION_PROFILE_PATH = os.path.join(BASE_DIR, 'weights', 'detection_profile.json')
+DETECTION_DEFAULTS = {"conf": 0.15, "iou": 0.7, "imgsz": None}  # imgsz: None = ultralytics default, "native" = frame (h, w)
+
+# OCR Settings (tiled, process-parallel OCR for large frames)
+# Off until `python -m vision.tiled_ocr <4K screenshot>` shows a speedup on the
+# target machine (each worker loads its own EasyOCR reader)
+OCR_TILED_MODE = "never"  # "auto" | "always" | "never"
+OCR_TILED_MIN_PIXELS = 2560 * 1440  # "auto" tiles frames at least this large (CPU only)
+OCR_TILE_SIZE = 1280
+OCR_TILE_OVERLAP = 96  # Must exceed the tallest text line so seams can be stitched
+OCR_TILE_WORKERS = None  # None = min(4, cpu_count - 1)
+
+# Parse cache (binary parse results keyed by frame hash + model version)
+PARSE_CACHE_ENABLED = True
+PARSE_CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'parses')
+PARSE_CACHE_MAX_ENTRIES = 500
+
+# Persisted intent classifier artifacts (keyed by training data + hyperparameters)
+INTENT_MODEL_DIR = os.path.join(BASE_DIR, 'cache', 'intent_models')
+# Intent / CommandClassifier features: "tfidf" (fitted vocabulary) or "hashing"
+# (stateless char n-grams, robust to misspellings; `python -m models.intent_features`)
+INTENT_FEATURES = "tfidf"
+COMMAND_CLASSIFIER_FEATURES = "tfidf"
+
+# Intent cascade: cheapest classifier first, escalate while the calibrated confidence
+# is below the stage threshold (profile written by `python -m models.intent_router calibrate`)
+# Local by default: "model" (the classifier EvaGui always used) is the final stage, so
+# commands are never sent to Gemini unless "gemini" is appended. "matcher" is available
+# but never reaches the 90% calibrated precision needed to stop, so it only adds latency.
+INTENT_CASCADE_ENABLED = True
+INTENT_CASCADE_STAGES = ["online", "model"]  # also available: "matcher", "rules", "gemini"
+INTENT_CASCADE_PROFILE_PATH = os.path.join(BASE_DIR, 'weights', 'intent_cascade.json')
+INTENT_CASCADE_DEFAULT_THRESHOLD = 0.9  # used for stages missing from the profile
+
+# Online intent model (hashed features + partial_fit, updated from runtime feedback)
+ONLINE_INTENT_ENABLED = True
+ONLINE_INTENT_SNAPSHOT_PATH = os.path.join(BASE_DIR, 'cache', 'online_intent.joblib')
+ONLINE_INTENT_FEEDBACK_PATH = os.path.join(BASE_DIR, 'cache', 'intent_feedback.jsonl')
+ONLINE_INTENT_N_FEATURES = 2 ** 16
+ONLINE_INTENT_REPLAY = 4  # seed examples replayed per learned command
+ONLINE_INTENT_SNAPSHOT_EVERY = 25  # updates
+ONLINE_INTENT_SNAPSHOT_INTERVAL = 300  # seconds
+# Learn from unconfirmed Gemini cascade answers too (off: only confirmed / corrected commands)
+ONLINE_INTENT_LEARN_FROM_GEMINI = False
+
+# Persistent Gemini response cache (classifications / step plans keyed by
+# normalized command + category + model + prompt version); `python -m models.response_cache stats`
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_PATH = os.path.join(BASE_DIR, 'cache', 'responses.sqlite3')
+RESPONSE_CACHE_TTL = 7 * 24 * 3600  # seconds
+RESPONSE_CACHE_STEP_TTL = 24 * 3600  # step plans depend more on what is on screen
+RESPONSE_CACHE_MAX_ENTRIES = 5000
+
+# Click-target templates (fast re-location before the full vision path)
+TEMPLATE_MATCH_ENABLED = True
+TEMPLATE_STORE_DIR = os.path.join(BASE_DIR, 'cache', 'click_templates')
+TEMPLATE_MATCH_THRESHOLD = 0.9
+# A click counts as verified when this fraction of the screen changes within
+# CLICK_VERIFY_DELAY seconds; only verified clicks are stored as templates
+CLICK_VERIFY_DELAY = 0.5
+CLICK_VERIFY_MIN_CHANGE = 0.002
+
+# Coordinate decision cache (ScreenAnalyzer.select_coordinate)
+DECISION_CACHE_TTL = 120  # seconds
+DECISION_CACHE_MAX_ENTRIES = 256
+
+# Local-first coordinate selection: escalate to Gemini vision only when the
+# local winner leads the runner-up by less than the margin (or scores too low)
+LOCAL_SELECT_MARGIN = 0.15
+LOCAL_SELECT_MIN_SCORE = 0.7
+# When Gemini is unavailable or gives no answer, the local winner is still used
+# above this score (below it, plain fuzzy matching picks the element)
+VISION_LOCAL_DECISION_MIN_SCORE = 0.4
+
+# Gemini vision payloads: crop to the top-K local candidates (+ margin) when the
+# local ranking found something plausible, downscale and re-encode
+VISION_PAYLOAD_MODE = "crop"  # "crop" | "full" (downscaled whole frame) | "png" (legacy upload)
+VISION_PAYLOAD_TOP_K = 12
+VISION_PAYLOAD_CROP_MIN_SCORE = 0.4
+VISION_PAYLOAD_MARGIN = 96
+VISION_PAYLOAD_MAX_EDGE = 1024
+VISION_PAYLOAD_FORMAT = "JPEG"  # "JPEG" | "WEBP"
+VISION_PAYLOAD_QUALITY = 80
+
+# Compact prompts (estimated tokens; ~4 chars per token)
+PROMPT_TOKEN_BUDGET = 900  # element table in the vision selection prompt
+PROMPT_MAX_ELEMENTS = 50
+STEP_SUMMARY_TOKEN_BUDGET = 120  # screen summary embedded in StepGenerator prompts
+
+# Screen summaries cached per (layout fingerprint, window title)
+SUMMARY_CACHE_MAX_ENTRIES = 64
 
 # Classification Settings
 CLASSIFICATION_CONFIDENCE_THRESHOLD = 0.6
@@ -4,6 +4,7 @@ from pynput.keyboard import Controller as PyKeyboardController, Key as PyKey
 import pyautogui
 import config
 from vision.edge_search_handler import EdgeSearchHandler
+from vision.template_matcher import TargetTemplateStore, screen_changed
 
 logger = logging.getLogger("ActionRouter")
 
@@ -27,6 +28,15 @@ class ActionRouter:
             traceback.print_exc()
             self.web_search_handler = None
 
+        # Crops of successful click targets for fast re-location
+        self.template_store = None
+        if config.TEMPLATE_MATCH_ENABLED:
+            try:
+                self.template_store = TargetTemplateStore(
+                    config.TEMPLATE_STORE_DIR, match_threshold=config.TEMPLATE_MATCH_THRESHOLD
+                )
+            except Exception as e:
+                logger.error(f"❌ Failed to initialize TargetTemplateStore: {e}")
         
         logger.info("✓ Action Router initialized with Vision and C Executor Bridge.")
     
@@ -165,6 +175,25 @@ class ActionRouter:
                             logger.error(" -> Vision: Failed to capture screenshot")
                             continue
                         
+                        # Extract profile_name from step parameters first, then fall back to entities
+                        profile_name = params.get('profile_name')
+                        if not profile_name and entities:
+                            profile_name = entities.get('profile_name')
+                        
+                        # Fast path: re-locate a previously clicked target by template
+                        template_key = None
+                        if self.template_store:
+                            app_key = (entities or {}).get('app_name') or (entities or {}).get('website')
+                            template_key = self.template_store.make_key(app_key, target_description, profile_name)
+                            match = self.template_store.locate(template_key, screenshot_path)
+                            if match and self._click_at(match[0], match[1], params):
+                                if self._click_verified(screenshot_path):
+                                    logger.info(" -> Vision: Clicked via template match (skipped OmniParser + Gemini)")
+                                    continue
+                                # Nothing happened: the template is stale, fall back to the full vision path
+                                logger.warning(f" -> Vision: Template click at ({match[0]}, {match[1]}) had no effect, forgetting it")
+                                self.template_store.forget(template_key)
+                        
                         parse_result = self.omniparser.parse_screen(screenshot_path, raw_command)
                         elements = parse_result.get('elements', []) if parse_result else []
                         
@@ -173,12 +202,6 @@ class ActionRouter:
                             continue
                         
                         logger.info(f" -> Vision: Found {len(elements)} elements")
-                        
-                        # Extract profile_name from step parameters first, then fall back to entities
-                        profile_name = params.get('profile_name')
-                        if not profile_name and entities:
-                            profile_name = entities.get('profile_name')
-                        
                         logger.info(f" -> Profile name for selection: {profile_name}")
                         logger.info(f" -> Screenshot path: {screenshot_path}")
                         
@@ -192,16 +215,20 @@ class ActionRouter:
                         
                         if coordinate and len(coordinate) == 2:
                             x, y = coordinate
-                            screen_width, screen_height = pyautogui.size()
-                            
-                            if 0 <= x <= screen_width and 0 <= y <= screen_height:
-                                self.system_executor.executor.execute_action(
-                                    "MOUSE_CLICK",
-                                    {'x': int(x), 'y': int(y)},
-                                    {"button": params.get('button', 'left')}
+                            if not self._click_at(x, y, params):
+                                continue
+                            if not self._click_verified(screenshot_path):
+                                logger.warning(f" -> Vision: Click at ({x}, {y}) had no visible effect, dropping cached decision")
+                                self.screen_analyzer.forget_decision(elements, target_description, profile_name)
+                                if template_key:
+                                    self.template_store.forget(template_key)
+                                continue
+                            if template_key:
+                                clicked = next((e for e in elements if (e['x'], e['y']) == (x, y)), None)
+                                self.template_store.remember(
+                                    template_key, screenshot_path, int(x), int(y),
+                                    bbox=clicked.get('bbox') if clicked else None
                                 )
-                                logger.info(f" -> Action successful: Clicked at ({int(x)}, {int(y)})")
-                                time.sleep(0.1)
                 
                 # ===== FOCUS_WINDOW =====
                 elif action_type == 'FOCUS_WINDOW':
@@ -329,6 +356,29 @@ class ActionRouter:
             logger.error(f"❌ Execution failed: {e}")
             return {"success": False, "error": str(e)}
     
+    def _click_at(self, x, y, params):
+        """Click at screen coordinates if they are on screen; returns True on click"""
+        screen_width, screen_height = pyautogui.size()
+        if not (0 <= x <= screen_width and 0 <= y <= screen_height):
+            logger.warning(f" -> Vision: ({x}, {y}) is off screen, not clicking")
+            return False
+        self.system_executor.executor.execute_action(
+            "MOUSE_CLICK",
+            {'x': int(x), 'y': int(y)},
+            {"button": params.get('button', 'left')}
+        )
+        logger.info(f" -> Action successful: Clicked at ({int(x)}, {int(y)})")
+        time.sleep(0.1)
+        return True
+    
+    def _click_verified(self, before_path):
+        """True if the screen changed after a click (compared to the pre-click screenshot)"""
+        time.sleep(config.CLICK_VERIFY_DELAY)
+        after_path = self.screenshot_handler.capture()
+        if not after_path:
+            return False
+        return screen_changed(before_path, after_path, min_fraction=config.CLICK_VERIFY_MIN_CHANGE)
+    
     def _execute_keyboard_action(self, action, value):
         """Execute keyboard-related actions"""
         action_lower = action.lower()
@@ -9,7 +9,10 @@ import struct
 from groq import Groq
 import os
 from dotenv import load_dotenv
+import config
 from execution.execution_handler import ExecutionHandler
+from models.step_generator import StepGenerator, to_action_steps
+from vision.screen_analyzer import ScreenAnalyzer
 
 # Load environment variables from .env file
 load_dotenv()
@@ -19,33 +22,13 @@ load_dotenv()
 # ============================================================================ 
 
 # ... (rest of the logic from EVA_TER.py remains the same) ...
-MODEL1_TRAINING_DATA = [
-    ("open application", "OPEN_APP"), ("launch program", "OPEN_APP"), ("start software", "OPEN_APP"),
-    ("run app", "OPEN_APP"), ("open app", "OPEN_APP"), ("open chrome", "OPEN_APP"), ("launch spotify", "OPEN_APP"),
-    ("close application", "CLOSE_APP"), ("close this", "CLOSE_APP"), ("close window", "CLOSE_APP"),
-    ("exit application", "CLOSE_APP"), ("quit app", "CLOSE_APP"),
-    ("open file", "FILE_FOLDER_OPERATION"), ("open folder", "FILE_FOLDER_OPERATION"), ("open document", "FILE_FOLDER_OPERATION"),
-    ("launch file", "FILE_FOLDER_OPERATION"), ("open my documents", "FILE_FOLDER_OPERATION"), ("open downloads folder", "FILE_FOLDER_OPERATION"),
-    ("open desktop", "FILE_FOLDER_OPERATION"), ("show file", "FILE_FOLDER_OPERATION"), ("browse to folder", "FILE_FOLDER_OPERATION"),
-    ("open pictures", "FILE_FOLDER_OPERATION"), ("open videos folder", "FILE_FOLDER_OPERATION"), ("open music", "FILE_FOLDER_OPERATION"),
-    ("show folder", "FILE_FOLDER_OPERATION"), ("browse file", "FILE_FOLDER_OPERATION"),
-    ("type text", "TYPE_TEXT"), ("write something", "TYPE_TEXT"), ("enter text", "TYPE_TEXT"),
-    ("click on something", "MOUSE_CLICK"), ("click here", "MOUSE_CLICK"),
-    ("right click", "MOUSE_RIGHTCLICK"), ("double click", "MOUSE_DOUBLECLICK"),
-    ("maximize window", "WINDOW_ACTION"), ("minimize window", "WINDOW_ACTION"), ("fullscreen mode", "WINDOW_ACTION"),
-    ("take screenshot", "SYSTEM"), ("lock screen", "SYSTEM"),
-    ("copy", "KEYBOARD"), ("paste", "KEYBOARD"), ("save", "KEYBOARD"), ("undo", "KEYBOARD"),
-    ("open app and search", "APP_WITH_ACTION"), ("launch app and type", "APP_WITH_ACTION"),
-    ("open app and play", "APP_WITH_ACTION"), ("start app and compose", "APP_WITH_ACTION"),
-    ("play music", "MEDIA_CONTROL"), ("play video", "MEDIA_CONTROL"), ("stream music", "MEDIA_CONTROL"), ("stream video", "MEDIA_CONTROL"),
-    ("send whatsapp to", "SEND_MESSAGE"), ("send message to", "SEND_MESSAGE"), ("whatsapp to", "SEND_MESSAGE"),
-    ("email to", "SEND_MESSAGE"), ("post on social", "SEND_MESSAGE"), ("message to", "SEND_MESSAGE"),
-    ("whatsapp mom", "SEND_MESSAGE"), ("email john", "SEND_MESSAGE"),
-    ("search for something", "WEB_SEARCH"), ("google something", "WEB_SEARCH"), ("youtube search", "WEB_SEARCH"),
-    ("open youtube", "WEB_SEARCH"), ("profile work search python", "WEB_SEARCH"), ("with profile personal search", "WEB_SEARCH"),
-    ("chrome profile dev open youtube", "WEB_SEARCH"), ("open gmail", "WEB_SEARCH"), ("go to facebook", "WEB_SEARCH"),
-    ("search amazon", "WEB_SEARCH"), 
-]
+from models import intent_data
+from models.intent_data import CORE_TRAINING_DATA as MODEL1_TRAINING_DATA
+from models.keyword_extractor import extract_keywords
+from models.online_intent import OnlineIntentLearner, is_confirmation, parse_correction
+
+# Labels the online intent model (and corrections) use
+INTENT_LABELS = sorted({label for _, label in intent_data.MODEL1_TRAINING_DATA})
 
 STEP_TEMPLATES = {
     "open_app_windows": [
@@ -148,141 +131,8 @@ MODEL2_STEP_RULES = {
     ],
 }
 
-def extract_profile_name(text):
-    patterns = [
-        r'with chrome profile ([\w\s]+?)(?:\s+(?:search|open|go|and))', r'chrome profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
-        r'with profile ([\w\s]+?)(?:\s+(?:search|open|go|and))', r'use profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
-        r'profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, text.lower())
-        if match:
-            return match.group(1).strip()
-    return "Default"
-
-def extract_website_and_action(text):
-    websites = {
-        'youtube': 'youtube.com', 'google': 'google.com', 'gmail': 'mail.google.com', 'facebook': 'facebook.com',
-        'twitter': 'twitter.com', 'instagram': 'instagram.com', 'linkedin': 'linkedin.com', 'github': 'github.com',
-        'reddit': 'reddit.com', 'amazon': 'amazon.com', 'netflix': 'netflix.com', 'spotify': 'open.spotify.com',
-    }
-    text_l = text.lower()
-    website = 'google.com'
-    for keyword, url in websites.items():
-        if keyword in text_l:
-            website = url
-            break
-    query_text = text_l
-    for pattern in [r'with chrome profile [\w\s]+', r'chrome profile [\w\s]+', r'profile [\w\s]+']:
-        query_text = re.sub(pattern, '', query_text)
-    skip_words = {'with', 'chrome', 'search', 'for', 'open', 'go', 'to', 'on', 'in', 'and', 'youtube', 'google', 'gmail', 'facebook', 'profile'}
-    query_words = [w for w in query_text.split() if w not in skip_words and w.strip()]
-    return website, ' '.join(query_words) if query_words else None
-
-def extract_app_name(words, trigger_words):
-    for trigger in trigger_words:
-        if trigger in words:
-            idx = words.index(trigger)
-            app_words = [w for w in words[idx+1:] if w not in ['app', 'application', 'program']]
-            if app_words:
-                return ' '.join(app_words)
-    return None
-
-def extract_text_after_keywords(words, keywords, skip_words):
-    for keyword in keywords:
-        if keyword in words:
-            idx = words.index(keyword)
-            text_words = [w for w in words[idx+1:] if w not in skip_words]
-            if text_words:
-                return ' '.join(text_words)
-    return None
-
-def extract_file_or_folder_path(words, raw_command):
-    file_indicators = ['file', 'document', 'doc', 'pdf', 'image', 'video', 'folder', 'directory']
-    common_folders = {
-        'documents': r'%USERPROFILE%\Documents', 'downloads': r'%USERPROFILE%\Downloads', 'desktop': r'%USERPROFILE%\Desktop',
-        'pictures': r'%USERPROFILE%\Pictures', 'videos': r'%USERPROFILE%\Videos', 'music': r'%USERPROFILE%\Music',
-    }
-    is_file_operation = any(indicator in words for indicator in file_indicators)
-    if not is_file_operation:
-        return False, None, None, False
-    for folder_keyword, folder_path in common_folders.items():
-        if folder_keyword in words:
-            return True, folder_path, 'folder', True
-    skip_words = {'open', 'file', 'folder', 'document', 'my', 'the', 'launch', 'show', 'browse', 'to'}
-    target_words = [w for w in words if w not in skip_words]
-    if target_words:
-        target_name = ' '.join(target_words)
-        target_type = 'folder' if 'folder' in words or 'directory' in words else 'file'
-        return True, target_name, target_type, False
-    return False, None, None, False
-
 def extract_keywords_by_command_type(raw_command, command_type):
-    raw_command_lower = raw_command.lower().strip()
-    words = raw_command_lower.split()
-    extracted = {
-        'app_name': None, 'search_query': None, 'text_content': None, 'action_target': None, 'keyboard_shortcut': None,
-        'system_action': None, 'window_action': None, 'profile_name': None, 'website': None, 'media_query': None,
-        'recipient': None, 'message_content': None, 'action_content': None, 'is_file_operation': False, 'file_path': None,
-        'target_type': None, 'is_known_folder': False, 'needs_search': False, 'search_target': None, 'has_message_content': False,
-    }
-    if command_type == "OPEN_APP":
-        trigger = ['open', 'launch', 'start', 'run']
-        extracted['app_name'] = extract_app_name(words, trigger) or ('chrome' if 'chrome' in words else 'current')
-    elif command_type == "CLOSE_APP":
-        trigger = ['close', 'exit', 'quit']
-        extracted['app_name'] = extract_app_name(words, trigger) or 'current'
-    elif command_type == "FILE_FOLDER_OPERATION":
-        is_file_op, target_name, target_type, is_known = extract_file_or_folder_path(words, raw_command_lower)
-        extracted['is_file_operation'] = True
-        extracted['is_known_folder'] = is_known
-        extracted['needs_search'] = not is_known
-        extracted['target_type'] = target_type
-        if is_known:
-            extracted['file_path'] = target_name
-        else:
-            extracted['search_target'] = target_name
-    elif command_type == "WEB_SEARCH":
-        extracted['profile_name'] = extract_profile_name(raw_command_lower)
-        website, query = extract_website_and_action(raw_command_lower)
-        extracted['website'] = website
-        extracted['search_query'] = query
-    elif command_type == "TYPE_TEXT":
-        extracted['text_content'] = extract_text_after_keywords(words, ['type', 'write', 'enter'], {'text', 'message'})
-    elif command_type in ["MOUSE_CLICK", "MOUSE_RIGHTCLICK", "MOUSE_DOUBLECLICK"]:
-        skip = {'click', 'on', 'here', 'it', 'this', 'right', 'double'}
-        extracted['action_target'] = ' '.join([w for w in words if w not in skip]) or 'current'
-    elif command_type == "WINDOW_ACTION":
-        extracted['window_action'] = 'maximize' if any(w in words for w in ['maximize', 'fullscreen']) else 'minimize'
-    elif command_type == "KEYBOARD":
-        shortcuts = {'copy': 'ctrl+c', 'paste': 'ctrl+v', 'save': 'ctrl+s', 'undo': 'ctrl+z'}
-        for word, shortcut in shortcuts.items():
-            if word in words:
-                extracted['keyboard_shortcut'] = shortcut
-                break
-    elif command_type == "SYSTEM":
-        extracted['system_action'] = 'screenshot' if 'screenshot' in words or 'capture' in words else 'lock'
-    elif command_type == "APP_WITH_ACTION":
-        if 'and' in words:
-            and_idx = words.index('and')
-            extracted['app_name'] = extract_app_name(words[:and_idx], ['open', 'launch', 'start'])
-            extracted['action_content'] = ' '.join([w for w in words[and_idx+1:] if w not in ['search', 'type', 'play']])
-    elif command_type == "MEDIA_CONTROL":
-        apps = ['spotify', 'netflix', 'youtube', 'vlc']
-        extracted['app_name'] = next((app for app in apps if app in words), 'spotify')
-        extracted['media_query'] = ' '.join([w for w in words if w not in ['play', 'stream', 'music', 'video', extracted['app_name']]])
-    elif command_type == "SEND_MESSAGE":
-        apps_map = {
-            'whatsapp': 'whatsapp', 'email': 'outlook', 'social': 'facebook', 'twitter': 'twitter',
-            'instagram': 'instagram', 'telegram': 'telegram',
-        }
-        extracted['app_name'] = next((v for k, v in apps_map.items() if k in raw_command_lower), 'whatsapp')
-        if 'to' in words:
-            to_idx = words.index('to')
-            recipient_words = words[to_idx + 1:]
-            if recipient_words:
-                extracted['recipient'] = ' '.join(recipient_words)
-    return extracted
+    return extract_keywords(raw_command, command_type, dialect='eva_ter')
 
 def generate_steps_model2(command_type, extracted_keywords):
     if command_type not in MODEL2_STEP_RULES:
@@ -346,6 +196,55 @@ def generate_steps_model2(command_type, extracted_keywords):
         generated_steps.append(step_copy)
     return generated_steps
 
+_gemini_planner = None
+
+
+def plan_steps_with_gemini(command_type, extracted_keywords, raw_command, execution_handler):
+    """
+    StepGenerator plan for a command type without a step template, grounded
+    in a summary of the current screen (None if Gemini is unavailable)
+    """
+    global _gemini_planner
+    try:
+        if _gemini_planner is None:
+            _gemini_planner = (ScreenAnalyzer(config.GEMINI_API_KEY), StepGenerator(config.GEMINI_API_KEY))
+        screen_analyzer, step_generator = _gemini_planner
+
+        screenshot_path = execution_handler.screenshot_handler.capture()
+        elements = None
+        if screenshot_path:
+            parse_result = execution_handler.omniparser_executor.parse_screen(screenshot_path, raw_command)
+            elements = parse_result.get('elements') if parse_result else None
+        command_data = {
+            'raw_command': raw_command,
+            'classification': {'category': command_type, 'entities': extracted_keywords},
+            'screen_summary': screen_analyzer.get_screen_summary(screenshot_path, elements),
+        }
+        return to_action_steps(step_generator.generate(command_data))
+    except Exception as e:
+        print(f"Gemini step planning failed: {e}")
+        return None
+
+_online_learner = None
+_last_command = None  # (text, command_type) of the last classified command
+
+
+def record_intent_feedback(command_type, source):
+    """
+    Teach the online intent model (shared with main.py's cascade) the label of
+    the last command; only on an explicit user "confirmed" or "correction"
+    """
+    global _online_learner
+    if not config.ONLINE_INTENT_ENABLED or _last_command is None:
+        return False
+    try:
+        if _online_learner is None:
+            _online_learner = OnlineIntentLearner.load_or_seed(intent_data.MODEL1_TRAINING_DATA)
+        return _online_learner.learn(_last_command[0], command_type, source=source)
+    except Exception as e:
+        print(f"Could not record intent feedback: {e}")
+        return False
+
 def analyze_query_with_groq(query):
     """
     Analyzes the user's query using the Groq API to determine the command type.
@@ -389,12 +288,29 @@ def run_eva_pipeline(prompt, response_widget, execution_handler):
     response_widget.insert(tk.END, f">>> SYSTEM PROCESSING: {prompt}\n", "header")
     response_widget.insert(tk.END, "="*50 + "\n\n", "normal")
 
+    # "correct: OPEN_APP" / "that was web search" re-labels the previous command,
+    # "confirm" / "that's right" confirms its label
+    global _last_command
+    label = parse_correction(prompt, INTENT_LABELS)
+    source = "correction"
+    if not label and is_confirmation(prompt):
+        label, source = (_last_command[1] if _last_command else "-"), "confirmed"
+    if label:
+        if _last_command and record_intent_feedback(label, source=source):
+            _last_command = (_last_command[0], label)
+            response_widget.insert(tk.END, f"[LEARNED] \"{_last_command[0]}\" IS {label}\n", "success")
+        else:
+            response_widget.insert(tk.END, f"[ERROR] CANNOT LEARN {label} FOR THE PREVIOUS COMMAND\n", "error")
+        response_widget.config(state=tk.DISABLED)
+        return
+
     # STEP 1: Model 1 - Classification (using Groq)
     model1_result = analyze_query_with_groq(prompt)
     if not model1_result:
         response_widget.insert(tk.END, "[ERROR] ANALYZING COMMAND FAILED (GROQ)\n", "error")
         response_widget.config(state=tk.DISABLED)
         return
+    _last_command = (model1_result['input'], model1_result['command_type'])
 
     response_widget.insert(tk.END, "[STEP 1] CLASSIFICATION\n", "step")
     response_widget.insert(tk.END, f"INPUT: {model1_result['input']}\n", "normal")
@@ -409,8 +325,12 @@ def run_eva_pipeline(prompt, response_widget, execution_handler):
     response_widget.insert(tk.END, "\n")
 
 
-    # STEP 3: Step Generation
+    # STEP 3: Step Generation (Gemini + screen context when no template exists)
     steps = generate_steps_model2(model1_result['command_type'], extracted_keywords)
+    if model1_result['command_type'] not in MODEL2_STEP_RULES:
+        steps = plan_steps_with_gemini(
+            model1_result['command_type'], extracted_keywords, prompt, execution_handler
+        ) or steps
     response_widget.insert(tk.END, "[STEP 3] GENERATION\n", "step")
     step_count = 0
     for step in steps:
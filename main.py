@@ -2,6 +2,7 @@ import os
 import sys
 import re
 import threading
+import multiprocessing
 import time
 import warnings
 import json
@@ -30,8 +31,11 @@ from vision.omniparser_executor import OmniParserExecutor
 from speech.wake_word_detector import WakeWordDetector
 from mail import start_mail_composition
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from models.intent_model_store import IntentModelStore, analyze_queries, params_for
+from models.intent_router import build_router
+from models.keyword_extractor import extract_keywords
+from models.online_intent import is_confirmation, parse_correction
+from models.step_generator import StepGenerator, to_action_steps
 
 # === Qt (PySide6) ===
 
@@ -42,26 +46,6 @@ from PySide6.QtWidgets import (
     QVBoxLayout, QHBoxLayout, QFrame, QStackedWidget, QSizePolicy,
     QDialog, QMessageBox, QGraphicsDropShadowEffect, QStackedLayout
 )
-def text_to_number(text):
-    """Convert text numbers to digits"""
-    if isinstance(text, int):
-        return text
-    text = str(text).lower().strip()
-    number_words = {
-        'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
-        'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
-        'eleven': 11, 'twelve': 12, 'thirteen': 13, 'fourteen': 14, 'fifteen': 15,
-        'sixteen': 16, 'seventeen': 17, 'eighteen': 18, 'nineteen': 19, 'twenty': 20,
-        'thirty': 30, 'forty': 40, 'fifty': 50, 'sixty': 60, 'seventy': 70,
-        'eighty': 80, 'ninety': 90, 'hundred': 100
-    }
-    if text in number_words:
-        return number_words[text]
-    try:
-        return int(text)
-    except:
-        return None
-
 
 # Hide that pkg_resources deprecation notice from dependencies
 warnings.filterwarnings("ignore", message="pkg_resources is deprecated as an API", category=UserWarning)
@@ -73,299 +57,8 @@ load_dotenv()
 # EVA_TER LOGIC (INTEGRATED) — unchanged datasets and step templates
 # ============================================================================ 
 
-MODEL1_TRAINING_DATA = [
-    ("open application", "OPEN_APP"), ("launch program", "OPEN_APP"), ("start software", "OPEN_APP"),
-    ("run app", "OPEN_APP"), ("open app", "OPEN_APP"), ("open chrome", "OPEN_APP"), ("launch spotify", "OPEN_APP"),
-    ("open word", "OPEN_APP"),
-("open microsoft word", "OPEN_APP"),
-("launch word", "OPEN_APP"),
-("start word document", "OPEN_APP"),
-("open ms word", "OPEN_APP"),
-("open word processor", "OPEN_APP"),
-
-("open spotify", "OPEN_APP"),
-("launch spotify", "OPEN_APP"),
-("start spotify", "OPEN_APP"),
-("play spotify", "OPEN_APP"),
-("open music on spotify", "OPEN_APP"),
-("spotify open", "OPEN_APP"),
-
-("open notepad", "OPEN_APP"),
-("launch notepad", "OPEN_APP"),
-("start notepad", "OPEN_APP"),
-("open text editor", "OPEN_APP"),
-("open note pad", "OPEN_APP"),
-
-("open chrome", "OPEN_APP"),
-("open google chrome", "OPEN_APP"),
-("launch chrome", "OPEN_APP"),
-("start chrome browser", "OPEN_APP"),
-("open browser chrome", "OPEN_APP"),
-
-("open vscode", "OPEN_APP"),
-("open visual studio code", "OPEN_APP"),
-("launch vscode", "OPEN_APP"),
-("start code editor", "OPEN_APP"),
-("open vs code", "OPEN_APP"),
-
-("open task manager", "OPEN_APP"),
-("launch task manager", "OPEN_APP"),
-("start taskmgr", "OPEN_APP"),
-("open task manager ctrl shift esc", "OPEN_APP"),
-
-("open paint", "OPEN_APP"),
-("launch paint", "OPEN_APP"),
-("start mspaint", "OPEN_APP"),
-("open ms paint", "OPEN_APP"),
-
-("open powerpoint", "OPEN_APP"),
-("open microsoft powerpoint", "OPEN_APP"),
-("launch powerpoint", "OPEN_APP"),
-("start ppt", "OPEN_APP"),
-
-("open excel", "OPEN_APP"),
-("open microsoft excel", "OPEN_APP"),
-("launch excel", "OPEN_APP"),
-("start spreadsheet", "OPEN_APP"),
-
-("open edge", "OPEN_APP"),
-("open microsoft edge", "OPEN_APP"),
-("launch edge", "OPEN_APP"),
-("start edge browser", "OPEN_APP"),
-
-("open cmd", "OPEN_APP"),
-("open command prompt", "OPEN_APP"),
-("launch cmd", "OPEN_APP"),
-("start command line", "OPEN_APP"),
-
-("open settings", "OPEN_APP"),
-("open windows settings", "OPEN_APP"),
-("launch settings", "OPEN_APP"),
-("start settings app", "OPEN_APP"),
-    ("close application", "CLOSE_APP"), ("close this", "CLOSE_APP"), ("close window", "CLOSE_APP"),
-    ("exit application", "CLOSE_APP"), ("quit app", "CLOSE_APP"),
-    ("open file explorer", "OPEN_FILE_EXPLORER"), ("open file manager", "OPEN_FILE_EXPLORER"),
-    ("search for file", "SEARCH_FILE"), ("find document", "SEARCH_FILE"),
-    ("open documents", "OPEN_FOLDER"), ("open downloads", "OPEN_FOLDER"), ("open pictures", "OPEN_FOLDER"),
-    ("type text", "TYPE_TEXT"), ("write something", "TYPE_TEXT"), ("enter text", "TYPE_TEXT"),
-    ("click on something", "MOUSE_CLICK"), ("click here", "MOUSE_CLICK"),
-    ("right click", "MOUSE_RIGHTCLICK"), ("double click", "MOUSE_DOUBLECLICK"),
-    ("maximize window", "WINDOW_ACTION"), ("minimize window", "WINDOW_ACTION"), ("fullscreen mode", "WINDOW_ACTION"),
-    ("take screenshot", "SYSTEM"), ("lock screen", "SYSTEM"),
-    ("copy", "KEYBOARD"), ("paste", "KEYBOARD"), ("save", "KEYBOARD"), ("undo", "KEYBOARD"),
-    ("open app and search", "APP_WITH_ACTION"), ("launch app and type", "APP_WITH_ACTION"),
-    ("open app and play", "APP_WITH_ACTION"), ("start app and compose", "APP_WITH_ACTION"),
-    ("play music", "MEDIA_CONTROL"), ("play video", "MEDIA_CONTROL"), ("stream music", "MEDIA_CONTROL"), ("stream video", "MEDIA_CONTROL"),
-    ("open spotify and play", "MEDIA_CONTROL"), ("open youtube and play", "MEDIA_CONTROL"),
-    ("play song on spotify", "MEDIA_CONTROL"), ("play sapphire on spotify", "MEDIA_CONTROL"),
-    ("play blinding lights on spotify", "MEDIA_CONTROL"), ("play shape of you on spotify", "MEDIA_CONTROL"),
-    ("play something on spotify", "MEDIA_CONTROL"), ("play a song on spotify", "MEDIA_CONTROL"),
-    ("play any song on spotify", "MEDIA_CONTROL"), ("play music on spotify", "MEDIA_CONTROL"),
-    ("play on spotify", "MEDIA_CONTROL"), ("play on youtube", "MEDIA_CONTROL"),
-    ("play bohemian rhapsody on spotify", "MEDIA_CONTROL"), ("play despacito on spotify", "MEDIA_CONTROL"),
-    ("play song spotify", "MEDIA_CONTROL"), ("play track on spotify", "MEDIA_CONTROL"),
-    ("stream song on spotify", "MEDIA_CONTROL"), ("play album on spotify", "MEDIA_CONTROL"),
-    ("send whatsapp to", "SEND_MESSAGE"), ("send message to", "SEND_MESSAGE"), ("whatsapp to", "SEND_MESSAGE"),
- ("post on social", "SEND_MESSAGE"), ("message to", "SEND_MESSAGE"),
-    ("whatsapp mom", "SEND_MESSAGE"), 
-    ("text to", "SEND_MESSAGE"), ("text message to", "SEND_MESSAGE"),
-("send a text to", "SEND_MESSAGE"), ("send a whatsapp to", "SEND_MESSAGE"),
-("send an email to", "SEND_MESSAGE"), ("compose email to", "SEND_MESSAGE"),
- ("draft message to", "SEND_MESSAGE"),
-("send sms to", "SEND_MESSAGE"), ("sms to", "SEND_MESSAGE"),
-
-    # === WEB_SEARCH Commands (Dynamic - works with ANY website) ===
-    ("search for something", "WEB_SEARCH"), ("google something", "WEB_SEARCH"), ("youtube search", "WEB_SEARCH"),
-    ("open youtube", "WEB_SEARCH"), ("open gmail", "WEB_SEARCH"), ("go to facebook", "WEB_SEARCH"),
-    ("search amazon", "WEB_SEARCH"), ("search python on google", "WEB_SEARCH"), ("search for machine learning", "WEB_SEARCH"),
-    ("github search api documentation", "WEB_SEARCH"), ("wikipedia search artificial intelligence", "WEB_SEARCH"),
-    ("stackoverflow search error handling", "WEB_SEARCH"), ("search reddit python tutorials", "WEB_SEARCH"),
-    ("open github", "WEB_SEARCH"), ("search wikipedia", "WEB_SEARCH"), ("search stackoverflow for bug", "WEB_SEARCH"),
-    ("bing search tutorial", "WEB_SEARCH"), ("duckduckgo search privacy", "WEB_SEARCH"), ("medium search article", "WEB_SEARCH"),
-    ("twitter search news", "WEB_SEARCH"), ("instagram search photos", "WEB_SEARCH"), ("linkedin search jobs", "WEB_SEARCH"),
-    ("pinterest search ideas", "WEB_SEARCH"), ("reddit search community", "WEB_SEARCH"), ("imdb search movie", "WEB_SEARCH"),
-    ("ebay search products", "WEB_SEARCH"), ("quora search answers", "WEB_SEARCH"), ("netflix search shows", "WEB_SEARCH"),
-    ("search on google for python programming", "WEB_SEARCH"), ("find information about ai on wikipedia", "WEB_SEARCH"),
-    ("open stack overflow and search for javascript", "WEB_SEARCH"), ("search github for projects", "WEB_SEARCH"),
-    ("look up tutorials on youtube", "WEB_SEARCH"), ("browse reddit for discussions", "WEB_SEARCH"),
-    ("go to perplexity", "WEB_SEARCH"),
-    ("go to gemini", "WEB_SEARCH"),
-    ("go to grok", "WEB_SEARCH"),
-    ("go to chatgpt", "WEB_SEARCH"),
-    ("go to claude", "WEB_SEARCH"),
-    ("go to google", "WEB_SEARCH"),
-    ("go to youtube", "WEB_SEARCH"),
-    ("go to github", "WEB_SEARCH"),
-    ("go to stackoverflow", "WEB_SEARCH"),
-    ("go to reddit", "WEB_SEARCH"),
-    ("go to wikipedia", "WEB_SEARCH"),
-    ("go to amazon", "WEB_SEARCH"),
-    ("go to twitter", "WEB_SEARCH"),
-    ("go to linkedin", "WEB_SEARCH"),
-    ("go to flipkart", "WEB_SEARCH"),
-    ("turn on wifi", "SYSTEM"),
-    ("turn off wifi", "SYSTEM"),
-    ("enable bluetooth", "SYSTEM"),
-    ("disable bluetooth", "SYSTEM"),
-    ("turn on flight mode", "SYSTEM"),
-    ("turn off airplane mode", "SYSTEM"),
-    ("enable night light", "SYSTEM"),
-    ("turn on battery saver", "SYSTEM"),
-    ("enable hotspot", "SYSTEM"),
-    ("set volume to 50", "SYSTEM"),
-    ("increase volume", "SYSTEM"),
-    ("mute volume", "SYSTEM"),
-    ("set brightness to 70", "SYSTEM"),
-    ("set brightness to 100", "SYSTEM"),
-    ("set brightness to 20", "SYSTEM"),
-    ("brightness to 50", "SYSTEM"),
-    ("shutdown computer", "SYSTEM"),
-    ("restart system", "SYSTEM"),
-    ("lock computer", "SYSTEM"),
-    ("put computer to sleep", "SYSTEM"),
-    ("send mail", "SENDMAIL"),
-    ("email to shriya", "SENDMAIL"),
-    ("compose a mail to anu", "SENDMAIL"),
-    ("send an email", "SENDMAIL"),
-    ("email to shriya", "SENDMAIL"),
-    ("send mail", "SENDMAIL"),
-    ("email to shriya", "SENDMAIL"),
-    ("compose a mail to anu", "SENDMAIL"),
-    ("send an email", "SENDMAIL"),
-    ("send email", "SENDMAIL"),
-    ("send an email", "SENDMAIL"),
-    ("email to shriya", "SENDMAIL"),
-    ("email to anu", "SENDMAIL"),
-    ("compose a mail to anu", "SENDMAIL"),
-    ("compose email", "SENDMAIL"),
-    ("compose a mail", "SENDMAIL"),
-    ("send mail to john", "SENDMAIL"),
-    ("write an email", "SENDMAIL"),
-    ("draft email", "SENDMAIL"),
-    ("send a mail", "SENDMAIL"),
-    ("mail compose", "SENDMAIL"),
-    ("write email to", "SENDMAIL"),
-    ("goodbye eva", "EXIT"),
-("goodbye e", "EXIT"),
-("exit eva", "EXIT"),
-("close eva", "EXIT"),
-("quit eva", "EXIT"),
-("stop eva", "EXIT"),
-("bye eva", "EXIT"),
-("see you later eva", "EXIT"),
-
-    # === CALCULATOR Commands ===
-    ("open calculator", "CALCULATOR"),
-    ("launch calculator", "CALCULATOR"),
-    ("calculator", "CALCULATOR"),
-    ("calculate 25 plus 30", "CALCULATOR"),
-    ("calculate 100 minus 50", "CALCULATOR"),
-    ("multiply 12 by 8", "CALCULATOR"),
-    ("divide 144 by 12", "CALCULATOR"),
-    ("calculate square root of 144", "CALCULATOR"),
-    ("calculate 25 percent of 200", "CALCULATOR"),
-    ("clear calculator", "CALCULATOR"),
-    ("calculator equals", "CALCULATOR"),
-    ("switch calculator to scientific mode", "CALCULATOR"),
-    ("switch calculator to standard mode", "CALCULATOR"),
-    ("calculate sine of 45", "CALCULATOR"),
-    ("calculate cosine of 90", "CALCULATOR"),
-    ("calculate tangent of 30", "CALCULATOR"),
-    ("calculator memory store", "CALCULATOR"),
-    ("calculator memory recall", "CALCULATOR"),
-    ("calculator power 2 to the 8", "CALCULATOR"),
-    ("calculate factorial of 5", "CALCULATOR"),
-    ("add 15 and 25", "CALCULATOR"),
-    ("subtract 50 from 100", "CALCULATOR"),
-    ("what is 12 times 9", "CALCULATOR"),
-    ("divide 200 by 4", "CALCULATOR"),
-    ("square of 15", "CALCULATOR"),
-    # === CAMERA Commands ===
-    ("open camera", "CAMERA"),
-    ("launch camera", "CAMERA"),
-    ("start camera", "CAMERA"),
-    ("take photo", "CAMERA"),
-    ("capture photo", "CAMERA"),
-    ("snap a photo", "CAMERA"),
-    ("take a picture", "CAMERA"),
-    ("capture a picture", "CAMERA"),
-    ("snap a picture", "CAMERA"),
-    ("click a photo", "CAMERA"),
-    ("click a picture", "CAMERA"),
-    ("take selfie", "CAMERA"),
-    ("capture selfie", "CAMERA"),
-    ("snap selfie", "CAMERA"),
-    ("take a selfie", "CAMERA"),
-    ("camera on", "CAMERA"),
-    ("activate camera", "CAMERA"),
-    ("camera app", "CAMERA"),
-    ("open camera app", "CAMERA"),
-    ("launch camera app", "CAMERA"),
-    ("camera front", "CAMERA"),
-    ("switch to front camera", "CAMERA"),
-    ("camera back", "CAMERA"),
-    ("switch to back camera", "CAMERA"),
-    ("take a video", "CAMERA"),
-    ("record video", "CAMERA"),
-    ("capture video", "CAMERA"),
-    ("video recording", "CAMERA"),
-    ("start recording", "CAMERA"),
-    ("stop recording", "CAMERA"),
-    ("flash on", "CAMERA"),
-    ("flash off", "CAMERA"),
-    ("enable flash", "CAMERA"),
-    ("disable flash", "CAMERA"),
-    ("night mode", "CAMERA"),
-    ("portrait mode", "CAMERA"),
-    ("panorama mode", "CAMERA"),
-    ("zoom in camera", "CAMERA"),
-    ("zoom out camera", "CAMERA"),
-    ("camera zoom", "CAMERA"),
-    ("focus on face", "CAMERA"),
-    ("smile detection", "CAMERA"),
-    ("take burst photo", "CAMERA"),
-    ("picture perfect", "CAMERA"),
-    ("shoot", "CAMERA"),
-    ("music play pause", "SPOTIFY_CONTROL"),
-    ("music pause", "SPOTIFY_CONTROL"),
-    ("music play", "SPOTIFY_CONTROL"),
-    ("music next song", "SPOTIFY_CONTROL"),
-    ("music next", "SPOTIFY_CONTROL"),
-    ("music previous song", "SPOTIFY_CONTROL"),
-    ("music previous", "SPOTIFY_CONTROL"),
-    ("music back", "SPOTIFY_CONTROL"),
-    # === CLOCK ALARM Commands ===
-    ("set alarm for 7 am", "CLOCK_ALARM"),
-    ("set alarm at 8 30", "CLOCK_ALARM"),
-    ("create alarm for 6 pm", "CLOCK_ALARM"),
-    ("wake me up at 9 am", "CLOCK_ALARM"),
-("alarm for 5 30 pm", "CLOCK_ALARM"),
-("set alarm for 6:15 am", "CLOCK_ALARM"),
-("set alarm 10 pm", "CLOCK_ALARM"),
-("create alarm 7:45", "CLOCK_ALARM"),
-("wake me at 5 am", "CLOCK_ALARM"),
-("alarm at 11 30 pm", "CLOCK_ALARM"),
-("set alarm for 12 pm", "CLOCK_ALARM"),
-("set alarm for noon", "CLOCK_ALARM"),
-("set alarm for midnight", "CLOCK_ALARM"),
-("alarm for 8 in the morning", "CLOCK_ALARM"),
-("set alarm 9 30 am", "CLOCK_ALARM"),
-("create alarm at 6:00 pm", "CLOCK_ALARM"),
-("wake me up 7:30 am", "CLOCK_ALARM"),
-("set an alarm for 4 pm", "CLOCK_ALARM"),
-("alarm 10:15 am", "CLOCK_ALARM"),
-("set morning alarm at 6", "CLOCK_ALARM"),
-("create alarm 5 45 pm", "CLOCK_ALARM"),
-("alarm for 3:30 in the afternoon", "CLOCK_ALARM"),
-("set alarm for 2 am", "CLOCK_ALARM"),
-("wake up alarm 8 am", "CLOCK_ALARM"),
-("set alarm for quarter past 7", "CLOCK_ALARM"),
-("alarm for half past 9 am", "CLOCK_ALARM"),
-("set alarm 11:00 pm", "CLOCK_ALARM"),
-("create wake up alarm 6:30", "CLOCK_ALARM"),
-("set daily alarm 7 am", "CLOCK_ALARM"),
-("alarm for 4:20 pm", "CLOCK_ALARM"),
-]
+from models.intent_data import MODEL1_TRAINING_DATA
+INTENT_LABELS = sorted({label for _, label in MODEL1_TRAINING_DATA})
 
 STEP_TEMPLATES = {
     "open_app_windows": [
@@ -990,6 +683,7 @@ class PasscodeDialog(QDialog):
 class EvaGui(QWidget):
     def __init__(self):
         super().__init__()
+        self._startup_started = time.perf_counter()
         self.setWindowTitle("EVA - Integrated Logic Assistant")
         self.resize(1200, 750)
         self.setStyleSheet("background-color: #000000; color: #e6e6e6;")
@@ -1009,6 +703,9 @@ class EvaGui(QWidget):
         self.current_model1_result = None
         self.current_extracted_keywords = None
         self.action_router = None
+        self.step_generator = None
+        self.intent_model = None
+        self.intent_router = None
 
         self._build_ui()
         self._init_backend_async()
@@ -1344,6 +1041,9 @@ class EvaGui(QWidget):
                 self.vision_enabled = True
                 self.bus.log.emit("✓ Vision system loaded successfully.\n")
 
+                # Gemini planner for command types without a step template
+                self.step_generator = StepGenerator(config.GEMINI_API_KEY)
+
                 self.wake_word_detector = WakeWordDetector()
                 self.bus.log.emit("✓ Wake word detector loaded successfully.\n")
 
@@ -1358,14 +1058,25 @@ class EvaGui(QWidget):
                     self.bus.log.emit(f"⚠️ FaceAuthenticator not available: {e}\n")
 
 
-                # Train classifier
-                self.vectorizer = TfidfVectorizer()
-                self.classifier = LogisticRegression()
-                X, y = zip(*MODEL1_TRAINING_DATA)
-                X_vectorized = self.vectorizer.fit_transform(X)
-                self.classifier.fit(X_vectorized, y)
-                self.bus.log.emit("✓ Command classifier trained.\n")
-                self.bus.log.emit("Ready to receive commands.\n")
+                # Command classifier: persisted artifact keyed by data + hyperparameters
+                store = IntentModelStore(config.INTENT_MODEL_DIR)
+                self.intent_model, status = store.get_or_train(
+                    MODEL1_TRAINING_DATA, params_for(config.INTENT_FEATURES), on_ready=self._swap_intent_model
+                )
+                if status == 'loaded':
+                    self.bus.log.emit("✓ Command classifier loaded from cache.\n")
+                elif status == 'stale':
+                    self.bus.log.emit("✓ Command classifier loaded (retraining on updated data in background).\n")
+                else:
+                    self.bus.log.emit("✓ Command classifier trained.\n")
+                if config.INTENT_CASCADE_ENABLED:
+                    self.intent_router = build_router(
+                        MODEL1_TRAINING_DATA, pipeline=self.intent_model, api_key=config.GEMINI_API_KEY
+                    )
+                    stages = " → ".join(stage.name for stage in self.intent_router.stages)
+                    self.bus.log.emit(f"✓ Intent cascade ready ({stages}).\n")
+                startup = time.perf_counter() - self._startup_started
+                self.bus.log.emit(f"Ready to receive commands. (startup {startup:.2f}s)\n")
             except Exception as e:
                 msg = (
                     "❌ CRITICAL ERROR: Could not initialize backend.\n"
@@ -1375,6 +1086,28 @@ class EvaGui(QWidget):
                 self.bus.log.emit(msg)
         threading.Thread(target=work, daemon=True).start()
 
+    def _record_intent_feedback(self, command_type, source):
+        """
+        Teach the online intent model the label of the last command; only on an
+        explicit user confirmation or correction (a run without errors proves nothing)
+        """
+        if not self.intent_router or not self.current_model1_result:
+            self.bus.log.emit("⚠️ No previous command to confirm or correct.\n")
+            return
+        text = self.current_model1_result['input']
+        command_type = command_type or self.current_model1_result['command_type']
+        if not self.intent_router.correct(text, command_type, source=source):
+            return
+        self.current_model1_result['command_type'] = command_type
+        self.bus.log.emit(f"🧠 Learned: \"{text}\" is {command_type}\n")
+
+    def _swap_intent_model(self, pipeline):
+        self.intent_model = pipeline
+        model_stage = self.intent_router.stage('model') if self.intent_router else None
+        if model_stage is not None:
+            model_stage.pipeline = pipeline
+        self.bus.log.emit("✓ Command classifier retrained on updated data.\n")
+
     def _start_wake_word_thread(self):
         def work():
             # ensure backend wake_word_detector exists
@@ -1440,6 +1173,16 @@ class EvaGui(QWidget):
         self._clear_log()
         self.bus.log.emit(f"Processing command: \"{prompt}\"\n\n")
 
+        # "correct: OPEN_APP" / "that was web search" re-labels the previous command,
+        # "confirm" / "that's right" confirms its label
+        label = parse_correction(prompt, INTENT_LABELS)
+        if label:
+            self._record_intent_feedback(label, source="correction")
+            return
+        if is_confirmation(prompt):
+            self._record_intent_feedback(None, source="confirmed")
+            return
+
         self.current_model1_result = self._analyze_query_with_model(prompt)
         if not self.current_model1_result:
             self.bus.log.emit("⚠️ Error analyzing command!")
@@ -1619,255 +1362,21 @@ class EvaGui(QWidget):
 
     # ---------- Model & NLP ----------
     def _analyze_query_with_model(self, query):
+        results = self._analyze_queries_with_model([query])
+        return results[0] if results and results[0]['command_type'] else None
+
+    def _analyze_queries_with_model(self, queries):
+        """Batch form of _analyze_query_with_model (intent cascade, else one predict_proba call for the list)"""
         try:
-            query_vectorized = self.vectorizer.transform([query.lower()])
-            prediction = self.classifier.predict(query_vectorized)
-            confidence = self.classifier.predict_proba(query_vectorized).max()
-            return {
-                "input": query,
-                "command_type": prediction[0],
-                "confidence": confidence,
-                "training_pattern": "Local Model Analysis",
-            }
+            if self.intent_router is not None:
+                return self.intent_router.route_batch(queries)
+            return analyze_queries(self.intent_model, queries)
         except Exception as e:
             print(f"Error analyzing query with model: {e}")
             return None
-    def _extract_keywords_by_command_type(self, raw_command, command_type):
-        import re
-        raw_command_lower = raw_command.lower().strip()
-        words = raw_command_lower.split()
-    
-        extracted = {
-        'app_name': None,
-        'search_query': None,
-        'text_content': None,
-        'action_target': None,
-        'keyboard_shortcut': None,
-        'system_action': None,
-        'window_action': None,
-        'profile_name': None,
-        'website': None,
-        'media_query': None,
-        'recipient': None,
-        'message_content': None,
-        'action_content': None,
-        'is_file_operation': False,
-        'file_path': None,
-        'target_type': None,
-        'is_known_folder': False,
-        'needs_search': False,
-        'search_target': None,
-        'has_message_content': False,
-        }
-    
-        if command_type == 'OPEN_APP':
-            trigger = ['open', 'launch', 'start', 'run', 'play']
-            extracted['app_name'] = self._extract_app_name(words, trigger)
-    
-        elif command_type == 'CLOSE_APP':
-            trigger = ['close', 'exit', 'quit']
-            extracted['app_name'] = self._extract_app_name(words, trigger) or 'current'
-    
-        elif command_type == 'OPEN_FOLDER':
-            is_file_op, target_name, target_type, is_known = self._extract_file_or_folder_path(words, raw_command_lower)
-            if is_known:
-                extracted['file_path'] = target_name
-            else:
-                extracted['search_target'] = target_name
-    
-        elif command_type == 'SEARCH_FILE':
-            is_file_op, target_name, target_type, is_known = self._extract_file_or_folder_path(words, raw_command_lower)
-            extracted['search_target'] = target_name
-    
-        elif command_type == 'WEB_SEARCH':
-            extracted['profile_name'] = self._extract_profile_name(raw_command_lower)
-            website, query, is_search = self._extract_website_and_action(raw_command_lower)
-            extracted['website'] = website
-            extracted['search_query'] = query
-            extracted['is_search_query'] = is_search
-    
-        elif command_type == 'TYPE_TEXT':
-            extracted['text_content'] = self._extract_text_after_keywords(raw_command.split(), ['type', 'write', 'enter', 'text', 'message'])
-    
-        elif command_type in ['MOUSE_CLICK', 'MOUSE_RIGHTCLICK', 'MOUSE_DOUBLECLICK']:
-            skip = ['click', 'on', 'here', 'it', 'this', 'right', 'double']
-            extracted['action_target'] = ' '.join([w for w in raw_command.split() if w.lower() not in skip]) or 'current'
-    
-        elif command_type == 'WINDOW_ACTION':
-            extracted['window_action'] = 'maximize' if any(w in raw_command.lower().split() for w in ['maximize', 'fullscreen']) else 'minimize'
-    
-        elif command_type == 'KEYBOARD':
-            shortcuts = {'copy': 'ctrl+c', 'paste': 'ctrl+v', 'save': 'ctrl+s', 'undo': 'ctrl+z'}
-            for word, shortcut in shortcuts.items():
-                if word in raw_command_lower:
-                    extracted['keyboard_shortcut'] = shortcut
-                    break
-    
-        elif command_type == 'SYSTEM':
-            extracted['control_type'] = None
-            extracted['percentage'] = None
-            extracted['system_action'] = raw_command.lower()
-        
-            # === VOLUME HANDLING ===
-            if 'volume' in words:
-                extracted['control_type'] = 'VOLUME'
-                extracted['system_action'] = 'VOLUME'
-                for word in words:
-                    level = text_to_number(word)
-                    if level is not None and 0 <= level <= 100:
-                        extracted['percentage'] = level
-                        break
-        
-            # === BRIGHTNESS HANDLING ===
-            elif 'brightness' in words:
-                extracted['control_type'] = 'BRIGHTNESS'
-                extracted['system_action'] = 'BRIGHTNESS'
-                for word in words:
-                    level = text_to_number(word)
-                    if level is not None and 0 <= level <= 100:
-                        extracted['percentage'] = level
-                        break
-        
-            # === OTHER SYSTEM CONTROLS ===
-            elif 'wifi' in words or 'wi-fi' in words or 'wi fi' in words:
-                extracted['control_type'] = 'WIFI'
-                extracted['system_action'] = 'WIFI'
-            elif 'bluetooth' in words:
-                extracted['control_type'] = 'BLUETOOTH'
-                extracted['system_action'] = 'BLUETOOTH'
-            elif 'flight' in words or 'airplane' in words:
-                extracted['control_type'] = 'FLIGHTMODE'
-                extracted['system_action'] = 'FLIGHTMODE'
-            elif 'night' in words and 'light' in words:
-                extracted['control_type'] = 'NIGHTLIGHT'
-                extracted['system_action'] = 'NIGHTLIGHT'
-            elif 'energy' in words or 'saver' in words or 'battery' in words:
-                extracted['control_type'] = 'ENERGYSAVER'
-                extracted['system_action'] = 'ENERGYSAVER'
-            elif 'hotspot' in words or 'mobile' in words:
-                extracted['control_type'] = 'MOBILEHOTSPOT'
-                extracted['system_action'] = 'MOBILEHOTSPOT'
-    
-        elif command_type == 'APP_WITH_ACTION':
-            if 'and' in raw_command_lower:
-                and_idx = raw_command_lower.split().index('and')
-                extracted['app_name'] = self._extract_app_name(raw_command.split()[:and_idx], ['open', 'launch', 'start'])
-                extracted['action_content'] = ' '.join([w for w in raw_command.split()[and_idx+1:] if w.lower() not in ['search', 'type', 'play']])
-    
-        elif command_type == 'MEDIA_CONTROL':
-            apps = ['spotify', 'netflix', 'youtube', 'vlc']
-            app_name = next((app for app in apps if app in raw_command_lower), 'spotify')
-            extracted['app_name'] = app_name
-        
-            play_idx = -1
-            raw_lower_words = raw_command_lower.split()
-            if 'play' in raw_lower_words:
-                play_idx = raw_lower_words.index('play')
-            elif 'stream' in raw_lower_words:
-                play_idx = raw_lower_words.index('stream')
-        
-            if play_idx != -1:
-                query_parts = raw_command.split()[play_idx + 1:]
-                # Remove app names and stop words from query
-                filtered_query = [word for word in query_parts if word.lower() not in apps + ['on', 'in', 'from']]
-                extracted['media_query'] = ' '.join(filtered_query)
-
-    
-        elif command_type == 'SEND_MESSAGE':
-            apps_map = {'whatsapp': 'whatsapp', 'email': 'outlook', 'social': 'facebook', 
-                    'twitter': 'twitter', 'instagram': 'instagram', 'telegram': 'telegram'}
-            extracted['app_name'] = next((v for k, v in apps_map.items() if k in raw_command_lower), 'whatsapp')
-
-            # Pattern 1: "send [message] to [recipient]"
-            # e.g. "send hello to John on whatsapp"
-            match = re.search(r'send\s+(.+?)\s+to\s+(\w+)', raw_command, re.IGNORECASE)
-            if match:
-                extracted['message_content'] = match.group(1).strip()
-                extracted['recipient'] = match.group(2).strip()
-                extracted['has_message_content'] = True
-                return extracted
-
-            # Pattern 2: "send message to [recipient] saying [message]"
-            match = re.search(r'send.*?to\s+([\w\s]+?)\s+(?:saying|that|message)\s+(.+)', raw_command, re.IGNORECASE)
-            if match:
-                extracted['recipient'] = match.group(1).strip()
-                extracted['message_content'] = match.group(2).strip()
-                extracted['has_message_content'] = True
-                return extracted
-
-            # Pattern 3: "whatsapp/message/text [message] to [recipient]"
-            match = re.search(r'(?:whatsapp|message|text)\s+(.+?)\s+to\s+(\w+)', raw_command, re.IGNORECASE)
-            if match:
-                extracted['message_content'] = match.group(1).strip()
-                extracted['recipient'] = match.group(2).strip()
-                extracted['has_message_content'] = True
-                return extracted
-
-            # Pattern 4: "to [recipient]" only — will ask for message later
-            match = re.search(r'\bto\s+(\w+)', raw_command, re.IGNORECASE)
-            if match:
-                extracted['recipient'] = match.group(1).strip()
-                return extracted
-
-            # Fallback: grab word after 'to'
-            if 'to' in raw_command_lower:
-                to_idx = raw_command_lower.split().index('to')
-                remaining = raw_command.split()[to_idx + 1:]
-                if remaining:
-                    extracted['recipient'] = remaining[0]
-    
-        elif command_type == 'CALCULATOR':
-            import re
-            numbers = re.findall(r'\d+', raw_command)
-            extracted['number1'] = numbers[0] if len(numbers) > 0 else ''
-            extracted['number2'] = numbers[1] if len(numbers) > 1 else ''
-        
-            if any(word in raw_command_lower for word in ['plus', 'add']):
-                extracted['operation'] = 'plus'
-            elif any(word in raw_command_lower for word in ['minus', 'subtract', '-']):
-                extracted['operation'] = 'minus'
-            elif any(word in raw_command_lower for word in ['multiply', 'times', '*', 'by']):
-                extracted['operation'] = 'multiply'
-            elif any(word in raw_command_lower for word in ['divide', '/']):
-                extracted['operation'] = 'divide'
-            elif 'square root' in raw_command_lower or 'sqrt' in raw_command_lower:
-                extracted['operation'] = 'square root'
-            elif 'clear' in raw_command_lower:
-                extracted['operation'] = 'clear'
-            elif 'scientific' in raw_command_lower:
-                extracted['operation'] = 'scientific'
-            elif 'standard' in raw_command_lower:
-                extracted['operation'] = 'standard'
-    
-        elif command_type == 'CAMERA':
-            extracted['action_content'] = 'take_photo'
-            if 'open' in raw_command_lower:
-                extracted['action_content'] = 'open_camera'
-    
-        elif command_type == 'CLOCK_ALARM':
-            import re
-            match = re.search(r'(\d{1,2}):(\d{2})', raw_command)
-            if match:
-                extracted['hour'] = match.group(1)
-                extracted['minute'] = match.group(2)
-            else:
-                numbers = re.findall(r'\d{1,2}', raw_command)
-                if len(numbers) >= 1:
-                    extracted['hour'] = numbers[0]
-                    extracted['minute'] = numbers[1] if len(numbers) > 1 else '00'
-        
-            if 'pm' in raw_command_lower and extracted.get('hour'):
-                hour = int(extracted['hour'])
-
-                if hour < 12:
-                    extracted['hour'] = str(hour + 12)
-            elif 'am' in raw_command_lower and extracted.get('hour'):
-                hour = int(extracted['hour'])
-                if hour == 12:
-                    extracted['hour'] = '0'
-    
-        return extracted
 
+    def _extract_keywords_by_command_type(self, raw_command, command_type):
+        return extract_keywords(raw_command, command_type, dialect='main')
 
     def _generate_steps_model2(self, command_type, extracted_keywords, raw_command=None):
     # Special handling for SYSTEM commands (nested dict)
@@ -2093,6 +1602,9 @@ class EvaGui(QWidget):
         
         # For all other command types, use existing logic
         if command_type not in MODEL2_STEP_RULES:
+            steps = self._plan_with_gemini(command_type, extracted_keywords, raw_command)
+            if steps:
+                return steps
             return [{"action_type": "EXECUTE", "parameters": {}, "description": f"Execute: {command_type}"}]
     
         steps_template = MODEL2_STEP_RULES[command_type]
@@ -2156,364 +1668,29 @@ class EvaGui(QWidget):
         return generated_steps
 
 
-    # ---------- small helpers ----------
-    def _extract_profile_name(self, text):
-        patterns = [
-            r'with chrome profile ([\w\s]+?)(?:\s+(?:search|open|go|and))', r'chrome profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
-            r'with profile ([\w\s]+?)(?:\s+(?:search|open|go|and))', r'use profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
-            r'profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                return match.group(1).strip()
-        return "Default"
-
-    def _extract_website_and_action(self, text):
-        """
-        Extract website and search query from command
-        Improved to handle dynamic websites and properly exclude "for" keyword
-        Also detects if it's just opening a website vs searching
-        
-        Patterns supported:
-        - "search google for python" -> (website, query, True)
-        - "search python on google" -> (website, query, True)
-        - "google search for python" -> (website, query, True)
-        - "search python programming" -> (website, query, True)
-        - "open github" -> (website, None, False)
-        - "go to netflix" -> (website, None, False)
-        - "search stackoverflow for error message" -> (website, query, True)
-        
-        Returns:
-            tuple: (website, query, is_search_action)
-        """
-        websites = {
-    'youtube': 'youtube',
-    'google': 'google',
-    'gmail': 'gmail',
-    'facebook': 'facebook',
-    'twitter': 'twitter',
-    'instagram': 'instagram',
-    'linkedin': 'linkedin',
-    'github': 'github',
-    'reddit': 'reddit',
-    'amazon': 'amazon',
-    'netflix': 'netflix',
-    'spotify': 'spotify',
-    'stackoverflow': 'stackoverflow',
-    'wikipedia': 'wikipedia',
-    'bing': 'bing',
-    'x': 'x',
-    'pinterest': 'pinterest',
-    'medium': 'medium',
-    'quora': 'quora',
-    'ebay': 'ebay',
-    'imdb': 'imdb',
-    'duckduckgo': 'duckduckgo',
-    'chatgpt': 'chatgpt',
-    'whatsapp': 'whatsapp',
-    'bank': 'bank',
-    'hotstar': 'hotstar',
-    'flipkart': 'flipkart',
-    'cricbuzz': 'cricbuzz',
-    'paytm': 'paytm',
-    'timesofindia': 'timesofindia',
-    'justdial': 'justdial',
-    'jiosaavn': 'jiosaavn',
-    'hindustantimes': 'hindustantimes',
-    'indianexpress': 'indianexpress',
-    'espncricinfo': 'espncricinfo',
-    'bookmyshow': 'bookmyshow',
-    'zeenews': 'zeenews',
-    'snapchat': 'snapchat',
-    'telegram': 'telegram',
-    'magicbricks': 'magicbricks',
-    'naukri': 'naukri',
-    'shaadi': 'shaadi',
-    'policybazaar': 'policybazaar',
-    'myntra': 'myntra',
-    'zomato': 'zomato',
-    'swiggy': 'swiggy',
-    'aajtak': 'aajtak',
-    'ndtv': 'ndtv',
-    'moneycontrol': 'moneycontrol',
-    'gaana': 'gaana',
-    'yatra': 'yatra',
-    '99acres': '99acres',
-    'cleartrip': 'cleartrip',
-    'makemytrip': 'makemytrip',
-    'olx': 'olx',
-    'carwale': 'carwale',
-    'bikedekho': 'bikedekho',
-    'housing': 'housing',
-    'bigbasket': 'bigbasket',
-    'grofers': 'grofers',
-    'reliancedigital': 'reliancedigital',
-    'vijaysales': 'vijaysales',
-    'croma': 'croma',
-    'indiamart': 'indiamart',
-    'tradeindia': 'tradeindia',
-    'sulekha': 'sulekha',
-    'mouthshut': 'mouthshut',
-    'whatmobile': 'whatmobile',
-    'hindisahityadarpan': 'hindisahityadarpan',
-    'abhiyojana': 'abhiyojana',
-    'pib': 'pib',
-    'incometaxindia': 'incometaxindia',
-    'upi': 'upi',
-    'bhimgov': 'bhimgov',
-    'umang': 'umang',
-    'digilocker': 'digilocker',
-    'mygov': 'mygov',
-    'india': 'india',
-    'epfindia': 'epfindia',
-    'esi': 'esi',
-    'passportindia': 'passportindia',
-    'irctc': 'irctc',
-    'indianrail': 'indianrail',
-    'airindia': 'airindia',
-    'raaga': 'raaga',
-    'hungama': 'hungama',
-    'wynk': 'wynk',
-    'jio': 'jio',
-    'airtel': 'airtel',
-    'vi': 'vi',
-    'bsnl': 'bsnl',
-    'icicibank': 'icicibank',
-    'hdfcbank': 'hdfcbank',
-    'sbibank': 'sbibank',
-    'axisbank': 'axisbank',
-    'kotak': 'kotak',
-    'yesbank': 'yesbank',
-    'federalbank': 'federalbank',
-    'ucobank': 'ucobank',
-    'canarabank': 'canarabank',
-    'iifl': 'iifl',
-    'bajajfinserv': 'bajajfinserv',
-    'tatacapital': 'tatacapital',
-    'lendenclub': 'lendenclub',
-    'groww': 'groww',
-    'zerodha': 'zerodha',
-    'upstox': 'upstox',
-    'angelone': 'angelone',
-    '5paisa': '5paisa',
-    'dhan': 'dhan',
-    'icicidirect': 'icicidirect',
-    'sharekhan': 'sharekhan',
-    'motilaloswal': 'motilaloswal',
-    'choiceindia': 'choiceindia',
-    'rkglobal': 'rkglobal',
-    'indmoney': 'indmoney',
-    'smallcase': 'smallcase',
-    'fisdom': 'fisdom',
-    'bajajbroking': 'bajajbroking',
-    'hdfcsec': 'hdfcsec',
-    'kfintech': 'kfintech',
-    'nseindia': 'nseindia',
-    'bseindia': 'bseindia',
-    'mcxindia': 'mcxindia',
-    'moneybhai': 'moneybhai',
-    'tickertape': 'tickertape',
-    'stockedge': 'stockedge',
-    'screener': 'screener',
-    'trendlyne': 'trendlyne',
-    'tradingview': 'tradingview',
-    'investing': 'investing',
-    'yahoofinance': 'yahoofinance',
-    'economictimes': 'economictimes',
-    'livemint': 'livemint',
-    'financialexpress': 'financialexpress',
-    'businesstoday': 'businesstoday',
-    'business-standard': 'businessstandard',
-    'firstpost': 'firstpost',
-    'scroll': 'scroll',
-    'theprint': 'theprint',
-    'opindia': 'opindia',
-    'republicworld': 'republicworld',
-    'news18': 'news18',
-    'tv9telugu': 'tv9telugu',
-    'sakshi': 'sakshi',
-    'andhrajyothy': 'andhrajyothy',
-    'manatelangana': 'manatelangana',
-    'greatandhra': 'greatandhra',
-    'idlebrain': 'idlebrain',
-    '123telugu': '123telugu',
-    'filmibeat': 'filmibeat',
-    'bollywoodhungama': 'bollywoodhungama',
-    'pinkvilla': 'pinkvilla',
-    'koimoi': 'koimoi',
-    'indiaforums': 'indiaforums',
-    'tellychakkar': 'tellychakkar',
-    'iwmbuzz': 'iwmbuzz',
-    'gossipaddict': 'gossipaddict',
-    'missmalini': 'missmalini',
-    'jagran': 'jagran',
-    'dainikbhaskar': 'dainikbhaskar',
-    'amarujala': 'amarujala',
-    'navbharattimes': 'navbharattimes',
-    'abhiyaan': 'abhiyaan',
-    'livehindustan': 'livehindustan',
-    'jansatta': 'jansatta',
-    'rajasthanpatrika': 'rajasthanpatrika',
-    'bhaskar': 'bhaskar',
-    'divyabhaskar': 'divyabhaskar',
-    'inshorts': 'inshorts',
-    'dailyhunt': 'dailyhunt',
-    'newsdog': 'newsdog',
-    'ucnews': 'ucnews',
-    'operanews': 'operanews',
-    'sharechat': 'sharechat',
-    'mogo': 'mogo',
-    'josh': 'josh',
-    'public': 'public',
-    'kooapp': 'kooapp',
-    'mailyolo': 'mailyolo',
-    'toffee': 'toffee',
-    'voot': 'voot',
-    'sonyliv': 'sonyliv',
-    'zee5': 'zee5',
-    'mxplayer': 'mxplayer',
-    'erosnow': 'erosnow',
-    'altbalaji': 'altbalaji',
-    'hoichoi': 'hoichoi',
-    'aha': 'aha',
-    'perplexity': 'perplexity',
-    'gemini': 'gemini',
-    'grok': 'grok',
-    'claude': 'claude'
-        }
-        text_l = text.lower()
-        website = None
-        query = None
-        is_search_action = True  # Default to search
-        
-        # Step 0: Detect if it's just opening a website (no search action)
-        # Patterns like: "open github", "go to netflix", "open perplexity"
-        open_patterns = [
-            r'\b(?:open|go\s+to|visit|browse)\s+(.+?)$',
-        ]
-        for pattern in open_patterns:
-            match = re.search(pattern, text_l)
-            if match:
-                potential_website = match.group(1).strip()
-                # Check if the potential website is in our websites list
-                sorted_keywords = sorted(websites.keys(), key=len, reverse=True)
-                for keyword in sorted_keywords:
-                    word_pattern = rf'\b{re.escape(keyword)}\b'
-                    if re.search(word_pattern, potential_website):
-                        website = keyword
-                        is_search_action = False  # Just opening, not searching
-                        return website, None, is_search_action
-        
-        # Step 1: Extract website name from command using word boundaries
-        # Sort by length (longest first) to match longer keywords before shorter ones
-        # This prevents 'x' from matching inside 'perplexity'
-        sorted_keywords = sorted(websites.keys(), key=len, reverse=True)
-        for keyword in sorted_keywords:
-            # Use word boundaries to match whole words only
-            pattern = rf'\b{re.escape(keyword)}\b'
-            if re.search(pattern, text_l):
-                website = keyword
-                break
-        
-        # Step 2: Extract search query - IMPROVED to exclude "for" keyword
-        
-        # Pattern 1: "search [query] on/for/at [website]"
-        website_keywords_pattern = '|'.join(list(websites.keys()))
-        pattern1 = rf'search\s+(.+?)\s+(?:on|for|at)\s+(?:{website_keywords_pattern})'
-        match1 = re.search(pattern1, text_l)
-        
-        if match1:
-            query = match1.group(1).strip()
-        else:
-            # Pattern 2: "[website] search [query]"
-            pattern2 = rf'(?:{website_keywords_pattern})\s+(?:search|google)\s+(?:for\s+)?(.+?)$'
-            match2 = re.search(pattern2, text_l)
-            
-            if match2:
-                query = match2.group(1).strip()
-            else:
-                # Pattern 3: "search [query]" (generic search)
-                pattern3 = r'search\s+(?:for\s+)?(.+?)(?:\s+on|\s+at|\s+in)?\s*$'
-                match3 = re.search(pattern3, text_l)
-                
-                if match3:
-                    query = match3.group(1).strip()
-                    # Remove website names from end if present
-                    for keyword in websites.keys():
-                        query = re.sub(rf'\s+{keyword}\s*$', '', query)
-                else:
-                    # Pattern 4: Extract remaining words (fallback)
-                    query_text = text_l
-                    
-                    # Remove action words and profile patterns
-                    skip_patterns = [
-                        r'with\s+chrome\s+profile\s+\w+',
-                        r'chrome\s+profile\s+\w+',
-                        r'with\s+profile\s+\w+',
-                        r'use\s+profile\s+\w+',
-                        r'profile\s+\w+',
-                    ]
-                    
-                    for pattern in skip_patterns:
-                        query_text = re.sub(pattern, '', query_text)
-                    
-                    # Remove structural keywords
-                    skip_words = {
-                        'search', 'open', 'go', 'to', 'on', 'in', 'at', 'for', 'and', 'the', 'a', 'an',
-                        'with', 'use', 'profile', 'chrome', 'edge', 'browser', 'query'
-                    }
-                    skip_words.update(list(websites.keys()))
-                    
-                    query_words = [w for w in query_text.split() if w not in skip_words and w.strip()]
-                    query = ' '.join(query_words) if query_words else None
-        
-        # Step 3: Clean up query - remove "for" if it was included
-        if query:
-            query = re.sub(r'^\s*for\s+', '', query)  # Remove "for" at the start
-            query = re.sub(r'\s+for\s*$', '', query)  # Remove "for" at the end
-        
-        # Default to google if no website detected
-        if not website:
-            website = 'google'
-        
-        return website, query, is_search_action
-
-    def _extract_app_name(self, words, trigger_words):
-        for trigger in trigger_words:
-            if trigger in words:
-                idx = words.index(trigger)
-                app_words = [w for w in words[idx+1:] if w not in ['app', 'application', 'program']]
-                if app_words:
-                    return ' '.join(app_words)
-        return None
-
-    def _extract_text_after_keywords(self, words, keywords, skip_words):
-        for keyword in keywords:
-            if keyword in words:
-                idx = words.index(keyword)
-                text_words = [w for w in words[idx+1:] if w not in skip_words]
-                if text_words:
-                    return ' '.join(text_words)
-        return None
-
-    def _extract_file_or_folder_path(self, words, raw_command):
-        common_folders = {
-            'documents': r'%USERPROFILE%\Documents', 'downloads': r'%USERPROFILE%\Downloads', 'desktop': r'%USERPROFILE%\Desktop',
-            'pictures': r'%USERPROFILE%\Pictures', 'videos': r'%USERPROFILE%\Videos', 'music': r'%USERPROFILE%\Music',
-        }
-        for folder_keyword, folder_path in common_folders.items():
-            if folder_keyword in words:
-                return True, folder_path, 'folder', True
-        skip_words = {'open', 'file', 'folder', 'document', 'my', 'the', 'launch', 'show', 'browse', 'to', 'for', 'find'}
-        target_words = [w for w in words if w not in skip_words]
-        if target_words:
-            target_name = ' '.join(target_words)
-            target_type = 'folder' if 'folder' in words or 'directory' in words else 'file'
-            return True, target_name, target_type, False
-        return False, None, None, False
-
+    def _plan_with_gemini(self, command_type, extracted_keywords, raw_command=None):
+        """StepGenerator plan grounded in a summary of the current screen (None if unavailable)"""
+        if not self.step_generator or not self.screen_analyzer:
+            return None
+        raw_command = raw_command or self.current_model1_result['input']
+        try:
+            screenshot_path = self.screenshot_handler.capture()
+            elements = None
+            if screenshot_path:
+                parse_result = self.omniparser.parse_screen(screenshot_path, raw_command)
+                elements = parse_result.get('elements') if parse_result else None
+            command_data = {
+                'raw_command': raw_command,
+                'classification': {'category': command_type, 'entities': extracted_keywords or {}},
+                'screen_summary': self.screen_analyzer.get_screen_summary(screenshot_path, elements),
+            }
+            self.bus.log.emit(f"[DEBUG] Screen: {command_data['screen_summary']}\n")
+            return to_action_steps(self.step_generator.generate(command_data))
+        except Exception as e:
+            self.bus.log.emit(f"⚠️ Gemini step planning failed: {e}\n")
+            return None
 
+    # ---------- small helpers ----------
 def main():
     # show passcode dialog first
     app = QApplication(sys.argv)
@@ -2544,4 +1721,5 @@ def main():
     sys.exit(app.exec())
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Tiled OCR worker processes in the PyInstaller build
     main()
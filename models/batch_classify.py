@@ -0,0 +1,162 @@
+"""
+Batch Classify - re-score logged commands through the classifier batch APIs
+Streams a JSONL file of commands ({"text": ..., "label": optional}) through
+one of the classifiers in chunks, reports commands/sec and, when labels are
+present, accuracy and the per-category confusion matrix.
+
+Usage:
+    python -m models.batch_classify logs/commands.jsonl --backend model
+    python -m models.batch_classify logs/commands.jsonl --backend cascade
+    python -m models.batch_classify logs/commands.jsonl --backend processor --output scored.jsonl
+"""
+
+import argparse
+import json
+import logging
+import time
+from collections import Counter, defaultdict
+
+logger = logging.getLogger("BatchClassify")
+
+_TEXT_KEYS = ('text', 'command', 'input')
+
+
+def read_commands(path, batch_size):
+    """Yield lists of {text, label} records from a JSONL file"""
+    batch = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping invalid JSON on line {line_number}")
+                continue
+            if isinstance(record, str):
+                record = {'text': record}
+            text = next((record[k] for k in _TEXT_KEYS if record.get(k)), None)
+            if not text:
+                continue
+            batch.append({'text': text, 'label': record.get('label')})
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def load_backend(name):
+    """
+    Returns:
+        callable(texts) -> list of (predicted label, confidence), None per failed item
+    """
+    if name == 'model':
+        import config
+        from models.intent_data import MODEL1_TRAINING_DATA
+        from models.intent_model_store import IntentModelStore, analyze_queries, params_for
+
+        pipeline, _ = IntentModelStore(config.INTENT_MODEL_DIR).get_or_train(
+            MODEL1_TRAINING_DATA, params_for(config.INTENT_FEATURES)
+        )
+        return lambda texts: [(r['command_type'], float(r['confidence'])) for r in analyze_queries(pipeline, texts)]
+
+    if name == 'matcher':
+        from models.intent_data import CORE_TRAINING_DATA
+        from models.pattern_matcher import PatternMatcher
+
+        matcher = PatternMatcher(CORE_TRAINING_DATA)
+        return lambda texts: [(r['command_type'], r['confidence']) if r else None for r in matcher.match_batch(texts)]
+
+    if name == 'classifier':
+        from models.command_classifier import CommandClassifier
+
+        classifier = CommandClassifier()
+        return lambda texts: [(r['category'], r['confidence']) for r in classifier.classify_batch(texts)]
+
+    if name == 'cascade':
+        import config
+        from models.intent_data import MODEL1_TRAINING_DATA
+        from models.intent_router import build_router
+
+        router = build_router(MODEL1_TRAINING_DATA, api_key=config.GEMINI_API_KEY)
+        classify = lambda texts: [
+            (r['command_type'], r['confidence']) if r['command_type'] else None for r in router.route_batch(texts)
+        ]
+        classify.router = router
+        return classify
+
+    if name == 'processor':
+        import config
+        from models.command_processor import CommandProcessor
+
+        processor = CommandProcessor(config.GEMINI_API_KEY)
+        return lambda texts: [
+            (r.get('category'), r.get('confidence')) if r else None for r in processor.process_batch(texts)
+        ]
+
+    raise ValueError(f"Unknown backend: {name}")
+
+
+def format_confusion(confusion):
+    """Text table: rows = labels, columns = predictions"""
+    labels = sorted(confusion)
+    predicted = sorted({p for row in confusion.values() for p in row})
+    width = max([len(str(x)) for x in labels + predicted] + [5])
+    lines = [" " * width + " | " + " ".join(f"{str(p)[:width]:>{width}}" for p in predicted)]
+    for label in labels:
+        cells = " ".join(f"{confusion[label].get(p, 0):>{width}}" for p in predicted)
+        lines.append(f"{label:>{width}} | {cells}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score a JSONL file of commands with a classifier")
+    parser.add_argument("input", help="JSONL with one {\"text\": ..., \"label\": ...} per line")
+    parser.add_argument("--backend", choices=["model", "matcher", "classifier", "cascade", "processor"], default="model")
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--output", help="Write {text, label, predicted, confidence} JSONL here")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    classify = load_backend(args.backend)
+
+    total = failed = correct = labelled = 0
+    elapsed = 0.0
+    confusion = defaultdict(Counter)
+    output = open(args.output, 'w', encoding='utf-8') if args.output else None
+    try:
+        for batch in read_commands(args.input, args.batch_size):
+            start = time.perf_counter()
+            predictions = classify([record['text'] for record in batch])
+            elapsed += time.perf_counter() - start
+
+            for record, prediction in zip(batch, predictions):
+                total += 1
+                predicted, confidence = prediction if prediction else (None, None)
+                if prediction is None:
+                    failed += 1
+                if record['label'] is not None:
+                    labelled += 1
+                    correct += predicted == record['label']
+                    confusion[record['label']][predicted if predicted is not None else '(none)'] += 1
+                if output:
+                    output.write(json.dumps({**record, 'predicted': predicted, 'confidence': confidence}) + "\n")
+    finally:
+        if output:
+            output.close()
+
+    print(f"Backend: {args.backend}")
+    print(f"Commands: {total} ({failed} failed) in {elapsed:.3f}s -> {total / elapsed if elapsed else 0:,.0f} commands/sec")
+    if labelled:
+        print(f"Accuracy: {correct / labelled:.2%} on {labelled} labelled commands\n")
+        print(format_confusion(confusion))
+    if hasattr(classify, 'router'):
+        print("\nCascade stages:")
+        for name, stats in classify.router.stats()['stages'].items():
+            print(f"  {name:>8}: {stats['seen']} seen, {stats['accept_rate']:.1%} accepted, "
+                  f"{stats['escalation_rate']:.1%} escalated, avg {stats['avg_ms'] or 0:.3f} ms/command")
+
+
+if __name__ == "__main__":
+    main()
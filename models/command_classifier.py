@@ -7,11 +7,13 @@ Zero hardcoding, fully ML-based (except system commands list)
 import joblib
 import os
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 import config
+from models.intent_features import make_vectorizer
+from utils.keyword_automaton import KeywordAutomaton
 from utils.logger import setup_logger
 
 
@@ -28,6 +30,29 @@ class CommandClassifier:
         'battery': ['enable battery saver', 'disable battery saver', 'power saver on', 'power saver off'],
     }
     
+    # Keyword tables for classify(), in priority order within each table
+    SYSTEM_PATTERNS = {
+        'volume': ['volume', 'sound level', 'audio level'],
+        'brightness': ['brightness', 'screen brightness'],
+        'shutdown': ['shut down', 'power off', 'turn off computer'],
+        'restart': ['restart', 'reboot'],
+        'sleep': ['sleep', 'hibernate'],
+        'lock': ['lock screen', 'lock computer', 'lock my screen']
+    }
+    LAUNCH_KEYWORDS = ['open', 'launch', 'start', 'run']
+    IN_APP_KEYWORDS = [
+        'click', 'press', 'tap', 'select',
+        'send', 'message', 'text',
+        'type', 'write', 'enter',
+        'search', 'find', 'look for',
+        'scroll', 'swipe',
+        'play', 'pause', 'stop',
+        'next', 'previous', 'back',
+        'close', 'minimize', 'maximize'
+    ]
+    
+    _automaton = None  # KeywordAutomaton over all tables, compiled on first use
+    
     def __init__(self):
         self.logger = setup_logger('CommandClassifier')
         self.model_path = os.path.join(config.MODEL_WEIGHTS_DIR, 'classifier_model.pkl')
@@ -58,26 +83,39 @@ class CommandClassifier:
         
         self.logger.info(f"Classifying: '{text}'")
         
-        # Priority 1: SYSTEM COMMANDS (highest priority)
-        system_result = self._detect_system_command(text_lower)
-        if system_result:
-            self.logger.info(f"Classified: '{text}' → SYSTEM_ACTION ({system_result['subcategory']}) (confidence: {system_result['confidence']:.2%})")
-            return system_result
-        
-        # Priority 2: APP LAUNCH
-        app_result = self._detect_app_launch(text_lower, text)
-        if app_result:
-            self.logger.info(f"Classified: '{text}' → APP_LAUNCH (confidence: {app_result['confidence']:.2%})")
-            return app_result
-        
-        # Priority 3: IN-APP ACTION
-        in_app_result = self._detect_in_app_action(text_lower)
-        if in_app_result:
-            self.logger.info(f"Classified: '{text}' → IN_APP_ACTION (confidence: {in_app_result['confidence']:.2%})")
-            return in_app_result
-        
-        # Default: CONVERSATION
-        self.logger.info(f"Classified: '{text}' → CONVERSATION (confidence: 50.00%)")
+        # One automaton pass, resolved in priority order: SYSTEM > APP_LAUNCH > IN_APP_ACTION
+        result = self._match_keywords(text_lower, text)
+        if result['category'] == 'SYSTEM_ACTION':
+            self.logger.info(f"Classified: '{text}' → SYSTEM_ACTION ({result['subcategory']}) (confidence: {result['confidence']:.2%})")
+        else:
+            self.logger.info(f"Classified: '{text}' → {result['category']} (confidence: {result['confidence']:.2%})")
+        return result
+    
+    def classify_batch(self, texts):
+        """classify() for a list of commands (one log line for the batch)"""
+        results = [self._match_keywords(text.lower().strip(), text) for text in texts]
+        counts = {}
+        for result in results:
+            counts[result['category']] = counts.get(result['category'], 0) + 1
+        self.logger.info(f"Classified batch of {len(texts)}: {counts}")
+        return results
+    
+    def predict_batch(self, texts):
+        """
+        Trained model prediction for a list of commands (one vectorize and
+        predict_proba call)
+        
+        Returns: [(category, confidence)]
+        """
+        if not texts:
+            return []
+        X = self.vectorizer.transform([text.lower().strip() for text in texts])
+        probabilities = self.model.predict_proba(X)
+        best = probabilities.argmax(axis=1)
+        return [(self.model.classes_[i], float(probabilities[row, i])) for row, i in enumerate(best)]
+    
+    @staticmethod
+    def _conversation_result(text):
         return {
             'category': 'CONVERSATION',
             'confidence': 0.5,
@@ -86,69 +124,70 @@ class CommandClassifier:
             'raw_command': text
         }
     
-    def _detect_system_command(self, text_lower):
-        """Detect system-level commands"""
-        system_patterns = {
-            'volume': ['volume', 'sound level', 'audio level'],
-            'brightness': ['brightness', 'screen brightness'],
-            'shutdown': ['shut down', 'power off', 'turn off computer'],
-            'restart': ['restart', 'reboot'],
-            'sleep': ['sleep', 'hibernate'],
-            'lock': ['lock screen', 'lock computer', 'lock my screen']
-        }
+    @classmethod
+    def _keyword_automaton(cls):
+        """
+        Every keyword table in one automaton; payload = (table, priority, value)
+        where a lower priority wins within a table
+        """
+        if cls._automaton is None:
+            automaton = KeywordAutomaton()
+            for rank, (subcategory, keywords) in enumerate(cls.SYSTEM_PATTERNS.items()):
+                for kw in keywords:
+                    automaton.add(kw, ('system', rank, subcategory))
+            for rank, kw in enumerate(cls.LAUNCH_KEYWORDS):
+                automaton.add(kw, ('launch', rank, kw))
+            for rank, kw in enumerate(cls.IN_APP_KEYWORDS):
+                automaton.add(kw, ('in_app', rank, kw))
+            for rank, (category, phrases) in enumerate(cls.SYSTEM_COMMANDS.items()):
+                for phrase in phrases:
+                    automaton.add(phrase, ('system_command', rank, category))
+            cls._automaton = automaton.compile()
+        return cls._automaton
+    
+    def _scan(self, text_lower):
+        """
+        One pass over the text: best (priority, value) per table, and the
+        first position of every launch keyword present
+        """
+        best = {}
+        launch_positions = {}
+        for start, keyword, (table, rank, value) in self._keyword_automaton().iter_matches(text_lower):
+            if table == 'launch':
+                if keyword not in launch_positions or start < launch_positions[keyword][1]:
+                    launch_positions[keyword] = (rank, start)
+            elif table not in best or rank < best[table][0]:
+                best[table] = (rank, value)
+        return best, launch_positions
+    
+    def _match_keywords(self, text_lower, original_text):
+        """Detector-priority classification (SYSTEM > APP_LAUNCH > IN_APP_ACTION) from a single automaton pass"""
+        best, launch_positions = self._scan(text_lower)
+        
+        if 'system' in best:
+            return {
+                'category': 'SYSTEM_ACTION',
+                'subcategory': best['system'][1],
+                'confidence': 0.95,
+                'requires_screen_analysis': False,
+                'raw_command': text_lower
+            }
         
-        for subcategory, keywords in system_patterns.items():
-            if any(kw in text_lower for kw in keywords):
+        # Launch keywords in table order; the app name follows the first occurrence
+        for keyword, (_, start) in sorted(launch_positions.items(), key=lambda item: item[1][0]):
+            app_name = text_lower[start + len(keyword):].strip()
+            app_name = app_name.replace('.', '').replace(',', '').replace('?', '').replace('!', '').strip()
+            if app_name:
                 return {
-                    'category': 'SYSTEM_ACTION',
-                    'subcategory': subcategory,
-                    'confidence': 0.95,
+                    'category': 'APP_LAUNCH',
+                    'confidence': 0.90,
+                    'subcategory': None,
                     'requires_screen_analysis': False,
-                    'raw_command': text_lower
+                    'raw_command': original_text,
+                    'app_name': app_name
                 }
         
-        return None
-    
-    def _detect_app_launch(self, text_lower, original_text):
-        """Detect app launch commands"""
-        launch_keywords = ['open', 'launch', 'start', 'run']
-        
-        for keyword in launch_keywords:
-            if keyword in text_lower:
-                # Extract app name after keyword
-                parts = text_lower.split(keyword, 1)
-                if len(parts) > 1:
-                    app_name = parts[1].strip()  # ✅ FIXED: Correct order
-                    
-                    # Clean app name (remove punctuation)
-                    app_name = app_name.replace('.', '').replace(',', '').replace('?', '').replace('!', '').strip()
-                    
-                    if app_name:
-                        return {
-                            'category': 'APP_LAUNCH',
-                            'confidence': 0.90,
-                            'subcategory': None,
-                            'requires_screen_analysis': False,
-                            'raw_command': original_text,
-                            'app_name': app_name
-                        }
-        
-        return None
-    
-    def _detect_in_app_action(self, text_lower):
-        """Detect in-app actions"""
-        in_app_keywords = [
-            'click', 'press', 'tap', 'select',
-            'send', 'message', 'text',
-            'type', 'write', 'enter',
-            'search', 'find', 'look for',
-            'scroll', 'swipe',
-            'play', 'pause', 'stop',
-            'next', 'previous', 'back',
-            'close', 'minimize', 'maximize'
-        ]
-        
-        if any(kw in text_lower for kw in in_app_keywords):
+        if 'in_app' in best:
             return {
                 'category': 'IN_APP_ACTION',
                 'confidence': 0.85,
@@ -157,15 +196,13 @@ class CommandClassifier:
                 'raw_command': text_lower
             }
         
-        return None
+        return self._conversation_result(original_text)
     
     def _is_system_command(self, command):
         """Check if command is a system command (legacy compatibility)"""
-        command = command.lower()
-        for category, phrases in self.SYSTEM_COMMANDS.items():
-            for phrase in phrases:
-                if phrase in command:
-                    return True, category
+        best, _ = self._scan(command.lower())
+        if 'system_command' in best:
+            return True, best['system_command'][1]
         return False, None
     
     def train_default_model(self):
@@ -203,8 +240,11 @@ class CommandClassifier:
         X = [item[0] for item in training_data]
         y = [item[1] for item in training_data]
         
-        # Train vectorizer
-        self.vectorizer = TfidfVectorizer(max_features=100)
+        # Vectorizer: fitted TF-IDF vocabulary, or stateless hashed char n-grams
+        if config.COMMAND_CLASSIFIER_FEATURES == 'hashing':
+            self.vectorizer = make_vectorizer('hashing')
+        else:
+            self.vectorizer = make_vectorizer('tfidf', max_features=100)
         X_vectorized = self.vectorizer.fit_transform(X)
         
         # Train classifier
@@ -223,8 +263,133 @@ class CommandClassifier:
         try:
             self.model = joblib.load(self.model_path)
             self.vectorizer = joblib.load(self.vectorizer_path)
+            if isinstance(self.vectorizer, HashingVectorizer) != (config.COMMAND_CLASSIFIER_FEATURES == 'hashing'):
+                self.logger.info("Feature pipeline changed in config; retraining")
+                self.train_default_model()
+                return
             self.logger.info("Classification model loaded successfully")
         except Exception as e:
             self.logger.error(f"Failed to load model: {e}")
             self.logger.info("Falling back to training new model")
             self.train_default_model()
+
+
+# ---------------------------------------------------------------------------
+# Reference detectors (the keyword scans classify() used before the automaton);
+# only the equivalence benchmark below uses them
+# ---------------------------------------------------------------------------
+
+def _legacy_classify(text):
+    """Detector-by-detector classification, same result as CommandClassifier._match_keywords"""
+    text_lower = text.lower().strip()
+
+    # Priority 1: SYSTEM COMMANDS (highest priority)
+    for subcategory, keywords in CommandClassifier.SYSTEM_PATTERNS.items():
+        if any(kw in text_lower for kw in keywords):
+            return {
+                'category': 'SYSTEM_ACTION',
+                'subcategory': subcategory,
+                'confidence': 0.95,
+                'requires_screen_analysis': False,
+                'raw_command': text_lower
+            }
+
+    # Priority 2: APP LAUNCH (app name after the keyword)
+    for keyword in CommandClassifier.LAUNCH_KEYWORDS:
+        if keyword in text_lower:
+            app_name = text_lower.split(keyword, 1)[1].strip()
+            app_name = app_name.replace('.', '').replace(',', '').replace('?', '').replace('!', '').strip()
+            if app_name:
+                return {
+                    'category': 'APP_LAUNCH',
+                    'confidence': 0.90,
+                    'subcategory': None,
+                    'requires_screen_analysis': False,
+                    'raw_command': text,
+                    'app_name': app_name
+                }
+
+    # Priority 3: IN-APP ACTION
+    if any(kw in text_lower for kw in CommandClassifier.IN_APP_KEYWORDS):
+        return {
+            'category': 'IN_APP_ACTION',
+            'confidence': 0.85,
+            'subcategory': None,
+            'requires_screen_analysis': True,
+            'raw_command': text_lower
+        }
+
+    # Default: CONVERSATION
+    return CommandClassifier._conversation_result(text)
+
+
+def _legacy_is_system_command(command):
+    """Nested-loop reference for CommandClassifier._is_system_command"""
+    command = command.lower()
+    for category, phrases in CommandClassifier.SYSTEM_COMMANDS.items():
+        for phrase in phrases:
+            if phrase in command:
+                return True, category
+    return False, None
+
+
+def _benchmark():
+    """Equivalence check and timing of the keyword automaton vs the legacy detectors"""
+    import argparse
+    import random
+    import time
+    from models.intent_data import MODEL1_TRAINING_DATA, CORE_TRAINING_DATA
+
+    parser = argparse.ArgumentParser(description="Benchmark CommandClassifier keyword matching")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--vocab-sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    # Keyword paths only; skips loading / training the RandomForest model
+    classifier = CommandClassifier.__new__(CommandClassifier)
+
+    rng = random.Random(0)
+    commands = [pattern for pattern, _ in MODEL1_TRAINING_DATA + CORE_TRAINING_DATA]
+    keywords = [kw for kws in CommandClassifier.SYSTEM_PATTERNS.values() for kw in kws]
+    keywords += CommandClassifier.LAUNCH_KEYWORDS + CommandClassifier.IN_APP_KEYWORDS
+    keywords += [p for ps in CommandClassifier.SYSTEM_COMMANDS.values() for p in ps]
+    for _ in range(2000):
+        words = rng.sample(keywords, 2) + rng.sample(commands, 1)
+        rng.shuffle(words)
+        commands.append(" ".join(words) + rng.choice(["", ".", "!", " now", "?"]))
+
+    mismatches = [c for c in commands if classifier._match_keywords(c.lower().strip(), c) != _legacy_classify(c)]
+    mismatches += [c for c in commands if classifier._is_system_command(c) != _legacy_is_system_command(c)]
+    print(f"Equivalence: {len(commands)} commands, {len(mismatches)} mismatches")
+    for command in mismatches[:10]:
+        print(f"  MISMATCH: {command!r}")
+
+    for name, func in (("legacy", _legacy_classify),
+                       ("automaton", lambda c: classifier._match_keywords(c.lower().strip(), c))):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for command in commands:
+                func(command)
+        per_call = (time.perf_counter() - start) / (args.repeat * len(commands)) * 1e6
+        print(f"{name:>10}: {per_call:.1f} µs/command")
+
+    # Scaling with vocabulary size: any(kw in text) vs one automaton pass
+    text = "please open the downloads folder and send the report to john on whatsapp"
+    print(f"\n{'keywords':>9} {'scan µs':>9} {'automaton µs':>13}")
+    for size in args.vocab_sizes:
+        vocab = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 10)))
+                 for _ in range(size)]
+        automaton = KeywordAutomaton((kw, i) for i, kw in enumerate(vocab)).compile()
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            [kw for kw in vocab if kw in text]
+        scan_us = (time.perf_counter() - start) / args.repeat * 1e6
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            list(automaton.iter_matches(text))
+        automaton_us = (time.perf_counter() - start) / args.repeat * 1e6
+        print(f"{size:>9} {scan_us:>9.1f} {automaton_us:>13.1f}")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -5,30 +5,43 @@ WITH QUOTA HANDLING
 
 import logging
 import json
-from google.genai import Client
 import time
+from models.gemini_service import get_gemini_service
+from models.response_cache import get_response_cache, model_preference
 
 logger = logging.getLogger("CommandProcessor")
 
+# Bump whenever _build_prompt changes so cached classifications are not reused
+PROMPT_VERSION = 1
+CACHE_NAMESPACE = "classify"
+
 class CommandProcessor:
     """Process commands using Gemini"""
     
     def __init__(self, api_key):
         """Initialize with Gemini"""
         try:
-            self.client = Client(api_key=api_key)
+            self.gemini = get_gemini_service(api_key)
         except Exception as e:
             logger.error(f"Failed to configure Gemini: {e}")
             raise
         
-        self.model_name = 'gemini-2.0-flash'
+        self.model_name = self.gemini.router.choose(claim=False)
+        self.cache = get_response_cache()
         logger.info(f"✓ CommandProcessor initialized with: {self.model_name}")
     
-    def process(self, text):
-        """Process command using Gemini with retry on quota"""
-        if not text or len(text.strip()) < 2:
-            raise Exception("Text too short")
-        
+    def _cached(self, text):
+        if self.cache is None:
+            return None
+        return self.cache.get(CACHE_NAMESPACE, text, version=PROMPT_VERSION,
+                              models=model_preference(self.gemini.router))
+    
+    def _remember(self, text, result):
+        if self.cache is not None:
+            self.cache.put(CACHE_NAMESPACE, text, result, self.model_name, version=PROMPT_VERSION)
+    
+    @staticmethod
+    def _build_prompt(text):
         prompt = f"""You are a command classifier for a voice assistant.
 
 Analyze this command and classify it into ONE category.
@@ -53,64 +66,127 @@ Examples:
 - "search for python tutorials" → category: WEB_ACTION, action: search, entities: {{"query": "python tutorials"}}
 
 JSON:"""
+        return prompt
+    
+    @staticmethod
+    def _parse_response(response_text):
+        """Classification dict from a Gemini reply"""
+        response_text = response_text.strip()
+        
+        # Extract JSON
+        start = response_text.find('{')
+        end = response_text.rfind('}') + 1
+        json_str = response_text[start:end]
+        
+        return json.loads(json_str)
+    
+    @staticmethod
+    def _is_quota_error(error):
+        error_str = str(error)
+        return "429" in error_str or "quota" in error_str.lower()
+    
+    @staticmethod
+    def _fallback_classification(text):
+        """Safe keyword-based classification used when Gemini quota is exhausted"""
+        text_lower = text.lower()
+        
+        if any(word in text_lower for word in ['open', 'launch', 'start']):
+            return {
+                "category": "APP_LAUNCH",
+                "action": "launch",
+                "confidence": 50,
+                "entities": {"app_name": "unknown"}
+            }
+        elif any(word in text_lower for word in ['search', 'google', 'bing']):
+            return {
+                "category": "WEB_ACTION",
+                "action": "search",
+                "confidence": 50,
+                "entities": {"query": text}
+            }
+        elif any(word in text_lower for word in ['send', 'message', 'whatsapp']):
+            return {
+                "category": "IN_APP_ACTION",
+                "action": "send_message",
+                "confidence": 50,
+                "entities": {}
+            }
+        else:
+            return {
+                "category": "IN_APP_ACTION",
+                "action": "unknown",
+                "confidence": 30,
+                "entities": {}
+            }
+    
+    def process(self, text):
+        """Process command using Gemini with retry on quota"""
+        if not text or len(text.strip()) < 2:
+            raise Exception("Text too short")
+        
+        cached = self._cached(text)
+        if cached is not None:
+            logger.info(f"⚡ Classification (cached): {cached['category']} (conf: {cached['confidence']}%)")
+            return cached
+        
+        prompt = self._build_prompt(text)
         
         try:
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt
-            )
-            response_text = response.text.strip()
-            
-            # Extract JSON
-            start = response_text.find('{')
-            end = response_text.rfind('}') + 1
-            json_str = response_text[start:end]
-            
-            result = json.loads(json_str)
+            response, self.model_name = self.gemini.generate_batched_sync(prompt)
+            result = self._parse_response(response.text)
             logger.info(f"✓ Classification: {result['category']} (conf: {result['confidence']}%)")
             
+            # Only real Gemini answers are cached, never the quota fallback
+            self._remember(text, result)
             return result
         
         except Exception as e:
-            error_str = str(e)
-            
             # ✅ QUOTA EXCEEDED - Return fallback classification
-            if "429" in error_str or "quota" in error_str.lower():
+            if self._is_quota_error(e):
                 logger.warning(f"⚠️ QUOTA EXCEEDED - Using fallback classification")
                 logger.warning(f"Retry after: Check error message for retry timing")
                 
                 # Return safe fallback based on keywords
-                text_lower = text.lower()
-                
-                if any(word in text_lower for word in ['open', 'launch', 'start']):
-                    return {
-                        "category": "APP_LAUNCH",
-                        "action": "launch",
-                        "confidence": 50,
-                        "entities": {"app_name": "unknown"}
-                    }
-                elif any(word in text_lower for word in ['search', 'google', 'bing']):
-                    return {
-                        "category": "WEB_ACTION",
-                        "action": "search",
-                        "confidence": 50,
-                        "entities": {"query": text}
-                    }
-                elif any(word in text_lower for word in ['send', 'message', 'whatsapp']):
-                    return {
-                        "category": "IN_APP_ACTION",
-                        "action": "send_message",
-                        "confidence": 50,
-                        "entities": {}
-                    }
-                else:
-                    return {
-                        "category": "IN_APP_ACTION",
-                        "action": "unknown",
-                        "confidence": 30,
-                        "entities": {}
-                    }
+                return self._fallback_classification(text)
             
             # Any other error - raise it
             logger.error(f"Classification error: {e}")
             raise
+    
+    def process_batch(self, texts, deadline=None):
+        """
+        process() for many commands: all prompts are submitted at once and
+        micro-batched by the Gemini service into multi-item calls
+        
+        Returns:
+            list: classification dict per text, or None where it failed
+            (too short / unparseable / non-quota error)
+        """
+        results = [None] * len(texts)
+        valid = []
+        for i, text in enumerate(texts):
+            if text and len(text.strip()) >= 2:
+                results[i] = self._cached(text)
+                if results[i] is None:
+                    valid.append(i)
+        cached = sum(r is not None for r in results)
+        replies = self.gemini.generate_batched_many_sync([self._build_prompt(texts[i]) for i in valid], deadline)
+        
+        failures = 0
+        for i, reply in zip(valid, replies):
+            if isinstance(reply, BaseException):
+                if self._is_quota_error(reply):
+                    results[i] = self._fallback_classification(texts[i])
+                else:
+                    failures += 1
+                continue
+            response, self.model_name = reply
+            try:
+                results[i] = self._parse_response(response.text)
+                self._remember(texts[i], results[i])
+            except (ValueError, AttributeError) as e:
+                failures += 1
+                logger.debug(f"Unparseable classification for '{texts[i]}': {e}")
+        
+        logger.info(f"✓ Classified batch of {len(texts)} ({cached} cached, {failures} failed)")
+        return results
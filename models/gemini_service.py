@@ -0,0 +1,398 @@
+"""
+Gemini Service - one shared, pooled Gemini client for the whole app
+Every caller (ScreenAnalyzer, StepGenerator, CommandProcessor) goes through
+the same google.genai Client, so HTTP connections stay alive between calls.
+Calls are asyncio coroutines on a private event loop thread with per-call
+deadlines; the sync wrappers block the calling thread only up to that
+deadline. A call slower than the primary model's p90 latency is hedged by
+firing the same request at the next healthy model, and the first answer wins.
+Identical in-flight requests share one call, and small text requests that
+arrive within a few milliseconds of each other can be micro-batched into a
+single multi-item call.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import config
+from models.model_router import classify_error, create_client, get_model_router
+from utils.gemini_cassette import start_from_config
+
+logger = logging.getLogger("GeminiService")
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a call does not finish within its deadline"""
+
+
+class BatchedResponse:
+    """Per-caller slice of a batched reply (mirrors response.text)"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+def request_key(contents, generation_config=None):
+    """Hash identifying identical requests (text and inline image bytes)"""
+    digest = hashlib.blake2b(digest_size=16)
+    items = contents if isinstance(contents, (list, tuple)) else [contents]
+    for item in items:
+        if isinstance(item, str):
+            digest.update(item.encode('utf-8'))
+            continue
+        inline = getattr(item, 'inline_data', None) or getattr(item, 'inlineData', None)
+        if inline is not None and getattr(inline, 'data', None) is not None:
+            digest.update(str(getattr(inline, 'mime_type', '') or '').encode('utf-8'))
+            digest.update(inline.data)
+        else:
+            digest.update(repr(item).encode('utf-8'))
+        digest.update(b'\x00')
+    if generation_config is not None:
+        digest.update(repr(generation_config).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def build_batch_prompt(prompts):
+    """Combine independent prompts into one request answered as a JSON array"""
+    parts = [
+        f"Answer each of the following {len(prompts)} independent requests separately.",
+        f"Reply with ONLY a JSON array of {len(prompts)} strings; element i is the complete answer "
+        "to request i, exactly as if it had been asked alone.",
+    ]
+    for index, prompt in enumerate(prompts, 1):
+        parts.append(f"### Request {index}\n{prompt}")
+    return "\n\n".join(parts)
+
+
+def parse_batch_answers(text, count):
+    """The per-request answers of a batched reply, or None if it is malformed"""
+    text = (text or '').strip()
+    if text.startswith('```'):
+        text = text.strip('`')
+        if text.startswith('json'):
+            text = text[4:]
+    start, end = text.find('['), text.rfind(']') + 1
+    try:
+        answers = json.loads(text[start:end])
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(answers, list) or len(answers) != count:
+        return None
+    return [a if isinstance(a, str) else json.dumps(a) for a in answers]
+
+
+class GeminiService:
+    """Shared asynchronous Gemini client with deadlines and hedged requests"""
+
+    def __init__(self, api_key, router=None, default_deadline=20.0, hedge=True,
+                 hedge_min_delay=0.5, hedge_min_samples=5, max_connections=10, base_url=None,
+                 batch_window=0.005, batch_max_items=8, batch_max_chars=4000):
+        """
+        Args:
+            default_deadline: Seconds a call may take end to end (all fallbacks included)
+            hedge: Fire a second model when the first exceeds its p90 latency
+            hedge_min_delay: Never hedge earlier than this (seconds)
+            hedge_min_samples: Successful calls a model needs before its p90 is trusted
+            base_url: Endpoint override (record proxy / replay server)
+            batch_window: Seconds small text requests wait to be batched together
+            batch_max_items: Requests per batched call (<= 1 disables batching)
+            batch_max_chars: Longer prompts are never batched
+        """
+        self.client = create_client(api_key, max_connections=max_connections, base_url=base_url)
+        self.max_connections = max_connections
+        self.router = router or get_model_router()
+        self.default_deadline = default_deadline
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.batch_window = batch_window
+        self.batch_max_items = batch_max_items
+        self.batch_max_chars = batch_max_chars
+        self.coalesced = 0
+        self.batches_sent = 0
+        self.batched_items = 0
+        self._inflight = {}      # request key -> shared future (service loop only)
+        self._batch_queue = []   # [(prompt, future, deadline)] waiting for the batch window
+        self._batch_timer = None
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="GeminiServiceLoop", daemon=True)
+        self._thread.start()
+        logger.info(f"✓ GeminiService ready (models: {self.router.models})")
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    # ---------- async API ----------
+
+    async def _attempt(self, model, contents, generation_config):
+        """One call to one model, reported to the router"""
+        start = time.perf_counter()
+        try:
+            kwargs = {'model': model, 'contents': contents}
+            if generation_config is not None:
+                kwargs['config'] = generation_config
+            response = await self.client.aio.models.generate_content(**kwargs)
+        except asyncio.CancelledError:
+            # Lost a hedge race or hit the deadline: a half-open probe may be retried later
+            self.router.release_probe(model)
+            raise
+        except Exception as e:
+            self.router.record_failure(model, e, time.perf_counter() - start)
+            raise
+        self.router.record_success(model, time.perf_counter() - start)
+        return response, model
+
+    def _hedge_delay(self, model):
+        """Seconds to wait before hedging a call to model (None = do not hedge)"""
+        if not self.hedge:
+            return None
+        health = self.router.health.get(model)
+        if health is None:
+            return None
+        if sum(1 for lat, ok in health.samples if ok) < self.hedge_min_samples:
+            return None
+        p90 = health.latency_percentile(90)
+        return max(self.hedge_min_delay, p90) if p90 is not None else None
+
+    async def generate(self, contents, deadline=None, hedge=True, generation_config=None, coalesce=True):
+        """
+        generate_content on the best model, with fallback, hedging and a deadline
+        Identical requests already in flight share one call (coalesce=True).
+
+        Returns:
+            tuple: (response, model_name)
+        """
+        if not coalesce:
+            return await self._generate(contents, deadline, hedge, generation_config)
+
+        key = request_key(contents, generation_config)
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._generate(contents, deadline, hedge, generation_config))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _, key=key: self._inflight.pop(key, None))
+        else:
+            self.coalesced += 1
+            logger.debug(f"Coalesced identical in-flight request {key[:8]}")
+        # shield: one caller giving up must not cancel the call for the others
+        return await asyncio.shield(future)
+
+    async def _generate(self, contents, deadline=None, hedge=True, generation_config=None):
+        """
+        generate_content on the best model, with fallback, hedging and a deadline
+
+        Args:
+            contents: Prompt string or list of parts (same as generate_content)
+            deadline: Seconds for the whole call (default: default_deadline)
+            hedge: Allow a hedged second request for this call
+
+        Returns:
+            tuple: (response, model_name)
+
+        Raises:
+            DeadlineExceeded, or the last model error if every model failed
+        """
+        deadline = deadline or self.default_deadline
+        end = time.monotonic() + deadline
+        tried = set()
+        last_error = None
+        pending = set()
+
+        try:
+            while True:
+                if not pending:
+                    model = self.router.choose(exclude=tried)
+                    if model is None:
+                        break
+                    tried.add(model)
+                    task = asyncio.ensure_future(self._attempt(model, contents, generation_config))
+                    task.model = model
+                    pending.add(task)
+                    hedge_after = self._hedge_delay(model) if hedge else None
+                else:
+                    hedge_after = None
+
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    for task in pending:
+                        self.router.record_failure(task.model, DeadlineExceeded("deadline exceeded"), deadline)
+                    raise DeadlineExceeded(f"Gemini deadline of {deadline:.1f}s exceeded (tried {sorted(tried)})")
+
+                wait_for = min(remaining, hedge_after) if hedge_after else remaining
+                done, pending = await asyncio.wait(pending, timeout=wait_for, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    if hedge_after and time.monotonic() < end:
+                        backup = self.router.choose(exclude=tried)
+                        if backup:
+                            tried.add(backup)
+                            self.hedges_fired += 1
+                            logger.info(f"🪂 Hedging: {sorted(tried - {backup})} slower than {hedge_after:.2f}s, also asking {backup}")
+                            hedge_task = asyncio.ensure_future(self._attempt(backup, contents, generation_config))
+                            hedge_task.model = backup
+                            hedge_task.hedged = True
+                            pending.add(hedge_task)
+                    continue
+
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        if getattr(task, 'hedged', False):
+                            self.hedges_won += 1
+                        return task.result()
+                    last_error = error
+                    logger.warning(f"⚠️ Gemini call failed: {str(error)[:120]}")
+                    if classify_error(error) == "fatal":
+                        raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if last_error is None:
+            last_error = RuntimeError("429 All Gemini models are unavailable (circuits open)")
+        raise last_error
+
+    async def generate_batched(self, prompt, deadline=None):
+        """
+        Text-only request that may share one call with other small requests
+        arriving within batch_window; each caller gets its own answer back.
+
+        Returns:
+            tuple: (response with .text, model_name)
+        """
+        if not isinstance(prompt, str) or len(prompt) > self.batch_max_chars or self.batch_max_items <= 1:
+            return await self.generate(prompt, deadline)
+
+        future = self._loop.create_future()
+        self._batch_queue.append((prompt, future, deadline or self.default_deadline))
+        if len(self._batch_queue) >= self.batch_max_items:
+            self._flush_now()
+        elif self._batch_timer is None:
+            self._batch_timer = self._loop.call_later(self.batch_window, self._flush_now)
+        return await future
+
+    def _flush_now(self):
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        items, self._batch_queue = self._batch_queue, []
+        if items:
+            asyncio.ensure_future(self._send_batch(items))
+
+    async def _send_batch(self, items):
+        """One multi-item call for the queued prompts, demultiplexed per caller"""
+        # Identical prompts in one window are asked once
+        unique = list(dict.fromkeys(prompt for prompt, _, _ in items))
+        deadline = min(d for _, _, d in items)
+
+        answers = None
+        model = None
+        if len(unique) > 1:
+            try:
+                response, model = await self.generate(build_batch_prompt(unique), deadline)
+                answers = parse_batch_answers(getattr(response, 'text', ''), len(unique))
+                self.batches_sent += 1
+                self.batched_items += len(items)
+                logger.info(f"📦 Batched {len(items)} requests ({len(unique)} unique) into one call")
+            except Exception as e:
+                logger.warning(f"Batched call failed ({str(e)[:80]}), sending individually")
+
+        if answers is None:
+            # Single prompt or unusable batch reply: one call per unique prompt
+            results = await asyncio.gather(
+                *(self.generate(prompt, deadline) for prompt in unique), return_exceptions=True
+            )
+            by_prompt = dict(zip(unique, results))
+        else:
+            by_prompt = {prompt: (BatchedResponse(answer), model) for prompt, answer in zip(unique, answers)}
+
+        for prompt, future, _ in items:
+            if future.done():
+                continue
+            result = by_prompt[prompt]
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    # ---------- sync wrappers ----------
+
+    def run(self, coro, deadline):
+        """Run a coroutine on the service loop and wait for it (bounded by deadline)"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        try:
+            return future.result(timeout=deadline + 1.0)
+        except FutureTimeoutError:
+            future.cancel()
+            raise DeadlineExceeded(f"Gemini deadline of {deadline:.1f}s exceeded")
+
+    def generate_sync(self, contents, deadline=None, hedge=True, generation_config=None):
+        """Blocking generate(); safe to call from any thread except the service loop"""
+        deadline = deadline or self.default_deadline
+        return self.run(self.generate(contents, deadline, hedge, generation_config), deadline)
+
+    def generate_batched_sync(self, prompt, deadline=None):
+        """Blocking generate_batched()"""
+        deadline = deadline or self.default_deadline
+        return self.run(self.generate_batched(prompt, deadline), deadline)
+
+    def generate_batched_many_sync(self, prompts, deadline=None):
+        """
+        Blocking generate_batched() for many prompts at once
+
+        Returns:
+            list: (response, model_name) or the exception, per prompt
+        """
+        deadline = deadline or self.default_deadline
+
+        async def gather():
+            return await asyncio.gather(
+                *(self.generate_batched(prompt, deadline) for prompt in prompts), return_exceptions=True
+            )
+
+        # Batches run concurrently; allow one deadline per wave of connections
+        waves = -(-len(prompts) // max(1, self.batch_max_items * (self.max_connections or 1)))
+        return self.run(gather(), deadline * max(1, waves))
+
+    def stats(self):
+        return {
+            'hedges_fired': self.hedges_fired,
+            'hedges_won': self.hedges_won,
+            'coalesced': self.coalesced,
+            'batches_sent': self.batches_sent,
+            'batched_items': self.batched_items,
+            'models': self.router.stats(),
+        }
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+_shared_service = None
+_shared_lock = threading.Lock()
+
+
+def get_gemini_service(api_key=None):
+    """Process-wide GeminiService (created on first use)"""
+    global _shared_service
+    with _shared_lock:
+        if _shared_service is None:
+            _shared_service = GeminiService(
+                api_key or config.GEMINI_API_KEY,
+                default_deadline=config.GEMINI_CALL_DEADLINE,
+                hedge=config.GEMINI_HEDGE_ENABLED,
+                max_connections=config.GEMINI_MAX_CONNECTIONS,
+                batch_window=config.GEMINI_BATCH_WINDOW_MS / 1000.0,
+                batch_max_items=config.GEMINI_BATCH_MAX_ITEMS,
+                base_url=start_from_config(),
+            )
+        return _shared_service
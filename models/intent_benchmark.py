@@ -0,0 +1,334 @@
+"""
+Intent Benchmark - accuracy, latency and memory of every intent classifier
+The labelled corpus has two splits:
+- 'seed': the training patterns of main.py (MODEL1_TRAINING_DATA) and
+  gui.py / EVA_TER.py (CORE_TRAINING_DATA)
+- 'heldout': HELDOUT_PARAPHRASES, which no model is trained on
+
+Every classifier is built fresh and asked one command at a time, as the
+front-ends do. The report gives accuracy, macro-F1, p50/p99 latency per
+command, and the memory the built model retains. Coarse classifiers
+(CommandClassifier, CommandProcessor) are scored on the coarse category of
+each label. Fine classifiers are scored on both.
+
+Gemini-backed classifiers replay a cassette (utils.gemini_cassette) rather
+than calling the live API. With the default --gemini replay and no cassette,
+they are listed as NOT RUN and the run exits non-zero:
+    python -m models.intent_benchmark --gemini record   # once, needs a key; writes cassettes/intent_benchmark.jsonl
+    python -m models.intent_benchmark --replay-latency 0
+    python -m models.intent_benchmark --gemini off --split heldout --json report.json
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+logger = logging.getLogger("IntentBenchmark")
+
+
+def load_corpus():
+    """{split: [(text, label)]}; seed pairs are de-duplicated across the front-ends"""
+    from models.intent_data import CORE_TRAINING_DATA, HELDOUT_PARAPHRASES, MODEL1_TRAINING_DATA
+
+    seed = list(dict.fromkeys(MODEL1_TRAINING_DATA + CORE_TRAINING_DATA))
+    return {'seed': seed, 'heldout': list(HELDOUT_PARAPHRASES)}
+
+
+# ---------------------------------------------------------------------------
+# Candidates: name -> (taxonomy, needs Gemini, build() -> predict(text) -> label or None)
+# ---------------------------------------------------------------------------
+
+def _main_model(params_name):
+    def build():
+        from models.intent_data import MODEL1_TRAINING_DATA
+        from models.intent_model_store import analyze_queries, params_for, train_pipeline
+
+        pipeline = train_pipeline(MODEL1_TRAINING_DATA, params_for(params_name))
+        return lambda text: analyze_queries(pipeline, [text])[0]['command_type']
+    return build
+
+
+def _gui_model():
+    from models.intent_data import CORE_TRAINING_DATA
+    from models.intent_model_store import analyze_queries, train_pipeline
+
+    pipeline = train_pipeline(CORE_TRAINING_DATA)
+    return lambda text: analyze_queries(pipeline, [text])[0]['command_type']
+
+
+def _matcher(data_name):
+    def build():
+        from models import intent_data
+        from models.pattern_matcher import PatternMatcher
+
+        matcher = PatternMatcher(getattr(intent_data, data_name))
+
+        def predict(text):
+            result = matcher.match(text)
+            return result['command_type'] if result else None
+        return predict
+    return build
+
+
+def _online_model():
+    from models.intent_data import MODEL1_TRAINING_DATA
+    from models.online_intent import OnlineIntentModel
+
+    model = OnlineIntentModel({label for _, label in MODEL1_TRAINING_DATA}).seed(MODEL1_TRAINING_DATA)
+    return lambda text: model.analyze_queries([text])[0]['command_type']
+
+
+def _cascade(gemini):
+    """The configured local cascade, optionally with Gemini appended"""
+    def build():
+        import config
+        from models.intent_data import MODEL1_TRAINING_DATA
+        from models.intent_router import build_router
+        from models.online_intent import OnlineIntentLearner, OnlineIntentModel
+
+        # A private, non-persisted online model; teaching is off so results don't depend on order
+        model = OnlineIntentModel({label for _, label in MODEL1_TRAINING_DATA}).seed(MODEL1_TRAINING_DATA)
+        learner = OnlineIntentLearner(model, os.path.join(tempfile.mkdtemp(), 'online.joblib'))
+        stages = [name for name in config.INTENT_CASCADE_STAGES if name != 'gemini'] + (['gemini'] if gemini else [])
+        api_key = config.GEMINI_API_KEY if gemini else None
+        router = build_router(MODEL1_TRAINING_DATA, api_key=api_key, stages=stages, learner=learner)
+        router.learner = None
+        return lambda text: router.route(text)['command_type']
+    return build
+
+
+def _rules():
+    from models.command_classifier import CommandClassifier
+
+    # Keyword tiers only; the RandomForest is benchmarked separately
+    classifier = CommandClassifier.__new__(CommandClassifier)
+    classifier.logger = logging.getLogger("IntentBenchmark.rules")
+    return lambda text: classifier.classify(text)['category']
+
+
+def _random_forest():
+    import config
+    from models.command_classifier import CommandClassifier
+
+    config.MODEL_WEIGHTS_DIR = tempfile.mkdtemp()  # train the shipped default, don't touch real weights
+    classifier = CommandClassifier()
+    classifier.logger = logging.getLogger("IntentBenchmark.forest")
+    return lambda text: str(classifier.predict_batch([text])[0][0])
+
+
+def _processor():
+    import config
+    from models.command_processor import CommandProcessor
+
+    processor = CommandProcessor(config.GEMINI_API_KEY)
+
+    def predict(text):
+        try:
+            return processor.process(text).get('category')
+        except Exception:
+            return None
+    return predict
+
+
+CANDIDATES = {
+    'main: tfidf + logreg': ('fine', False, _main_model('tfidf')),
+    'main: hashing + logreg': ('fine', False, _main_model('hashing')),
+    'gui: tfidf + logreg (core)': ('fine', False, _gui_model),
+    'eva_ter: matcher (core)': ('fine', False, _matcher('CORE_TRAINING_DATA')),
+    'matcher (model1)': ('fine', False, _matcher('MODEL1_TRAINING_DATA')),
+    'online sgd': ('fine', False, _online_model),
+    'cascade (local)': ('fine', False, _cascade(gemini=False)),
+    'cascade (+gemini)': ('fine', True, _cascade(gemini=True)),
+    'classifier: rules': ('coarse', False, _rules),
+    'classifier: forest': ('coarse', False, _random_forest),
+    'processor: gemini': ('coarse', True, _processor),
+}
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def build_measured(build):
+    """
+    (predict, build seconds, retained bytes, peak bytes) via tracemalloc
+
+    One untraced build runs first so lazy imports and first-fit setup are
+    not charged to the model.
+    """
+    build()
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        predict = build()
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return predict, elapsed, retained, peak
+
+
+def macro_f1(truth, predicted):
+    """Macro-F1 over the labels present in the truth (a missing prediction counts as wrong)"""
+    scores = []
+    for label in sorted(set(truth)):
+        tp = sum(1 for t, p in zip(truth, predicted) if t == label and p == label)
+        fp = sum(1 for t, p in zip(truth, predicted) if t != label and p == label)
+        fn = sum(1 for t, p in zip(truth, predicted) if t == label and p != label)
+        scores.append(2 * tp / (2 * tp + fp + fn) if tp else 0.0)
+    return float(np.mean(scores)) if scores else 0.0
+
+
+def evaluate(predict, corpus, taxonomy, warmup=1):
+    """Accuracy / macro-F1 / latency of one predict function on one split"""
+    from models.intent_router import COARSE_CATEGORY
+
+    def coarse(label):
+        return COARSE_CATEGORY.get(label, label)
+
+    for text, _ in corpus[:warmup]:
+        predict(text)
+
+    predicted, latencies, failed = [], [], 0
+    for text, _ in corpus:
+        start = time.perf_counter()
+        try:
+            label = predict(text)
+        except Exception as e:
+            logger.debug(f"Prediction failed for '{text}': {e}")
+            label = None
+        latencies.append(time.perf_counter() - start)
+        failed += label is None
+        predicted.append(label)
+
+    truth = [label for _, label in corpus]
+    coarse_truth = [coarse(label) for label in truth]
+    coarse_predicted = [coarse(label) if label else None for label in predicted]
+    if taxonomy == 'coarse':
+        accuracy, f1 = None, None
+    else:
+        accuracy = float(np.mean([t == p for t, p in zip(truth, predicted)]))
+        f1 = macro_f1(truth, predicted)
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'n': len(corpus),
+        'accuracy': accuracy,
+        'macro_f1': f1,
+        'coarse_accuracy': float(np.mean([t == p for t, p in zip(coarse_truth, coarse_predicted)])),
+        'coarse_macro_f1': macro_f1(coarse_truth, coarse_predicted),
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'failed': failed,
+    }
+
+
+def format_report(rows, split, not_run=()):
+    def pct(value):
+        return f"{value:>6.1%}" if value is not None else f"{'-':>6}"
+
+    def num(value):
+        return f"{value:>6.3f}" if value is not None else f"{'-':>6}"
+
+    header = (f"{'classifier':<28} {'labels':<6} {'n':>4} {'acc':>6} {'F1':>6} {'c-acc':>6} {'c-F1':>6} "
+              f"{'p50 ms':>8} {'p99 ms':>8} {'build':>8} {'mem MB':>7} {'fail':>4}")
+    lines = [f"\n[{split}]", header, "-" * len(header)]
+    for r in rows:
+        m = r['splits'][split]
+        lines.append(
+            f"{r['name']:<28} {r['taxonomy']:<6} {m['n']:>4} {pct(m['accuracy'])} {num(m['macro_f1'])} "
+            f"{pct(m['coarse_accuracy'])} {num(m['coarse_macro_f1'])} {m['p50_ms']:>8.3f} {m['p99_ms']:>8.3f} "
+            f"{r['build_s']:>7.2f}s {r['retained_mb']:>7.2f} {m['failed']:>4}"
+        )
+    for name, reason in not_run:
+        lines.append(f"{name:<28} NOT RUN: {reason}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every intent classifier on a labelled corpus")
+    parser.add_argument("--gemini", choices=["replay", "record", "live", "off"], default="replay",
+                        help="How Gemini-backed classifiers reach the API (default: replay a cassette)")
+    parser.add_argument("--cassette", default=os.path.join("cassettes", "intent_benchmark.jsonl"))
+    parser.add_argument("--replay-latency", type=float, help="Fixed seconds per replayed call (default: recorded)")
+    parser.add_argument("--split", choices=["seed", "heldout", "both"], default="both")
+    parser.add_argument("--models", nargs='+', help="Substrings of classifier names to run")
+    parser.add_argument("--json", help="Also write the report rows to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    # Gemini settings must be in place before config / the Gemini service are imported
+    use_gemini = args.gemini != "off"
+    missing_cassette = args.gemini == "replay" and not os.path.exists(args.cassette)
+    if missing_cassette:
+        use_gemini = False
+    if args.gemini in ("replay", "off"):
+        os.environ.setdefault('GEMINI_API_KEY', 'replay')
+    if use_gemini and args.gemini != "live":
+        os.environ['GEMINI_MODE'] = args.gemini
+        os.environ['GEMINI_CASSETTE'] = args.cassette
+        if args.replay_latency is not None:
+            os.environ['GEMINI_REPLAY_LATENCY'] = str(args.replay_latency)
+
+    import config
+    config.RESPONSE_CACHE_ENABLED = False  # measure the classifier, not the response cache
+
+    corpus = load_corpus()
+    splits = ['seed', 'heldout'] if args.split == "both" else [args.split]
+
+    rows, not_run = [], []
+    for name, (taxonomy, needs_gemini, build) in CANDIDATES.items():
+        if args.models and not any(pattern in name for pattern in args.models):
+            continue
+        if needs_gemini and missing_cassette:
+            not_run.append((name, f"no cassette at {args.cassette} (record one with --gemini record)"))
+            continue
+        if needs_gemini and not use_gemini:
+            continue
+        print(f"Running {name}...", flush=True)
+        try:
+            predict, build_s, retained, peak = build_measured(build)
+        except Exception as e:
+            not_run.append((name, f"build failed: {e}"))
+            continue
+        rows.append({
+            'name': name,
+            'taxonomy': taxonomy,
+            'build_s': build_s,
+            'retained_mb': retained / 2 ** 20,
+            'peak_mb': peak / 2 ** 20,
+            'splits': {split: evaluate(predict, corpus[split], taxonomy) for split in splits},
+        })
+
+    print(f"\nCorpus: {', '.join(f'{s} {len(corpus[s])}' for s in splits)} commands. "
+          f"acc/F1 on fine labels, c-acc/c-F1 on coarse categories; "
+          f"'seed' is the training data of most models (an upper bound), 'heldout' is not.")
+    for split in splits:
+        print(format_report(rows, split, not_run))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'gemini': args.gemini if use_gemini else 'off', 'rows': rows,
+                       'not_run': [{'name': name, 'reason': reason} for name, reason in not_run]}, f, indent=2)
+        print(f"\nReport written to {args.json}")
+
+    if not_run:
+        print(f"\nERROR: {len(not_run)} classifier(s) not evaluated: {', '.join(name for name, _ in not_run)}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+Intent Features - text vectorizers for the intent classifiers
+'tfidf' is the vocabulary-bearing TfidfVectorizer the classifiers have always
+fitted. 'hashing' is a stateless HashingVectorizer over character n-grams
+inside word boundaries: it has no vocabulary to fit or pickle, its size does
+not grow with the data, and a misspelled word still shares most of its
+n-grams with the correct spelling.
+
+Benchmark (accuracy, ASR-noise robustness, latency, size):
+    python -m models.intent_features
+"""
+
+import argparse
+import io
+import random
+import time
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+
+HASHING_DEFAULTS = {
+    'analyzer': 'char_wb',
+    'ngram_range': (2, 4),
+    'n_features': 2 ** 12,  # same CV accuracy as 2^14-2^18 on this data, a quarter of the weights
+    'alternate_sign': False,
+    'norm': 'l2',
+}
+
+
+def make_vectorizer(kind='tfidf', **params):
+    """Unfitted TfidfVectorizer, or a ready-to-use HashingVectorizer"""
+    if kind == 'tfidf':
+        return TfidfVectorizer(**params)
+    if kind == 'hashing':
+        options = dict(HASHING_DEFAULTS)
+        options.update(params)
+        if isinstance(options.get('ngram_range'), list):
+            options['ngram_range'] = tuple(options['ngram_range'])
+        return HashingVectorizer(**options)
+    raise ValueError(f"Unknown feature pipeline: {kind}")
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+_NEIGHBOURS = {
+    'a': 'e', 'e': 'i', 'i': 'e', 'o': 'u', 'u': 'o', 's': 'z', 'z': 's',
+    'c': 'k', 'k': 'c', 'm': 'n', 'n': 'm', 'p': 'b', 'b': 'p', 't': 'd', 'd': 't',
+}
+
+
+def asr_noise(text, rng, rate=0.3):
+    """Misspell about `rate` of the words the way speech recognition tends to (drop, double, swap, sound-alike)"""
+    words = []
+    for word in text.split():
+        if len(word) > 2 and rng.random() < rate:
+            i = rng.randrange(1, len(word))
+            edit = rng.choice(('drop', 'double', 'swap', 'sound'))
+            if edit == 'drop':
+                word = word[:i] + word[i + 1:]
+            elif edit == 'double':
+                word = word[:i] + word[i] + word[i:]
+            elif edit == 'swap' and i < len(word) - 1:
+                word = word[:i] + word[i + 1] + word[i] + word[i + 2:]
+            elif word[i] in _NEIGHBOURS:
+                word = word[:i] + _NEIGHBOURS[word[i]] + word[i + 1:]
+        words.append(word)
+    return " ".join(words)
+
+
+def _macro_f1(truth, predicted):
+    from sklearn.metrics import f1_score
+    return f1_score(truth, predicted, average='macro', zero_division=0)
+
+
+def benchmark(training_data, variants, folds=5, seed=0, repeat=200):
+    """
+    Args:
+        variants: {name: intent_model_store params}
+
+    Returns:
+        list: one row of metrics per variant
+    """
+    from models.intent_model_store import build_pipeline
+
+    rng = random.Random(seed)
+    indices = list(range(len(training_data)))
+    rng.shuffle(indices)
+    queries = [text for text, _ in training_data]
+    rows = []
+
+    for name, params in variants.items():
+        truth, clean, noisy = [], [], []
+        for fold in range(folds):
+            held_out = set(indices[fold::folds])
+            train = [item for i, item in enumerate(training_data) if i not in held_out]
+            test = [training_data[i] for i in sorted(held_out)]
+            pipeline = build_pipeline(params)
+            X, y = zip(*train)
+            pipeline.fit([x.lower() for x in X], y)
+            texts = [text.lower() for text, _ in test]
+            noise_rng = random.Random(seed + fold)
+            truth.extend(label for _, label in test)
+            clean.extend(pipeline.predict(texts))
+            noisy.extend(pipeline.predict([asr_noise(text, noise_rng) for text in texts]))
+
+        # Full-data pipeline for timing and size
+        X, y = zip(*training_data)
+        pipeline = build_pipeline(params)
+        vectorizer, classifier = pipeline.steps[0][1], pipeline.steps[1][1]
+        start = time.perf_counter()
+        features = vectorizer.fit_transform([x.lower() for x in X])
+        vectorizer_fit = time.perf_counter() - start
+        start = time.perf_counter()
+        classifier.fit(features, y)
+        classifier_fit = time.perf_counter() - start
+
+        single = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            pipeline.predict_proba([queries[i % len(queries)].lower()])
+            single.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        pipeline.predict_proba([q.lower() for q in queries])
+        batch = time.perf_counter() - start
+
+        vectorizer_bytes, artifact_bytes = io.BytesIO(), io.BytesIO()
+        joblib.dump(vectorizer, vectorizer_bytes)
+        joblib.dump(pipeline, artifact_bytes)
+        start = time.perf_counter()
+        joblib.load(io.BytesIO(artifact_bytes.getvalue()))
+        load = time.perf_counter() - start
+
+        rows.append({
+            'name': name,
+            'accuracy': float(np.mean(np.array(clean) == np.array(truth))),
+            'macro_f1': _macro_f1(truth, clean),
+            'noisy_accuracy': float(np.mean(np.array(noisy) == np.array(truth))),
+            'vectorizer_fit_ms': vectorizer_fit * 1000,
+            'classifier_fit_ms': classifier_fit * 1000,
+            'p50_ms': sorted(single)[len(single) // 2] * 1000,
+            'batch_us_per_query': batch / len(queries) * 1e6,
+            'features': features.shape[1],
+            'vectorizer_kb': len(vectorizer_bytes.getvalue()) / 1024,
+            'artifact_kb': len(artifact_bytes.getvalue()) / 1024,
+            'load_ms': load * 1000,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare TF-IDF and hashed char n-gram intent features")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--n-features", type=int, nargs='+', default=[2 ** 12, 2 ** 14])
+    parser.add_argument("--data", choices=["model1", "core"], default="model1")
+    args = parser.parse_args()
+
+    from models.intent_data import CORE_TRAINING_DATA, MODEL1_TRAINING_DATA
+    from models.intent_model_store import DEFAULT_PARAMS, HASHING_PARAMS
+
+    data = MODEL1_TRAINING_DATA if args.data == "model1" else CORE_TRAINING_DATA
+    variants = {
+        'tfidf (current)': DEFAULT_PARAMS,
+        'tfidf, C=10': {'tfidf': {}, 'clf': HASHING_PARAMS['clf']},
+    }
+    for n in args.n_features:
+        variants[f'hashing char 2-4, 2^{int(np.log2(n))}'] = {'hashing': {'n_features': n}, 'clf': HASHING_PARAMS['clf']}
+
+    rows = benchmark(data, variants, folds=args.folds)
+    print(f"{len(data)} commands, {args.folds}-fold CV; noisy = same held-out commands with ASR-style misspellings\n")
+    header = (f"{'pipeline':<26} {'acc':>6} {'F1':>6} {'noisy':>6} {'vec fit':>8} {'clf fit':>8} "
+              f"{'p50':>7} {'batch':>8} {'feats':>6} {'vec':>7} {'artifact':>9} {'load':>7}")
+    print(header)
+    print("-" * len(header))
+    for r in rows:
+        print(f"{r['name']:<26} {r['accuracy']:>6.1%} {r['macro_f1']:>6.3f} {r['noisy_accuracy']:>6.1%} "
+              f"{r['vectorizer_fit_ms']:>6.1f}ms {r['classifier_fit_ms']:>6.0f}ms {r['p50_ms']:>5.2f}ms "
+              f"{r['batch_us_per_query']:>6.0f}us {r['features']:>6} {r['vectorizer_kb']:>5.1f}KB "
+              f"{r['artifact_kb']:>7.0f}KB {r['load_ms']:>5.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
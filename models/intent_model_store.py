@@ -0,0 +1,213 @@
+"""
+Intent Model Store - persisted, content-hashed intent classifier artifacts
+The fitted TF-IDF + LogisticRegression pipeline is saved under a
+fingerprint of its training data, hyperparameters and scikit-learn version.
+Startup loads the artifact whose fingerprint matches instead of refitting;
+when only the data changed, the previous artifact (same hyperparameters and
+scikit-learn version, recorded in a .json sidecar) is served while a fresh
+one is trained in the background and swapped in.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import joblib
+import sklearn
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from models.intent_features import make_vectorizer
+
+logger = logging.getLogger("IntentModelStore")
+
+# Defaults match the classifier EvaGui has always trained
+DEFAULT_PARAMS = {
+    'tfidf': {},
+    'clf': {},
+}
+# Stateless hashed char n-grams instead of a fitted vocabulary (see models.intent_features)
+HASHING_PARAMS = {
+    'hashing': {},
+    'clf': {'C': 10.0},  # hashed n-grams are l2-normalized and many; weaker regularization pays off
+}
+
+
+def params_for(features):
+    """Pipeline params for config.INTENT_FEATURES ('tfidf' | 'hashing')"""
+    if features == 'hashing':
+        return HASHING_PARAMS
+    if features == 'tfidf':
+        return DEFAULT_PARAMS
+    raise ValueError(f"Unknown feature pipeline: {features}")
+
+
+def fingerprint(training_data, params=None):
+    """Hash of (training data, hyperparameters, sklearn version)"""
+    payload = {
+        'data': [list(item) for item in training_data],
+        'params': params or DEFAULT_PARAMS,
+        'sklearn': sklearn.__version__,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def build_pipeline(params=None):
+    params = params or DEFAULT_PARAMS
+    if 'hashing' in params:
+        features = ('hashing', make_vectorizer('hashing', **params['hashing']))
+    else:
+        features = ('tfidf', make_vectorizer('tfidf', **params.get('tfidf', {})))
+    return Pipeline([
+        features,
+        ('clf', LogisticRegression(**params.get('clf', {}))),
+    ])
+
+
+def train_pipeline(training_data, params=None):
+    X, y = zip(*training_data)
+    pipeline = build_pipeline(params)
+    pipeline.fit(X, y)
+    return pipeline
+
+
+def analyze_queries(pipeline, queries):
+    """
+    Classify many commands with one vectorize + predict_proba call
+
+    Returns:
+        list: one {input, command_type, confidence, training_pattern} per query
+    """
+    if not queries:
+        return []
+    probabilities = pipeline.predict_proba([query.lower() for query in queries])
+    best = probabilities.argmax(axis=1)
+    return [
+        {
+            "input": query,
+            "command_type": pipeline.classes_[index],
+            "confidence": probabilities[row, index],
+            "training_pattern": "Local Model Analysis",
+        }
+        for row, (query, index) in enumerate(zip(queries, best))
+    ]
+
+
+class IntentModelStore:
+    """Directory of <name>-<fingerprint>.joblib artifacts"""
+
+    def __init__(self, directory, name="intent_model", keep=2):
+        """
+        Args:
+            keep: Artifacts kept per name (older ones are deleted after a save)
+        """
+        self.directory = directory
+        self.name = name
+        self.keep = keep
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key):
+        return os.path.join(self.directory, f"{self.name}-{key}.joblib")
+
+    @staticmethod
+    def _meta_path(path):
+        return path[:-len('.joblib')] + '.json'
+
+    def _read_meta(self, path):
+        try:
+            with open(self._meta_path(path), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _artifacts(self):
+        """Artifact paths for this name, newest first"""
+        prefix = f"{self.name}-"
+        paths = [
+            os.path.join(self.directory, f) for f in os.listdir(self.directory)
+            if f.startswith(prefix) and f.endswith('.joblib')
+        ]
+        return sorted(paths, key=os.path.getmtime, reverse=True)
+
+    def load(self, key):
+        """Pipeline saved under this fingerprint, or None"""
+        path = self.path_for(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            return joblib.load(path)
+        except Exception as e:
+            logger.warning(f"Could not load intent model {path}: {e}")
+            return None
+
+    def load_latest(self, params=None):
+        """
+        Most recently saved pipeline trained with these params (any training
+        data) on this scikit-learn version, or None
+        """
+        wanted = {'params': params or DEFAULT_PARAMS, 'sklearn': sklearn.__version__}
+        for path in self._artifacts():
+            meta = self._read_meta(path)
+            if meta is None or {k: meta.get(k) for k in wanted} != wanted:
+                continue
+            try:
+                return joblib.load(path)
+            except Exception as e:
+                logger.warning(f"Could not load intent model {path}: {e}")
+        return None
+
+    def save(self, key, pipeline, params=None):
+        path = self.path_for(key)
+        tmp_path = path + ".tmp"
+        joblib.dump(pipeline, tmp_path)
+        os.replace(tmp_path, path)
+        with open(self._meta_path(path), 'w') as f:
+            json.dump({'params': params or DEFAULT_PARAMS, 'sklearn': sklearn.__version__}, f)
+        for old in self._artifacts()[self.keep:]:
+            for stale_path in (old, self._meta_path(old)):
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
+        return path
+
+    def get_or_train(self, training_data, params=None, on_ready=None):
+        """
+        Pipeline for this training data, as cheaply as possible
+
+        Args:
+            on_ready: callable(pipeline) run from the background thread when a
+                      stale artifact was served and the retrained one is ready
+
+        Returns:
+            tuple: (pipeline, status) where status is 'loaded', 'stale' or 'trained'
+        """
+        key = fingerprint(training_data, params)
+        start = time.perf_counter()
+
+        pipeline = self.load(key)
+        if pipeline is not None:
+            logger.info(f"⚡ Intent model {key} loaded from disk in {(time.perf_counter() - start) * 1000:.0f} ms")
+            return pipeline, 'loaded'
+
+        stale = self.load_latest(params)
+        if stale is not None and on_ready is not None:
+            logger.info(f"🔁 Training data changed; serving previous intent model while {key} trains")
+
+            def retrain():
+                fresh = train_pipeline(training_data, params)
+                self.save(key, fresh, params)
+                logger.info(f"✅ Intent model {key} retrained in background")
+                on_ready(fresh)
+
+            threading.Thread(target=retrain, name="IntentModelRetrain", daemon=True).start()
+            return stale, 'stale'
+
+        pipeline = train_pipeline(training_data, params)
+        self.save(key, pipeline, params)
+        logger.info(f"🧠 Intent model {key} trained in {(time.perf_counter() - start) * 1000:.0f} ms and saved")
+        return pipeline, 'trained'
@@ -0,0 +1,672 @@
+"""
+Intent Router - confidence cascade over the local and remote intent classifiers
+Each command goes to the cheapest stage first (nearest-pattern matcher,
+online model, TF-IDF model, then Gemini). A stage's answer is accepted when
+its calibrated confidence - the probability that its label is right, fitted
+on cross-validated predictions - clears the stage threshold; otherwise the
+command escalates to the next stage. Coarse stages (CommandClassifier rules,
+Gemini) answer in SYSTEM_ACTION / APP_LAUNCH / IN_APP_ACTION / WEB_ACTION and
+are mapped back onto the fine command types using the earlier stages'
+candidates. Per-stage latency, acceptance and escalation are recorded.
+
+Calibrate (writes config.INTENT_CASCADE_PROFILE_PATH):
+    python -m models.intent_router calibrate --target 0.9
+Route:
+    python -m models.intent_router route "open notepad" "turn the volume up"
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+import config
+
+logger = logging.getLogger("IntentRouter")
+
+# Fine command types (intent_data) -> coarse categories (CommandClassifier / CommandProcessor)
+COARSE_CATEGORY = {
+    'OPEN_APP': 'APP_LAUNCH',
+    'OPEN_FILE_EXPLORER': 'APP_LAUNCH',
+    'OPEN_FOLDER': 'APP_LAUNCH',
+    'WEB_SEARCH': 'WEB_ACTION',
+    'SYSTEM': 'SYSTEM_ACTION',
+    'EXIT': 'SYSTEM_ACTION',
+    'SEND_MESSAGE': 'IN_APP_ACTION',
+    'SENDMAIL': 'IN_APP_ACTION',
+    'APP_WITH_ACTION': 'IN_APP_ACTION',
+    'CLOSE_APP': 'IN_APP_ACTION',
+    'MEDIA_CONTROL': 'IN_APP_ACTION',
+    'SPOTIFY_CONTROL': 'IN_APP_ACTION',
+    'KEYBOARD': 'IN_APP_ACTION',
+    'TYPE_TEXT': 'IN_APP_ACTION',
+    'WINDOW_ACTION': 'IN_APP_ACTION',
+    'MOUSE_CLICK': 'IN_APP_ACTION',
+    'MOUSE_RIGHTCLICK': 'IN_APP_ACTION',
+    'MOUSE_DOUBLECLICK': 'IN_APP_ACTION',
+    'CAMERA': 'IN_APP_ACTION',
+    'CLOCK_ALARM': 'IN_APP_ACTION',
+    'CALCULATOR': 'IN_APP_ACTION',
+    'SEARCH_FILE': 'IN_APP_ACTION',
+    'FILE_FOLDER_OPERATION': 'IN_APP_ACTION',
+}
+
+# Gemini actions specific enough to pick the fine type, and per-category defaults
+ACTION_COMMAND_TYPE = {
+    'send_message': 'SEND_MESSAGE',
+    'send_email': 'SENDMAIL',
+    'type': 'TYPE_TEXT',
+    'type_text': 'TYPE_TEXT',
+    'close': 'CLOSE_APP',
+    'close_app': 'CLOSE_APP',
+    'play': 'MEDIA_CONTROL',
+    'pause': 'MEDIA_CONTROL',
+    'click': 'MOUSE_CLICK',
+    'minimize': 'WINDOW_ACTION',
+    'maximize': 'WINDOW_ACTION',
+}
+DEFAULT_COMMAND_TYPE = {
+    'APP_LAUNCH': 'OPEN_APP',
+    'WEB_ACTION': 'WEB_SEARCH',
+    'SYSTEM_ACTION': 'SYSTEM',
+    'IN_APP_ACTION': 'APP_WITH_ACTION',
+}
+
+
+def to_command_type(category, candidates=None, action=None):
+    """
+    Fine command type for a coarse category: a recognised action first, then
+    the best candidate inside the category, then the category default
+
+    Args:
+        candidates: {command_type: score} seen at earlier stages
+    """
+    if category in COARSE_CATEGORY:
+        return category  # already fine
+    if action and category == 'IN_APP_ACTION' and action.lower() in ACTION_COMMAND_TYPE:
+        return ACTION_COMMAND_TYPE[action.lower()]
+    best, best_score = None, -1.0
+    for command_type, score in (candidates or {}).items():
+        if COARSE_CATEGORY.get(command_type) == category and score > best_score:
+            best, best_score = command_type, score
+    if best is not None:
+        return best
+    return DEFAULT_COMMAND_TYPE.get(category)
+
+
+def data_fingerprint(training_data):
+    """Hash of the training data a calibration profile was fitted on"""
+    canonical = json.dumps([list(item) for item in training_data], separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+class Calibrator:
+    """Monotone map from a stage's raw confidence to P(label is correct)"""
+
+    def __init__(self, knots_x=(0.0, 1.0), knots_y=(0.0, 1.0)):
+        self.knots_x = [float(x) for x in knots_x]
+        self.knots_y = [float(y) for y in knots_y]
+
+    @classmethod
+    def fit(cls, confidences, correct):
+        from sklearn.isotonic import IsotonicRegression
+
+        if len(set(confidences)) < 2:
+            accuracy = float(np.mean(correct)) if len(correct) else 0.0
+            return cls((0.0, 1.0), (accuracy, accuracy))
+        iso = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip')
+        iso.fit(np.asarray(confidences, dtype=float), np.asarray(correct, dtype=float))
+        return cls(iso.X_thresholds_, iso.y_thresholds_)
+
+    def __call__(self, confidence):
+        return float(np.interp(confidence, self.knots_x, self.knots_y))
+
+    def to_dict(self):
+        return {'knots_x': self.knots_x, 'knots_y': self.knots_y}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['knots_x'], data['knots_y'])
+
+
+# ---------------------------------------------------------------------------
+# Stages: predict_batch(texts) -> [{'label', 'confidence', 'candidates', 'action'} or None]
+# ---------------------------------------------------------------------------
+
+class MatcherStage:
+    """PatternMatcher nearest pattern; confidence is the raw similarity"""
+
+    name = 'matcher'
+    coarse = False
+
+    def __init__(self, matcher):
+        self.matcher = matcher
+        self.label_names = sorted(set(matcher.labels))
+        index = {label: i for i, label in enumerate(self.label_names)}
+        self.label_ids = np.array([index[label] for label in matcher.labels], dtype=np.int64)
+
+    def predict_batch(self, texts):
+        predictions = []
+        for row in self.matcher.scores_batch(texts):
+            if not len(row) or row.max() <= 0:
+                predictions.append(None)
+                continue
+            per_label = np.zeros(len(self.label_names))
+            np.maximum.at(per_label, self.label_ids, row)
+            best = int(np.argmax(row))  # first maximum, same tie-break as PatternMatcher.match
+            predictions.append({
+                'label': self.matcher.labels[best],
+                'confidence': float(row[best]),
+                'candidates': {label: float(s) for label, s in zip(self.label_names, per_label) if s > 0},
+            })
+        return predictions
+
+
+def _probability_predictions(probabilities, classes):
+    """Top class and the five best candidates per row of predict_proba output"""
+    classes = [str(label) for label in classes]
+    return [
+        {
+            'label': classes[int(row.argmax())],
+            'confidence': float(row.max()),
+            'candidates': {classes[i]: float(row[i]) for i in np.argsort(row)[::-1][:5]},
+        }
+        for row in probabilities
+    ]
+
+
+class ModelStage:
+    """TF-IDF + LogisticRegression pipeline; confidence is the top class probability"""
+
+    name = 'model'
+    coarse = False
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline  # replaced in place when a retrained artifact is swapped in
+
+    def predict_batch(self, texts):
+        if not texts:
+            return []
+        probabilities = self.pipeline.predict_proba([text.lower() for text in texts])
+        return _probability_predictions(probabilities, self.pipeline.classes_)
+
+
+class OnlineStage:
+    """OnlineIntentModel (partial_fit on runtime feedback); confidence is the top class probability"""
+
+    name = 'online'
+    coarse = False
+
+    def __init__(self, model):
+        self.model = model  # shared with the learner, so updates are visible immediately
+
+    def predict_batch(self, texts):
+        if not texts:
+            return []
+        return _probability_predictions(self.model.predict_proba(texts), self.model.classes)
+
+
+class RulesStage:
+    """CommandClassifier keyword tiers (coarse; CONVERSATION always escalates)"""
+
+    name = 'rules'
+    coarse = True
+
+    def __init__(self, classifier):
+        self.classifier = classifier
+
+    def predict_batch(self, texts):
+        return [
+            {'label': r['category'], 'confidence': float(r['confidence'])}
+            for r in self.classifier.classify_batch(texts)
+        ]
+
+
+class GeminiStage:
+    """CommandProcessor on Gemini (coarse, response-cached, micro-batched)"""
+
+    name = 'gemini'
+    coarse = True
+    teaches = True  # authoritative; its answers can also teach the online model (teach=True)
+
+    def __init__(self, processor):
+        self.processor = processor
+
+    def predict_batch(self, texts):
+        predictions = []
+        for result in self.processor.process_batch(texts):
+            if not result or not result.get('category'):
+                predictions.append(None)
+                continue
+            try:
+                confidence = float(result.get('confidence', 0)) / 100.0
+            except (TypeError, ValueError):
+                confidence = 0.0
+            predictions.append({
+                'label': result['category'],
+                'confidence': confidence,
+                'action': result.get('action'),
+            })
+        return predictions
+
+
+class StageStats:
+    """Rolling per-stage latency and acceptance counters"""
+
+    def __init__(self, window=200):
+        self.seen = 0
+        self.accepted = 0
+        self.escalated = 0
+        self.errors = 0
+        self.total_s = 0.0
+        self._latencies = deque(maxlen=window)  # seconds per command
+
+    def record(self, count, elapsed):
+        self.seen += count
+        self.total_s += elapsed
+        if count:
+            self._latencies.append(elapsed / count)
+
+    def latency_percentile(self, pct):
+        latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * pct / 100.0))]
+
+    def to_dict(self):
+        p50, p95 = self.latency_percentile(50), self.latency_percentile(95)
+        return {
+            'seen': self.seen,
+            'accepted': self.accepted,
+            'escalated': self.escalated,
+            'errors': self.errors,
+            'accept_rate': self.accepted / self.seen if self.seen else 0.0,
+            'escalation_rate': self.escalated / self.seen if self.seen else 0.0,
+            'avg_ms': self.total_s / self.seen * 1000 if self.seen else None,
+            'p50_ms': p50 * 1000 if p50 is not None else None,
+            'p95_ms': p95 * 1000 if p95 is not None else None,
+        }
+
+
+class IntentRouter:
+    """Cheapest stage first; escalate while calibrated confidence is below threshold"""
+
+    def __init__(self, stages, thresholds=None, calibrators=None, default_threshold=0.9, learner=None,
+                 teach=False):
+        """
+        Args:
+            stages: Stage objects, cheapest first (a final teaching stage, i.e. Gemini, always
+                    answers if it can; otherwise the most confident answer wins)
+            thresholds: {stage name: calibrated confidence needed to stop there}
+            calibrators: {stage name: Calibrator} (identity when missing)
+            learner: OnlineIntentLearner updated by correct()
+            teach: Also feed the unconfirmed answers of teaching stages to the learner
+        """
+        self.stages = list(stages)
+        self.learner = learner
+        self.teach = teach
+        self.thresholds = {s.name: (thresholds or {}).get(s.name, default_threshold) for s in self.stages}
+        self.calibrators = {s.name: (calibrators or {}).get(s.name) or Calibrator() for s in self.stages}
+        self.stats_by_stage = {s.name: StageStats() for s in self.stages}
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        return next((s for s in self.stages if s.name == name), None)
+
+    def route(self, text):
+        return self.route_batch([text])[0]
+
+    def route_batch(self, texts):
+        """
+        Returns:
+            list: one {input, command_type, confidence, training_pattern, stage,
+                  path, accepted} per text (command_type None when no stage answered)
+        """
+        results = [None] * len(texts)
+        candidates = [{} for _ in texts]
+        fallback = [None] * len(texts)  # best unaccepted answer so far
+        paths = [[] for _ in texts]
+        pending = list(range(len(texts)))
+
+        for position, stage in enumerate(self.stages):
+            if not pending:
+                break
+            final = position == len(self.stages) - 1
+            authoritative = final and getattr(stage, 'teaches', False)
+            stats = self.stats_by_stage[stage.name]
+            start = time.perf_counter()
+            try:
+                predictions = stage.predict_batch([texts[i] for i in pending])
+            except Exception as e:
+                logger.warning(f"Intent stage '{stage.name}' failed: {e}")
+                predictions = [None] * len(pending)
+                with self._lock:
+                    stats.errors += len(pending)
+            elapsed = time.perf_counter() - start
+
+            escalate = []
+            for i, prediction in zip(pending, predictions):
+                paths[i].append(stage.name)
+                answer = self._resolve(stage, prediction, candidates[i])
+                if answer is not None:
+                    command_type, calibrated = answer
+                    if authoritative or calibrated >= self.thresholds[stage.name]:
+                        results[i] = self._result(texts[i], command_type, calibrated, stage.name, paths[i], True)
+                        continue
+                    if fallback[i] is None or calibrated > fallback[i][1]:
+                        fallback[i] = (command_type, calibrated, stage.name)
+                escalate.append(i)
+
+            with self._lock:
+                stats.record(len(pending), elapsed)
+                stats.accepted += len(pending) - len(escalate)
+                stats.escalated += len(escalate) if not final else 0
+            pending = escalate
+
+        for i in pending:
+            if fallback[i] is not None:
+                command_type, calibrated, stage_name = fallback[i]
+                results[i] = self._result(texts[i], command_type, calibrated, stage_name, paths[i], False)
+            else:
+                results[i] = self._result(texts[i], None, 0.0, None, paths[i], False)
+
+        if self.learner is not None and self.teach:
+            taught = [
+                (result['input'], result['command_type']) for result in results
+                if result['accepted'] and getattr(self.stage(result['stage']), 'teaches', False)
+            ]
+            if taught:
+                self.learner.learn_many(taught, source="gemini")
+        return results
+
+    def correct(self, text, command_type, source="correction"):
+        """
+        Record a confirmed or corrected label for a command (online model only)
+
+        Args:
+            source: "confirmed" (the command executed successfully) or "correction"
+        """
+        if self.learner is None:
+            return False
+        return self.learner.learn(text, command_type, source=source)
+
+    def _resolve(self, stage, prediction, candidates):
+        """(command_type, calibrated confidence) or None; merges fine candidates for later stages"""
+        if not prediction or not prediction.get('label'):
+            return None
+        if stage.coarse:
+            command_type = to_command_type(prediction['label'], candidates, prediction.get('action'))
+        else:
+            command_type = prediction['label']
+            for label, score in (prediction.get('candidates') or {}).items():
+                candidates[label] = max(candidates.get(label, 0.0), self.calibrators[stage.name](score))
+        if command_type is None:
+            return None
+        return command_type, self.calibrators[stage.name](prediction['confidence'])
+
+    @staticmethod
+    def _result(text, command_type, confidence, stage_name, path, accepted):
+        return {
+            "input": text,
+            "command_type": command_type,
+            "confidence": confidence,
+            "training_pattern": f"Cascade: {stage_name}" if stage_name else "Cascade: no answer",
+            "stage": stage_name,
+            "path": list(path),
+            "accepted": accepted,
+        }
+
+    def stats(self):
+        """Per stage: seen / accepted / escalated counts and latency (ms)"""
+        with self._lock:
+            stages = {name: stats.to_dict() for name, stats in self.stats_by_stage.items()}
+        first = self.stats_by_stage[self.stages[0].name].seen if self.stages else 0
+        local = [s.name for s in self.stages if s.name != 'gemini']
+        local_accepted = sum(stages[name]['accepted'] for name in local)
+        return {
+            'stages': stages,
+            'thresholds': dict(self.thresholds),
+            'commands': first,
+            'answered_locally': local_accepted / first if first else 0.0,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Construction, calibration profile
+# ---------------------------------------------------------------------------
+
+def load_profile(path=None):
+    path = path or config.INTENT_CASCADE_PROFILE_PATH
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read intent cascade profile {path}: {e}")
+        return None
+
+
+def build_router(training_data, pipeline=None, api_key=None, stages=None, classifier=None, profile_path=None,
+                 learner=None):
+    """
+    IntentRouter over config.INTENT_CASCADE_STAGES, with thresholds and
+    calibrators from the calibration profile when it matches the training data
+
+    Args:
+        pipeline: Fitted intent pipeline for the 'model' stage (trained when None)
+        api_key: Gemini key for the 'gemini' stage (stage skipped without one)
+        classifier: CommandClassifier for the 'rules' stage
+        learner: OnlineIntentLearner for the 'online' stage (loaded or seeded when None)
+    """
+    from models.intent_model_store import params_for, train_pipeline
+    from models.pattern_matcher import PatternMatcher
+
+    built = []
+    for name in stages or config.INTENT_CASCADE_STAGES:
+        if name == 'matcher':
+            built.append(MatcherStage(PatternMatcher(training_data)))
+        elif name == 'model':
+            if pipeline is None:
+                pipeline = train_pipeline(training_data, params_for(config.INTENT_FEATURES))
+            built.append(ModelStage(pipeline))
+        elif name == 'online':
+            if not config.ONLINE_INTENT_ENABLED:
+                continue
+            if learner is None:
+                from models.online_intent import OnlineIntentLearner
+                learner = OnlineIntentLearner.load_or_seed(training_data)
+            built.append(OnlineStage(learner.model))
+        elif name == 'rules':
+            if classifier is None:
+                from models.command_classifier import CommandClassifier
+                classifier = CommandClassifier()
+            built.append(RulesStage(classifier))
+        elif name == 'gemini':
+            if not api_key:
+                logger.warning("No Gemini API key; intent cascade runs local stages only")
+                continue
+            from models.command_processor import CommandProcessor
+            built.append(GeminiStage(CommandProcessor(api_key)))
+        else:
+            raise ValueError(f"Unknown intent stage: {name}")
+
+    thresholds, calibrators = {}, {}
+    profile = load_profile(profile_path)
+    if profile is not None:
+        if profile.get('fingerprint') != data_fingerprint(training_data):
+            logger.warning("Intent cascade profile was calibrated on other training data; "
+                           "re-run `python -m models.intent_router calibrate`")
+        for name, entry in profile.get('stages', {}).items():
+            thresholds[name] = entry['threshold']
+            calibrators[name] = Calibrator.from_dict(entry)
+
+    router = IntentRouter(built, thresholds, calibrators, config.INTENT_CASCADE_DEFAULT_THRESHOLD,
+                          learner=learner if any(s.name == 'online' for s in built) else None,
+                          teach=config.ONLINE_INTENT_LEARN_FROM_GEMINI)
+    logger.info(f"✓ Intent cascade: {' → '.join(s.name for s in built)} "
+                f"({'calibrated' if profile else 'uncalibrated'})")
+    return router
+
+
+def select_threshold(calibrated, correct, target):
+    """
+    Lowest threshold whose accepted set reaches the target precision
+
+    Returns:
+        tuple: (threshold, precision, coverage); threshold > 1 when no cut does
+    """
+    order = np.argsort(calibrated)[::-1]
+    values = np.asarray(calibrated, dtype=float)[order]
+    hits = np.cumsum(np.asarray(correct, dtype=float)[order])
+    best = (1.01, 0.0, 0.0)
+    for k in range(len(values)):
+        # only cut between distinct values, so everything >= threshold is accepted
+        if k + 1 < len(values) and values[k + 1] == values[k]:
+            continue
+        precision = hits[k] / (k + 1)
+        if precision >= target:
+            best = (float(values[k]), float(precision), (k + 1) / len(values))
+    return best
+
+
+def collect_calibration(training_data, stages, folds=5, seed=0):
+    """
+    Out-of-fold (raw confidence, correct) per local stage: every stage sees
+    every held-out command, with candidates from the stages before it
+
+    Stages are processed in order and each stage's calibrator is fitted
+    before its candidates are merged, so later stages see calibrated
+    candidate scores exactly as in IntentRouter._resolve.
+
+    Returns:
+        dict: {stage name: ([confidence], [correct])}
+    """
+    from models.intent_model_store import params_for, train_pipeline
+    from models.pattern_matcher import PatternMatcher
+
+    indices = list(range(len(training_data)))
+    random.Random(seed).shuffle(indices)
+    observations = {}
+    classifier = None
+
+    splits = []
+    for fold in range(folds):
+        held_out = set(indices[fold::folds])
+        train = [item for i, item in enumerate(training_data) if i not in held_out]
+        test = [training_data[i] for i in sorted(held_out)]
+        splits.append((train, test, [{} for _ in test]))
+
+    for name in stages:
+        confidences, correct, merges = [], [], []
+        for train, test, candidates in splits:
+            if name == 'matcher':
+                stage = MatcherStage(PatternMatcher(train))
+            elif name == 'model':
+                stage = ModelStage(train_pipeline(train, params_for(config.INTENT_FEATURES)))
+            elif name == 'online':
+                from models.online_intent import OnlineIntentModel
+                stage = OnlineStage(OnlineIntentModel({label for _, label in training_data}).seed(train))
+            elif name == 'rules':
+                if classifier is None:
+                    from models.command_classifier import CommandClassifier
+                    classifier = CommandClassifier()
+                stage = RulesStage(classifier)
+            else:
+                break
+
+            texts = [text for text, _ in test]
+            for (_, label), prediction, seen in zip(test, stage.predict_batch(texts), candidates):
+                if not prediction:
+                    confidences.append(0.0)
+                    correct.append(False)
+                    continue
+                if stage.coarse:
+                    command_type = to_command_type(prediction['label'], seen, prediction.get('action'))
+                else:
+                    command_type = prediction['label']
+                    merges.append((seen, prediction.get('candidates') or {}))
+                confidences.append(prediction['confidence'])
+                correct.append(command_type == label)
+        else:
+            observations[name] = (confidences, correct)
+            calibrator = Calibrator.fit(confidences, correct)
+            for seen, stage_candidates in merges:
+                for candidate, score in stage_candidates.items():
+                    seen[candidate] = max(seen.get(candidate, 0.0), calibrator(score))
+    return observations
+
+
+def calibrate(training_data, stages, target=0.9, folds=5, seed=0):
+    """Calibration profile (dict) for the local stages"""
+    profile = {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'fingerprint': data_fingerprint(training_data),
+        'target_precision': target,
+        'folds': folds,
+        'samples': len(training_data),
+        'stages': {},
+    }
+    for name, (confidences, correct) in collect_calibration(training_data, stages, folds, seed).items():
+        calibrator = Calibrator.fit(confidences, correct)
+        calibrated = [calibrator(c) for c in confidences]
+        threshold, precision, coverage = select_threshold(calibrated, correct, target)
+        profile['stages'][name] = {
+            **calibrator.to_dict(),
+            'threshold': threshold,
+            'expected_precision': precision,
+            'expected_coverage': coverage,
+            'raw_accuracy': float(np.mean(correct)) if correct else 0.0,
+        }
+    return profile
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate or try the intent classifier cascade")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    cal = sub.add_parser("calibrate", help="Fit calibrators and thresholds on cross-validated predictions")
+    cal.add_argument("--target", type=float, default=0.9, help="Precision required to stop at a stage")
+    cal.add_argument("--folds", type=int, default=5)
+    cal.add_argument("--stages", nargs='+', default=None, help="Local stages (default: config order)")
+    cal.add_argument("--profile", help="Output path (default: config.INTENT_CASCADE_PROFILE_PATH)")
+
+    route = sub.add_parser("route", help="Route commands through the cascade and print the stage stats")
+    route.add_argument("texts", nargs='+')
+    route.add_argument("--local", action="store_true", help="Skip the Gemini stage")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    from models.intent_data import MODEL1_TRAINING_DATA
+
+    if args.command == "calibrate":
+        stages = [s for s in (args.stages or config.INTENT_CASCADE_STAGES) if s != 'gemini']
+        profile = calibrate(MODEL1_TRAINING_DATA, stages, args.target, args.folds)
+        path = args.profile or config.INTENT_CASCADE_PROFILE_PATH
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(profile, f, indent=4)
+        for name, entry in profile['stages'].items():
+            print(f"{name:>8}: threshold {entry['threshold']:.3f} -> precision {entry['expected_precision']:.1%}, "
+                  f"coverage {entry['expected_coverage']:.1%} (raw accuracy {entry['raw_accuracy']:.1%})")
+        print(f"Profile written to {path}")
+        return
+
+    api_key = None if args.local else config.GEMINI_API_KEY
+    router = build_router(MODEL1_TRAINING_DATA, api_key=api_key)
+    for result in router.route_batch(args.texts):
+        print(f"{result['input']!r:40} -> {result['command_type']} "
+              f"({result['confidence']:.0%} at {result['stage']}, path {' → '.join(result['path'])})")
+    print(json.dumps(router.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
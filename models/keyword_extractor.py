@@ -0,0 +1,636 @@
+"""
+Keyword Extractor - grammar-compiled keyword extraction for classified commands
+One implementation of extract_keywords_by_command_type for every front-end.
+Each command type's grammar (trigger words, filler words, lookup maps and
+patterns) is declared once below and compiled at import into frozensets,
+dicts and precompiled regexes, so a call does no pattern building or
+list scans.
+
+Two dialects reproduce the front-ends' historical output:
+    'main'     EvaGui (main.py): site keywords, volume/brightness levels,
+               calculator, camera, alarm and regex-based message parsing
+    'eva_ter'  EVA_TER.py / gui.py: site domains ('youtube.com'), OPEN_APP
+               fallback to chrome/current, screenshot/lock system actions
+
+Benchmark:
+    python -m models.keyword_extractor
+"""
+
+import argparse
+import re
+import time
+
+DIALECTS = ('main', 'eva_ter')
+
+# ---------------------------------------------------------------------------
+# Shared grammar
+# ---------------------------------------------------------------------------
+
+APP_FILLER_WORDS = frozenset(['app', 'application', 'program'])
+
+OPEN_APP_TRIGGERS = {
+    'main': ('open', 'launch', 'start', 'run', 'play'),
+    'eva_ter': ('open', 'launch', 'start', 'run'),
+}
+CLOSE_APP_TRIGGERS = ('close', 'exit', 'quit')
+APP_WITH_ACTION_TRIGGERS = ('open', 'launch', 'start')
+APP_WITH_ACTION_VERBS = frozenset(['search', 'type', 'play'])
+
+CLICK_SKIP_WORDS = frozenset(['click', 'on', 'here', 'it', 'this', 'right', 'double'])
+MAXIMIZE_WORDS = frozenset(['maximize', 'fullscreen'])
+KEYBOARD_SHORTCUTS = (('copy', 'ctrl+c'), ('paste', 'ctrl+v'), ('save', 'ctrl+s'), ('undo', 'ctrl+z'))
+
+MEDIA_APPS = ('spotify', 'netflix', 'youtube', 'vlc')
+MESSAGE_APPS = (
+    ('whatsapp', 'whatsapp'), ('email', 'outlook'), ('social', 'facebook'),
+    ('twitter', 'twitter'), ('instagram', 'instagram'), ('telegram', 'telegram'),
+)
+
+COMMON_FOLDERS = (
+    ('documents', r'%USERPROFILE%\Documents'), ('downloads', r'%USERPROFILE%\Downloads'),
+    ('desktop', r'%USERPROFILE%\Desktop'), ('pictures', r'%USERPROFILE%\Pictures'),
+    ('videos', r'%USERPROFILE%\Videos'), ('music', r'%USERPROFILE%\Music'),
+)
+FILE_INDICATORS = frozenset(['file', 'document', 'doc', 'pdf', 'image', 'video', 'folder', 'directory'])
+FILE_SKIP_WORDS = {
+    'main': frozenset(['open', 'file', 'folder', 'document', 'my', 'the', 'launch', 'show', 'browse', 'to', 'for', 'find']),
+    'eva_ter': frozenset(['open', 'file', 'folder', 'document', 'my', 'the', 'launch', 'show', 'browse', 'to']),
+}
+
+_PROFILE_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'with chrome profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
+    r'chrome profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
+    r'with profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
+    r'use profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
+    r'profile ([\w\s]+?)(?:\s+(?:search|open|go|and))',
+))
+
+NUMBER_WORDS = {
+    'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+    'eleven': 11, 'twelve': 12, 'thirteen': 13, 'fourteen': 14, 'fifteen': 15,
+    'sixteen': 16, 'seventeen': 17, 'eighteen': 18, 'nineteen': 19, 'twenty': 20,
+    'thirty': 30, 'forty': 40, 'fifty': 50, 'sixty': 60, 'seventy': 70,
+    'eighty': 80, 'ninety': 90, 'hundred': 100
+}
+
+# ---------------------------------------------------------------------------
+# 'main' dialect: web sites (keyword is returned, longest keyword wins)
+# ---------------------------------------------------------------------------
+
+WEBSITE_KEYWORDS = (
+    'youtube', 'google', 'gmail', 'facebook', 'twitter', 'instagram', 'linkedin', 'github',
+    'reddit', 'amazon', 'netflix', 'spotify', 'stackoverflow', 'wikipedia', 'bing', 'x',
+    'pinterest', 'medium', 'quora', 'ebay', 'imdb', 'duckduckgo', 'chatgpt', 'whatsapp', 'bank',
+    'hotstar', 'flipkart', 'cricbuzz', 'paytm', 'timesofindia', 'justdial', 'jiosaavn',
+    'hindustantimes', 'indianexpress', 'espncricinfo', 'bookmyshow', 'zeenews', 'snapchat',
+    'telegram', 'magicbricks', 'naukri', 'shaadi', 'policybazaar', 'myntra', 'zomato', 'swiggy',
+    'aajtak', 'ndtv', 'moneycontrol', 'gaana', 'yatra', '99acres', 'cleartrip', 'makemytrip',
+    'olx', 'carwale', 'bikedekho', 'housing', 'bigbasket', 'grofers', 'reliancedigital',
+    'vijaysales', 'croma', 'indiamart', 'tradeindia', 'sulekha', 'mouthshut', 'whatmobile',
+    'hindisahityadarpan', 'abhiyojana', 'pib', 'incometaxindia', 'upi', 'bhimgov', 'umang',
+    'digilocker', 'mygov', 'india', 'epfindia', 'esi', 'passportindia', 'irctc', 'indianrail',
+    'airindia', 'raaga', 'hungama', 'wynk', 'jio', 'airtel', 'vi', 'bsnl', 'icicibank', 'hdfcbank',
+    'sbibank', 'axisbank', 'kotak', 'yesbank', 'federalbank', 'ucobank', 'canarabank', 'iifl',
+    'bajajfinserv', 'tatacapital', 'lendenclub', 'groww', 'zerodha', 'upstox', 'angelone',
+    '5paisa', 'dhan', 'icicidirect', 'sharekhan', 'motilaloswal', 'choiceindia', 'rkglobal',
+    'indmoney', 'smallcase', 'fisdom', 'bajajbroking', 'hdfcsec', 'kfintech', 'nseindia',
+    'bseindia', 'mcxindia', 'moneybhai', 'tickertape', 'stockedge', 'screener', 'trendlyne',
+    'tradingview', 'investing', 'yahoofinance', 'economictimes', 'livemint', 'financialexpress',
+    'businesstoday', 'business-standard', 'firstpost', 'scroll', 'theprint', 'opindia',
+    'republicworld', 'news18', 'tv9telugu', 'sakshi', 'andhrajyothy', 'manatelangana',
+    'greatandhra', 'idlebrain', '123telugu', 'filmibeat', 'bollywoodhungama', 'pinkvilla',
+    'koimoi', 'indiaforums', 'tellychakkar', 'iwmbuzz', 'gossipaddict', 'missmalini', 'jagran',
+    'dainikbhaskar', 'amarujala', 'navbharattimes', 'abhiyaan', 'livehindustan', 'jansatta',
+    'rajasthanpatrika', 'bhaskar', 'divyabhaskar', 'inshorts', 'dailyhunt', 'newsdog', 'ucnews',
+    'operanews', 'sharechat', 'mogo', 'josh', 'public', 'kooapp', 'mailyolo', 'toffee', 'voot',
+    'sonyliv', 'zee5', 'mxplayer', 'erosnow', 'altbalaji', 'hoichoi', 'aha', 'perplexity',
+    'gemini', 'grok', 'claude',
+)
+_WEBSITE_RANK = {kw: rank for rank, kw in enumerate(sorted(WEBSITE_KEYWORDS, key=len, reverse=True))}
+_WEBSITE_ORDER = {kw: index for index, kw in enumerate(WEBSITE_KEYWORDS)}
+_WEBSITE_ALTERNATION = '|'.join(WEBSITE_KEYWORDS)
+# Zero-width so overlapping whole-word hits are all seen; ties go to the longest keyword
+_WEBSITE_WORD_RE = re.compile(
+    r'(?=\b(' + '|'.join(re.escape(kw) for kw in sorted(WEBSITE_KEYWORDS, key=len, reverse=True)) + r')\b)'
+)
+_OPEN_SITE_RE = re.compile(r'\b(?:open|go\s+to|visit|browse)\s+(.+?)$')
+_SEARCH_ON_SITE_RE = re.compile(rf'search\s+(.+?)\s+(?:on|for|at)\s+(?:{_WEBSITE_ALTERNATION})')
+_SITE_SEARCH_RE = re.compile(rf'(?:{_WEBSITE_ALTERNATION})\s+(?:search|google)\s+(?:for\s+)?(.+?)$')
+_GENERIC_SEARCH_RE = re.compile(r'search\s+(?:for\s+)?(.+?)(?:\s+on|\s+at|\s+in)?\s*$')
+_QUERY_PROFILE_RES = tuple(re.compile(p) for p in (
+    r'with\s+chrome\s+profile\s+\w+',
+    r'chrome\s+profile\s+\w+',
+    r'with\s+profile\s+\w+',
+    r'use\s+profile\s+\w+',
+    r'profile\s+\w+',
+))
+_QUERY_SKIP_WORDS = frozenset([
+    'search', 'open', 'go', 'to', 'on', 'in', 'at', 'for', 'and', 'the', 'a', 'an',
+    'with', 'use', 'profile', 'chrome', 'edge', 'browser', 'query'
+]) | frozenset(WEBSITE_KEYWORDS)
+_LEADING_FOR_RE = re.compile(r'^\s*for\s+')
+_TRAILING_FOR_RE = re.compile(r'\s+for\s*$')
+
+# ---------------------------------------------------------------------------
+# 'eva_ter' dialect: web sites (domain is returned, first listed keyword wins)
+# ---------------------------------------------------------------------------
+
+WEBSITE_DOMAINS = (
+    ('youtube', 'youtube.com'), ('google', 'google.com'), ('gmail', 'mail.google.com'),
+    ('facebook', 'facebook.com'), ('twitter', 'twitter.com'), ('instagram', 'instagram.com'),
+    ('linkedin', 'linkedin.com'), ('github', 'github.com'), ('reddit', 'reddit.com'),
+    ('amazon', 'amazon.com'), ('netflix', 'netflix.com'), ('spotify', 'open.spotify.com'),
+)
+_DOMAIN_QUERY_PROFILE_RES = tuple(re.compile(p) for p in (
+    r'with chrome profile [\w\s]+', r'chrome profile [\w\s]+', r'profile [\w\s]+',
+))
+_DOMAIN_QUERY_SKIP_WORDS = frozenset([
+    'with', 'chrome', 'search', 'for', 'open', 'go', 'to', 'on', 'in', 'and',
+    'youtube', 'google', 'gmail', 'facebook', 'profile'
+])
+
+# ---------------------------------------------------------------------------
+# 'main' dialect: system controls, messages, calculator, alarms
+# ---------------------------------------------------------------------------
+
+SYSTEM_CONTROLS = (
+    # (control, any of these words, all of these words)
+    ('WIFI', ('wifi', 'wi-fi'), ()),
+    ('BLUETOOTH', ('bluetooth',), ()),
+    ('FLIGHTMODE', ('flight', 'airplane'), ()),
+    ('NIGHTLIGHT', (), ('night', 'light')),
+    ('ENERGYSAVER', ('energy', 'saver', 'battery'), ()),
+    ('MOBILEHOTSPOT', ('hotspot', 'mobile'), ()),
+)
+LEVEL_CONTROLS = ('volume', 'brightness')
+
+MEDIA_PLAY_WORDS = ('play', 'stream')
+_MEDIA_QUERY_SKIP = frozenset(MEDIA_APPS) | frozenset(['on', 'in', 'from'])
+_MEDIA_QUERY_SKIP_EVA_TER = frozenset(['play', 'stream', 'music', 'video'])
+
+_MESSAGE_RES = (
+    # "send [message] to [recipient]"
+    (re.compile(r'send\s+(.+?)\s+to\s+(\w+)', re.IGNORECASE), 'message_first'),
+    # "send message to [recipient] saying [message]"
+    (re.compile(r'send.*?to\s+([\w\s]+?)\s+(?:saying|that|message)\s+(.+)', re.IGNORECASE), 'recipient_first'),
+    # "whatsapp/message/text [message] to [recipient]"
+    (re.compile(r'(?:whatsapp|message|text)\s+(.+?)\s+to\s+(\w+)', re.IGNORECASE), 'message_first'),
+)
+_RECIPIENT_RE = re.compile(r'\bto\s+(\w+)', re.IGNORECASE)
+
+TYPE_TEXT_KEYWORDS = {
+    'main': ('type', 'write', 'enter', 'text', 'message'),
+    'eva_ter': ('type', 'write', 'enter'),
+}
+TYPE_TEXT_SKIP_WORDS = frozenset(['text', 'message'])  # 'eva_ter' only
+
+CALCULATOR_OPERATIONS = (
+    ('plus', ('plus', 'add')),
+    ('minus', ('minus', 'subtract', '-')),
+    ('multiply', ('multiply', 'times', '*', 'by')),
+    ('divide', ('divide', '/')),
+    ('square root', ('square root', 'sqrt')),
+    ('clear', ('clear',)),
+    ('scientific', ('scientific',)),
+    ('standard', ('standard',)),
+)
+_NUMBER_RE = re.compile(r'\d+')
+_TIME_RE = re.compile(r'(\d{1,2}):(\d{2})')
+_HOUR_RE = re.compile(r'\d{1,2}')
+
+
+def text_to_number(text):
+    """Convert text numbers to digits"""
+    if isinstance(text, int):
+        return text
+    text = str(text).lower().strip()
+    if text in NUMBER_WORDS:
+        return NUMBER_WORDS[text]
+    try:
+        return int(text)
+    except (ValueError, TypeError):
+        return None
+
+
+def empty_keywords():
+    return {
+        'app_name': None,
+        'search_query': None,
+        'text_content': None,
+        'action_target': None,
+        'keyboard_shortcut': None,
+        'system_action': None,
+        'window_action': None,
+        'profile_name': None,
+        'website': None,
+        'media_query': None,
+        'recipient': None,
+        'message_content': None,
+        'action_content': None,
+        'is_file_operation': False,
+        'file_path': None,
+        'target_type': None,
+        'is_known_folder': False,
+        'needs_search': False,
+        'search_target': None,
+        'has_message_content': False,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Grammar helpers
+# ---------------------------------------------------------------------------
+
+def _words_after(words, triggers, skip_words):
+    """Words after the first trigger present (triggers tried in order), minus skip words"""
+    for trigger in triggers:
+        if trigger in words:
+            rest = [w for w in words[words.index(trigger) + 1:] if w not in skip_words]
+            if rest:
+                return ' '.join(rest)
+    return None
+
+
+def extract_app_name(words, triggers):
+    return _words_after(words, triggers, APP_FILLER_WORDS)
+
+
+def extract_profile_name(text, default='Default'):
+    for pattern in _PROFILE_RES:
+        match = pattern.search(text)
+        if match:
+            return match.group(1).strip()
+    return default
+
+
+def extract_file_or_folder_path(words, dialect='main'):
+    """(is_file_operation, target_name, target_type, is_known_folder)"""
+    if dialect == 'eva_ter' and FILE_INDICATORS.isdisjoint(words):
+        return False, None, None, False
+    for folder_keyword, folder_path in COMMON_FOLDERS:
+        if folder_keyword in words:
+            return True, folder_path, 'folder', True
+    target_words = [w for w in words if w not in FILE_SKIP_WORDS[dialect]]
+    if target_words:
+        target_type = 'folder' if 'folder' in words or 'directory' in words else 'file'
+        return True, ' '.join(target_words), target_type, False
+    return False, None, None, False
+
+
+def _best_website(text):
+    """Whole-word website keyword, longest first (None if absent)"""
+    hits = _WEBSITE_WORD_RE.findall(text)
+    return min(hits, key=_WEBSITE_RANK.__getitem__) if hits else None
+
+
+def _strip_trailing_websites(query):
+    """Drop website keywords from the end, checking them in WEBSITE_KEYWORDS order"""
+    checked = -1
+    while True:
+        parts = query.split()
+        if len(parts) < 2:
+            return query
+        last = parts[-1]
+        order = _WEBSITE_ORDER.get(last)
+        if order is None or order <= checked:
+            return query
+        query = query[:len(query) - len(last)].rstrip()
+        checked = order
+
+
+def extract_website_and_action(text):
+    """
+    'main' dialect: (website keyword, search query, is_search_action)
+
+    - "search google for python" -> ('google', 'python', True)
+    - "open github"              -> ('github', None, False)
+    """
+    text_l = text.lower()
+
+    # Just opening a site ("open github", "go to netflix")
+    match = _OPEN_SITE_RE.search(text_l)
+    if match:
+        website = _best_website(match.group(1).strip())
+        if website:
+            return website, None, False
+
+    website = _best_website(text_l)
+
+    match = _SEARCH_ON_SITE_RE.search(text_l) or _SITE_SEARCH_RE.search(text_l)
+    if match:
+        query = match.group(1).strip()
+    else:
+        match = _GENERIC_SEARCH_RE.search(text_l)
+        if match:
+            query = _strip_trailing_websites(match.group(1).strip())
+        else:
+            query_text = text_l
+            for pattern in _QUERY_PROFILE_RES:
+                query_text = pattern.sub('', query_text)
+            query_words = [w for w in query_text.split() if w not in _QUERY_SKIP_WORDS and w.strip()]
+            query = ' '.join(query_words) if query_words else None
+
+    if query:
+        query = _LEADING_FOR_RE.sub('', query)
+        query = _TRAILING_FOR_RE.sub('', query)
+
+    return website or 'google', query, True
+
+
+def extract_website_domain(text):
+    """'eva_ter' dialect: (domain, search query)"""
+    text_l = text.lower()
+    website = next((url for keyword, url in WEBSITE_DOMAINS if keyword in text_l), 'google.com')
+    query_text = text_l
+    for pattern in _DOMAIN_QUERY_PROFILE_RES:
+        query_text = pattern.sub('', query_text)
+    query_words = [w for w in query_text.split() if w not in _DOMAIN_QUERY_SKIP_WORDS and w.strip()]
+    return website, ' '.join(query_words) if query_words else None
+
+
+# ---------------------------------------------------------------------------
+# Per-command-type rules: rule(extracted, raw_command, lower, words, context)
+# ---------------------------------------------------------------------------
+
+def _open_app(extracted, raw, lower, words, ctx):
+    app_name = extract_app_name(words, OPEN_APP_TRIGGERS[ctx['dialect']])
+    if ctx['dialect'] == 'eva_ter':
+        app_name = app_name or ('chrome' if 'chrome' in words else 'current')
+    extracted['app_name'] = app_name
+
+
+def _close_app(extracted, raw, lower, words, ctx):
+    extracted['app_name'] = extract_app_name(words, CLOSE_APP_TRIGGERS) or 'current'
+
+
+def _open_folder(extracted, raw, lower, words, ctx):
+    _, target_name, _, is_known = extract_file_or_folder_path(words, 'main')
+    if is_known:
+        extracted['file_path'] = target_name
+    else:
+        extracted['search_target'] = target_name
+
+
+def _search_file(extracted, raw, lower, words, ctx):
+    extracted['search_target'] = extract_file_or_folder_path(words, 'main')[1]
+
+
+def _file_folder_operation(extracted, raw, lower, words, ctx):
+    _, target_name, target_type, is_known = extract_file_or_folder_path(words, 'eva_ter')
+    extracted['is_file_operation'] = True
+    extracted['is_known_folder'] = is_known
+    extracted['needs_search'] = not is_known
+    extracted['target_type'] = target_type
+    if is_known:
+        extracted['file_path'] = target_name
+    else:
+        extracted['search_target'] = target_name
+
+
+def _web_search(extracted, raw, lower, words, ctx):
+    extracted['profile_name'] = extract_profile_name(lower, ctx['default_profile'])
+    if ctx['dialect'] == 'main':
+        website, query, is_search = extract_website_and_action(lower)
+        extracted['is_search_query'] = is_search
+    else:
+        website, query = extract_website_domain(lower)
+    extracted['website'] = website
+    extracted['search_query'] = query
+
+
+def _type_text(extracted, raw, lower, words, ctx):
+    dialect = ctx['dialect']
+    if dialect == 'eva_ter':
+        extracted['text_content'] = _words_after(words, TYPE_TEXT_KEYWORDS[dialect], TYPE_TEXT_SKIP_WORDS)
+        return
+    # 'main' keeps the original casing of the typed text
+    original = raw.split()
+    for keyword in TYPE_TEXT_KEYWORDS[dialect]:
+        if keyword in words:
+            text_words = original[words.index(keyword) + 1:]
+            if text_words:
+                extracted['text_content'] = ' '.join(text_words)
+                return
+
+
+def _mouse_click(extracted, raw, lower, words, ctx):
+    if ctx['dialect'] == 'main':
+        target = ' '.join(w for w in raw.split() if w.lower() not in CLICK_SKIP_WORDS)
+    else:
+        target = ' '.join(w for w in words if w not in CLICK_SKIP_WORDS)
+    extracted['action_target'] = target or 'current'
+
+
+def _window_action(extracted, raw, lower, words, ctx):
+    extracted['window_action'] = 'maximize' if not MAXIMIZE_WORDS.isdisjoint(words) else 'minimize'
+
+
+def _keyboard(extracted, raw, lower, words, ctx):
+    # 'main' matches substrings ("copying"), 'eva_ter' whole words
+    haystack = lower if ctx['dialect'] == 'main' else words
+    extracted['keyboard_shortcut'] = next((shortcut for word, shortcut in KEYBOARD_SHORTCUTS if word in haystack), None)
+
+
+def _system(extracted, raw, lower, words, ctx):
+    if ctx['dialect'] == 'eva_ter':
+        extracted['system_action'] = 'screenshot' if 'screenshot' in words or 'capture' in words else 'lock'
+        return
+
+    extracted['control_type'] = None
+    extracted['percentage'] = None
+    extracted['system_action'] = raw.lower()
+
+    word_set = set(words)
+    for control in LEVEL_CONTROLS:
+        if control in word_set:
+            extracted['control_type'] = extracted['system_action'] = control.upper()
+            for word in words:
+                level = text_to_number(word)
+                if level is not None and 0 <= level <= 100:
+                    extracted['percentage'] = level
+                    break
+            return
+
+    for control, any_words, all_words in SYSTEM_CONTROLS:
+        if (any_words and not word_set.isdisjoint(any_words)) or (all_words and word_set.issuperset(all_words)):
+            extracted['control_type'] = extracted['system_action'] = control
+            return
+
+
+def _app_with_action(extracted, raw, lower, words, ctx):
+    source = raw.split() if ctx['dialect'] == 'main' else words
+    lowered = words if ctx['dialect'] == 'eva_ter' else [w.lower() for w in source]
+    if 'and' not in lowered:
+        return
+    and_idx = lowered.index('and')
+    extracted['app_name'] = extract_app_name(source[:and_idx], APP_WITH_ACTION_TRIGGERS)
+    extracted['action_content'] = ' '.join(
+        w for w, l in zip(source[and_idx + 1:], lowered[and_idx + 1:]) if l not in APP_WITH_ACTION_VERBS
+    )
+
+
+def _media_control(extracted, raw, lower, words, ctx):
+    if ctx['dialect'] == 'eva_ter':
+        app_name = next((app for app in MEDIA_APPS if app in words), 'spotify')
+        extracted['app_name'] = app_name
+        extracted['media_query'] = ' '.join(w for w in words if w not in _MEDIA_QUERY_SKIP_EVA_TER and w != app_name)
+        return
+
+    extracted['app_name'] = next((app for app in MEDIA_APPS if app in lower), 'spotify')
+    play_word = next((w for w in MEDIA_PLAY_WORDS if w in words), None)
+    if play_word:
+        query_parts = raw.split()[words.index(play_word) + 1:]
+        extracted['media_query'] = ' '.join(w for w in query_parts if w.lower() not in _MEDIA_QUERY_SKIP)
+
+
+def _send_message(extracted, raw, lower, words, ctx):
+    extracted['app_name'] = next((app for keyword, app in MESSAGE_APPS if keyword in lower), 'whatsapp')
+
+    if ctx['dialect'] == 'eva_ter':
+        # Full recipient, multi-word names included ("john smith")
+        if 'to' in words:
+            recipient_words = words[words.index('to') + 1:]
+            if recipient_words:
+                extracted['recipient'] = ' '.join(recipient_words)
+        return
+
+    for pattern, order in _MESSAGE_RES:
+        match = pattern.search(raw)
+        if match:
+            first, second = match.group(1).strip(), match.group(2).strip()
+            message, recipient = (first, second) if order == 'message_first' else (second, first)
+            extracted['message_content'] = message
+            extracted['recipient'] = recipient
+            extracted['has_message_content'] = True
+            return
+
+    # "to [recipient]" only - the message is asked for later
+    match = _RECIPIENT_RE.search(raw)
+    if match:
+        extracted['recipient'] = match.group(1).strip()
+    elif 'to' in words:
+        remaining = raw.split()[words.index('to') + 1:]
+        if remaining:
+            extracted['recipient'] = remaining[0]
+
+
+def _calculator(extracted, raw, lower, words, ctx):
+    numbers = _NUMBER_RE.findall(raw)
+    extracted['number1'] = numbers[0] if len(numbers) > 0 else ''
+    extracted['number2'] = numbers[1] if len(numbers) > 1 else ''
+    for operation, markers in CALCULATOR_OPERATIONS:
+        if any(marker in lower for marker in markers):
+            extracted['operation'] = operation
+            break
+
+
+def _camera(extracted, raw, lower, words, ctx):
+    extracted['action_content'] = 'open_camera' if 'open' in lower else 'take_photo'
+
+
+def _clock_alarm(extracted, raw, lower, words, ctx):
+    match = _TIME_RE.search(raw)
+    if match:
+        extracted['hour'] = match.group(1)
+        extracted['minute'] = match.group(2)
+    else:
+        numbers = _HOUR_RE.findall(raw)
+        if numbers:
+            extracted['hour'] = numbers[0]
+            extracted['minute'] = numbers[1] if len(numbers) > 1 else '00'
+
+    if 'pm' in lower and extracted.get('hour'):
+        hour = int(extracted['hour'])
+        if hour < 12:
+            extracted['hour'] = str(hour + 12)
+    elif 'am' in lower and extracted.get('hour'):
+        if int(extracted['hour']) == 12:
+            extracted['hour'] = '0'
+
+
+_MOUSE_TYPES = ('MOUSE_CLICK', 'MOUSE_RIGHTCLICK', 'MOUSE_DOUBLECLICK')
+_COMMON_RULES = {
+    'OPEN_APP': _open_app,
+    'CLOSE_APP': _close_app,
+    'WEB_SEARCH': _web_search,
+    'TYPE_TEXT': _type_text,
+    'WINDOW_ACTION': _window_action,
+    'KEYBOARD': _keyboard,
+    'SYSTEM': _system,
+    'APP_WITH_ACTION': _app_with_action,
+    'MEDIA_CONTROL': _media_control,
+    'SEND_MESSAGE': _send_message,
+    **{command_type: _mouse_click for command_type in _MOUSE_TYPES},
+}
+GRAMMAR = {
+    'main': {
+        **_COMMON_RULES,
+        'OPEN_FOLDER': _open_folder,
+        'SEARCH_FILE': _search_file,
+        'CALCULATOR': _calculator,
+        'CAMERA': _camera,
+        'CLOCK_ALARM': _clock_alarm,
+    },
+    'eva_ter': {
+        **_COMMON_RULES,
+        'FILE_FOLDER_OPERATION': _file_folder_operation,
+    },
+}
+
+
+def extract_keywords(raw_command, command_type, dialect='main', default_profile='Default'):
+    """
+    Keywords for a classified command
+
+    Args:
+        dialect: 'main' (EvaGui) or 'eva_ter' (EVA_TER.py / gui.py)
+        default_profile: Chrome profile when the command names none
+
+    Returns:
+        dict: empty_keywords() filled in by the command type's rule
+    """
+    lower = raw_command.lower().strip()
+    extracted = empty_keywords()
+    rule = GRAMMAR[dialect].get(command_type)
+    if rule:
+        rule(extracted, raw_command, lower, lower.split(),
+             {'dialect': dialect, 'default_profile': default_profile})
+    return extracted
+
+
+BENCHMARK_COMMANDS = (
+    ("open notepad", "OPEN_APP"), ("close this window", "CLOSE_APP"),
+    ("open downloads folder", "OPEN_FOLDER"), ("find my resume file", "SEARCH_FILE"),
+    ("open downloads folder", "FILE_FOLDER_OPERATION"),
+    ("search python tutorials on youtube", "WEB_SEARCH"), ("open github", "WEB_SEARCH"),
+    ("with chrome profile work search weather in pune", "WEB_SEARCH"),
+    ("type hello world", "TYPE_TEXT"), ("click on the submit button", "MOUSE_CLICK"),
+    ("maximize window", "WINDOW_ACTION"), ("copy", "KEYBOARD"),
+    ("set volume to fifty", "SYSTEM"), ("turn on bluetooth", "SYSTEM"), ("take screenshot", "SYSTEM"),
+    ("open chrome and search cats", "APP_WITH_ACTION"), ("play shape of you on spotify", "MEDIA_CONTROL"),
+    ("send hello to john on whatsapp", "SEND_MESSAGE"), ("calculate 12 plus 30", "CALCULATOR"),
+    ("set alarm for 7:30 am", "CLOCK_ALARM"),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark keyword extraction per command type")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    for dialect in DIALECTS:
+        print(f"\nDialect: {dialect}")
+        print(f"{'command type':>22} {'µs/call':>8}  command")
+        for command, command_type in BENCHMARK_COMMANDS:
+            if command_type not in GRAMMAR[dialect]:
+                continue
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                extract_keywords(command, command_type, dialect)
+            per_call = (time.perf_counter() - start) / args.repeat * 1e6
+            print(f"{command_type:>22} {per_call:>8.1f}  {command}")
+
+
+if __name__ == "__main__":
+    main()
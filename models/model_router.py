@@ -0,0 +1,299 @@
+"""
+Model Router - latency-aware Gemini model selection with circuit breakers
+One shared router tracks rolling latency and error rate per model. Each
+call goes to the fastest healthy model; repeated quota errors open a
+model's circuit, and after a cooldown a single half-open probe decides
+whether it closes again.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import deque
+
+import config
+
+logger = logging.getLogger("ModelRouter")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def classify_error(error):
+    """'quota' | 'unavailable' | 'transient' | 'fatal' for a Gemini exception"""
+    message = str(error)
+    lowered = message.lower()
+    if "429" in message or "quota" in lowered or "resource_exhausted" in lowered:
+        return "quota"
+    if "404" in message or "not found" in lowered:
+        return "unavailable"
+    if any(code in message for code in ("500", "502", "503", "504")) or "timeout" in lowered or "timed out" in lowered \
+            or "deadline" in lowered or "connection" in lowered:
+        return "transient"
+    return "fatal"
+
+
+class ModelHealth:
+    """Rolling latency / error window and circuit state of one model"""
+
+    def __init__(self, name, window=20, sample_ttl=300.0):
+        self.name = name
+        self.sample_ttl = sample_ttl
+        self._samples = deque(maxlen=window)  # (timestamp, latency_s or None, ok)
+        self.state = CLOSED
+        self.consecutive_quota = 0
+        self.opened_at = 0.0
+        self.cooldown = 0.0
+        self.probe_in_flight = False
+
+    @property
+    def samples(self):
+        """(latency, ok) pairs younger than sample_ttl, so old errors stop counting"""
+        cutoff = time.time() - self.sample_ttl
+        return [(lat, ok) for ts, lat, ok in self._samples if ts >= cutoff]
+
+    def add_sample(self, latency, ok):
+        self._samples.append((time.time(), latency, ok))
+
+    def avg_latency(self):
+        latencies = [lat for lat, ok in self.samples if ok and lat is not None]
+        return sum(latencies) / len(latencies) if latencies else None
+
+    def latency_percentile(self, pct):
+        latencies = sorted(lat for lat, ok in self.samples if ok and lat is not None)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * pct / 100.0))]
+
+    def error_rate(self):
+        samples = self.samples
+        if not samples:
+            return 0.0
+        return sum(1 for _, ok in samples if not ok) / len(samples)
+
+
+class ModelRouter:
+    """Routes calls to the fastest healthy model"""
+
+    def __init__(self, models, window=20, failure_threshold=3, cooldown=30.0,
+                 max_cooldown=300.0, max_error_rate=0.5, explore_rate=0.05, seed=None):
+        """
+        Args:
+            models: Model names in preference order (used until latencies are known)
+            failure_threshold: Consecutive quota errors that open a circuit
+            cooldown: Seconds before the first half-open probe (doubles on failed probes)
+            max_error_rate: Models above this rolling error rate are used only as a last resort
+            explore_rate: Share of calls sent to another healthy model so its latency stays measured
+        """
+        self.models = list(dict.fromkeys(models))
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_error_rate = max_error_rate
+        self.explore_rate = explore_rate
+        self._random = random.Random(seed)
+        self.health = {name: ModelHealth(name, window) for name in self.models}
+        self._lock = threading.Lock()
+
+    def _available(self, health, now):
+        """Closed, or open with an expired cooldown (half-open probes are exclusive)"""
+        if health.state == CLOSED:
+            return True
+        if health.state == OPEN and now - health.opened_at >= health.cooldown:
+            return True
+        return False
+
+    def choose(self, exclude=(), claim=True):
+        """
+        Pick the model for the next call
+
+        Args:
+            claim: Turn an expired open circuit into the running half-open probe
+                   (False = just report which model would be used)
+
+        Returns:
+            str: model name, or None if every circuit is open
+        """
+        now = time.time()
+        with self._lock:
+            candidates = [
+                (index, self.health[name]) for index, name in enumerate(self.models)
+                if name not in exclude and self._available(self.health[name], now)
+            ]
+            if not candidates:
+                return None
+
+            def rank(item):
+                index, health = item
+                latency = health.avg_latency()
+                return (
+                    health.state == CLOSED,                      # Due half-open probes go first
+                    health.error_rate() > self.max_error_rate,   # Erratic models last
+                    latency if latency is not None else float('inf'),
+                    index,                                       # Configured order breaks ties
+                )
+
+            _, chosen = min(candidates, key=rank)
+            healthy = [h for _, h in candidates if h.state == CLOSED and h is not chosen]
+            if healthy and chosen.state == CLOSED and self._random.random() < self.explore_rate:
+                chosen = self._random.choice(healthy)
+            if chosen.state == OPEN and claim:
+                chosen.state = HALF_OPEN
+                chosen.probe_in_flight = True
+                logger.info(f"🔌 Half-open probe for {chosen.name}")
+            return chosen.name
+
+    def record_success(self, model, latency):
+        with self._lock:
+            health = self.health.get(model)
+            if health is None:
+                return
+            if health.state != CLOSED:
+                logger.info(f"✅ Circuit closed for {model} ({latency * 1000:.0f} ms)")
+                health._samples.clear()  # Errors from before the outage no longer apply
+            health.add_sample(latency, True)
+            health.consecutive_quota = 0
+            health.state = CLOSED
+            health.cooldown = 0.0
+            health.probe_in_flight = False
+
+    def record_failure(self, model, error, latency=None):
+        """Record a failed call; returns the error kind (see classify_error)"""
+        kind = classify_error(error)
+        with self._lock:
+            health = self.health.get(model)
+            if health is None:
+                return kind
+            health.add_sample(latency, False)
+
+            if kind == "quota":
+                health.consecutive_quota += 1
+            if health.state == HALF_OPEN:
+                # Failed probe: back off longer
+                self._open(health, min(self.max_cooldown, max(self.base_cooldown, health.cooldown * 2)))
+            elif kind == "unavailable":
+                self._open(health, self.max_cooldown)
+            elif kind == "quota" and health.consecutive_quota >= self.failure_threshold:
+                self._open(health, self.base_cooldown)
+        return kind
+
+    def release_probe(self, model):
+        """A half-open probe was abandoned without a result; allow another probe"""
+        with self._lock:
+            health = self.health.get(model)
+            if health is not None and health.state == HALF_OPEN:
+                health.state = OPEN
+                health.probe_in_flight = False
+
+    def _open(self, health, cooldown):
+        health.state = OPEN
+        health.opened_at = time.time()
+        health.cooldown = cooldown
+        health.probe_in_flight = False
+        logger.warning(f"⛔ Circuit opened for {health.name} for {cooldown:.1f}s")
+
+    def call(self, func, max_attempts=None):
+        """
+        Run func(model_name) on the best model, moving to the next model on
+        quota / unavailable / transient errors
+
+        Returns:
+            tuple: (result, model_name)
+
+        Raises:
+            The last error if every model failed (or a non-retryable error immediately)
+        """
+        tried = set()
+        last_error = None
+        attempts = max_attempts or len(self.models)
+        for _ in range(attempts):
+            model = self.choose(exclude=tried)
+            if model is None:
+                break
+            tried.add(model)
+            start = time.perf_counter()
+            try:
+                result = func(model)
+            except Exception as e:
+                kind = self.record_failure(model, e, time.perf_counter() - start)
+                last_error = e
+                if kind == "fatal":
+                    raise
+                logger.warning(f"⚠️ {model} failed ({kind}): {str(e)[:120]}")
+                continue
+            self.record_success(model, time.perf_counter() - start)
+            return result, model
+
+        if last_error is None:
+            last_error = RuntimeError("429 All Gemini models are unavailable (circuits open)")
+        raise last_error
+
+    def stats(self):
+        """Per model: state, rolling avg/p90 latency (ms) and error rate"""
+        with self._lock:
+            result = {}
+            for name, health in self.health.items():
+                avg = health.avg_latency()
+                p90 = health.latency_percentile(90)
+                result[name] = {
+                    'state': health.state,
+                    'avg_ms': avg * 1000 if avg is not None else None,
+                    'p90_ms': p90 * 1000 if p90 is not None else None,
+                    'error_rate': health.error_rate(),
+                    'samples': len(health.samples),
+                }
+            return result
+
+
+_shared_router = None
+_shared_lock = threading.Lock()
+
+
+def get_model_router():
+    """Process-wide router over config.GEMINI_MODEL + config.GEMINI_FALLBACK_MODELS"""
+    global _shared_router
+    with _shared_lock:
+        if _shared_router is None:
+            _shared_router = ModelRouter(
+                [config.GEMINI_MODEL] + list(config.GEMINI_FALLBACK_MODELS),
+                window=config.MODEL_ROUTER_WINDOW,
+                failure_threshold=config.MODEL_ROUTER_FAILURE_THRESHOLD,
+                cooldown=config.MODEL_ROUTER_COOLDOWN,
+            )
+        return _shared_router
+
+
+def create_client(api_key, max_connections=None, base_url=None):
+    """
+    google.genai Client, pointed at base_url / config.GEMINI_BASE_URL when set (local fake endpoint)
+
+    Args:
+        max_connections: Keep-alive pool size for the underlying HTTP clients
+                         (ignored by google-genai versions without client_args)
+    """
+    from google.genai import Client, types
+
+    options = {}
+    base_url = base_url or config.GEMINI_BASE_URL
+    if base_url:
+        logger.info(f"Using Gemini endpoint {base_url}")
+        options['base_url'] = base_url
+    if max_connections:
+        import httpx
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        options['client_args'] = {'limits': limits}
+        options['async_client_args'] = {'limits': limits}
+
+    try:
+        http_options = types.HttpOptions(**options) if options else None
+    except Exception:
+        # Older google-genai: no pooled client args
+        options.pop('client_args', None)
+        options.pop('async_client_args', None)
+        http_options = types.HttpOptions(**options) if options else None
+
+    if http_options is not None:
+        return Client(api_key=api_key, http_options=http_options)
+    return Client(api_key=api_key)
@@ -0,0 +1,340 @@
+"""
+Online Intent - incrementally trained intent classifier
+Hashed word uni/bigram features + a linear SGD model updated with
+partial_fit, so commands the user explicitly confirms or corrects are
+learned in milliseconds instead of editing MODEL1_TRAINING_DATA
+and refitting. The label set is fixed by the seed data; a few seed examples
+are replayed with every update so old intents are not forgotten. Snapshots
+are written periodically (and at exit), and every update is appended to a
+feedback log so a snapshot can always be rebuilt.
+
+Usage:
+    python -m models.online_intent predict "open notepad"
+    python -m models.online_intent learn "fire up the music player" OPEN_APP
+    python -m models.online_intent replay cache/intent_feedback.jsonl
+    python -m models.online_intent stats
+"""
+
+import argparse
+import atexit
+import copy
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from scipy.special import expit
+from sklearn.linear_model import SGDClassifier
+
+import config
+
+logger = logging.getLogger("OnlineIntent")
+
+
+class OnlineIntentModel:
+    """HashingVectorizer + SGDClassifier(log_loss) trained only with partial_fit"""
+
+    def __init__(self, classes, n_features=2 ** 16, alpha=1e-4, replay=4, repeats=3, seed=0):
+        """
+        Args:
+            classes: Fixed label set (updates with other labels are rejected)
+            replay: Seed examples mixed into every update
+            repeats: Times a runtime example is weighted relative to a seed example
+        """
+        self.classes = np.array(sorted(set(classes)))
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features, ngram_range=(1, 2), alternate_sign=False, norm='l2'
+        )
+        self.model = SGDClassifier(loss='log_loss', alpha=alpha, random_state=seed)
+        self.replay = replay
+        self.repeats = repeats
+        self.seed_data = []
+        self.updates = 0
+        self.rejected = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Snapshots hold the fitted model only; seed data is re-attached on load
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['seed_data'] = []
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _vectorize(self, texts):
+        return self.vectorizer.transform([text.lower().strip() for text in texts])
+
+    def seed(self, training_data, epochs=10):
+        """Initial fit: shuffled partial_fit passes over the seed data"""
+        self.seed_data = [(text, label) for text, label in training_data if label in self.classes]
+        data = list(self.seed_data)
+        with self._lock:
+            for _ in range(epochs):
+                self._random.shuffle(data)
+                texts, labels = zip(*data)
+                self.model.partial_fit(self._vectorize(texts), labels, classes=self.classes)
+        return self
+
+    def learn_many(self, examples):
+        """
+        Update from (text, label) pairs; labels outside the fixed set are skipped
+
+        Returns:
+            int: examples learned
+        """
+        accepted = [(text, label) for text, label in examples if text and label in self.classes]
+        self.rejected += len(examples) - len(accepted)
+        if not accepted:
+            return 0
+
+        replayed = self._random.sample(self.seed_data, min(self.replay * len(accepted), len(self.seed_data)))
+        texts = [text for text, _ in accepted] + [text for text, _ in replayed]
+        labels = [label for _, label in accepted] + [label for _, label in replayed]
+        weights = [float(self.repeats)] * len(accepted) + [1.0] * len(replayed)
+        with self._lock:
+            self.model.partial_fit(self._vectorize(texts), labels, sample_weight=weights)
+            self.updates += len(accepted)
+        return len(accepted)
+
+    def learn(self, text, label):
+        return self.learn_many([(text, label)]) == 1
+
+    def predict_proba(self, texts):
+        """
+        Same values as SGDClassifier.predict_proba (one-vs-rest sigmoids,
+        normalized), computed on the feature columns the texts actually use
+        instead of the whole n_features-wide weight matrix
+        """
+        X = self._vectorize(texts)
+        columns = np.unique(X.indices)
+        with self._lock:
+            coef = self.model.coef_[:, columns]
+            intercept = self.model.intercept_.copy()
+        scores = np.asarray(X[:, columns] @ coef.T) + intercept
+        probabilities = expit(scores)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        return probabilities
+
+    def analyze_queries(self, queries):
+        """Same result shape as intent_model_store.analyze_queries"""
+        if not queries:
+            return []
+        probabilities = self.predict_proba(queries)
+        best = probabilities.argmax(axis=1)
+        return [
+            {
+                "input": query,
+                "command_type": str(self.classes[index]),
+                "confidence": float(probabilities[row, index]),
+                "training_pattern": "Online Model Analysis",
+            }
+            for row, (query, index) in enumerate(zip(queries, best))
+        ]
+
+
+class OnlineIntentLearner:
+    """OnlineIntentModel plus feedback log and periodic snapshots"""
+
+    def __init__(self, model, snapshot_path, feedback_path=None, snapshot_every=25, snapshot_interval=300.0):
+        """
+        Args:
+            snapshot_every: Updates between snapshots
+            snapshot_interval: Seconds after which any pending update triggers a snapshot
+        """
+        self.model = model
+        self.snapshot_path = snapshot_path
+        self.feedback_path = feedback_path
+        self.snapshot_every = snapshot_every
+        self.snapshot_interval = snapshot_interval
+        self.snapshots = 0
+        self._pending = 0
+        self._last_snapshot = time.time()
+        self._io_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    @classmethod
+    def load_or_seed(cls, training_data, snapshot_path=None, feedback_path=None, **options):
+        """
+        Latest snapshot when its label set matches the seed data, otherwise a
+        freshly seeded model
+        """
+        snapshot_path = snapshot_path or config.ONLINE_INTENT_SNAPSHOT_PATH
+        feedback_path = feedback_path or config.ONLINE_INTENT_FEEDBACK_PATH
+        options.setdefault('snapshot_every', config.ONLINE_INTENT_SNAPSHOT_EVERY)
+        options.setdefault('snapshot_interval', config.ONLINE_INTENT_SNAPSHOT_INTERVAL)
+        classes = sorted({label for _, label in training_data})
+        start = time.perf_counter()
+
+        model = None
+        if os.path.exists(snapshot_path):
+            try:
+                model = joblib.load(snapshot_path)
+                if list(model.classes) != classes:
+                    logger.info("🔁 Intent label set changed; reseeding the online model")
+                    model = None
+            except Exception as e:
+                logger.warning(f"Could not load online intent snapshot {snapshot_path}: {e}")
+                model = None
+
+        if model is not None:
+            model.seed_data = [(text, label) for text, label in training_data]
+            logger.info(f"⚡ Online intent model loaded ({model.updates} updates) "
+                        f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+            return cls(model, snapshot_path, feedback_path, **options)
+
+        model = OnlineIntentModel(classes, n_features=config.ONLINE_INTENT_N_FEATURES,
+                                  replay=config.ONLINE_INTENT_REPLAY).seed(training_data)
+        learner = cls(model, snapshot_path, feedback_path, **options)
+        learner.snapshot()
+        logger.info(f"🧠 Online intent model seeded in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return learner
+
+    def learn_many(self, examples, source="correction"):
+        learned = self.model.learn_many(examples)
+        if not learned:
+            return 0
+        if self.feedback_path:
+            self._append_feedback(examples, source)
+        self._pending += learned
+        if self._pending >= self.snapshot_every or time.time() - self._last_snapshot >= self.snapshot_interval:
+            threading.Thread(target=self.snapshot, name="OnlineIntentSnapshot", daemon=True).start()
+        return learned
+
+    def learn(self, text, label, source="correction"):
+        return self.learn_many([(text, label)], source) == 1
+
+    def _append_feedback(self, examples, source):
+        now = time.time()
+        lines = "".join(
+            json.dumps({'text': text, 'label': label, 'source': source, 'time': now}) + "\n"
+            for text, label in examples if label in self.model.classes
+        )
+        try:
+            with self._io_lock:
+                os.makedirs(os.path.dirname(os.path.abspath(self.feedback_path)), exist_ok=True)
+                with open(self.feedback_path, 'a', encoding='utf-8') as f:
+                    f.write(lines)
+        except OSError as e:
+            logger.warning(f"Could not append intent feedback: {e}")
+
+    def snapshot(self):
+        """Atomic joblib dump of a copy of the model (predictions are not blocked while it compresses)"""
+        with self._io_lock:
+            self._pending = 0
+            self._last_snapshot = time.time()
+            try:
+                with self.model._lock:
+                    frozen = copy.deepcopy(self.model)
+                os.makedirs(os.path.dirname(os.path.abspath(self.snapshot_path)), exist_ok=True)
+                tmp_path = self.snapshot_path + ".tmp"
+                joblib.dump(frozen, tmp_path, compress=3)
+                os.replace(tmp_path, self.snapshot_path)
+                self.snapshots += 1
+                logger.info(f"💾 Online intent snapshot saved ({frozen.updates} updates)")
+            except Exception as e:
+                logger.warning(f"Could not save online intent snapshot: {e}")
+
+    def flush(self):
+        if self._pending:
+            self.snapshot()
+
+    def stats(self):
+        return {
+            'classes': len(self.model.classes),
+            'updates': self.model.updates,
+            'rejected': self.model.rejected,
+            'pending': self._pending,
+            'snapshots': self.snapshots,
+            'snapshot_bytes': os.path.getsize(self.snapshot_path) if os.path.exists(self.snapshot_path) else 0,
+        }
+
+
+_CORRECTION_RE = re.compile(r'^\s*(?:correct(?:ion)?|relabel|wrong|that was)\b[\s,:]*(?:it was\s+|to\s+)?(.+?)[\s.!]*$',
+                            re.IGNORECASE)
+
+
+def parse_correction(text, labels):
+    """
+    Label from a re-label command ("correct: OPEN_APP", "that was web search"),
+    or None when the text is not one or names an unknown label
+    """
+    match = _CORRECTION_RE.match(text or '')
+    if not match:
+        return None
+    label = re.sub(r'[\s-]+', '_', match.group(1).strip()).upper()
+    return label if label in set(labels) else None
+
+
+_CONFIRMATION_RE = re.compile(r"^\s*(?:confirm(?:ed)?|(?:yes,?\s+)?that(?:'s|\s+is|\s+was)\s+right|correct)[\s.!]*$",
+                              re.IGNORECASE)
+
+
+def is_confirmation(text):
+    """True for an explicit confirmation of the previous command ("confirm", "that's right")"""
+    return bool(_CONFIRMATION_RE.match(text or ''))
+
+
+def read_feedback(path):
+    """(text, label) pairs from a feedback / labelled JSONL file"""
+    examples = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('text') and record.get('label'):
+                examples.append((record['text'], record['label']))
+    return examples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or update the online intent classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+    predict = sub.add_parser("predict")
+    predict.add_argument("texts", nargs='+')
+    learn = sub.add_parser("learn", help="Record one corrected command")
+    learn.add_argument("text")
+    learn.add_argument("label")
+    replay = sub.add_parser("replay", help="Learn every {text, label} line of a JSONL file")
+    replay.add_argument("path")
+    sub.add_parser("stats")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    from models.intent_data import MODEL1_TRAINING_DATA
+
+    learner = OnlineIntentLearner.load_or_seed(MODEL1_TRAINING_DATA)
+
+    if args.command == "predict":
+        for result in learner.model.analyze_queries(args.texts):
+            print(f"{result['input']!r:40} -> {result['command_type']} ({result['confidence']:.0%})")
+    elif args.command == "learn":
+        if not learner.learn(args.text, args.label):
+            print(f"Unknown label {args.label}; known: {', '.join(learner.model.classes)}")
+        learner.snapshot()
+    elif args.command == "replay":
+        # Straight to the model: replayed lines are already in the feedback log
+        examples = read_feedback(args.path)
+        start = time.perf_counter()
+        learned = sum(learner.model.learn_many(examples[i:i + 32]) for i in range(0, len(examples), 32))
+        elapsed = time.perf_counter() - start
+        learner.snapshot()
+        print(f"Learned {learned}/{len(examples)} examples in {elapsed * 1000:.0f} ms")
+    print(json.dumps(learner.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
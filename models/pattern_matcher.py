@@ -0,0 +1,198 @@
+"""
+Pattern Matcher - precompiled nearest-pattern command classifier
+Vectorized equivalent of EVA_TER.calculate_tfidf_similarity over a whole
+pattern set: patterns are tokenized once into a sparse pattern x token
+matrix, so the word-overlap term for a query (or a batch of queries) is one
+sparse product, and the positional order bonus is a single array compare.
+Scores are bit-identical to the per-pattern loop, including its ties.
+
+Benchmark:
+    python -m models.pattern_matcher --sizes 1000 10000 100000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+from scipy import sparse
+
+# order_bonus in calculate_tfidf_similarity is sum(0.1 for ...), whose float
+# rounding differs from 0.1 * k; precompute the exact sums
+_BONUS_CACHE = [0]
+
+
+def _order_bonus(k):
+    while len(_BONUS_CACHE) <= k:
+        _BONUS_CACHE.append(sum(0.1 for _ in range(len(_BONUS_CACHE))))
+    return _BONUS_CACHE[k]
+
+
+class PatternMatcher:
+    """Best training pattern for a command, scored like calculate_tfidf_similarity"""
+
+    def __init__(self, training_data):
+        """
+        Args:
+            training_data: [(pattern, command_type)] in priority order (ties go to the first)
+        """
+        self.patterns = [pattern for pattern, _ in training_data]
+        self.labels = [label for _, label in training_data]
+        self.vocab = {}
+
+        tokenized = [pattern.lower().split() for pattern in self.patterns]
+        rows, cols = [], []
+        for row, tokens in enumerate(tokenized):
+            for token_id in {self.vocab.setdefault(token, len(self.vocab)) for token in tokens}:
+                rows.append(row)
+                cols.append(token_id)
+
+        # Binary membership: matches = sum over query tokens (with repeats) found in the pattern
+        self.membership = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(len(tokenized), max(1, len(self.vocab)))
+        )
+        self.lengths = np.array([len(tokens) for tokens in tokenized], dtype=np.int64)
+
+        # Token id at each position (-1 past the end) for the order bonus
+        width = int(self.lengths.max()) if len(tokenized) else 0
+        self.positions = np.full((len(tokenized), width), -1, dtype=np.int64)
+        for row, tokens in enumerate(tokenized):
+            self.positions[row, :len(tokens)] = [self.vocab[token] for token in tokens]
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def _encode(self, query):
+        """(token ids with -2 for unknown words, token count)"""
+        tokens = query.lower().split()
+        return np.array([self.vocab.get(token, -2) for token in tokens], dtype=np.int64), len(tokens)
+
+    def _finish(self, matches, ids, length):
+        """Similarity + order bonus for one query, given its overlap counts"""
+        denominator = np.maximum(self.lengths, length)
+        similarity = np.divide(matches, denominator, out=np.zeros(len(self)), where=denominator > 0)
+
+        width = min(len(ids), self.positions.shape[1])
+        in_order = (self.positions[:, :width] == ids[:width]).sum(axis=1)
+        bonus = np.array([_order_bonus(k) for k in range(int(in_order.max(initial=0)) + 1)])[in_order]
+        return np.minimum(1.0, similarity + bonus)
+
+    def scores(self, query):
+        """Similarity of the query to every pattern (same values as the per-pattern loop)"""
+        ids, length = self._encode(query)
+        known = ids[ids >= 0]
+        counts = np.bincount(known, minlength=self.membership.shape[1]).astype(np.float64)
+        return self._finish(self.membership @ counts, ids, length)
+
+    def scores_batch(self, queries):
+        """[n_queries, n_patterns] similarities with one sparse product for the overlap term"""
+        encoded = [self._encode(query) for query in queries]
+        rows, cols = [], []
+        for col, (ids, _) in enumerate(encoded):
+            known = ids[ids >= 0]
+            rows.extend(known.tolist())
+            cols.extend([col] * len(known))
+        counts = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(self.membership.shape[1], len(queries))
+        )
+        matches = (self.membership @ counts).toarray()
+        return np.stack([
+            self._finish(matches[:, col], ids, length) for col, (ids, length) in enumerate(encoded)
+        ]) if queries else np.zeros((0, len(self)))
+
+    def _result(self, query, scores):
+        if not len(scores):
+            return None
+        best = int(np.argmax(scores))  # first maximum, like the strict '>' in the loop
+        if scores[best] <= 0:
+            return None
+        return {
+            "input": query,
+            "command_type": self.labels[best],
+            "confidence": float(scores[best]),
+            "training_pattern": self.patterns[best],
+        }
+
+    def match(self, query):
+        """Same contract as EVA_TER.process_command_model1 (None when nothing overlaps)"""
+        return self._result(query, self.scores(query))
+
+    def match_batch(self, queries):
+        return [self._result(query, row) for query, row in zip(queries, self.scores_batch(queries))]
+
+
+def _legacy_similarity(str1, str2):
+    """Reference copy of EVA_TER.calculate_tfidf_similarity"""
+    words1, words2 = str1.lower().split(), str2.lower().split()
+    matches = sum(1 for word in words1 if word in words2)
+    similarity = matches / max(len(words1), len(words2)) if max(len(words1), len(words2)) > 0 else 0
+    order_bonus = sum(0.1 for i in range(min(len(words1), len(words2))) if words1[i] == words2[i])
+    return min(1.0, similarity + order_bonus)
+
+
+def _legacy_match(training_data, input_text):
+    best_match, highest_similarity = None, 0
+    for pattern, cmd_type in training_data:
+        similarity = _legacy_similarity(input_text, pattern)
+        if similarity > highest_similarity:
+            highest_similarity = similarity
+            best_match = (pattern, cmd_type)
+    return {
+        "input": input_text,
+        "command_type": best_match[1],
+        "confidence": highest_similarity,
+        "training_pattern": best_match[0],
+    } if best_match else None
+
+
+def synthetic_patterns(base, size, seed=0):
+    """Pattern set of the given size built from the base patterns' vocabulary"""
+    rng = random.Random(seed)
+    words = sorted({word for pattern, _ in base for word in pattern.lower().split()})
+    labels = sorted({label for _, label in base})
+    data = list(base[:size])
+    while len(data) < size:
+        data.append((" ".join(rng.choice(words) for _ in range(rng.randint(1, 6))), rng.choice(labels)))
+    return data
+
+
+def main():
+    from models.intent_data import CORE_TRAINING_DATA
+
+    parser = argparse.ArgumentParser(description="Benchmark PatternMatcher against the per-pattern loop")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    queries = [q for q, _ in synthetic_patterns(CORE_TRAINING_DATA, len(CORE_TRAINING_DATA) + args.queries,
+                                                 seed=args.seed + 1)[-args.queries:]]
+    queries += ["open chrome", "play music on spotify", "send whatsapp to mom", "take a screenshot now"]
+
+    print(f"{'patterns':>9} {'build ms':>9} {'loop ms/q':>10} {'single ms/q':>12} {'batch ms/q':>11} {'speedup':>8}  equal")
+    for size in args.sizes:
+        data = synthetic_patterns(CORE_TRAINING_DATA, size, seed=args.seed)
+
+        start = time.perf_counter()
+        matcher = PatternMatcher(data)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        expected = [_legacy_match(data, q) for q in queries]
+        loop_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        start = time.perf_counter()
+        single = [matcher.match(q) for q in queries]
+        single_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        start = time.perf_counter()
+        batch = matcher.match_batch(queries)
+        batch_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        equal = single == expected and batch == expected
+        print(f"{size:>9} {build_ms:>9.1f} {loop_ms:>10.2f} {single_ms:>12.3f} {batch_ms:>11.3f} "
+              f"{loop_ms / single_ms:>7.0f}x  {equal}")
+
+
+if __name__ == "__main__":
+    main()
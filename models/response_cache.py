@@ -0,0 +1,223 @@
+"""
+Response Cache - persistent SQLite cache of parsed Gemini answers
+CommandProcessor classifications and StepGenerator plans are stored under
+(namespace, command, category, prompt-template version) for each model that
+produced them, so a repeated command is answered from disk in
+microseconds without a Gemini call. Entries expire after a TTL and the
+table is trimmed oldest-first to a maximum size.
+
+Stats / maintenance:
+    python -m models.response_cache stats
+    python -m models.response_cache purge     # drop expired entries
+    python -m models.response_cache clear [--namespace steps]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger("ResponseCache")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT NOT NULL,
+    model TEXT NOT NULL,
+    namespace TEXT NOT NULL,
+    command TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created REAL NOT NULL,
+    expires REAL NOT NULL,
+    PRIMARY KEY (key, model)
+);
+CREATE INDEX IF NOT EXISTS responses_created ON responses (created);
+"""
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_command(text):
+    """
+    Only whitespace is collapsed: cached answers carry the user's exact text
+    (typed text, message bodies, queries), so case and punctuation are part
+    of the key
+    """
+    return _WHITESPACE_RE.sub(' ', text or '').strip()
+
+
+def cache_key(namespace, text, category=None, version=1):
+    raw = f"{namespace}\x1f{normalize_command(text)}\x1f{category or ''}\x1f{version}"
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def model_preference(router):
+    """Models whose cached answers are acceptable: the router's current pick first"""
+    return list(dict.fromkeys([router.choose(claim=False)] + router.models))
+
+
+class ResponseCache:
+    """SQLite key-value store with TTL and size-bounded eviction"""
+
+    def __init__(self, path, ttl_seconds=7 * 24 * 3600, max_entries=5000):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lookup_us = 0.0
+        self._lock = threading.Lock()
+        self._writes_since_trim = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def get(self, namespace, text, category=None, version=1, models=None):
+        """
+        Cached value, or None
+
+        Args:
+            models: Acceptable models in preference order (None = any model)
+        """
+        start = time.perf_counter()
+        key = cache_key(namespace, text, category, version)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT model, value FROM responses WHERE key = ? AND expires > ?", (key, time.time())
+            ).fetchall()
+
+        value = None
+        if rows:
+            by_model = dict(rows)
+            if models is None:
+                value = rows[0][1]
+            else:
+                value = next((by_model[m] for m in models if m in by_model), None)
+
+        self.lookup_us += (time.perf_counter() - start) * 1e6
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(value)
+
+    def put(self, namespace, text, value, model, category=None, version=1, ttl_seconds=None):
+        now = time.time()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        row = (cache_key(namespace, text, category, version), model, namespace,
+               normalize_command(text), json.dumps(value), now, now + ttl)
+        try:
+            with self._lock:
+                self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+                self._writes_since_trim += 1
+                if self._writes_since_trim >= 50:
+                    self._trim()
+        except sqlite3.Error as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    def _trim(self):
+        """Drop expired rows, then the oldest beyond max_entries (caller holds the lock)"""
+        self._writes_since_trim = 0
+        self._db.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+        count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count > self.max_entries:
+            self._db.execute(
+                "DELETE FROM responses WHERE rowid IN (SELECT rowid FROM responses ORDER BY created LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def purge(self):
+        with self._lock:
+            self._trim()
+
+    def clear(self, namespace=None):
+        with self._lock:
+            if namespace:
+                self._db.execute("DELETE FROM responses WHERE namespace = ?", (namespace,))
+            else:
+                self._db.execute("DELETE FROM responses")
+
+    def stats(self):
+        """Process hit/miss counters plus what is on disk, per namespace"""
+        now = time.time()
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT namespace, COUNT(*), SUM(expires <= ?), SUM(LENGTH(value)), MIN(created), MAX(created) "
+                "FROM responses GROUP BY namespace", (now,)
+            ).fetchall()
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'avg_lookup_us': self.lookup_us / total if total else 0.0,
+            'file_bytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            'namespaces': {
+                namespace: {
+                    'entries': count,
+                    'expired': expired or 0,
+                    'value_bytes': size or 0,
+                    'oldest_age_s': now - oldest if oldest else None,
+                    'newest_age_s': now - newest if newest else None,
+                }
+                for namespace, count, expired, size, oldest, newest in rows
+            },
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide cache from config (None when disabled or unavailable)"""
+    global _cache
+    import config
+
+    if not config.RESPONSE_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = ResponseCache(
+                    config.RESPONSE_CACHE_PATH,
+                    ttl_seconds=config.RESPONSE_CACHE_TTL,
+                    max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+                )
+                logger.info(f"✓ Response cache enabled ({config.RESPONSE_CACHE_PATH})")
+            except sqlite3.Error as e:
+                logger.warning(f"Response cache unavailable: {e}")
+                return None
+        return _cache
+
+
+def main():
+    import config
+
+    parser = argparse.ArgumentParser(description="Inspect or maintain the Gemini response cache")
+    parser.add_argument("command", choices=["stats", "purge", "clear"])
+    parser.add_argument("--path", default=config.RESPONSE_CACHE_PATH)
+    parser.add_argument("--namespace", help="clear only this namespace (e.g. classify, steps)")
+    args = parser.parse_args()
+
+    cache = ResponseCache(args.path, config.RESPONSE_CACHE_TTL, config.RESPONSE_CACHE_MAX_ENTRIES)
+    if args.command == "purge":
+        cache.purge()
+    elif args.command == "clear":
+        cache.clear(args.namespace)
+    print(json.dumps(cache.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
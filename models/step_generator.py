@@ -1,19 +1,71 @@
 import logging
 import json
-from google.genai import Client
+import config
+from models.gemini_service import get_gemini_service
+from models.response_cache import get_response_cache, model_preference
+from vision.prompt_compiler import estimate_tokens, trim_to_budget
+from vision.screen_summary import foreground_app
 
 logger = logging.getLogger("StepGenerator")
 
+# Bump whenever the step prompt changes so cached plans are not reused
+STEP_PROMPT_VERSION = 1
+CACHE_NAMESPACE = "steps"
+
+# StepGenerator actions -> ActionRouter action_type
+ACTION_TYPES = {
+    'press_key': 'PRESS_KEY',
+    'type': 'TYPE_TEXT',
+    'wait': 'WAIT',
+    'open_app': 'OPEN_APP',
+    'ui_click': 'SCREEN_ANALYSIS',
+}
+
+
+def to_action_steps(steps):
+    """
+    Convert StepGenerator steps ({"action": ..., <parameters>}) into the
+    {action_type, parameters, description} steps the front-ends display and
+    ActionRouter / ExecutionHandler execute. ui_click / ui_type become a
+    SCREEN_ANALYSIS vision click on the target (then TYPE_TEXT for ui_type).
+    """
+    converted = []
+    for step in steps:
+        if not isinstance(step, dict):
+            continue
+        action = str(step.get('action', '')).lower()
+        params = dict(step.get('parameters') or {})
+        params.update({k: v for k, v in step.items() if k not in ('action', 'parameters', 'description')})
+        description = step.get('description', '')
+
+        if action in ('ui_click', 'ui_type'):
+            target = params.pop('target', None) or params.pop('element', None) or description
+            target = target or "target"
+            converted.append({"action_type": "SCREEN_ANALYSIS", "parameters": {"target": target}, "description": target})
+            if action == 'ui_type' and params.get('text'):
+                converted.append({"action_type": "TYPE_TEXT", "parameters": {"text": params['text']},
+                                  "description": f"Type {params['text']}"})
+            continue
+        if action == 'open_app' and 'app_name' not in params:
+            params['app_name'] = params.pop('app', None) or params.pop('name', '')
+
+        action_type = ACTION_TYPES.get(action, action.upper())
+        converted.append({"action_type": action_type, "parameters": params,
+                          "description": description or f"{action_type} {' '.join(map(str, params.values()))}".strip()})
+    return converted
+
+
 class StepGenerator:
     def __init__(self, api_key):
-        self.client = Client(api_key=api_key)
-        self.model_name = 'gemini-2.0-flash'
+        self.gemini = get_gemini_service(api_key)
+        self.model_name = self.gemini.router.choose(claim=False)
+        self.cache = get_response_cache()
         logger.info(f"✓ StepGenerator initialized with: {self.model_name}")
 
     def generate(self, command_data):
         category = command_data['classification']['category']
         raw_command = command_data['raw_command']
-        screen_summary = command_data.get('screen_summary', '')
+        screen_summary = trim_to_budget(command_data.get('screen_summary', ''), config.STEP_SUMMARY_TOKEN_BUDGET)
 
         if category == 'SYSTEM_ACTION':
             logger.info("📍 SYSTEM_ACTION - no steps needed")
@@ -34,6 +86,17 @@ class StepGenerator:
                 {"action": "press_key", "key": "alt+f4", "description": "Close active window"}
             ]
 
+        # Keyed by command + category + foreground app: the full summary changes
+        # from frame to frame, but a plan (ui_click targets included) is only
+        # reused on the same application
+        cache_scope = f"{category}@{command_data.get('screen_app', foreground_app())}"
+        if self.cache is not None:
+            steps = self.cache.get(CACHE_NAMESPACE, raw_command, cache_scope, STEP_PROMPT_VERSION,
+                                   models=model_preference(self.gemini.router))
+            if steps is not None:
+                logger.info(f"⚡ Reusing {len(steps)} cached steps")
+                return steps
+
         prompt = (
             "You are a Windows automation planner for a voice assistant. "
             f"Voice command: \"{raw_command}\"\n"
@@ -49,16 +112,14 @@ class StepGenerator:
             "\nNow generate the full steps for the user's request. Output *only* the JSON array."
         )
 
-        response = self.client.models.generate_content(
-            model=self.model_name,
-            contents=prompt
-        )
+        logger.debug(f"Step prompt: ~{estimate_tokens(prompt)} tokens")
+        response, self.model_name = self.gemini.generate_sync(prompt)
         response_text = response.text.strip()
 
         # Universal step extraction for Gemini output
         # Remove any markdown/code blocks, only JSON array allowed
         if response_text.startswith("```"):
-            response_text = response_text.replace("```json", '').replace("```")
+            response_text = response_text.replace("```json", '').replace("```", '').strip()
         if response_text.startswith("["):
             json_str = response_text
         else:
@@ -69,6 +130,9 @@ class StepGenerator:
             steps = json.loads(json_str)
             logger.info(f"✓ Generated {len(steps)} steps from Gemini.")
             assert isinstance(steps, list)
+            if self.cache is not None:
+                self.cache.put(CACHE_NAMESPACE, raw_command, steps, self.model_name, cache_scope,
+                               STEP_PROMPT_VERSION, ttl_seconds=config.RESPONSE_CACHE_STEP_TTL)
             return steps
         except Exception as e:
             # Return empty if parsing fails
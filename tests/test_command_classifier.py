@@ -0,0 +1,48 @@
+"""The keyword automaton classifies exactly like the legacy substring detectors"""
+
+import itertools
+
+import pytest
+
+from models.command_classifier import CommandClassifier, _legacy_classify, _legacy_is_system_command
+
+KEYWORDS = (
+    [kw for kws in CommandClassifier.SYSTEM_PATTERNS.values() for kw in kws]
+    + CommandClassifier.LAUNCH_KEYWORDS
+    + CommandClassifier.IN_APP_KEYWORDS
+    + [phrase for phrases in CommandClassifier.SYSTEM_COMMANDS.values() for phrase in phrases]
+)
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    # Keyword paths only; skips loading / training the RandomForest model
+    return CommandClassifier.__new__(CommandClassifier)
+
+
+def _assert_same(classifier, command):
+    assert classifier._match_keywords(command.lower().strip(), command) == _legacy_classify(command), command
+    assert classifier._is_system_command(command) == _legacy_is_system_command(command), command
+
+
+@pytest.mark.parametrize("keyword", KEYWORDS)
+def test_single_keywords(classifier, keyword):
+    for command in (keyword, f"{keyword} chrome", f"please {keyword} the report.", keyword.upper() + "!"):
+        _assert_same(classifier, command)
+
+
+def test_priority_collisions(classifier):
+    # Every ordered pair of keywords across all tables, so table priority and
+    # first-keyword-wins within a table are both exercised
+    for first, second in itertools.permutations(KEYWORDS, 2):
+        _assert_same(classifier, f"{first} {second}")
+        _assert_same(classifier, f"{first} the {second} now?")
+
+
+@pytest.mark.parametrize("command", [
+    "restart spotify", "start the restart", "brunch plans", "textbook search",
+    "open", "open.", "run, ", "unmute and mute", "lock my screen brightness",
+    "previously opened", "stopwatch", "", "   ",
+])
+def test_overlapping_substrings(classifier, command):
+    _assert_same(classifier, command)
@@ -0,0 +1,50 @@
+"""Only confident coordinate decisions are cached, and wrong ones can be dropped"""
+
+import os
+
+import pytest
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+pytest.importorskip("google.genai")
+
+import vision.screen_analyzer as screen_analyzer  # noqa: E402
+from vision.decision_cache import DecisionCache  # noqa: E402
+
+ELEMENTS = [
+    {'id': 0, 'label': 'Text: Send', 'type': 'text', 'x': 40, 'y': 20, 'bbox': [0, 0, 80, 40], 'confidence': 0.98},
+    {'id': 1, 'label': 'Text: Settings', 'type': 'text', 'x': 200, 'y': 20, 'bbox': [160, 0, 240, 40], 'confidence': 0.97},
+    {'id': 2, 'label': 'UI Element 2', 'type': 'icon', 'x': 40, 'y': 300, 'bbox': [20, 280, 60, 320], 'confidence': 0.6},
+]
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    def unavailable(api_key=None):
+        raise RuntimeError("offline")
+    monkeypatch.setattr(screen_analyzer, "get_gemini_service", unavailable)
+    return screen_analyzer.ScreenAnalyzer("test-key")
+
+
+def test_clear_local_decision_is_cached_and_can_be_forgotten(analyzer):
+    assert analyzer.select_coordinate(ELEMENTS, "Send", {}) == (40, 20)
+    assert analyzer.decision_cache.stats()['entries'] == 1
+    assert analyzer.select_coordinate(ELEMENTS, "Send", {}) == (40, 20)
+    assert analyzer.decision_cache.stats()['hits'] == 1
+
+    analyzer.forget_decision(ELEMENTS, "Send")
+    assert analyzer.decision_cache.stats()['entries'] == 0
+
+
+def test_fallback_guesses_are_not_cached(analyzer):
+    analyzer.select_coordinate(ELEMENTS, "the blue paper plane", {})
+    assert analyzer.decision_cache.stats()['entries'] == 0
+
+
+def test_invalidate_counts_dropped_entries():
+    cache = DecisionCache()
+    key = DecisionCache.make_key("layout", "Send")
+    cache.put(key, ELEMENTS[0], source='gemini')
+    cache.invalidate(key)
+    cache.invalidate(key)
+    assert cache.get(key, ELEMENTS) is None
+    assert cache.stats()['invalidated'] == 1
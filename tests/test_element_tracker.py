@@ -0,0 +1,48 @@
+"""Elements keep their track IDs across parses while they stay on screen"""
+
+from vision.element_tracker import ElementTracker, bbox_iou
+
+
+def _text(label, bbox):
+    return {'label': f"Text: {label}", 'type': 'text', 'bbox': list(bbox)}
+
+
+def _icon(index, bbox):
+    return {'label': f"UI Element {index}", 'type': 'icon', 'bbox': list(bbox)}
+
+
+def test_bbox_iou():
+    assert bbox_iou([0, 0, 10, 10], [0, 0, 10, 10]) == 1.0
+    assert bbox_iou([0, 0, 10, 10], [20, 20, 30, 30]) == 0.0
+    assert abs(bbox_iou([0, 0, 10, 10], [5, 0, 15, 10]) - 1 / 3) < 1e-9
+
+
+def test_jittered_elements_keep_ids_and_age():
+    tracker = ElementTracker()
+    first = tracker.update([_text("Send", [0, 0, 80, 40]), _icon(2, [100, 0, 140, 40])])
+    ids = [e['track_id'] for e in first]
+
+    # Re-parse: boxes move a few pixels and YOLO numbers the icon differently
+    second = tracker.update([_icon(7, [102, 1, 141, 41]), _text("Send", [2, 0, 82, 40])])
+    assert [e['track_id'] for e in second] == ids[::-1]
+    assert all(e['track_age'] == 2 for e in second)
+
+
+def test_different_text_at_same_place_is_a_new_track():
+    tracker = ElementTracker()
+    old_id = tracker.update([_text("Send", [0, 0, 80, 40])])[0]['track_id']
+    new = tracker.update([_text("Cancel", [0, 0, 80, 40])])[0]
+    assert new['track_id'] != old_id
+    assert new['track_age'] == 1
+
+
+def test_tracks_survive_missed_frames_then_expire():
+    tracker = ElementTracker(max_missed=2)
+    track_id = tracker.update([_text("Send", [0, 0, 80, 40])])[0]['track_id']
+    tracker.update([])
+    tracker.update([])
+    assert tracker.update([_text("Send", [0, 0, 80, 40])])[0]['track_id'] == track_id
+
+    for _ in range(3):
+        tracker.update([])
+    assert tracker.update([_text("Send", [0, 0, 80, 40])])[0]['track_id'] != track_id
@@ -0,0 +1,67 @@
+"""LabelIndex scores a whole parse exactly like the per-element fuzzy loop"""
+
+import random
+
+import numpy as np
+import pytest
+
+import vision.fuzzy_scorer as fuzzy_scorer
+from vision.fuzzy_scorer import LabelIndex, similarity
+
+WORDS = ["send", "message", "chrome", "profile", "work", "settings", "search", "inbox", "Code", "Crusaders", "é"]
+
+
+def _elements(rng, count=40):
+    elements = []
+    for i in range(count):
+        words = rng.sample(WORDS, rng.randint(0, 3))
+        elements.append({
+            'label': " ".join(words),
+            'confidence': round(rng.random(), 3),
+            'x': i, 'y': i,
+        })
+    return elements
+
+
+def _reference_best(query, elements, weight, boost):
+    """Element-by-element loop the original _fuzzy_match_element ran"""
+    best, best_score = None, 0.0
+    query = query.lower()
+    for elem in elements:
+        label = elem.get('label', '').lower()
+        sim = similarity(query, label)
+        if query in label or label in query:
+            sim = max(sim, boost)
+        score = sim * weight + elem.get('confidence', 0) * (1 - weight)
+        if score > best_score and score > 0.5:
+            best, best_score = elem, score
+    return best, best_score
+
+
+@pytest.mark.parametrize("rapidfuzz", [True, False])
+def test_matches_reference_loop(monkeypatch, rapidfuzz):
+    if rapidfuzz and not fuzzy_scorer.RAPIDFUZZ_AVAILABLE:
+        pytest.skip("rapidfuzz not installed")
+    monkeypatch.setattr(fuzzy_scorer, "RAPIDFUZZ_AVAILABLE", rapidfuzz)
+    rng = random.Random(0)
+    for _ in range(50):
+        elements = _elements(rng)
+        index = LabelIndex(elements)
+        query = " ".join(rng.sample(WORDS, rng.randint(1, 2)))
+        for weight, boost in ((0.9, 0.95), (0.7, 0.9)):
+            expected = _reference_best(query, elements, weight, boost)
+            element, score = index.best(query, weight, boost)
+            assert element is expected[0]
+            assert score == pytest.approx(expected[1])
+
+
+def test_similarities_are_batched_per_label():
+    index = LabelIndex([{'label': 'Send'}, {'label': ''}, {'label': 'Sending'}])
+    sims = index.similarities('send', substring_boost=0.9)
+    assert sims[0] == pytest.approx(1.0)
+    assert sims[2] == pytest.approx(0.9)  # contains the query
+    assert isinstance(sims, np.ndarray) and len(sims) == 3
+
+
+def test_empty_index():
+    assert LabelIndex([]).best('send', 0.7, 0.9) == (None, 0.0)
@@ -0,0 +1,57 @@
+"""Recorded exchanges replay offline; an unrecorded request fails loudly"""
+
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from utils.fake_gemini_server import text_response
+from utils.gemini_cassette import Cassette, create_replay_server, request_fingerprint
+
+REQUEST = {'contents': [{'role': 'user', 'parts': [{'text': 'open notepad'}]}]}
+
+
+def _post(base_url, model, body):
+    request = urllib.request.Request(
+        f"{base_url}/v1beta/models/{model}:generateContent",
+        data=json.dumps(body).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+
+@pytest.fixture
+def cassette_path(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    Cassette(path).add("gemini-a", REQUEST, 200, text_response('{"category": "APP_LAUNCH"}'), 0.01)
+    return path
+
+
+def test_fingerprint_ignores_volatile_fields():
+    assert request_fingerprint(REQUEST) == request_fingerprint(dict(REQUEST, labels={'run': '2'}))
+    assert request_fingerprint(REQUEST) != request_fingerprint({'contents': []})
+
+
+def test_replays_recorded_answer_for_any_model(cassette_path):
+    with create_replay_server(cassette_path, latency=0.0) as server:
+        for model in ("gemini-a", "gemini-b"):
+            body = _post(server.base_url, model, REQUEST)
+            assert body['candidates'][0]['content']['parts'][0]['text'] == '{"category": "APP_LAUNCH"}'
+        assert server.cassette.hits == 2
+
+
+def test_miss_raises(cassette_path):
+    other = {'contents': [{'role': 'user', 'parts': [{'text': 'never recorded'}]}]}
+    with create_replay_server(cassette_path, latency=0.0) as server:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            _post(server.base_url, "gemini-a", other)
+        assert error.value.code == 400
+        assert server.cassette.misses == 1
+
+
+def test_cassette_reloads_from_disk(cassette_path):
+    reloaded = Cassette(cassette_path)
+    entry = reloaded.lookup("gemini-a", REQUEST)
+    assert entry['status'] == 200 and entry['latency'] == 0.01
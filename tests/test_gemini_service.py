@@ -0,0 +1,148 @@
+"""GeminiService deadlines, fallback, hedging, coalescing and batching against a scripted fake client"""
+
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import models.gemini_service as gemini_service  # noqa: E402
+from models.gemini_service import DeadlineExceeded, GeminiService  # noqa: E402
+from models.model_router import OPEN, ModelRouter  # noqa: E402
+
+
+def reply(text, delay=0.0):
+    async def behaviour(contents):
+        await asyncio.sleep(delay)
+        return SimpleNamespace(text=text)
+    return behaviour
+
+
+def fail(message):
+    async def behaviour(contents):
+        raise Exception(message)
+    return behaviour
+
+
+class FakeModels:
+    def __init__(self):
+        self.behaviours = {}
+        self.calls = []
+
+    async def generate_content(self, model, contents, config=None):
+        self.calls.append((model, contents))
+        return await self.behaviours[model](contents)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    models = FakeModels()
+    client = SimpleNamespace(aio=SimpleNamespace(models=models))
+    monkeypatch.setattr(gemini_service, "create_client", lambda *args, **kwargs: client)
+    router = ModelRouter(["primary", "backup"], failure_threshold=1, explore_rate=0.0, seed=0)
+    service = GeminiService("test-key", router=router, default_deadline=2.0,
+                            hedge_min_delay=0.05, hedge_min_samples=3)
+    yield service, models
+    service.close()
+
+
+def test_answer_from_best_model(service):
+    service, models = service
+    models.behaviours = {"primary": reply("hi")}
+    response, model = service.generate_sync("hello")
+    assert (response.text, model) == ("hi", "primary")
+
+
+def test_deadline_exceeded(service):
+    service, models = service
+    models.behaviours = {"primary": reply("late", delay=1.0), "backup": reply("late", delay=1.0)}
+    with pytest.raises(DeadlineExceeded):
+        service.generate_sync("hello", deadline=0.2, hedge=False)
+    assert service.router.health["primary"].error_rate() == 1.0
+
+
+def test_falls_back_on_transient_error(service):
+    service, models = service
+    models.behaviours = {"primary": fail("503 overloaded"), "backup": reply("from backup")}
+    response, model = service.generate_sync("hello")
+    assert (response.text, model) == ("from backup", "backup")
+
+
+def test_fatal_error_is_not_retried(service):
+    service, models = service
+    models.behaviours = {"primary": fail("400 invalid argument"), "backup": reply("unused")}
+    with pytest.raises(Exception, match="400"):
+        service.generate_sync("hello")
+    assert [model for model, _ in models.calls] == ["primary"]
+
+
+def test_quota_error_opens_circuit(service):
+    service, models = service
+    models.behaviours = {"primary": fail("429 quota"), "backup": reply("from backup")}
+    assert service.generate_sync("hello")[1] == "backup"
+    assert service.router.health["primary"].state == OPEN
+
+
+def test_slow_call_is_hedged(service):
+    service, models = service
+    models.behaviours = {"primary": reply("fast", delay=0.01), "backup": reply("from backup")}
+    for index in range(3):
+        service.generate_sync(f"warm-up {index}")  # primary p90 is now ~10 ms
+
+    models.behaviours["primary"] = reply("too slow", delay=1.0)
+    response, model = service.generate_sync("hello")
+    assert (response.text, model) == ("from backup", "backup")
+    assert service.stats()['hedges_fired'] == 1
+    assert service.stats()['hedges_won'] == 1
+
+
+def test_no_hedge_without_latency_history(service):
+    service, models = service
+    models.behaviours = {"primary": reply("slow but only", delay=0.2), "backup": reply("unused")}
+    assert service.generate_sync("hello")[1] == "primary"
+    assert service.stats()['hedges_fired'] == 0
+
+
+def test_identical_inflight_requests_share_one_call(service):
+    service, models = service
+    models.behaviours = {"primary": reply("shared", delay=0.1)}
+
+    async def both():
+        return await asyncio.gather(service.generate("same prompt"), service.generate("same prompt"))
+
+    results = service.run(both(), 2.0)
+    assert [response.text for response, _ in results] == ["shared", "shared"]
+    assert len(models.calls) == 1
+    assert service.stats()['coalesced'] == 1
+
+
+def test_small_prompts_are_batched_and_demultiplexed(service):
+    service, models = service
+
+    async def batch_reply(contents):
+        if "independent requests" not in contents:
+            return SimpleNamespace(text=f"single: {contents}")
+        count = contents.count("### Request")
+        return SimpleNamespace(text="[" + ", ".join(f'"answer {i}"' for i in range(1, count + 1)) + "]")
+
+    models.behaviours = {"primary": batch_reply}
+    results = service.generate_batched_many_sync(["a", "b", "a", "c"])
+    assert [response.text for response, _ in results] == ["answer 1", "answer 2", "answer 1", "answer 3"]
+    assert len(models.calls) == 1
+    assert service.stats()['batches_sent'] == 1
+
+
+def test_malformed_batch_reply_falls_back_to_single_calls(service):
+    service, models = service
+
+    async def no_json(contents):
+        if "independent requests" in contents:
+            return SimpleNamespace(text="sorry, I can only answer one thing")
+        return SimpleNamespace(text=f"single: {contents}")
+
+    models.behaviours = {"primary": no_json}
+    results = service.generate_batched_many_sync(["a", "b"])
+    assert [response.text for response, _ in results] == ["single: a", "single: b"]
+    assert len(models.calls) == 3
@@ -0,0 +1,47 @@
+"""A stale intent model is only served when it was trained with the same params"""
+
+import threading
+
+from models.intent_model_store import DEFAULT_PARAMS, HASHING_PARAMS, IntentModelStore
+
+DATA = [
+    ("open notepad", "OPEN_APP"), ("launch chrome", "OPEN_APP"), ("start spotify", "OPEN_APP"),
+    ("volume up", "SYSTEM"), ("mute the sound", "SYSTEM"), ("lower the brightness", "SYSTEM"),
+]
+MORE_DATA = DATA + [("open calculator", "OPEN_APP"), ("turn the volume down", "SYSTEM")]
+
+
+def _get(store, data, params):
+    ready = threading.Event()
+    pipeline, status = store.get_or_train(data, params, on_ready=lambda fresh: ready.set())
+    if status == 'stale':
+        assert ready.wait(30)
+    return pipeline, status
+
+
+def test_loads_exact_artifact(tmp_path):
+    store = IntentModelStore(str(tmp_path))
+    assert _get(store, DATA, DEFAULT_PARAMS)[1] == 'trained'
+    assert _get(store, DATA, DEFAULT_PARAMS)[1] == 'loaded'
+
+
+def test_stale_artifact_needs_matching_params(tmp_path):
+    store = IntentModelStore(str(tmp_path), keep=4)
+    _get(store, DATA, DEFAULT_PARAMS)
+
+    # Different features: the tfidf artifact must not be served for hashing
+    assert store.load_latest(HASHING_PARAMS) is None
+    assert _get(store, MORE_DATA, HASHING_PARAMS)[1] == 'trained'
+
+    # Same params, new data: the previous artifact is served while retraining
+    pipeline, status = _get(store, MORE_DATA, DEFAULT_PARAMS)
+    assert status == 'stale'
+    assert 'tfidf' in pipeline.named_steps
+
+
+def test_artifacts_without_metadata_are_not_served(tmp_path):
+    store = IntentModelStore(str(tmp_path))
+    _get(store, DATA, DEFAULT_PARAMS)
+    for meta in tmp_path.glob("*.json"):
+        meta.unlink()
+    assert store.load_latest(DEFAULT_PARAMS) is None
@@ -0,0 +1,50 @@
+"""
+extract_keywords reproduces the front-ends' original extractors per dialect
+
+data/keyword_extractor_baseline.json holds the non-empty fields returned by
+EvaGui._extract_keywords_by_command_type ('main') and EVA_TER's
+extract_keywords_by_command_type ('eva_ter') before they were replaced,
+minus the cases the shared extractor fixes on purpose (main TYPE_TEXT always
+raised; eva_ter leaked 'recipient' into every command type).
+"""
+
+import json
+import os
+
+import pytest
+
+from models.keyword_extractor import DIALECTS, empty_keywords, extract_keywords, text_to_number
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'keyword_extractor_baseline.json')
+
+with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+    BASELINE = json.load(f)
+
+
+@pytest.mark.parametrize("dialect", DIALECTS)
+def test_matches_original_extractors(dialect):
+    mismatches = []
+    for command, command_type, fields in BASELINE[dialect]:
+        expected = dict(empty_keywords(), **fields)
+        actual = extract_keywords(command, command_type, dialect)
+        if actual != expected:
+            mismatches.append((command, command_type))
+    assert not mismatches
+
+
+def test_type_text_keeps_casing():
+    assert extract_keywords("Type Hello World", "TYPE_TEXT", 'main')['text_content'] == "Hello World"
+
+
+def test_recipient_only_for_messages():
+    assert extract_keywords("set volume to 50", "SYSTEM", 'eva_ter')['recipient'] is None
+    assert extract_keywords("send hi to john", "SEND_MESSAGE", 'eva_ter')['recipient'] == "john"
+
+
+def test_unknown_command_type_is_empty():
+    assert extract_keywords("anything", "NOT_A_TYPE") == empty_keywords()
+
+
+@pytest.mark.parametrize("text, number", [("fifty", 50), ("7", 7), (12, 12), ("many", None)])
+def test_text_to_number(text, number):
+    assert text_to_number(text) == number
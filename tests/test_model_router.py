@@ -0,0 +1,117 @@
+"""Circuit breakers open on repeated quota errors and recover through a half-open probe"""
+
+import pytest
+
+import models.model_router as model_router
+from models.model_router import CLOSED, HALF_OPEN, OPEN, ModelRouter, classify_error
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(model_router.time, "time", clock)
+    return clock
+
+
+def _router(**kwargs):
+    return ModelRouter(["fast", "slow"], failure_threshold=2, cooldown=10.0, explore_rate=0.0, seed=0, **kwargs)
+
+
+@pytest.mark.parametrize("message, kind", [
+    ("429 RESOURCE_EXHAUSTED", "quota"),
+    ("404 model not found", "unavailable"),
+    ("503 Service Unavailable", "transient"),
+    ("Deadline exceeded", "transient"),
+    ("400 invalid argument", "fatal"),
+])
+def test_classify_error(message, kind):
+    assert classify_error(Exception(message)) == kind
+
+
+def test_prefers_lower_latency(clock):
+    router = _router()
+    router.record_success("fast", 0.8)
+    router.record_success("slow", 0.2)
+    assert router.choose() == "slow"
+
+
+def test_circuit_opens_and_recovers(clock):
+    router = _router()
+    quota = Exception("429 quota")
+    router.record_failure("fast", quota)
+    assert router.health["fast"].state == CLOSED
+    router.record_failure("fast", quota)
+    assert router.health["fast"].state == OPEN
+    assert router.choose() == "slow"
+
+    # Cooldown over: exactly one half-open probe is handed out
+    clock.now += 10.0
+    assert router.choose() == "fast"
+    assert router.health["fast"].state == HALF_OPEN
+    assert router.choose() == "slow"
+
+    router.record_success("fast", 0.1)
+    assert router.health["fast"].state == CLOSED
+    assert router.choose() == "fast"
+
+
+def test_failed_probe_doubles_cooldown(clock):
+    router = _router()
+    for _ in range(2):
+        router.record_failure("fast", Exception("429 quota"))
+    clock.now += 10.0
+    assert router.choose() == "fast"
+    router.record_failure("fast", Exception("503 unavailable"))
+    assert router.health["fast"].state == OPEN
+    assert router.health["fast"].cooldown == 20.0
+
+    clock.now += 10.0
+    assert router.choose() == "slow"
+    clock.now += 10.0
+    assert router.choose() == "fast"
+
+
+def test_released_probe_can_be_retried(clock):
+    router = _router()
+    router.record_failure("fast", Exception("404 not found"))
+    clock.now += router.max_cooldown
+    assert router.choose() == "fast"
+    router.release_probe("fast")
+    assert router.health["fast"].state == OPEN
+    assert router.choose() == "fast"
+
+
+def test_call_falls_through_and_raises_fatal(clock):
+    router = _router()
+    calls = []
+
+    def flaky(model):
+        calls.append(model)
+        if model == "fast":
+            raise Exception("503 overloaded")
+        return "ok"
+
+    assert router.call(flaky) == ("ok", "slow")
+    assert calls == ["fast", "slow"]
+
+    def broken(model):
+        raise ValueError("400 bad request")
+
+    with pytest.raises(ValueError):
+        router.call(broken)
+
+
+def test_all_circuits_open_raises(clock):
+    router = _router()
+    for model in ("fast", "slow"):
+        router.record_failure(model, Exception("404 not found"))
+    with pytest.raises(RuntimeError, match="circuits open"):
+        router.call(lambda model: "unused")
@@ -0,0 +1,134 @@
+"""Online intent updates change predictions, survive a snapshot reload and replay from the feedback log"""
+
+import os
+
+import pytest
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+from models.online_intent import (  # noqa: E402
+    OnlineIntentLearner, OnlineIntentModel, is_confirmation, parse_correction, read_feedback,
+)
+
+SEED = [
+    ("open notepad", "OPEN_APP"), ("launch chrome", "OPEN_APP"), ("start spotify", "OPEN_APP"),
+    ("open the calculator", "OPEN_APP"), ("launch word", "OPEN_APP"),
+    ("search for weather", "WEB_SEARCH"), ("google python tutorials", "WEB_SEARCH"),
+    ("look up the news", "WEB_SEARCH"), ("search cheap flights", "WEB_SEARCH"),
+    ("find recipes online", "WEB_SEARCH"),
+    ("take a screenshot", "SCREENSHOT"), ("capture the screen", "SCREENSHOT"),
+    ("grab a screenshot", "SCREENSHOT"), ("screenshot please", "SCREENSHOT"),
+    ("snap the screen", "SCREENSHOT"),
+]
+LABELS = sorted({label for _, label in SEED})
+NEW_PHRASE = "fire up the music player"
+
+
+def _predict(model, text):
+    return model.analyze_queries([text])[0]['command_type']
+
+
+@pytest.fixture
+def learner(tmp_path):
+    learner = OnlineIntentLearner.load_or_seed(
+        SEED, snapshot_path=str(tmp_path / "online.joblib"), feedback_path=str(tmp_path / "feedback.jsonl"),
+        snapshot_every=1000, snapshot_interval=1e9,
+    )
+    yield learner
+    learner._pending = 0  # nothing left for the atexit flush
+
+
+def test_seeded_model_predicts_seed_labels():
+    model = OnlineIntentModel(LABELS).seed(SEED)
+    assert _predict(model, "open notepad") == "OPEN_APP"
+    assert _predict(model, "take a screenshot") == "SCREENSHOT"
+    probabilities = model.predict_proba(["search for weather", "launch chrome"])
+    assert probabilities.shape == (2, len(LABELS))
+    assert probabilities.sum(axis=1) == pytest.approx([1.0, 1.0])
+
+
+def test_predict_proba_matches_sklearn():
+    model = OnlineIntentModel(LABELS).seed(SEED)
+    texts = ["open notepad", "search the web for cats", "unknown words here"]
+    expected = model.model.predict_proba(model._vectorize(texts))
+    assert model.predict_proba(texts) == pytest.approx(expected)
+
+
+def test_learning_changes_prediction_without_forgetting():
+    model = OnlineIntentModel(LABELS).seed(SEED)
+    for _ in range(5):
+        model.learn(NEW_PHRASE, "WEB_SEARCH")
+    assert _predict(model, NEW_PHRASE) == "WEB_SEARCH"
+    assert _predict(model, "open notepad") == "OPEN_APP"
+    assert model.updates == 5
+
+
+def test_unknown_labels_are_rejected():
+    model = OnlineIntentModel(LABELS).seed(SEED)
+    assert model.learn_many([("do a barrel roll", "NOT_A_LABEL"), ("", "OPEN_APP")]) == 0
+    assert not model.learn("do a barrel roll", "NOT_A_LABEL")
+    assert (model.updates, model.rejected) == (0, 3)
+
+
+def test_snapshot_reload_keeps_updates(learner):
+    assert learner.stats()['snapshots'] == 1  # written when seeded
+    for _ in range(5):
+        learner.learn(NEW_PHRASE, "SCREENSHOT")
+    assert learner.stats()['pending'] == 5
+    learner.flush()
+    assert learner.stats()['pending'] == 0
+    assert learner.stats()['snapshot_bytes'] > 0
+
+    reloaded = OnlineIntentLearner.load_or_seed(
+        SEED, snapshot_path=learner.snapshot_path, feedback_path=learner.feedback_path,
+    )
+    assert reloaded.model.updates == 5
+    assert reloaded.model.seed_data == SEED
+    assert _predict(reloaded.model, NEW_PHRASE) == "SCREENSHOT"
+
+
+def test_changed_label_set_reseeds(learner):
+    learner.learn(NEW_PHRASE, "SCREENSHOT")
+    learner.flush()
+    extended = SEED + [("set volume to 50", "SYSTEM")]
+    reloaded = OnlineIntentLearner.load_or_seed(extended, snapshot_path=learner.snapshot_path)
+    assert list(reloaded.model.classes) == sorted(LABELS + ["SYSTEM"])
+    assert reloaded.model.updates == 0
+
+
+def test_feedback_log_rebuilds_updates(learner):
+    learner.learn(NEW_PHRASE, "WEB_SEARCH", source="confirmation")
+    learner.learn_many([("snap it", "SCREENSHOT"), ("dance", "NOT_A_LABEL")])
+    examples = read_feedback(learner.feedback_path)
+    assert examples == [(NEW_PHRASE, "WEB_SEARCH"), ("snap it", "SCREENSHOT")]
+
+    fresh = OnlineIntentModel(LABELS).seed(SEED)
+    assert fresh.learn_many(examples) == 2
+
+
+def test_read_feedback_skips_bad_lines(tmp_path):
+    path = tmp_path / "labelled.jsonl"
+    path.write_text('{"text": "open notepad", "label": "OPEN_APP"}\n\nnot json\n{"text": "no label"}\n',
+                    encoding='utf-8')
+    assert read_feedback(str(path)) == [("open notepad", "OPEN_APP")]
+
+
+@pytest.mark.parametrize("text, label", [
+    ("correct: OPEN_APP", "OPEN_APP"),
+    ("that was web search", "WEB_SEARCH"),
+    ("wrong, it was screenshot", "SCREENSHOT"),
+    ("relabel to web-search", "WEB_SEARCH"),
+    ("correct: DANCE", None),
+    ("open notepad", None),
+    (None, None),
+])
+def test_parse_correction(text, label):
+    assert parse_correction(text, LABELS) == label
+
+
+@pytest.mark.parametrize("text, confirmed", [
+    ("confirm", True), ("that's right!", True), ("Yes, that is right", True), ("correct", True),
+    ("correct: OPEN_APP", False), ("open notepad", False), ("", False),
+])
+def test_is_confirmation(text, confirmed):
+    assert is_confirmation(text) == confirmed
@@ -0,0 +1,27 @@
+"""Sweep recall needs a box that localizes the target; imgsz 0 means native size"""
+
+from types import SimpleNamespace
+
+from vision.param_sweep import _matches_target, _predict_size
+
+FRAME_AREA = 1920 * 1080
+
+
+def test_native_imgsz_is_frame_height_width():
+    frame = SimpleNamespace(size=(1920, 1080))
+    assert _predict_size(frame, 0) == (1080, 1920)
+    assert _predict_size(frame, 640) == 640
+
+
+def test_labelled_bbox_needs_iou():
+    target = {'x': 1710, 'y': 985, 'bbox': [1680, 965, 1740, 1005]}
+    assert _matches_target([1682, 966, 1738, 1004], target, FRAME_AREA)
+    # Contains the click point but is far larger than the button
+    assert not _matches_target([1500, 900, 1900, 1060], target, FRAME_AREA)
+
+
+def test_point_target_rejects_window_sized_boxes():
+    target = {'x': 1710, 'y': 985}
+    assert _matches_target([1680, 965, 1740, 1005], target, FRAME_AREA)
+    assert not _matches_target([0, 0, 1920, 1080], target, FRAME_AREA)
+    assert not _matches_target([0, 0, 60, 40], target, FRAME_AREA)
@@ -0,0 +1,67 @@
+"""Parse results round-trip through the binary format and the disk cache"""
+
+import os
+
+import pytest
+
+from vision.parse_cache import ParseResultCache, deserialize_parse_result, serialize_parse_result
+
+RESULT = {
+    'success': True,
+    'screenshot_path': 'screen.png',
+    'elements': [
+        {'id': 1, 'label': 'UI Element 1', 'type': 'icon', 'x': 20, 'y': 20,
+         'bbox': [0, 0, 40, 40], 'confidence': 0.5},
+        {'id': 2, 'label': 'Text: Envoyer ✓', 'type': 'text', 'x': 120, 'y': 20,
+         'bbox': [80, 0, 160, 40], 'confidence': 0.25},
+    ],
+}
+
+
+def test_round_trip():
+    assert deserialize_parse_result(serialize_parse_result(RESULT)) == RESULT
+
+
+def test_empty_parse_round_trip():
+    empty = {'success': True, 'elements': []}
+    assert deserialize_parse_result(serialize_parse_result(empty)) == empty
+
+
+def test_cache_hit_strips_tracker_keys(tmp_path):
+    cache = ParseResultCache(str(tmp_path), model_version="v1")
+    tracked = dict(RESULT, elements=[dict(e, track_id=7, track_age=3) for e in RESULT['elements']])
+    assert cache.get("frame") is None
+    cache.put("frame", tracked)
+    assert cache.get("frame") == RESULT
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 1
+
+
+def test_model_version_separates_entries(tmp_path):
+    ParseResultCache(str(tmp_path), model_version="v1").put("frame", RESULT)
+    assert ParseResultCache(str(tmp_path), model_version="v2").get("frame") is None
+
+
+def test_corrupt_entry_is_discarded(tmp_path):
+    cache = ParseResultCache(str(tmp_path), model_version="v1")
+    cache.put("frame", RESULT)
+    path = cache._path("frame")
+    with open(path, 'wb') as f:
+        f.write(b"not an npz")
+    assert cache.get("frame") is None
+    assert not os.path.exists(path)
+
+
+def test_lru_eviction(tmp_path):
+    cache = ParseResultCache(str(tmp_path), model_version="v1", max_entries=2)
+    for index, key in enumerate(("a", "b", "c")):
+        cache.put(key, RESULT)
+        os.utime(cache._path(key), (index, index))
+    assert cache.get("a") is None
+    assert cache.get("c") == RESULT
+
+
+def test_other_format_version_is_rejected(monkeypatch):
+    data = serialize_parse_result(RESULT)
+    monkeypatch.setattr("vision.parse_cache.FORMAT_VERSION", 99)
+    with pytest.raises(ValueError):
+        deserialize_parse_result(data)
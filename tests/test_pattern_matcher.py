@@ -0,0 +1,58 @@
+"""PatternMatcher scores are bit-identical to EVA_TER.calculate_tfidf_similarity"""
+
+import random
+
+import numpy as np
+
+from EVA_TER import calculate_tfidf_similarity
+from models.intent_data import CORE_TRAINING_DATA
+from models.pattern_matcher import PatternMatcher, synthetic_patterns
+
+QUERIES = [
+    "open chrome", "OPEN   Chrome now", "play music on spotify", "send whatsapp to mom",
+    "take a screenshot now", "open open open", "", "zzz unknown words", "close the the window",
+]
+
+
+def _queries(seed=1, count=100):
+    rng = random.Random(seed)
+    generated = [q for q, _ in synthetic_patterns(CORE_TRAINING_DATA, len(CORE_TRAINING_DATA) + count, seed=seed)]
+    return QUERIES + generated[-count:] + [rng.choice(CORE_TRAINING_DATA)[0] for _ in range(20)]
+
+
+def _loop_match(training_data, query):
+    best, highest = None, 0
+    for pattern, label in training_data:
+        score = calculate_tfidf_similarity(query, pattern)
+        if score > highest:
+            highest, best = score, (pattern, label)
+    return best, highest
+
+
+def test_scores_equal_per_pattern_loop():
+    data = synthetic_patterns(CORE_TRAINING_DATA, 600, seed=0)
+    matcher = PatternMatcher(data)
+    queries = _queries()
+    batch = matcher.scores_batch(queries)
+    for query, row in zip(queries, batch):
+        expected = np.array([calculate_tfidf_similarity(query, pattern) for pattern, _ in data])
+        assert np.array_equal(matcher.scores(query), expected), query
+        assert np.array_equal(row, expected), query
+
+
+def test_match_picks_same_pattern_including_ties():
+    data = synthetic_patterns(CORE_TRAINING_DATA, 600, seed=0)
+    matcher = PatternMatcher(data)
+    for query in _queries():
+        result = matcher.match(query)
+        best, highest = _loop_match(data, query)
+        if best is None:
+            assert result is None
+            continue
+        assert (result['training_pattern'], result['command_type'], result['confidence']) == (*best, highest)
+
+
+def test_empty_matcher():
+    matcher = PatternMatcher([])
+    assert matcher.match("open chrome") is None
+    assert matcher.match_batch([]) == []
@@ -0,0 +1,62 @@
+"""Screen summaries are cached per layout and the cache stays bounded under concurrent callers"""
+
+import os
+import threading
+
+import pytest
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+pytest.importorskip("google.genai")
+
+import vision.screen_analyzer as screen_analyzer  # noqa: E402
+from vision.screen_summary import local_summary  # noqa: E402
+
+
+def _elements(index):
+    return [{'id': 0, 'label': f'Text: Page {index}', 'type': 'text', 'x': 40, 'y': 20 + index,
+             'bbox': [0, index, 80, 40 + index], 'confidence': 0.98}]
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    def unavailable(api_key=None):
+        raise RuntimeError("offline")
+    monkeypatch.setattr(screen_analyzer, "get_gemini_service", unavailable)
+    monkeypatch.setattr(screen_analyzer, "active_window_title", lambda: "Browser")
+    monkeypatch.setattr(screen_analyzer.config, "SUMMARY_CACHE_MAX_ENTRIES", 8)
+    return screen_analyzer.ScreenAnalyzer("test-key")
+
+
+def test_same_layout_is_summarized_once(analyzer, monkeypatch):
+    calls = []
+
+    def counting_summary(elements, window_title):
+        calls.append(window_title)
+        return local_summary(elements, window_title)
+
+    monkeypatch.setattr(screen_analyzer, "local_summary", counting_summary)
+    first = analyzer.get_screen_summary(None, _elements(1))
+    assert analyzer.get_screen_summary(None, _elements(1)) == first
+    assert len(calls) == 1
+
+
+def test_concurrent_callers_keep_cache_bounded(analyzer):
+    errors = []
+
+    def worker(offset):
+        try:
+            for index in range(40):
+                layout = (offset + index) % 24
+                summary = analyzer.get_screen_summary(None, _elements(layout))
+                assert f"Page {layout}" in summary
+        except Exception as e:  # surfaced in the main thread
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    assert len(analyzer._summary_cache) <= 8
@@ -0,0 +1,105 @@
+"""StepGenerator receives the real screen summary built by the front-ends"""
+
+import os
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+
+import models.step_generator as step_generator  # noqa: E402
+from vision.screen_summary import local_summary  # noqa: E402
+
+ELEMENTS = [
+    {'id': 0, 'label': 'Text: Inbox', 'type': 'text', 'x': 40, 'y': 20, 'bbox': [0, 0, 80, 40], 'confidence': 0.98},
+    {'id': 1, 'label': 'Compose', 'type': 'icon', 'x': 40, 'y': 80, 'bbox': [0, 60, 80, 100], 'confidence': 0.9},
+]
+
+
+class FakeGemini:
+    def __init__(self, reply):
+        self.reply = reply
+        self.prompts = []
+        self.router = SimpleNamespace(choose=lambda claim=False: "fake-model", models=["fake-model"])
+
+    def generate_sync(self, prompt, deadline=None):
+        self.prompts.append(prompt)
+        return SimpleNamespace(text=self.reply), "fake-model"
+
+
+@pytest.fixture
+def generator(monkeypatch):
+    gemini = FakeGemini('[{"action": "ui_click", "target": "Compose"}, {"action": "type", "text": "Hi"}]')
+    monkeypatch.setattr(step_generator, "get_gemini_service", lambda api_key=None: gemini)
+    monkeypatch.setattr(step_generator, "get_response_cache", lambda: None)
+    return step_generator.StepGenerator("test-key"), gemini
+
+
+def _command(summary):
+    return {
+        'raw_command': 'write a new email',
+        'classification': {'category': 'APP_WITH_ACTION', 'entities': {}},
+        'screen_summary': summary,
+    }
+
+
+def test_local_summary_reaches_step_prompt(generator):
+    gen, gemini = generator
+    summary = local_summary(ELEMENTS, "Mail - Outlook")
+    assert summary
+
+    gen.generate(_command(summary))
+
+    assert f'Screen summary: "{summary}"' in gemini.prompts[0]
+
+
+def test_screen_analyzer_summary_reaches_step_prompt(generator, monkeypatch):
+    pytest.importorskip("google.genai")
+    pytest.importorskip("PIL")
+    import vision.screen_analyzer as screen_analyzer
+
+    monkeypatch.setattr(screen_analyzer, "active_window_title", lambda: "Mail - Outlook")
+    analyzer = screen_analyzer.ScreenAnalyzer.__new__(screen_analyzer.ScreenAnalyzer)
+    analyzer.logger = screen_analyzer.logger
+    analyzer.gemini_available = False
+    analyzer._summary_cache = OrderedDict()
+    analyzer._summary_lock = threading.Lock()
+
+    summary = analyzer.get_screen_summary(None, ELEMENTS)
+    gen, gemini = generator
+    gen.generate(_command(summary))
+
+    assert "Mail - Outlook" in summary and "Inbox" in summary
+    assert summary in gemini.prompts[0]
+
+
+def test_to_action_steps():
+    steps = step_generator.to_action_steps([
+        {"action": "ui_type", "target": "Search box", "text": "weather"},
+        {"action": "press_key", "key": "enter"},
+    ])
+
+    assert [s['action_type'] for s in steps] == ["SCREEN_ANALYSIS", "TYPE_TEXT", "PRESS_KEY"]
+    assert steps[0]['parameters'] == {"target": "Search box"}
+    assert steps[2]['parameters'] == {"key": "enter"}
+
+
+def test_cached_plans_keep_text_and_screen(monkeypatch, tmp_path):
+    from models.response_cache import ResponseCache
+
+    gemini = FakeGemini('[{"action": "type", "text": "Hello World!"}]')
+    monkeypatch.setattr(step_generator, "get_gemini_service", lambda api_key=None: gemini)
+    monkeypatch.setattr(step_generator, "get_response_cache", lambda: ResponseCache(str(tmp_path / "cache.db")))
+    gen = step_generator.StepGenerator("test-key")
+
+    def command(text, app):
+        return {'raw_command': text, 'classification': {'category': 'TYPE_TEXT'}, 'screen_app': app}
+
+    gen.generate(command("type Hello World!", "notepad"))
+    gen.generate(command("type Hello World!", "notepad"))
+    gen.generate(command("type hello world", "notepad"))
+    gen.generate(command("type Hello World!", "outlook"))
+
+    assert len(gemini.prompts) == 3
@@ -0,0 +1,182 @@
+"""
+Fake Gemini endpoint for local testing of routing / fallback behaviour
+Serves POST /<version>/models/<model>:generateContent with configurable
+per-model latency and error rates. Point the app at it with
+GEMINI_BASE_URL=http://127.0.0.1:8765 (see models.model_router.create_client).
+
+Usage:
+    python -m utils.fake_gemini_server --port 8765 \
+        --model gemini-2.0-flash:latency=1.5,quota_rate=0.5 \
+        --model gemini-1.5-flash:latency=0.3
+"""
+
+import argparse
+import json
+import logging
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger("FakeGemini")
+
+_PATH_RE = re.compile(r'^/[^/]+/models/([^/:]+):generateContent')
+
+DEFAULT_BEHAVIOUR = {'latency': 0.05, 'jitter': 0.0, 'quota_rate': 0.0, 'error_rate': 0.0, 'missing': False}
+
+
+def _error_body(code, status, message):
+    return {'error': {'code': code, 'message': message, 'status': status}}
+
+
+def text_response(text):
+    """generateContent response body carrying a single text part"""
+    return {
+        'candidates': [{
+            'content': {'role': 'model', 'parts': [{'text': text}]},
+            'finishReason': 'STOP',
+            'index': 0,
+        }],
+    }
+
+
+class FakeGeminiServer:
+    """Threaded HTTP server answering generateContent calls"""
+
+    def __init__(self, host='127.0.0.1', port=0, models=None, responder=None, seed=None,
+                 use_recorded_latency=False):
+        """
+        Args:
+            models: {model_name: {latency, jitter, quota_rate, error_rate, missing}}
+                    ('*' applies to every model; unknown keys use DEFAULT_BEHAVIOUR)
+            responder: callable(model, request_json) -> response text, or
+                       (status, body, recorded_latency) for a full reply
+                       (default echoes '{"ok": true}')
+            use_recorded_latency: Sleep for the responder's recorded latency instead of 'latency'
+        """
+        self.models = models or {}
+        self.responder = responder or (lambda model, body: '{"ok": true}')
+        self.use_recorded_latency = use_recorded_latency
+        self.calls = []  # (model, status, seconds)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def behaviour(self, model):
+        merged = dict(DEFAULT_BEHAVIOUR)
+        merged.update(self.models.get('*', {}))
+        merged.update(self.models.get(model, {}))
+        return merged
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _send(self, status, body):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                start = time.perf_counter()
+                length = int(self.headers.get('Content-Length', 0))
+                raw = self.rfile.read(length) if length else b'{}'
+                match = _PATH_RE.match(self.path)
+                if not match:
+                    self._send(404, _error_body(404, 'NOT_FOUND', f"Unknown path {self.path}"))
+                    return
+                model = match.group(1)
+                status, body = server.handle(model, json.loads(raw or b'{}'))
+                self._send(status, body)
+                with server._lock:
+                    server.calls.append((model, status, time.perf_counter() - start))
+
+        return Handler
+
+    def handle(self, model, request_json):
+        """(status, body) for one call; sleeps for the configured latency"""
+        behaviour = self.behaviour(model)
+        reply = self.responder(model, request_json)
+        if isinstance(reply, str):
+            reply = (200, text_response(reply), None)
+        status, body, recorded_latency = reply
+
+        with self._lock:
+            roll = self._random.random()
+            if self.use_recorded_latency and recorded_latency is not None:
+                delay = recorded_latency
+            else:
+                delay = behaviour['latency']
+            delay += self._random.uniform(0, behaviour['jitter'])
+        time.sleep(delay)
+
+        if behaviour['missing']:
+            return 404, _error_body(404, 'NOT_FOUND', f"models/{model} is not found")
+        if roll < behaviour['quota_rate']:
+            return 429, _error_body(429, 'RESOURCE_EXHAUSTED', 'Quota exceeded (fake)')
+        if roll < behaviour['quota_rate'] + behaviour['error_rate']:
+            return 503, _error_body(503, 'UNAVAILABLE', 'Service unavailable (fake)')
+        return status, body
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Fake Gemini listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def parse_model_spec(spec):
+    """'name:latency=1.5,quota_rate=0.2' -> (name, {...})"""
+    name, _, options = spec.partition(':')
+    behaviour = {}
+    for option in filter(None, options.split(',')):
+        key, _, value = option.partition('=')
+        behaviour[key] = value.lower() in ('1', 'true', 'yes') if key == 'missing' else float(value)
+    return name, behaviour
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake Gemini generateContent endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--model", action="append", default=[],
+                        help="name:latency=S,jitter=S,quota_rate=P,error_rate=P,missing=1")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = FakeGeminiServer(args.host, args.port, dict(parse_model_spec(s) for s in args.model), seed=args.seed)
+    print(f"Serving on {server.base_url} (GEMINI_BASE_URL={server.base_url})")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
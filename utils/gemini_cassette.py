@@ -0,0 +1,254 @@
+"""
+Gemini Cassettes - record live Gemini traffic once, replay it offline
+Record mode runs a local proxy between the app and the Gemini API and
+appends every successful generateContent exchange to a JSONL cassette,
+keyed by a fingerprint of the request body. Replay mode serves the cassette
+from a FakeGeminiServer with injectable latency and error rates, so the
+whole pipeline can be benchmarked deterministically without network access
+or an API key.
+
+Enable for the app via environment:
+    GEMINI_MODE=record  GEMINI_CASSETTE=cassettes/run.jsonl python main.py
+    GEMINI_MODE=replay  GEMINI_CASSETTE=cassettes/run.jsonl GEMINI_REPLAY_ERROR_RATE=0.05 python main.py
+
+Or run a stand-alone replay server:
+    python -m utils.gemini_cassette replay cassettes/run.jsonl --port 8765 --latency 0.4 --quota-rate 0.1
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.fake_gemini_server import FakeGeminiServer, _PATH_RE, _error_body
+
+logger = logging.getLogger("GeminiCassette")
+
+UPSTREAM_URL = "https://generativelanguage.googleapis.com"
+
+# Request fields that change between runs without changing the answer
+_VOLATILE_FIELDS = ('labels',)
+
+
+def request_fingerprint(request_json):
+    """
+    Stable hash of a generateContent request body (model excluded, so a
+    recorded answer can be replayed when routing picks another model)
+    """
+    body = {k: v for k, v in request_json.items() if k not in _VOLATILE_FIELDS}
+    canonical = json.dumps(body, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+class Cassette:
+    """JSONL file of {fingerprint, model, status, body, latency} exchanges"""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}       # (model, fingerprint) -> entry
+        self.by_fingerprint = {}  # fingerprint -> first entry recorded
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    self._index(json.loads(line))
+        logger.info(f"📼 Loaded {len(self.entries)} recorded exchanges from {self.path}")
+
+    def _index(self, entry):
+        self.entries[(entry['model'], entry['fingerprint'])] = entry
+        self.by_fingerprint.setdefault(entry['fingerprint'], entry)
+
+    def add(self, model, request_json, status, body, latency):
+        entry = {
+            'fingerprint': request_fingerprint(request_json),
+            'model': model,
+            'status': status,
+            'body': body,
+            'latency': round(latency, 4),
+            'recorded': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        with self._lock:
+            self._index(entry)
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def lookup(self, model, request_json):
+        """Recorded entry for this request (same model preferred), or None"""
+        fingerprint = request_fingerprint(request_json)
+        with self._lock:
+            entry = self.entries.get((model, fingerprint)) or self.by_fingerprint.get(fingerprint)
+            if entry:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    def replay_response(self, model, request_json):
+        """FakeGeminiServer responder: (status, body, recorded latency)"""
+        entry = self.lookup(model, request_json)
+        if entry is None:
+            logger.warning(f"📼 Cassette miss for {model} ({request_fingerprint(request_json)})")
+            return 400, _error_body(400, 'INVALID_ARGUMENT', 'No cassette entry for this request'), None
+        return entry['status'], entry['body'], entry['latency']
+
+
+class RecordingProxy:
+    """Local proxy that forwards generateContent calls upstream and records them"""
+
+    def __init__(self, cassette, host='127.0.0.1', port=0, upstream=UPSTREAM_URL, timeout=60):
+        self.cassette = cassette
+        self.upstream = upstream.rstrip('/')
+        self.timeout = timeout
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        proxy = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                raw = self.rfile.read(length) if length else b'{}'
+                headers = {
+                    k: v for k, v in self.headers.items()
+                    if k.lower() in ('content-type', 'x-goog-api-key', 'x-goog-api-client', 'user-agent')
+                }
+                request = urllib.request.Request(proxy.upstream + self.path, data=raw, headers=headers, method='POST')
+
+                start = time.perf_counter()
+                try:
+                    with urllib.request.urlopen(request, timeout=proxy.timeout) as response:
+                        status, payload = response.status, response.read()
+                except urllib.error.HTTPError as e:
+                    status, payload = e.code, e.read()
+                except Exception as e:
+                    status, payload = 502, json.dumps(_error_body(502, 'UNAVAILABLE', str(e))).encode('utf-8')
+                latency = time.perf_counter() - start
+
+                match = _PATH_RE.match(self.path)
+                if match and status == 200:
+                    proxy.cassette.add(match.group(1), json.loads(raw or b'{}'), status, json.loads(payload), latency)
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"📼 Recording Gemini traffic via {self.base_url} -> {self.cassette.path}")
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def create_replay_server(cassette_path, latency=None, jitter=0.0, quota_rate=0.0, error_rate=0.0,
+                         seed=0, host='127.0.0.1', port=0):
+    """
+    FakeGeminiServer answering from a cassette
+
+    Args:
+        latency: Fixed seconds per call; None replays the recorded latencies
+    """
+    cassette = Cassette(cassette_path)
+    behaviour = {'jitter': jitter, 'quota_rate': quota_rate, 'error_rate': error_rate}
+    if latency is not None:
+        behaviour['latency'] = latency
+    server = FakeGeminiServer(
+        host, port, models={'*': behaviour}, responder=cassette.replay_response,
+        seed=seed, use_recorded_latency=latency is None,
+    )
+    server.cassette = cassette
+    return server
+
+
+def start_from_config():
+    """
+    Start the record proxy / replay server selected by config.GEMINI_MODE
+
+    Returns:
+        str: base URL for the Gemini client, or None in live mode
+    """
+    import config
+
+    if config.GEMINI_MODE == "record":
+        server = RecordingProxy(Cassette(config.GEMINI_CASSETTE)).start()
+    elif config.GEMINI_MODE == "replay":
+        server = create_replay_server(
+            config.GEMINI_CASSETTE,
+            latency=config.GEMINI_REPLAY_LATENCY,
+            quota_rate=config.GEMINI_REPLAY_QUOTA_RATE,
+            error_rate=config.GEMINI_REPLAY_ERROR_RATE,
+            seed=config.GEMINI_REPLAY_SEED,
+        ).start()
+        logger.info(f"📼 Replaying {config.GEMINI_CASSETTE} via {server.base_url}")
+    else:
+        return None
+    return server.base_url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay Gemini generateContent traffic")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    record = sub.add_parser("record", help="Proxy to the live API and record to a cassette")
+    record.add_argument("cassette")
+    record.add_argument("--port", type=int, default=8765)
+
+    replay = sub.add_parser("replay", help="Serve a cassette with injected latency / errors")
+    replay.add_argument("cassette")
+    replay.add_argument("--port", type=int, default=8765)
+    replay.add_argument("--latency", type=float, help="Fixed seconds per call (default: recorded latency)")
+    replay.add_argument("--jitter", type=float, default=0.0)
+    replay.add_argument("--quota-rate", type=float, default=0.0)
+    replay.add_argument("--error-rate", type=float, default=0.0)
+    replay.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.mode == "record":
+        server = RecordingProxy(Cassette(args.cassette), port=args.port)
+    else:
+        server = create_replay_server(
+            args.cassette, latency=args.latency, jitter=args.jitter,
+            quota_rate=args.quota_rate, error_rate=args.error_rate, seed=args.seed, port=args.port,
+        )
+    print(f"Serving on {server.base_url} (GEMINI_BASE_URL={server.base_url})")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
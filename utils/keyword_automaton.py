@@ -0,0 +1,83 @@
+"""
+Keyword Automaton - Aho-Corasick multi-pattern substring matcher
+All keywords are compiled once into a trie with failure links, so every
+occurrence of every keyword in a text is found in one pass over the text,
+independent of how many keywords there are. Each keyword carries an
+arbitrary payload (e.g. category and priority).
+"""
+
+from collections import deque
+
+
+class KeywordAutomaton:
+    """Finds all keyword occurrences (plain substring semantics, like `kw in text`)"""
+
+    def __init__(self, keywords=None):
+        """
+        Args:
+            keywords: Optional iterable of (keyword, payload)
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._own = [[]]      # state -> [(keyword length, keyword, payload)] ending exactly here
+        self._outputs = None  # _own plus the outputs of the state's suffixes (after compile)
+        self._delta = None    # state -> {char: next state}, failure links folded in
+        self._compiled = False
+        for keyword, payload in keywords or ():
+            self.add(keyword, payload)
+
+    def add(self, keyword, payload=None):
+        if not keyword:
+            raise ValueError("Empty keyword")
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._own.append([])
+            state = next_state
+        self._own[state].append((len(keyword), keyword, payload))
+        self._compiled = False
+
+    def compile(self):
+        """Breadth-first failure links; outputs of suffix states are merged in"""
+        self._outputs = [list(own) for own in self._own]
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+        # Fold the failure links into a full transition table (one dict lookup per character)
+        self._delta = [None] * len(self._goto)
+        self._delta[0] = dict(self._goto[0])
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            self._delta[state] = {**self._delta[self._fail[state]], **self._goto[state]}
+            queue.extend(self._goto[state].values())
+        self._compiled = True
+        return self
+
+    def iter_matches(self, text):
+        """Yield (start, keyword, payload) for every occurrence, in order of end position"""
+        if not self._compiled:
+            self.compile()
+        delta, outputs = self._delta, self._outputs
+        state = 0
+        for index, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                for length, keyword, payload in outputs[state]:
+                    yield index - length + 1, keyword, payload
@@ -0,0 +1,150 @@
+"""
+Decision Cache - reuse recent coordinate selections on an unchanged screen
+select_coordinate decisions are keyed by (layout fingerprint, normalized
+target, profile_name). Before a cached decision is reused, the chosen
+element is looked up again in the current parse so a stale entry never
+produces a click.
+"""
+
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from vision.element_tracker import bbox_iou
+
+logger = logging.getLogger("DecisionCache")
+
+
+def _normalize(text):
+    return re.sub(r'\s+', ' ', str(text or '').lower()).strip()
+
+
+def layout_fingerprint(elements, grid=16):
+    """
+    Order-independent hash of a parse's layout
+
+    Boxes are snapped to a coarse grid and YOLO labels ('UI Element N') are
+    ignored, so re-parses of the same screen hash identically even when
+    detection jitters by a few pixels or numbers elements differently.
+    """
+    signature = []
+    for elem in elements:
+        bbox = elem.get('bbox') or [elem.get('x', 0), elem.get('y', 0)] * 2
+        cells = tuple(int(v) // grid for v in bbox)
+        label = _normalize(elem.get('label')) if elem.get('type') == 'text' else ''
+        signature.append(f"{elem.get('type', 'unknown')}|{label}|{cells}")
+    digest = hashlib.blake2b(digest_size=12)
+    for item in sorted(signature):
+        digest.update(item.encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+class DecisionCache:
+    """TTL + LRU cache of selected elements with validation on reuse"""
+
+    def __init__(self, ttl_seconds=120, max_entries=256, iou_threshold=0.5):
+        """
+        Args:
+            ttl_seconds: Age after which a decision is no longer trusted
+            max_entries: LRU capacity
+            iou_threshold: Minimum IoU for the cached element to count as still present
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.iou_threshold = iou_threshold
+        self._entries = OrderedDict()  # key -> {"element", "source", "stored"}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidated = 0
+
+    @staticmethod
+    def make_key(fingerprint, target_label, profile_name=None):
+        return (fingerprint, _normalize(target_label), _normalize(profile_name))
+
+    def _find_current(self, cached, elements):
+        """The element in the current parse that the cached decision refers to"""
+        track_id = cached.get('track_id')
+        if track_id is not None:
+            for elem in elements:
+                if elem.get('track_id') == track_id:
+                    return elem
+
+        best, best_iou = None, 0.0
+        for elem in elements:
+            if elem.get('type') != cached.get('type'):
+                continue
+            if cached.get('type') == 'text' and _normalize(elem.get('label')) != _normalize(cached.get('label')):
+                continue
+            if not elem.get('bbox') or not cached.get('bbox'):
+                continue
+            iou = bbox_iou(elem['bbox'], cached['bbox'])
+            if iou >= self.iou_threshold and iou > best_iou:
+                best, best_iou = elem, iou
+        return best
+
+    def get(self, key, elements):
+        """
+        Return (x, y) of the cached element in the current parse, or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if time.time() - entry['stored'] > self.ttl_seconds:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            current = self._find_current(entry['element'], elements)
+            if current is None:
+                del self._entries[key]
+                self.invalidated += 1
+                self.misses += 1
+                logger.debug(f"Cached decision for {key[1]!r} no longer on screen")
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            logger.info(f"♻️ Decision cache hit: '{current.get('label')}' at ({current['x']}, {current['y']}) "
+                        f"(originally from {entry['source']})")
+            return (current['x'], current['y'])
+
+    def put(self, key, element, source='unknown'):
+        """Remember the element chosen for a key"""
+        snapshot = {k: element.get(k) for k in ('label', 'type', 'bbox', 'track_id', 'x', 'y')}
+        with self._lock:
+            self._entries[key] = {'element': snapshot, 'source': source, 'stored': time.time()}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        """Drop a decision that turned out to be wrong"""
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self.invalidated += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters for this process"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'invalidated': self.invalidated,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,170 @@
+"""
+Element Ranker - local scoring of OmniParser elements against a target
+Combines exact / prefix / fuzzy text match, element type and position
+priors into one score per element. ScreenAnalyzer trusts the local winner
+when it is clearly ahead of the runner-up and escalates to Gemini vision
+otherwise.
+"""
+
+import logging
+import re
+import threading
+
+from vision.fuzzy_scorer import similarity
+
+logger = logging.getLogger("ElementRanker")
+
+# Score weights (sum to 1.0)
+TEXT_WEIGHT = 0.75
+TYPE_WEIGHT = 0.1
+POSITION_WEIGHT = 0.1
+CONFIDENCE_WEIGHT = 0.05
+
+# Words that hint at where on screen the target usually is: (axis, preferred end)
+_POSITION_HINTS = {
+    'top': ('y', 0.0), 'header': ('y', 0.0), 'address': ('y', 0.0),
+    'search': ('y', 0.0), 'tab': ('y', 0.0), 'menu': ('y', 0.0),
+    'bottom': ('y', 1.0), 'message': ('y', 1.0), 'send': ('y', 1.0),
+    'taskbar': ('y', 1.0), 'footer': ('y', 1.0),
+    'left': ('x', 0.0), 'sidebar': ('x', 0.0),
+    'right': ('x', 1.0),
+}
+
+# Targets that are usually unlabeled widgets rather than OCR text
+_WIDGET_WORDS = {'icon', 'button', 'box', 'field', 'input', 'bar', 'toggle', 'checkbox', 'avatar'}
+
+_FILLER_WORDS = {'the', 'a', 'an', 'on', 'in', 'click', 'tap', 'press', 'select', 'open'}
+
+
+def _clean_label(label):
+    """Element label without the OmniParser 'Text: ' prefix, lowercased"""
+    label = str(label or '')
+    if label.startswith('Text: '):
+        label = label[6:]
+    return re.sub(r'\s+', ' ', label.lower()).strip()
+
+
+def _clean_target(target):
+    words = re.sub(r'[^\w\s]', ' ', str(target or '').lower()).split()
+    return ' '.join(w for w in words if w not in _FILLER_WORDS)
+
+
+def text_score(target, label):
+    """Exact (1.0) > prefix (0.9) > substring (0.8) > fuzzy ratio"""
+    if not target or not label:
+        return 0.0
+    if target == label:
+        return 1.0
+    if label.startswith(target) or target.startswith(label):
+        score = 0.9
+    elif target in label or label in target:
+        score = 0.8
+    else:
+        score = 0.0
+    # Partial matches against much longer/shorter strings are weaker
+    if score:
+        score *= min(len(target), len(label)) / max(len(target), len(label)) * 0.3 + 0.7
+    return max(score, similarity(target, label))
+
+
+def rank_elements(target, elements, profile_name=None, top_n=5):
+    """
+    Score every element against the target
+
+    Args:
+        target: Target description (e.g. "Send button")
+        profile_name: If given, it is matched instead of the target (profile pickers)
+
+    Returns:
+        list: [(score, element), ...] best first, at most top_n entries
+    """
+    if not elements:
+        return []
+
+    query = _clean_target(profile_name or target)
+    query_words = set(query.split())
+    wants_widget = bool(query_words & _WIDGET_WORDS) and not profile_name
+    hints = [_POSITION_HINTS[w] for w in query_words if w in _POSITION_HINTS]
+
+    # Screen extent from the parse itself (no screen size dependency)
+    max_x = max((e.get('bbox') or [0, 0, e['x'], e['y']])[2] for e in elements) or 1
+    max_y = max((e.get('bbox') or [0, 0, e['x'], e['y']])[3] for e in elements) or 1
+
+    scored = []
+    for elem in elements:
+        is_text = elem.get('type') == 'text'
+        label = _clean_label(elem.get('label')) if is_text else ''
+        text = text_score(query, label) if is_text else 0.0
+
+        if wants_widget:
+            type_prior = 0.5 if is_text else 1.0
+        else:
+            type_prior = 1.0 if is_text else 0.3
+
+        if hints:
+            position_prior = sum(
+                1.0 - abs((elem['x'] / max_x if axis == 'x' else elem['y'] / max_y) - end)
+                for axis, end in hints
+            ) / len(hints)
+        else:
+            position_prior = 0.5
+
+        score = (
+            text * TEXT_WEIGHT
+            + type_prior * TYPE_WEIGHT
+            + position_prior * POSITION_WEIGHT
+            + float(elem.get('confidence', 0)) * CONFIDENCE_WEIGHT
+        )
+        scored.append((score, elem))
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return scored[:top_n]
+
+
+class SelectionStats:
+    """Escalation rate and local-vs-Gemini agreement, for tuning the margin threshold"""
+
+    def __init__(self, max_records=500):
+        self.max_records = max_records
+        self.local_decisions = 0
+        self.escalations = 0
+        self.records = []  # [{"margin", "top_score", "agreed"}, ...] for escalated selections
+        self._lock = threading.Lock()
+
+    def record_local(self):
+        with self._lock:
+            self.local_decisions += 1
+
+    def record_escalation(self, margin, top_score, local_choice, remote_choice):
+        """Compare the local winner with Gemini's pick (None if Gemini gave no answer)"""
+        agreed = None
+        if remote_choice is not None and local_choice is not None:
+            agreed = tuple(local_choice) == tuple(remote_choice)
+        with self._lock:
+            self.escalations += 1
+            self.records.append({'margin': margin, 'top_score': top_score, 'agreed': agreed})
+            if len(self.records) > self.max_records:
+                self.records.pop(0)
+
+    def summary(self, bucket_width=0.05):
+        """Escalation rate plus agreement per margin bucket"""
+        with self._lock:
+            total = self.local_decisions + self.escalations
+            compared = [r for r in self.records if r['agreed'] is not None]
+            buckets = {}
+            for r in compared:
+                low = round(int(r['margin'] / bucket_width) * bucket_width, 2)
+                bucket = buckets.setdefault(low, {'n': 0, 'agreed': 0})
+                bucket['n'] += 1
+                bucket['agreed'] += int(r['agreed'])
+            return {
+                'selections': total,
+                'local': self.local_decisions,
+                'escalated': self.escalations,
+                'escalation_rate': self.escalations / total if total else 0.0,
+                'agreement_rate': (sum(r['agreed'] for r in compared) / len(compared)) if compared else None,
+                'agreement_by_margin': {
+                    f"{low:.2f}-{low + bucket_width:.2f}": b['agreed'] / b['n']
+                    for low, b in sorted(buckets.items())
+                },
+            }
@@ -0,0 +1,138 @@
+"""
+Element Tracker - stable IDs for OmniParser elements across successive parses
+parse_screen numbers elements from 1 on every call; the tracker associates
+each new element with the element it continues from the previous frame
+(by bbox IoU and label) so it keeps the same track ID.
+"""
+
+import logging
+import threading
+from itertools import count
+
+logger = logging.getLogger("ElementTracker")
+
+
+def bbox_iou(a, b):
+    """Intersection-over-union of two [x1, y1, x2, y2] boxes"""
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    intersection = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    if intersection == 0:
+        return 0.0
+    area_a = (a[2] - a[0]) * (a[3] - a[1])
+    area_b = (b[2] - b[0]) * (b[3] - b[1])
+    return intersection / float(area_a + area_b - intersection)
+
+
+def _label_key(element):
+    """
+    Comparable label for association
+    YOLO labels ('UI Element N') are just the parse index, so they carry no
+    identity; only OCR text is compared.
+    """
+    if element.get('type') == 'text':
+        return element.get('label', '').lower()
+    return None
+
+
+class ElementTracker:
+    """Greedy IoU + label association with persistent track IDs and ages"""
+
+    def __init__(self, iou_threshold=0.5, max_missed=3):
+        """
+        Args:
+            iou_threshold: Minimum IoU to continue a track
+            max_missed: Frames a track may go unseen before it is dropped
+        """
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.tracks = {}  # track_id -> track dict
+        self.frame_index = 0
+        self._ids = count(1)
+        self._lock = threading.Lock()
+
+    def update(self, elements):
+        """
+        Associate a new parse with existing tracks
+
+        Adds to every element:
+            'track_id': persistent ID (same element -> same ID across parses)
+            'track_age': number of parses the track has been seen in (1 = new)
+
+        Returns:
+            list: the same elements, annotated in place
+        """
+        with self._lock:
+            self.frame_index += 1
+            candidates = []
+            for elem_index, elem in enumerate(elements):
+                bbox = elem.get('bbox')
+                if not bbox:
+                    continue
+                label = _label_key(elem)
+                for track_id, track in self.tracks.items():
+                    if track['type'] != elem.get('type'):
+                        continue
+                    if label is not None and track['label'] != label:
+                        continue
+                    iou = bbox_iou(bbox, track['bbox'])
+                    if iou >= self.iou_threshold:
+                        candidates.append((iou, elem_index, track_id))
+
+            # Greedy: best overlaps claim their tracks first
+            candidates.sort(reverse=True)
+            matched_elements = set()
+            matched_tracks = set()
+            for iou, elem_index, track_id in candidates:
+                if elem_index in matched_elements or track_id in matched_tracks:
+                    continue
+                matched_elements.add(elem_index)
+                matched_tracks.add(track_id)
+                self._continue_track(track_id, elements[elem_index])
+
+            new_tracks = 0
+            for elem_index, elem in enumerate(elements):
+                if elem_index not in matched_elements and elem.get('bbox'):
+                    self._start_track(elem)
+                    new_tracks += 1
+
+            # Age out tracks that were not seen this frame
+            for track_id in list(self.tracks):
+                if self.tracks[track_id]['last_seen'] == self.frame_index:
+                    continue
+                self.tracks[track_id]['missed'] += 1
+                if self.tracks[track_id]['missed'] > self.max_missed:
+                    del self.tracks[track_id]
+
+            logger.debug(
+                f"Frame {self.frame_index}: {len(matched_tracks)} continued, "
+                f"{new_tracks} new, {len(self.tracks)} live tracks"
+            )
+            return elements
+
+    def _start_track(self, elem):
+        track_id = next(self._ids)
+        self.tracks[track_id] = {
+            'bbox': list(elem['bbox']),
+            'label': _label_key(elem),
+            'type': elem.get('type'),
+            'age': 1,
+            'missed': 0,
+            'last_seen': self.frame_index,
+        }
+        elem['track_id'] = track_id
+        elem['track_age'] = 1
+
+    def _continue_track(self, track_id, elem):
+        track = self.tracks[track_id]
+        track['bbox'] = list(elem['bbox'])
+        track['age'] += 1
+        track['missed'] = 0
+        track['last_seen'] = self.frame_index
+        elem['track_id'] = track_id
+        elem['track_age'] = track['age']
+
+    def reset(self):
+        """Forget all tracks (e.g. after switching to a different app)"""
+        with self._lock:
+            self.tracks.clear()
@@ -0,0 +1,92 @@
+"""
+Fuzzy Scorer - batch label similarity for one query against a whole parse
+Labels are lowercased once per parse into a LabelIndex; each query is then
+scored against every label in a single rapidfuzz.process.cdist call (the
+same indel ratio as python-levenshtein, one C loop over all labels). Without
+rapidfuzz the labels are scored one by one with Levenshtein.ratio, or
+difflib when that is not installed either.
+"""
+
+import logging
+from difflib import SequenceMatcher
+
+import numpy as np
+
+try:
+    from rapidfuzz import fuzz as _rapidfuzz_fuzz, process as _rapidfuzz_process
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    _rapidfuzz_fuzz = _rapidfuzz_process = None
+    RAPIDFUZZ_AVAILABLE = False
+
+try:
+    from Levenshtein import ratio as _levenshtein_ratio
+    LEVENSHTEIN_AVAILABLE = True
+except ImportError:
+    _levenshtein_ratio = None
+    LEVENSHTEIN_AVAILABLE = False
+
+logger = logging.getLogger("FuzzyScorer")
+
+
+def similarity(a, b):
+    """Similarity of two lowercased strings (0-1)"""
+    if not a or not b:
+        return 0.0
+    if LEVENSHTEIN_AVAILABLE:
+        return _levenshtein_ratio(a, b)
+    return SequenceMatcher(None, a, b).ratio()
+
+
+class LabelIndex:
+    """Element labels and confidences of one parse, preprocessed for scoring"""
+
+    def __init__(self, elements):
+        self.elements = elements
+        self.labels = [elem.get('label', '').lower() for elem in elements]
+        self._empty = np.array([not label for label in self.labels], dtype=bool)
+        self.confidences = np.array([float(elem.get('confidence', 0)) for elem in elements], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def similarities(self, query, substring_boost):
+        """
+        Similarity of the query to every label
+
+        Labels that contain the query (or are contained in it) are raised to
+        at least substring_boost.
+        """
+        query = query.lower()
+        if not query or not self.labels:
+            sims = np.zeros(len(self.labels))
+        elif RAPIDFUZZ_AVAILABLE:
+            sims = _rapidfuzz_process.cdist([query], self.labels, scorer=_rapidfuzz_fuzz.ratio,
+                                            dtype=np.float64)[0] / 100.0
+            sims[self._empty] = 0.0
+        else:
+            sims = np.fromiter((similarity(query, label) for label in self.labels),
+                               dtype=np.float64, count=len(self.labels))
+        contained = np.fromiter((query in label or label in query for label in self.labels),
+                                dtype=bool, count=len(self.labels))
+        return np.where(contained, np.maximum(sims, substring_boost), sims)
+
+    def scores(self, query, similarity_weight, substring_boost):
+        """Combined score: similarity * w + confidence * (1 - w)"""
+        sims = self.similarities(query, substring_boost)
+        return sims * similarity_weight + self.confidences * (1.0 - similarity_weight)
+
+    def best(self, query, similarity_weight, substring_boost, min_score=0.5):
+        """
+        Highest scoring element above min_score (first one wins ties)
+
+        Returns:
+            tuple: (element, score) or (None, 0.0)
+        """
+        if not self.labels:
+            return None, 0.0
+        scores = self.scores(query, similarity_weight, substring_boost)
+        index = int(np.argmax(scores))
+        if scores[index] > min_score:
+            return self.elements[index], float(scores[index])
+        return None, 0.0
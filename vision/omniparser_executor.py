@@ -1,9 +1,15 @@
 """
 OmniParser Executor - STRICT MODE (imports from util/utils.py)
 """
+import hashlib
+import json
 import logging
 import sys
+import time
 from pathlib import Path
+import config
+from vision.element_tracker import ElementTracker
+from vision.parse_cache import ParseResultCache, frame_hash
 
 logger = logging.getLogger("OmniParserExecutor")
 
@@ -82,7 +88,24 @@ class OmniParserExecutor:
             self.ocr_model = easyocr.Reader(['en'], gpu=(device == 'cuda'))
             logger.info("✓ EasyOCR loaded successfully")
             
+            # Tiled OCR pool is started lazily on the first large frame
+            self.tiled_ocr = None
+            
+            # Stable track IDs across successive parses
+            self.tracker = ElementTracker()
+            
             self.device = device
+            self.detection_settings = self._load_detection_profile()
+            
+            # Disk cache of parse results (keyed by frame hash + model version)
+            self.parse_cache = None
+            if config.PARSE_CACHE_ENABLED:
+                self.model_version = self._compute_model_version(icon_model_path)
+                self.parse_cache = ParseResultCache(
+                    config.PARSE_CACHE_DIR, self.model_version, config.PARSE_CACHE_MAX_ENTRIES
+                )
+                logger.info(f"✓ Parse cache enabled ({config.PARSE_CACHE_DIR})")
+            
             logger.info("✅ OmniParser fully initialized - READY")
             
         except Exception as e:
@@ -104,16 +127,33 @@ class OmniParserExecutor:
             width, height = image.size
             logger.info(f"Image: {width}x{height}")
         
+            frame_key = None
+            if self.parse_cache:
+                frame_key = frame_hash(image)
+                cached = self.parse_cache.get(frame_key)
+                if cached:
+                    logger.info(f"⚡ Parse cache hit: {len(cached['elements'])} elements")
+                    self.tracker.update(cached['elements'])
+                    return cached
+        
             elements = []
             element_id = 1
         
             # YOLO detection
             logger.info("Running YOLO detection...")
+            predict_kwargs = {
+                'conf': self.detection_settings['conf'],
+                'iou': self.detection_settings['iou'],
+            }
+            if self.detection_settings.get('imgsz') == 'native':
+                predict_kwargs['imgsz'] = (height, width)
+            elif self.detection_settings.get('imgsz'):
+                predict_kwargs['imgsz'] = self.detection_settings['imgsz']
             results = self.som_model.predict(
             image,
-            conf=0.15,
             device=self.device,
-            verbose=False
+            verbose=False,
+            **predict_kwargs
             )
         
             clickable_count = 0
@@ -138,80 +178,155 @@ class OmniParserExecutor:
             logger.info(f"✓ YOLO: {clickable_count} elements")
         
             # OCR detection with robust parsing
-            logger.info("Running OCR...")
             img_array = np.array(image)
+            use_tiled = self._should_tile_ocr(width, height)
+            logger.info(f"Running OCR ({'tiled' if use_tiled else 'serial'})...")
         
             try:
-                # EasyOCR format: returns list of (bbox, text, confidence)
-                # bbox is [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
-                ocr_result = self.ocr_model.readtext(img_array, detail=1)
+                ocr_start = time.perf_counter()
+                ocr_result = None
+                if use_tiled:
+                    try:
+                        ocr_result = self._get_tiled_ocr().readtext(img_array)
+                    except Exception as tiled_error:
+                        logger.warning(f"Tiled OCR failed: {tiled_error}, falling back to serial OCR")
+                if ocr_result is None:
+                    # EasyOCR format: returns list of (bbox, text, confidence)
+                    # bbox is [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
+                    ocr_result = self.ocr_model.readtext(img_array, detail=1)
+                logger.info(f"OCR took {(time.perf_counter() - ocr_start) * 1000:.0f} ms")
             except Exception as ocr_error:
                 logger.warning(f"OCR call failed: {ocr_error}, continuing with YOLO-only results")
                 ocr_result = None
         
-            text_count = 0
-            if ocr_result:
-                for detection in ocr_result:
-                    try:
-                        # EasyOCR format: (bbox_coords, text, confidence)
-                        bbox = detection[0]  # [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
-                        text = detection[1]  # Detected text
-                        conf = detection[2]  # Confidence score
-                    
-                        # Extract text and confidence safely
-                        if not text or len(text.strip()) < 1:
-                            logger.debug(f"Skipping empty OCR text")
-                            continue
-                    
-                        text = str(text).strip()
-                        conf = float(conf) if conf is not None else 0.5
-                    
-                        # Extract bbox coordinates
-                        if not bbox or len(bbox) < 4:
-                            logger.debug(f"Skipping: invalid bbox: {bbox}")
-                            continue
-                    
-                        x_coords = [float(p[0]) for p in bbox]
-                        y_coords = [float(p[1]) for p in bbox]
-                    
-                        if not x_coords or not y_coords:
-                            logger.debug(f"Skipping: no valid coordinates in bbox")
-                            continue
-                    
-                        center_x = int(sum(x_coords) / len(x_coords))
-                        center_y = int(sum(y_coords) / len(y_coords))
-                    
-                        # Add non-empty text elements (confidence > 0.3)
-                        if conf > 0.3:
-                            elements.append({
-                            'id': element_id,
-                            'label': f'Text: {text[:50]}',  # Truncate long text
-                            'x': center_x,
-                            'y': center_y,
-                            'confidence': conf,
-                            'type': 'text',
-                            'bbox': [int(min(x_coords)), int(min(y_coords)), 
-                                    int(max(x_coords)), int(max(y_coords))]
-                            })
-                            element_id += 1
-                            text_count += 1
-                
-                    except (IndexError, ValueError, TypeError) as e:
-                        logger.debug(f"Skipping OCR line due to format error: {e}, line: {line}")
-                        continue
+            text_elements = self._ocr_to_elements(ocr_result, element_id)
+            elements.extend(text_elements)
+            element_id += len(text_elements)
+            text_count = len(text_elements)
         
             logger.info(f"✓ OCR: {text_count} text elements")
             logger.info(f"✅ TOTAL: {len(elements)} elements detected")
         
             if len(elements) == 0:
                 logger.warning("⚠️ No elements detected (YOLO + OCR both empty)")
-
-            return {
+            
+            result = {
             "elements": elements,
             "total": len(elements),
             "resolution": f"{width}x{height}"
             }
+            if frame_key and ocr_result is not None:
+                # Don't persist degraded YOLO-only parses from a failed OCR call
+                self.parse_cache.put(frame_key, result)
+            
+            # Attach persistent track_id / track_age (same element -> same ID)
+            self.tracker.update(elements)
+
+            return result
     
         except Exception as e:
             logger.critical(f"❌ CRITICAL: OmniParser parse failed: {e}", exc_info=True)
             raise RuntimeError(f"OmniParser parse MUST work. Error: {e}")
+    
+    def _load_detection_profile(self):
+        """YOLO conf/iou/imgsz from the sweep profile, falling back to defaults"""
+        settings = dict(config.DETECTION_DEFAULTS)
+        try:
+            with open(config.DETECTION_PROFILE_PATH, 'r') as f:
+                profile = json.load(f)
+            settings.update({k: profile[k] for k in ('conf', 'iou', 'imgsz') if k in profile})
+            logger.info(f"✓ Detection profile loaded: {settings}")
+        except FileNotFoundError:
+            logger.info(f"No detection profile, using defaults: {settings}")
+        except Exception as e:
+            logger.warning(f"Invalid detection profile ({e}), using defaults: {settings}")
+        return settings
+    
+    def _compute_model_version(self, icon_model_path):
+        """Fingerprint of everything that changes parse output (weights + settings)"""
+        digest = hashlib.blake2b(digest_size=8)
+        with open(icon_model_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        detection = self.detection_settings
+        settings = f"conf={detection['conf']};iou={detection['iou']};imgsz={detection.get('imgsz')};ocr_min_conf=0.3;tiled={config.OCR_TILED_MODE}:{config.OCR_TILE_SIZE}:{config.OCR_TILE_OVERLAP}"
+        return f"{icon_model_path.name}:{digest.hexdigest()}:{settings}"
+    
+    def _should_tile_ocr(self, width, height):
+        """Decide between serial and tiled OCR for a frame of this size"""
+        mode = config.OCR_TILED_MODE
+        if mode == "always":
+            return True
+        if mode == "auto":
+            # One EasyOCR reader per worker process only pays off on CPU
+            return self.device == 'cpu' and width * height >= config.OCR_TILED_MIN_PIXELS
+        return False
+    
+    def _get_tiled_ocr(self):
+        """Create the tiled OCR pool on first use"""
+        if self.tiled_ocr is None:
+            from vision.tiled_ocr import TiledOCR
+            self.tiled_ocr = TiledOCR(
+                tile_size=config.OCR_TILE_SIZE,
+                overlap=config.OCR_TILE_OVERLAP,
+                workers=config.OCR_TILE_WORKERS,
+                gpu=(self.device == 'cuda'),
+            )
+        return self.tiled_ocr
+    
+    def _ocr_to_elements(self, ocr_result, start_id):
+        """Convert EasyOCR-format detections into parse_screen text elements"""
+        elements = []
+        element_id = start_id
+        if not ocr_result:
+            return elements
+        
+        for detection in ocr_result:
+            try:
+                # EasyOCR format: (bbox_coords, text, confidence)
+                bbox = detection[0]  # [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
+                text = detection[1]  # Detected text
+                conf = detection[2]  # Confidence score
+            
+                # Extract text and confidence safely
+                if not text or len(text.strip()) < 1:
+                    logger.debug(f"Skipping empty OCR text")
+                    continue
+            
+                text = str(text).strip()
+                conf = float(conf) if conf is not None else 0.5
+            
+                # Extract bbox coordinates
+                if not bbox or len(bbox) < 4:
+                    logger.debug(f"Skipping: invalid bbox: {bbox}")
+                    continue
+            
+                x_coords = [float(p[0]) for p in bbox]
+                y_coords = [float(p[1]) for p in bbox]
+            
+                if not x_coords or not y_coords:
+                    logger.debug(f"Skipping: no valid coordinates in bbox")
+                    continue
+            
+                center_x = int(sum(x_coords) / len(x_coords))
+                center_y = int(sum(y_coords) / len(y_coords))
+            
+                # Add non-empty text elements (confidence > 0.3)
+                if conf > 0.3:
+                    elements.append({
+                    'id': element_id,
+                    'label': f'Text: {text[:50]}',  # Truncate long text
+                    'x': center_x,
+                    'y': center_y,
+                    'confidence': conf,
+                    'type': 'text',
+                    'bbox': [int(min(x_coords)), int(min(y_coords)), 
+                            int(max(x_coords)), int(max(y_coords))]
+                    })
+                    element_id += 1
+        
+            except (IndexError, ValueError, TypeError) as e:
+                logger.debug(f"Skipping OCR line due to format error: {e}, line: {detection}")
+                continue
+        
+        return elements
@@ -0,0 +1,262 @@
+"""
+Detection Parameter Sweep - latency/recall trade-off for YOLO settings
+Runs a grid of conf / iou / imgsz settings over a labeled screenshot set,
+tabulates recall against ms per frame and writes the Pareto-optimal
+settings to the detection profile that OmniParserExecutor loads.
+
+Ground truth JSON:
+    {
+      "screenshots": [
+        {"path": "temp_screenshots/screen_1.png",
+         "targets": [{"label": "Send", "x": 1710, "y": 985,
+                      "bbox": [1680, 965, 1740, 1005]}, ...]},
+        ...
+      ]
+    }
+
+A target counts as recalled when a parsed element (YOLO boxes for the
+setting under test plus the OCR text boxes, which do not depend on the swept
+parameters and are computed once) overlaps its labelled bbox with IoU >=
+--min-iou. Targets without a bbox need a box that contains the click point
+and covers at most --max-box-fraction of the frame, so a window-sized
+detection does not count as finding every button inside it.
+
+--imgsz 0 runs YOLO at the frame's native (h, w), as util.utils does; the
+profile then stores "native". Leaving imgsz unset uses the ultralytics
+default (640), which is what parse_screen runs without a profile.
+
+Usage:
+    python -m vision.param_sweep ground_truth.json --conf 0.05 0.1 0.15 0.25 \
+        --iou 0.5 0.7 0.9 --imgsz 640 1280 0 --min-recall 0.95 --plot sweep.png
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+from vision.element_tracker import bbox_iou
+
+logger = logging.getLogger("ParamSweep")
+
+
+def load_ground_truth(path):
+    """Load the ground truth file (paths are relative to the JSON file)"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    samples = []
+    for shot in data.get('screenshots', []):
+        image_path = shot['path']
+        if not os.path.isabs(image_path):
+            image_path = os.path.join(base, image_path)
+        samples.append({'path': image_path, 'targets': shot.get('targets', [])})
+    return samples
+
+
+def _contains(bbox, x, y):
+    return bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]
+
+
+def _predict_size(image, imgsz):
+    """YOLO imgsz for a frame; 0 means native (h, w)"""
+    width, height = image.size
+    return imgsz if imgsz else (height, width)
+
+
+def _matches_target(box, target, frame_area, min_iou=0.5, max_box_fraction=0.05):
+    """True if a parsed box localizes a labelled target"""
+    if target.get('bbox'):
+        return bbox_iou(box, target['bbox']) >= min_iou
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    return _contains(box, target['x'], target['y']) and area <= max_box_fraction * frame_area
+
+
+def _ocr_boxes(reader, image):
+    """OCR text boxes for one frame (independent of the swept settings)"""
+    import numpy as np
+    boxes = []
+    for bbox, text, conf in reader.readtext(np.array(image), detail=1):
+        if conf > 0.3 and str(text).strip():
+            xs = [p[0] for p in bbox]
+            ys = [p[1] for p in bbox]
+            boxes.append([min(xs), min(ys), max(xs), max(ys)])
+    return boxes
+
+
+def run_sweep(model, samples, confs, ious, imgszs, device='cpu', ocr_reader=None, repeats=1,
+              min_iou=0.5, max_box_fraction=0.05):
+    """
+    Evaluate every (conf, iou, imgsz) combination
+
+    Args:
+        imgszs: Inference sizes; 0 means native resolution (each frame's (h, w))
+        min_iou: IoU a box needs with a target's labelled bbox
+        max_box_fraction: Largest box (fraction of the frame) accepted for targets without a bbox
+
+    Returns:
+        list: [{"conf", "iou", "imgsz", "recall", "ms_per_frame", "elements_per_frame"}, ...]
+    """
+    from PIL import Image
+
+    images = [Image.open(s['path']).convert('RGB') for s in samples]
+    ocr = [_ocr_boxes(ocr_reader, img) if ocr_reader else [] for img in images]
+    total_targets = sum(len(s['targets']) for s in samples)
+
+    rows = []
+    for conf, iou, imgsz in itertools.product(confs, ious, imgszs):
+        kwargs = {'conf': conf, 'iou': iou, 'device': device, 'verbose': False}
+        model.predict(images[0], imgsz=_predict_size(images[0], imgsz), **kwargs)  # Warm-up for this input size
+
+        found = 0
+        element_count = 0
+        elapsed = 0.0
+        for image, sample, ocr_boxes in zip(images, samples, ocr):
+            start = time.perf_counter()
+            for _ in range(repeats):
+                results = model.predict(image, imgsz=_predict_size(image, imgsz), **kwargs)
+            elapsed += (time.perf_counter() - start) / repeats
+
+            boxes = [b.xyxy[0].tolist() for b in results[0].boxes] + ocr_boxes
+            element_count += len(boxes)
+            frame_area = image.size[0] * image.size[1]
+            for target in sample['targets']:
+                if any(_matches_target(b, target, frame_area, min_iou, max_box_fraction) for b in boxes):
+                    found += 1
+
+        row = {
+            'conf': conf,
+            'iou': iou,
+            'imgsz': imgsz,
+            'recall': found / total_targets if total_targets else 0.0,
+            'ms_per_frame': elapsed * 1000 / len(images),
+            'elements_per_frame': element_count / len(images),
+        }
+        logger.info(f"conf={conf} iou={iou} imgsz={imgsz or 'native'}: recall={row['recall']:.3f} {row['ms_per_frame']:.1f} ms")
+        rows.append(row)
+    return rows
+
+
+def pareto_front(rows):
+    """Settings not dominated on (higher recall, lower ms), fastest first"""
+    front = []
+    for row in rows:
+        dominated = any(
+            other['recall'] >= row['recall'] and other['ms_per_frame'] <= row['ms_per_frame']
+            and (other['recall'] > row['recall'] or other['ms_per_frame'] < row['ms_per_frame'])
+            for other in rows
+        )
+        if not dominated:
+            front.append(row)
+    return sorted(front, key=lambda r: r['ms_per_frame'])
+
+
+def select_setting(front, min_recall):
+    """Fastest Pareto setting that reaches min_recall (else the most accurate one)"""
+    eligible = [r for r in front if r['recall'] >= min_recall]
+    if eligible:
+        return eligible[0]
+    return max(front, key=lambda r: r['recall'])
+
+
+def format_table(rows, front):
+    """Plain-text table of all settings, Pareto rows marked with '*'"""
+    lines = [f"{'':1} {'conf':>6} {'iou':>5} {'imgsz':>6} {'recall':>7} {'ms/frame':>9} {'elems':>6}"]
+    for r in sorted(rows, key=lambda r: (r['ms_per_frame'], -r['recall'])):
+        mark = '*' if r in front else ' '
+        lines.append(
+            f"{mark:1} {r['conf']:>6.3f} {r['iou']:>5.2f} {str(r['imgsz'] or 'native'):>6} "
+            f"{r['recall']:>7.3f} {r['ms_per_frame']:>9.1f} {r['elements_per_frame']:>6.0f}"
+        )
+    return "\n".join(lines)
+
+
+def plot_sweep(rows, front, output_path):
+    """Scatter of recall vs ms/frame with the Pareto front highlighted"""
+    from matplotlib import pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.scatter([r['ms_per_frame'] for r in rows], [r['recall'] for r in rows], alpha=0.5, label='settings')
+    ax.plot([r['ms_per_frame'] for r in front], [r['recall'] for r in front], 'r-o', label='Pareto front')
+    for r in front:
+        ax.annotate(f"c={r['conf']} i={r['iou']} s={r['imgsz'] or 'native'}",
+                    (r['ms_per_frame'], r['recall']), fontsize=7)
+    ax.set_xlabel('ms per frame (YOLO)')
+    ax.set_ylabel('target recall')
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(output_path)
+
+
+def write_profile(path, selected, front):
+    """Write the detection profile consumed by OmniParserExecutor"""
+    profile = {
+        'generated': datetime.now().isoformat(timespec='seconds'),
+        'conf': selected['conf'],
+        'iou': selected['iou'],
+        'imgsz': selected['imgsz'] or 'native',
+        'expected_recall': selected['recall'],
+        'expected_ms_per_frame': selected['ms_per_frame'],
+        'pareto': front,
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(profile, f, indent=4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep YOLO conf/iou/imgsz against labeled click targets")
+    parser.add_argument("ground_truth", help="Ground truth JSON (see module docstring)")
+    parser.add_argument("--weights", default=os.path.join("weights", "icon_detect", "model.pt"))
+    parser.add_argument("--conf", type=float, nargs='+', default=[0.01, 0.05, 0.1, 0.15, 0.25])
+    parser.add_argument("--iou", type=float, nargs='+', default=[0.5, 0.7, 0.9])
+    parser.add_argument("--imgsz", type=int, nargs='+', default=[640, 1280, 0], help="0 = native resolution")
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--no-ocr", action="store_true", help="Measure YOLO boxes only")
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    parser.add_argument("--min-iou", type=float, default=0.5, help="IoU needed with a target's labelled bbox")
+    parser.add_argument("--max-box-fraction", type=float, default=0.05,
+                        help="Largest box (fraction of the frame) that counts for targets without a bbox")
+    parser.add_argument("--plot", help="Write a recall vs latency plot to this PNG")
+    parser.add_argument("--profile", help="Profile output path (default: config.DETECTION_PROFILE_PATH)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    import torch
+    from ultralytics import YOLO
+
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+    model = YOLO(args.weights)
+    ocr_reader = None
+    if not args.no_ocr:
+        import easyocr
+        ocr_reader = easyocr.Reader(['en'], gpu=(device == 'cuda'))
+
+    samples = load_ground_truth(args.ground_truth)
+    rows = run_sweep(model, samples, args.conf, args.iou, args.imgsz,
+                     device=device, ocr_reader=ocr_reader, repeats=args.repeats,
+                     min_iou=args.min_iou, max_box_fraction=args.max_box_fraction)
+    front = pareto_front(rows)
+    print(format_table(rows, front))
+
+    if args.plot:
+        plot_sweep(rows, front, args.plot)
+        print(f"\nPlot written to {args.plot}")
+
+    profile_path = args.profile
+    if not profile_path:
+        import config
+        profile_path = config.DETECTION_PROFILE_PATH
+    selected = select_setting(front, args.min_recall)
+    write_profile(profile_path, selected, front)
+    print(f"\nSelected conf={selected['conf']} iou={selected['iou']} imgsz={selected['imgsz'] or 'native'} "
+          f"(recall {selected['recall']:.3f}, {selected['ms_per_frame']:.1f} ms/frame)")
+    print(f"Profile written to {profile_path}")
+
+
+if __name__ == "__main__":
+    main()
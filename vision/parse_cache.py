@@ -0,0 +1,191 @@
+"""
+Parse Cache - compact binary format and disk cache for OmniParser results
+Parse results are stored as compressed .npz (columnar numpy arrays plus a
+small JSON header) keyed by frame hash and model version, so warm restarts
+and offline benchmark runs load precomputed parses instead of re-running
+YOLO + OCR.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+logger = logging.getLogger("ParseCache")
+
+# Bump whenever the array layout below changes
+FORMAT_VERSION = 1
+
+# Per-session keys that must not be persisted (they refer to live tracker state)
+_VOLATILE_KEYS = ('track_id', 'track_age')
+
+
+def frame_hash(image):
+    """
+    Content hash of a PIL image (pixels + size + mode)
+    Independent of PNG encoding, so re-saved identical frames still hit.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{image.mode}:{image.size[0]}x{image.size[1]}".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def serialize_parse_result(result):
+    """
+    Encode a parse_screen result as compressed npz bytes
+
+    Layout (all arrays have one row per element):
+        ids int32, bbox int32[N,4], xy int32[N,2], confidence float32,
+        type_codes uint8 (index into header['types']), labels unicode
+    """
+    elements = result.get('elements', [])
+    types = sorted({e.get('type', 'unknown') for e in elements})
+    type_index = {t: i for i, t in enumerate(types)}
+
+    header = {
+        'format_version': FORMAT_VERSION,
+        'types': types,
+        'meta': {k: v for k, v in result.items() if k != 'elements'},
+    }
+
+    buffer = io.BytesIO()
+    np.savez_compressed(
+        buffer,
+        header=np.frombuffer(json.dumps(header).encode('utf-8'), dtype=np.uint8),
+        ids=np.array([e['id'] for e in elements], dtype=np.int32),
+        bbox=np.array([e.get('bbox', [0, 0, 0, 0]) for e in elements], dtype=np.int32).reshape(-1, 4),
+        xy=np.array([(e['x'], e['y']) for e in elements], dtype=np.int32).reshape(-1, 2),
+        confidence=np.array([e.get('confidence', 0) for e in elements], dtype=np.float32),
+        type_codes=np.array([type_index[e.get('type', 'unknown')] for e in elements], dtype=np.uint8),
+        labels=np.array([e.get('label', '') for e in elements], dtype=np.str_),
+    )
+    return buffer.getvalue()
+
+
+def deserialize_parse_result(data):
+    """
+    Decode npz bytes produced by serialize_parse_result
+
+    Raises:
+        ValueError: if the payload was written by a different FORMAT_VERSION
+    """
+    with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+        header = json.loads(arrays['header'].tobytes().decode('utf-8'))
+        if header.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported parse format version: {header.get('format_version')}")
+
+        types = header['types']
+        ids = arrays['ids'].tolist()
+        bboxes = arrays['bbox'].tolist()
+        xys = arrays['xy'].tolist()
+        confidences = arrays['confidence'].tolist()
+        type_codes = arrays['type_codes'].tolist()
+        labels = arrays['labels'].tolist()
+
+    elements = [
+        {
+            'id': ids[i],
+            'label': labels[i],
+            'x': xys[i][0],
+            'y': xys[i][1],
+            'confidence': confidences[i],
+            'type': types[type_codes[i]],
+            'bbox': bboxes[i],
+        }
+        for i in range(len(ids))
+    ]
+    result = dict(header['meta'])
+    result['elements'] = elements
+    return result
+
+
+class ParseResultCache:
+    """Disk cache of parse results keyed by (frame hash, model version)"""
+
+    def __init__(self, cache_dir, model_version, max_entries=500):
+        self.cache_dir = cache_dir
+        self.model_version = model_version
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._version_tag = hashlib.blake2b(
+            f"{FORMAT_VERSION}:{model_version}".encode(), digest_size=6
+        ).hexdigest()
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, frame_key):
+        return os.path.join(self.cache_dir, f"{frame_key}_{self._version_tag}.npz")
+
+    def get(self, frame_key):
+        """Return the cached parse result for a frame hash, or None"""
+        path = self._path(frame_key)
+        try:
+            with open(path, 'rb') as f:
+                result = deserialize_parse_result(f.read())
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        os.utime(path)  # Refresh for LRU eviction
+        return result
+
+    def put(self, frame_key, result):
+        """Store a parse result (volatile tracker keys are stripped)"""
+        clean = dict(result)
+        clean['elements'] = [
+            {k: v for k, v in e.items() if k not in _VOLATILE_KEYS}
+            for e in result.get('elements', [])
+        ]
+        path = self._path(frame_key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(serialize_parse_result(clean))
+            os.replace(tmp_path, path)  # Atomic: readers never see partial files
+        except Exception as e:
+            logger.warning(f"Failed to write parse cache entry: {e}")
+            self._remove(tmp_path)
+            return
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries beyond max_entries"""
+        with self._lock:
+            entries = [
+                os.path.join(self.cache_dir, name)
+                for name in os.listdir(self.cache_dir)
+                if name.endswith('.npz')
+            ]
+            if len(entries) <= self.max_entries:
+                return
+            entries.sort(key=os.path.getmtime)
+            for path in entries[:len(entries) - self.max_entries]:
+                self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def stats(self):
+        """Hit/miss counters for this process"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,129 @@
+"""
+Prompt Compiler - compact, token-budgeted prompts for element selection
+Elements are emitted as one 'id|type|label|x,y' row each (the OmniParser
+'Text: ' prefix and index-only 'UI Element N' labels are dropped),
+near-identical labels at the same spot are collapsed, and rows are added in
+priority order until the token budget is used up.
+"""
+
+import logging
+import re
+
+from vision.fuzzy_scorer import similarity
+
+logger = logging.getLogger("PromptCompiler")
+
+# Gemini tokenizers average roughly 4 characters per token for English/UI text
+CHARS_PER_TOKEN = 4.0
+
+_TYPE_CODES = {'text': 't', 'clickable': 'c'}
+_INDEX_LABEL_RE = re.compile(r'^UI Element \d+$')
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (no API call)"""
+    return int(len(text) / CHARS_PER_TOKEN) + 1 if text else 0
+
+
+def trim_to_budget(text, max_tokens):
+    """Cut text to roughly max_tokens, on a word boundary"""
+    if not text or estimate_tokens(text) <= max_tokens:
+        return text or ''
+    cut = text[:int(max_tokens * CHARS_PER_TOKEN)]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]
+    return cut.rstrip(' ,;') + '…'
+
+
+def compact_label(elem):
+    """Display label for the table ('' for index-only YOLO labels)"""
+    label = str(elem.get('label', ''))
+    if label.startswith('Text: '):
+        label = label[6:]
+    if _INDEX_LABEL_RE.match(label):
+        return ''
+    # '|' is the column separator
+    return re.sub(r'\s+', ' ', label.replace('|', '/')).strip()
+
+
+def dedupe_elements(elements, label_similarity=0.9, distance=48):
+    """
+    Drop elements whose label is near-identical to an earlier element at
+    (almost) the same position, e.g. OCR fragments detected twice or YOLO
+    boxes stacked on one icon. Equal labels far apart are kept.
+    """
+    kept = []
+    for elem in elements:
+        label = compact_label(elem).lower()
+        duplicate = False
+        for other in kept:
+            if abs(elem['x'] - other['x']) > distance or abs(elem['y'] - other['y']) > distance:
+                continue
+            other_label = compact_label(other).lower()
+            if label == other_label or (label and other_label and similarity(label, other_label) >= label_similarity):
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append(elem)
+    return kept
+
+
+def compile_element_table(elements, token_budget, max_rows=50, to_payload=None):
+    """
+    Compact element table within a token budget
+
+    Args:
+        elements: Elements in priority order (most likely targets first)
+        token_budget: Maximum estimated tokens for the table
+        to_payload: Optional (x, y) -> (x, y) mapping into image coordinates
+
+    Returns:
+        tuple: (table text, list of included elements)
+    """
+    header = "id|type|label|x,y"
+    lines = [header]
+    used = estimate_tokens(header)
+    included = []
+
+    for elem in dedupe_elements(elements):
+        if len(included) >= max_rows:
+            break
+        x, y = to_payload(elem['x'], elem['y']) if to_payload else (elem['x'], elem['y'])
+        row = f"{elem['id']}|{_TYPE_CODES.get(elem.get('type'), '?')}|{compact_label(elem)}|{x},{y}"
+        cost = estimate_tokens(row) + 1
+        if used + cost > token_budget:
+            break
+        lines.append(row)
+        used += cost
+        included.append(elem)
+
+    return "\n".join(lines), included
+
+
+def build_selection_prompt(elements, action_description, target_label, profile_name=None,
+                           token_budget=900, max_rows=50, to_payload=None):
+    """
+    Element-selection prompt for Gemini vision
+
+    Returns:
+        tuple: (prompt, valid_ids, stats) where stats has 'tokens', 'rows', 'dropped'
+    """
+    table, included = compile_element_table(elements, token_budget, max_rows, to_payload)
+
+    parts = [f"Task: {action_description}", f"Target: {target_label}"]
+    if profile_name:
+        parts.append(f"Must match label: '{profile_name}' (profile selection)")
+    parts.extend([
+        "Elements on the screenshot (t=text, c=clickable; x,y in image pixels):",
+        table,
+        "Pick the listed element that best matches the task (exact label > partial > visual meaning). Use only listed ids.",
+        'Reply with JSON only: {"id": N, "x": X, "y": Y, "reason": "short"} or {"id": -1, "reason": "..."} if none fits.',
+    ])
+    prompt = "\n".join(parts)
+
+    stats = {
+        'tokens': estimate_tokens(prompt),
+        'rows': len(included),
+        'dropped': len(elements) - len(included),
+    }
+    return prompt, {elem['id'] for elem in included}, stats
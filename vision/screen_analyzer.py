@@ -4,10 +4,21 @@ Methodology: Uses vision + coordinate matching for precise element selection
 """
 
 import logging
+import hashlib
 import json
 import re
-from google.genai import Client, types
-from difflib import SequenceMatcher
+import threading
+import time
+from collections import OrderedDict
+from google.genai import types
+import config
+from models.gemini_service import get_gemini_service
+from vision.decision_cache import DecisionCache, layout_fingerprint
+from vision.element_ranker import rank_elements, SelectionStats
+from vision.fuzzy_scorer import LabelIndex, similarity
+from vision.vision_payload import build_payload, PayloadStats
+from vision.prompt_compiler import build_selection_prompt, trim_to_budget
+from vision.screen_summary import active_window_title, local_summary
 
 logger = logging.getLogger("ScreenAnalyzer")
 
@@ -21,132 +32,133 @@ class ScreenAnalyzer:
         self.gemini_available = False  # Flag to track if Gemini is ready
         self.model_name = None
         self.available_models = []  # Track all available models for fallback
-        self.client = Client(api_key=api_key)
+        self.decision_cache = DecisionCache(
+            ttl_seconds=config.DECISION_CACHE_TTL,
+            max_entries=config.DECISION_CACHE_MAX_ENTRIES
+        )
+        self.selection_stats = SelectionStats()
+        self._label_index = None
+        self.payload_stats = PayloadStats()
+        self._summary_cache = OrderedDict()  # (layout fingerprint, window title) -> {"local", "gemini"}
+        self._summary_lock = threading.Lock()
         
         try:
-            
-            # Models prioritized for VISION support (with image/generateContent support)
-            # Try vision-capable models FIRST
-            models_to_try = [
-                'gemini-2.0-flash',          # Stable 2.0 flash (primary - best quota efficiency)
-                'gemini-2.0-flash-exp',      # Latest with vision support
-                'gemini-1.5-pro',             # Pro has better vision support than flash
-                'gemini-1.5-flash',           # Flash (check API support)
-                'gemini-1.0-pro-vision',      # Explicit vision model
-                'gemini-pro-vision',          # Alternative vision model
-            ]
-            
             self.logger.info("🤖 Initializing Gemini for vision-based coordinate selection...")
-            
-            for model_name in models_to_try:
-                try:
-                    # Create model WITHOUT testing (avoids API calls during init)
-                    self.model_name = model_name
-                    self.gemini_available = True
-                    self.available_models.append(model_name)
-                    self.logger.info(f"✅ Gemini vision model selected: {model_name}")
-                    self.logger.info(f"   Available fallback models: {self.available_models[1:]}")
-                    return
-                except Exception as e:
-                    self.logger.debug(f"   Model '{model_name}' unavailable: {str(e)[:100]}")
-                    self.available_models.append(model_name)  # Track for fallback
-                    continue
-            
-            # If no vision model works, still proceed with fallback
-            self.logger.warning("⚠️ No vision-capable Gemini models available")
-            self.logger.warning("   Will use fuzzy matching for coordinate selection")
-            self.logger.warning("   Check GEMINI_API_KEY and model availability in Google AI Studio")
-            self.gemini_available = False
-            self.model_name = None
+            # Shared pooled client; no API call during init, the router picks a model per call
+            self.gemini = get_gemini_service(api_key)
+            self.client = self.gemini.client
+            self.available_models = list(self.gemini.router.models)
+            self.model_name = self.gemini.router.choose(claim=False)
+            self.gemini_available = True
+            self.logger.info(f"✅ Gemini vision model selected: {self.model_name}")
+            self.logger.info(f"   Available fallback models: {self.available_models[1:]}")
         
         except Exception as e:
             self.logger.error(f"❌ Gemini initialization error: {e}")
+            self.logger.warning("   Will use fuzzy matching for coordinate selection")
             self.gemini_available = False
             self.model_name = None
     
-    def _switch_to_fallback_model(self, current_model_index=None):
-        """
-        Switch to next available model when current one fails (e.g., 429 quota)
-        
-        Returns:
-            bool: True if switched successfully, False if no more models
-        """
-        if current_model_index is None:
-            # Find current model's index
-            try:
-                current_model_index = self.available_models.index(self.model_name)
-            except (ValueError, AttributeError):
-                current_model_index = 0
-        
-        # Try remaining models
-        for i in range(current_model_index + 1, len(self.available_models)):
-            model_name = self.available_models[i]
-            try:
-                self.model = genai.GenerativeModel(model_name)
-                self.model_name = model_name
-                self.logger.warning(f"⚠️ Switched to fallback model: {model_name}")
-                return True
-            except Exception as e:
-                self.logger.debug(f"   Fallback model '{model_name}' also unavailable: {str(e)[:100]}")
-                continue
-        
-        self.logger.error("❌ All fallback models exhausted")
-        return False
-    
-    def get_screen_summary(self, screenshot_path):
+    def get_screen_summary(self, screenshot_path=None, elements=None, use_gemini=False):
         """
         Get 1-2 line screen summary (Methodology requirement)
-        Uses fallback when Gemini unavailable
+        Built locally from the window title and parse result; Gemini is asked
+        only when use_gemini=True (or nothing local is known). Summaries are
+        cached per layout fingerprint, so the same screen is summarized once.
         
         Args:
-            screenshot_path: Path to PNG screenshot
+            screenshot_path: Path to PNG screenshot (needed for Gemini)
+            elements: OmniParser elements of the same screenshot, if parsed
+            use_gemini: Ask Gemini for a richer description
         
         Returns:
             str: Brief screen state description
         """
-        # Fallback: No Gemini call needed
-        self.logger.info("Using fallback screen summary")
-        return "Screen active - processing UI elements"
+        window_title = active_window_title()
+        cache_key = (self._summary_fingerprint(elements, screenshot_path), window_title)
+        cached = None
+        if cache_key[0]:
+            with self._summary_lock:
+                cached = self._summary_cache.get(cache_key)
+                if cached and (not use_gemini or 'gemini' in cached):
+                    self._summary_cache.move_to_end(cache_key)
+                    return cached.get('gemini') or cached['local']
+        
+        summary = local_summary(elements, window_title)
+        # Copy: the Gemini call below runs outside the lock
+        entry = dict(cached) if cached else {'local': summary}
+        
+        if (use_gemini or not (elements or window_title)) and self.gemini_available and screenshot_path:
+            gemini_summary = self._gemini_screen_summary(screenshot_path, summary)
+            if gemini_summary:
+                entry['gemini'] = gemini_summary
+                summary = gemini_summary
+        
+        if cache_key[0]:
+            with self._summary_lock:
+                self._summary_cache[cache_key] = entry
+                self._summary_cache.move_to_end(cache_key)
+                while len(self._summary_cache) > config.SUMMARY_CACHE_MAX_ENTRIES:
+                    self._summary_cache.popitem(last=False)
+        
+        self.logger.info(f"Screen summary: {summary[:100]}")
+        return summary
+    
+    @staticmethod
+    def _summary_fingerprint(elements, screenshot_path):
+        """Layout fingerprint of the parse, else a hash of the screenshot file"""
+        if elements:
+            return layout_fingerprint(elements)
+        if screenshot_path:
+            try:
+                with open(screenshot_path, 'rb') as f:
+                    return hashlib.blake2b(f.read(), digest_size=12).hexdigest()
+            except OSError:
+                return None
+        return None
+    
+    def _gemini_screen_summary(self, screenshot_path, local_hint):
+        """Gemini description of a (downscaled) screenshot, or None"""
         try:
-            with open(screenshot_path, 'rb') as f:
-                image_data = f.read()
-            
-            image_part = {
-                "mime_type": "image/png",
-                "data": image_data
-            }
-            
-            prompt = """Analyze this screenshot and provide a concise 1-2 line summary describing:
-
-1. What application is open
-2. Current screen state
-3. Visible UI elements
-
-Keep it brief and factual. Example: "Chrome browser is open showing YouTube homepage with search bar visible at top."
-
-Summary:"""
+            payload = build_payload(
+                screenshot_path,
+                max_edge=config.VISION_PAYLOAD_MAX_EDGE,
+                image_format=config.VISION_PAYLOAD_FORMAT,
+                quality=config.VISION_PAYLOAD_QUALITY
+            )
+            image_part = types.Part(inlineData=types.Blob(mimeType=payload.mime_type, data=payload.data))
+            
+            prompt = (
+                "Summarize this screenshot in 1-2 factual lines: which application is open, "
+                "the current screen state and the key visible controls.\n"
+                f"Local context: {trim_to_budget(local_hint, config.STEP_SUMMARY_TOKEN_BUDGET)}\n"
+                "Example: \"Chrome browser is open showing YouTube homepage with search bar visible at top.\"\n"
+                "Summary:"
+            )
             
             self.logger.info("Requesting screen summary from Gemini...")
-            response = self.model.generate_content([prompt, image_part])
+            response, self.model_name = self.gemini.generate_sync([prompt, image_part])
             
             # Extract text safely
             if hasattr(response, 'text'):
-                summary = response.text.strip()
-            else:
-                summary = str(response).strip()
-            
-            self.logger.info(f"Screen summary: {summary[:100]}...")
-            return summary
+                return response.text.strip()
+            return str(response).strip()
         
         except Exception as e:
             self.logger.error(f"Screen summary error: {e}")
-            return "Unable to analyze screen"
+            return None
     
     def _calculate_text_similarity(self, text1, text2):
         """Calculate similarity between two text strings (0-1)"""
         if not text1 or not text2:
             return 0.0
-        return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
+        return similarity(text1.lower(), text2.lower())
+    
+    def _get_label_index(self, elements):
+        """Preprocessed labels for this parse (rebuilt only when the element list changes)"""
+        if self._label_index is None or self._label_index.elements is not elements:
+            self._label_index = LabelIndex(elements)
+        return self._label_index
     
     def _fuzzy_match_element(self, target, elements, profile_name=None):
         """
@@ -155,47 +167,15 @@ Summary:"""
         Returns:
             tuple: (x, y) or None
         """
-        best_match = None
-        best_score = 0.0
-        
         self.logger.info(f"🔍 Fuzzy matching: target='{target}', profile_name='{profile_name}'")
+        index = self._get_label_index(elements)
         
-        for elem in elements:
-            label = elem.get('label', '').lower()
-            confidence = elem.get('confidence', 0)
-            
-            # If profile_name is specified, prioritize matching it first
-            if profile_name:
-                profile_lower = profile_name.lower()
-                profile_similarity = self._calculate_text_similarity(profile_lower, label)
-                
-                # Boost score for exact substring matches
-                if profile_lower in label or label in profile_lower:
-                    profile_similarity = max(profile_similarity, 0.95)
-                
-                # Combine profile match with confidence (profile is PRIMARY)
-                profile_score = profile_similarity * 0.9 + (confidence * 0.1)
-                
-                if profile_score > best_score and profile_score > 0.5:
-                    best_score = profile_score
-                    best_match = elem
-                    self.logger.debug(f"  Profile match candidate: '{label}' (score: {profile_score:.2f})")
-            else:
-                # No profile specified, match against target description
-                target_lower = target.lower()
-                similarity = self._calculate_text_similarity(target_lower, label)
-                
-                # Boost score for exact substring matches
-                if target_lower in label or label in target_lower:
-                    similarity = max(similarity, 0.9)
-                
-                # Combine with element confidence
-                combined_score = similarity * 0.7 + (confidence * 0.3)
-                
-                if combined_score > best_score and combined_score > 0.5:
-                    best_score = combined_score
-                    best_match = elem
-                    self.logger.debug(f"  Target match candidate: '{label}' (score: {combined_score:.2f})")
+        if profile_name:
+            # Profile is PRIMARY: similarity * 0.9 + confidence * 0.1
+            best_match, best_score = index.best(profile_name, similarity_weight=0.9, substring_boost=0.95)
+        else:
+            # Target description: similarity * 0.7 + confidence * 0.3
+            best_match, best_score = index.best(target, similarity_weight=0.7, substring_boost=0.9)
         
         if best_match:
             self.logger.info(f"✓ Fuzzy match: '{best_match['label']}' (score: {best_score:.2f})")
@@ -241,97 +221,11 @@ Summary:"""
         except Exception as e:
             self.logger.error(f"Coordinate filtering error: {e}")
             return {"x": 0, "y": 0, "operation": "click", "confidence": 0}
-        try:
-            if not omniparser_elements:
-                self.logger.warning("No elements to filter")
-                return {"x": 0, "y": 0, "operation": "click", "confidence": 0}
-            
-            # Simplify elements for Gemini (top 30 by confidence)
-            sorted_elements = sorted(
-                omniparser_elements, 
-                key=lambda e: e.get('confidence', 0), 
-                reverse=True
-            )[:30]
-            
-            simplified = []
-            for e in sorted_elements:
-                simplified.append({
-                    'id': e.get('id'),
-                    'label': e.get('label', ''),
-                    'x': e.get('x'),
-                    'y': e.get('y'),
-                    'type': e.get('type', 'unknown'),
-                    'confidence': round(e.get('confidence', 0), 2)
-                })
-            
-            prompt = f"""You are filtering UI elements to execute this step: "{step_description}"
-
-Available elements (sorted by confidence):
-{json.dumps(simplified, indent=2)}
-
-Return ONLY a valid JSON object with this exact structure:
-{{
-  "element_id": 5,
-  "x": 100,
-  "y": 200,
-  "operation": "click",
-  "confidence": 85
-}}
-
-Valid operations: click, double_click, right_click
-
-Choose the element that best matches the step description. Consider:
-- Label text similarity
-- Element type appropriateness
-- Element confidence score
-
-JSON:"""
-            
-            self.logger.info(f"Filtering coordinates for: {step_description}")
-            response = self.model.generate_content(prompt)
-            
-            # Extract and parse JSON safely
-            if hasattr(response, 'text'):
-                response_text = response.text.strip()
-            else:
-                response_text = str(response).strip()
-            
-            # ✅ FIX: Handle markdown JSON properly
-            if '```json' in response_text:
-                response_text = response_text.split('```json')[1].split('```')[0].strip()
-            elif '```' in response_text:
-                parts = response_text.split('```')
-                for part in parts:
-                    if '{' in part and '}' in part:
-                        response_text = part.strip()
-                        break
-            
-            # Extract JSON object
-            json_match = re.search(r'\{.*?\}', response_text, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group(0))
-                
-                # Validate result structure
-                if all(k in result for k in ['x', 'y', 'operation']):
-                    self.logger.info(f"Selected: ({result.get('x')}, {result.get('y')}) confidence: {result.get('confidence', 0)}%")
-                    return result
-                else:
-                    self.logger.warning(f"Invalid JSON structure: {result}")
-                    return {"x": 0, "y": 0, "operation": "click", "confidence": 0}
-            else:
-                self.logger.warning("No JSON found in response")
-                return {"x": 0, "y": 0, "operation": "click", "confidence": 0}
-        
-        except json.JSONDecodeError as e:
-            self.logger.error(f"JSON parsing error: {e}")
-            return {"x": 0, "y": 0, "operation": "click", "confidence": 0}
-        except Exception as e:
-            self.logger.error(f"Coordinate filtering error: {e}")
-            return {"x": 0, "y": 0, "operation": "click", "confidence": 0}
     
     def select_coordinate(self, elements, target_label, step_context, profile_name=None, screenshot_path=None):
         """
-        Use Gemini + vision to select best coordinate from OmniParser elements
+        Select best coordinate from OmniParser elements
+        Local ranking first; Gemini + vision only when the local winner is ambiguous
         
         Args:
             elements: List of {id, label, x, y, type, confidence} from OmniParser
@@ -354,158 +248,219 @@ JSON:"""
         for elem in elements[:10]:  # Log first 10
             self.logger.debug(f"  Element: {elem.get('label', 'N/A')} at ({elem['x']}, {elem['y']}) - conf: {elem.get('confidence', 0):.2f}")
         
+        # Reuse a recent decision if the screen layout is unchanged
+        cache_key = DecisionCache.make_key(layout_fingerprint(elements), target_label, profile_name)
+        cached = self.decision_cache.get(cache_key, elements)
+        if cached:
+            return cached
+        
+        result = None
+        source = None
+        
+        # Local ranking first; Gemini only when the winner is not clearly ahead
+        ranked = rank_elements(target_label, elements, profile_name, top_n=config.VISION_PAYLOAD_TOP_K)
+        top_score = ranked[0][0] if ranked else 0.0
+        margin = top_score - ranked[1][0] if len(ranked) > 1 else top_score
+        local_choice = (ranked[0][1]['x'], ranked[0][1]['y']) if ranked else None
+        
+        if top_score >= config.LOCAL_SELECT_MIN_SCORE and margin >= config.LOCAL_SELECT_MARGIN:
+            best = ranked[0][1]
+            self.logger.info(f"✓ Local selection: '{best['label']}' at {local_choice} "
+                             f"(score: {top_score:.2f}, margin: {margin:.2f})")
+            self.selection_stats.record_local()
+            result = local_choice
+            source = 'local'
+        
         # If Gemini available and we have screenshot, use vision-based selection
-        if self.gemini_available and screenshot_path:
+        elif self.gemini_available and screenshot_path:
+            self.logger.info(f"Escalating to Gemini (local score: {top_score:.2f}, margin: {margin:.2f})")
+            # Crop to the local candidates only when the ranking found something plausible
+            candidates = None
+            if top_score >= config.VISION_PAYLOAD_CROP_MIN_SCORE:
+                candidates = [elem for _, elem in ranked]
             result = self._gemini_select_coordinate_with_vision(
-                elements, target_label, step_context, profile_name, screenshot_path
+                elements, target_label, step_context, profile_name, screenshot_path,
+                candidates=candidates, priority=[elem for _, elem in ranked]
             )
-            if result:
-                return result
-            self.logger.info("Gemini vision selection failed, trying fuzzy match fallback...")
+            self.selection_stats.record_escalation(margin, top_score, local_choice, result)
+            source = 'gemini'
+            if not result:
+                self.logger.info("Gemini vision selection failed, trying fuzzy match fallback...")
+        
+        # Gemini unavailable, no screenshot, or no answer: best local guess
+        if not result:
+            if top_score >= config.VISION_LOCAL_DECISION_MIN_SCORE:
+                self.logger.info(f"Using local ranking fallback: '{ranked[0][1]['label']}' at {local_choice} "
+                                 f"(score: {top_score:.2f})")
+                result = local_choice
+                source = 'local_fallback'
+            else:
+                self.logger.info("Using fuzzy matching fallback...")
+                result = self._fuzzy_match_element(target_label, elements, profile_name)
+                source = 'fuzzy'
         
-        # Fallback to fuzzy matching if Gemini unavailable or failed
-        self.logger.info("Using fuzzy matching fallback...")
-        return self._fuzzy_match_element(target_label, elements, profile_name)
+        # Only confident decisions are reused; fallback guesses are recomputed next time
+        if result and source in ('local', 'gemini'):
+            chosen = next((e for e in elements if (e['x'], e['y']) == tuple(result)), None)
+            if chosen:
+                self.decision_cache.put(cache_key, chosen, source=source)
+        return result
+    
+    def forget_decision(self, elements, target_label, profile_name=None):
+        """Drop the cached decision for a target (e.g. after the click had no effect)"""
+        cache_key = DecisionCache.make_key(layout_fingerprint(elements), target_label, profile_name)
+        self.decision_cache.invalidate(cache_key)
     
-    def _gemini_select_coordinate_with_vision(self, elements, target_label, step_context, profile_name, screenshot_path):
+    def get_decision_cache_stats(self):
+        """Decision cache hit metrics"""
+        return self.decision_cache.stats()
+    
+    def get_selection_stats(self):
+        """Local-vs-Gemini escalation rate and agreement (for tuning LOCAL_SELECT_MARGIN)"""
+        return self.selection_stats.summary()
+    
+    def get_payload_stats(self):
+        """Bytes sent and end-to-end latency of vision calls per VISION_PAYLOAD_MODE"""
+        return self.payload_stats.summary()
+    
+    def _build_vision_payload(self, screenshot_path, candidates):
+        """
+        Image payload for a vision call
+        
+        Returns:
+            tuple: (VisionPayload or None, mode) - None means the raw PNG is sent
+        """
+        mode = config.VISION_PAYLOAD_MODE
+        if mode == "png":
+            return None, mode
+        if mode == "crop" and not candidates:
+            mode = "full"
+        try:
+            payload = build_payload(
+                screenshot_path,
+                candidates=candidates if mode == "crop" else None,
+                margin=config.VISION_PAYLOAD_MARGIN,
+                max_edge=config.VISION_PAYLOAD_MAX_EDGE,
+                image_format=config.VISION_PAYLOAD_FORMAT,
+                quality=config.VISION_PAYLOAD_QUALITY
+            )
+            return payload, mode
+        except Exception as e:
+            self.logger.warning(f"Payload encoding failed ({e}), sending full PNG")
+            return None, "png"
+    
+    def _gemini_select_coordinate_with_vision(self, elements, target_label, step_context, profile_name, screenshot_path,
+                                              candidates=None, priority=None):
         """
         Use Gemini with actual screenshot image to select the correct coordinate
         Gemini can see the visual profile buttons and match them to profile_name
+        
+        Args:
+            candidates: Elements the image is cropped to (None = whole frame)
+            priority: Elements to list first in the prompt (local ranking)
         """
         try:
-            # Read screenshot image
-            try:
-                with open(screenshot_path, 'rb') as f:
-                    image_data = f.read()
-            except Exception as e:
-                self.logger.warning(f"Failed to read screenshot: {e}")
-                return None
+            call_start = time.perf_counter()
+            payload, payload_mode = self._build_vision_payload(screenshot_path, candidates)
             
-            # Format elements for Gemini (top 50 elements)
-            # ✅ IMPORTANT: Build list of valid IDs for validation
-            valid_ids = set()
-            element_list = []
-            for idx, elem in enumerate(elements[:50]):
-                elem_id = elem['id']
-                valid_ids.add(elem_id)
-                element_list.append(
-                    f"ID {elem_id}: '{elem['label']}' at ({elem['x']}, {elem['y']}) "
-                    f"[type: {elem.get('type', 'unknown')}, conf: {elem.get('confidence', 0):.2f}]"
-                )
+            if payload is None:
+                # Read screenshot image
+                try:
+                    with open(screenshot_path, 'rb') as f:
+                        image_data = f.read()
+                except Exception as e:
+                    self.logger.warning(f"Failed to read screenshot: {e}")
+                    return None
+                mime_type = "image/png"
+                visible = elements
+                to_payload = lambda x, y: (x, y)
+            else:
+                image_data = payload.data
+                mime_type = payload.mime_type
+                # Only list what Gemini can actually see, in image coordinates
+                visible = [elem for elem in elements if payload.contains(elem['x'], elem['y'])]
+                to_payload = payload.to_payload
+            
+            # Most likely targets first so budget trimming drops the unlikely ones
+            if priority:
+                priority_ids = {id(elem) for elem in priority}
+                visible_ids = {id(elem) for elem in visible}
+                visible = [e for e in priority if id(e) in visible_ids] + [e for e in visible if id(e) not in priority_ids]
             
             action_description = step_context.get("description", "")
             if not action_description:
                 action_description = target_label
             
-            # Build prompt with profile prioritization
-            prompt_parts = [
-                f"🎯 ACTION: {action_description}",
-                f"🔍 TARGET: {target_label}"
-            ]
-            
-            if profile_name:
-                prompt_parts.append(f"⭐ PRIORITY: Look for UI element labeled '{profile_name}' (CRITICAL for profile selection)")
-            
-            prompt_parts.extend([
-                "",
-                "AVAILABLE UI ELEMENTS FROM OMNIPARSER:",
-                "\n".join(element_list),
-                "",
-                "INSTRUCTIONS:",
-                "1. Look at the screenshot visually - you can see the actual UI",
-                "2. If PRIORITY is given, MUST select element matching that exact text/profile name",
-                "3. Match element labels to action description (exact > partial > semantic)",
-                "4. For profile selection: look for clickable profile buttons/names on screen",
-                "5. Return the element ID that BEST matches the action",
-                "6. ⚠️  ONLY use IDs from the list above - do NOT invent IDs",
-                "",
-                "RESPONSE: Return ONLY valid JSON (no markdown): {\"id\": N, \"x\": X, \"y\": Y, \"reason\": \"brief why\"}"
-            ])
-            
-            prompt = "\n".join(prompt_parts)
+            # Compact id|type|label|x,y table within the token budget
+            # ✅ IMPORTANT: valid_ids are the listed elements, for validation
+            prompt, valid_ids, prompt_stats = build_selection_prompt(
+                visible, action_description, target_label, profile_name,
+                token_budget=config.PROMPT_TOKEN_BUDGET,
+                max_rows=config.PROMPT_MAX_ELEMENTS,
+                to_payload=to_payload
+            )
             
-            self.logger.info(f"📸 Sending to Gemini ({self.model_name}): screenshot + {len(elements)} elements + profile='{profile_name}'")
+            self.logger.info(f"📸 Sending to Gemini ({self.model_name}): {payload_mode} image ({len(image_data) / 1024:.0f} KB) "
+                             f"+ {prompt_stats['rows']} elements (~{prompt_stats['tokens']} tokens, "
+                             f"{prompt_stats['dropped']} dropped) + profile='{profile_name}'")
             self.logger.debug(f"Prompt length: {len(prompt)} chars")
             
             # Create image part using proper google.genai types
-            image_blob = types.Blob(mimeType="image/png", data=image_data)
+            image_blob = types.Blob(mimeType=mime_type, data=image_data)
             image_part = types.Part(inlineData=image_blob)
             
             # Initialize response_text to None
             response_text = None
-            max_retries = 2
-            retry_count = 0
             
-            # Call Gemini with BOTH image and text (with retry on quota error)
-            while retry_count < max_retries:
-                try:
-                    self.logger.debug(f"Calling {self.model_name} with vision capabilities... (attempt {retry_count + 1})")
-                    response = self.client.models.generate_content(
-                        model=self.model_name,
-                        contents=[prompt, image_part]
-                    )
-                    
-                    # Extract response
-                    if hasattr(response, 'text'):
-                        response_text = response.text.strip()
-                    else:
-                        response_text = str(response).strip()
-                    
-                    self.logger.debug(f"Gemini response: {response_text[:300]}")
-                    break  # Success - exit retry loop
-                    
-                except Exception as api_error:
-                    error_msg = str(api_error)
-                    self.logger.error(f"❌ Gemini API Error: {error_msg[:200]}")
-                    
-                    # Check for specific API issues
-                    if "404" in error_msg or "not found" in error_msg.lower():
-                        self.logger.error(f"   Model {self.model_name} doesn't support images on this API")
-                        self.logger.error("   Fix: Try updating google-generativeai package")
-                        self.logger.error("   $ pip install --upgrade google-generativeai")
-                        # Try fallback model
-                        if self._switch_to_fallback_model():
-                            retry_count += 1
-                            continue
-                        return None
-                    
-                    elif "429" in error_msg or "quota" in error_msg.lower():
-                        self.logger.error("   API quota exceeded - attempting to switch to fallback model...")
-                        # Try to switch to a lower-tier model with better quota limits
-                        if self._switch_to_fallback_model():
-                            retry_count += 1
-                            self.logger.info(f"   Retrying with {self.model_name}...")
-                            continue
+            # Call Gemini with BOTH image and text (the shared service handles
+            # model fallback, hedging and the deadline)
+            try:
+                self.logger.debug(f"Calling Gemini with vision capabilities (deadline {config.GEMINI_VISION_DEADLINE}s)...")
+                response, self.model_name = self.gemini.generate_sync(
+                    [prompt, image_part], deadline=config.GEMINI_VISION_DEADLINE
+                )
+                
+                # Extract response
+                if hasattr(response, 'text'):
+                    response_text = response.text.strip()
+                else:
+                    response_text = str(response).strip()
+                
+                self.logger.debug(f"Gemini response: {response_text[:300]}")
+                
+            except Exception as api_error:
+                error_msg = str(api_error)
+                self.logger.error(f"❌ Gemini API Error: {error_msg[:200]}")
+                
+                if "SAFETY" in error_msg or "blocked" in error_msg.lower():
+                    self.logger.warning("   Image blocked by safety filter - trying without image")
+                    # Try text-only fallback
+                    try:
+                        response, self.model_name = self.gemini.generate_sync(prompt)
+                        if hasattr(response, 'text'):
+                            response_text = response.text.strip()
                         else:
-                            self.logger.error("   No fallback models available - will use fuzzy matching")
-                            return None
-                    
-                    elif "SAFETY" in error_msg or "blocked" in error_msg.lower():
-                        self.logger.warning("   Image blocked by safety filter - trying without image")
-                        # Try text-only fallback
-                        try:
-                            response = self.client.models.generate_content(
-                                model=self.model_name,
-                                contents=prompt
-                            )
-                            if hasattr(response, 'text'):
-                                response_text = response.text.strip()
-                            else:
-                                response_text = str(response).strip()
-                            self.logger.info("   Text-only fallback succeeded")
-                            break  # Exit retry loop if text-only works
-                        except Exception as e:
-                            self.logger.error(f"   Text-only fallback also failed: {e}")
-                            return None
-                    else:
-                        self.logger.error(f"   Unhandled API error - falling back to fuzzy match")
+                            response_text = str(response).strip()
+                        self.logger.info("   Text-only fallback succeeded")
+                    except Exception as e:
+                        self.logger.error(f"   Text-only fallback also failed: {e}")
                         return None
+                else:
+                    # select_coordinate falls back to the local ranking / fuzzy match on None
+                    self.logger.error("   No Gemini model answered - falling back to local ranking")
+                    return None
             
             # Only process response if we successfully got response_text
             if response_text is None:
                 self.logger.error("No response from Gemini and no fallback available")
                 return None
             
+            latency_ms = (time.perf_counter() - call_start) * 1000
+            original_bytes = payload.original_bytes if payload else len(image_data)
+            self.payload_stats.record(payload_mode, original_bytes, len(image_data), latency_ms,
+                                      prompt_tokens=prompt_stats['tokens'])
+            self.logger.info(f"⏱️ Vision call ({payload_mode}): {len(image_data) / 1024:.0f} KB sent in {latency_ms:.0f} ms")
+            
             # Parse JSON
             if '```json' in response_text:
                 response_text = response_text.split('```json')[1].split('```')[0].strip()
@@ -531,6 +486,14 @@ JSON:"""
                 if elem_id not in valid_ids:
                     self.logger.warning(f"⚠️  Element ID {elem_id} returned by Gemini is not in valid element list")
                     self.logger.warning(f"   Valid IDs are: {sorted(valid_ids)}")
+                    if payload is not None and isinstance(result.get('x'), (int, float)) and isinstance(result.get('y'), (int, float)):
+                        # Map the returned image coordinates back to the screen
+                        x, y = payload.to_screen(result['x'], result['y'])
+                        for elem in visible:
+                            bbox = elem.get('bbox')
+                            if bbox and bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]:
+                                self.logger.info(f"✅ Gemini point ({result['x']}, {result['y']}) maps to '{elem['label']}' at ({elem['x']}, {elem['y']})")
+                                return (elem['x'], elem['y'])
                     self.logger.info("   Falling back to fuzzy matching...")
                     return self._fuzzy_match_element(target_label, elements, profile_name)
                 
@@ -0,0 +1,85 @@
+"""
+Screen Summary - short description of the current screen built from a parse
+Uses the foreground window title, element counts and the most prominent OCR
+text (largest, most confident lines) so planners get real screen context
+without a Gemini call.
+"""
+
+import logging
+import re
+
+logger = logging.getLogger("ScreenSummary")
+
+
+def active_window_title():
+    """Title of the foreground window ('' if unavailable on this platform)"""
+    try:
+        import pygetwindow as gw
+        window = gw.getActiveWindow()
+        return (window.title or '').strip() if window else ''
+    except Exception as e:
+        logger.debug(f"Active window title unavailable: {e}")
+        return ''
+
+
+def foreground_app(window_title=None):
+    """
+    Coarse screen signature: the application part of the foreground window
+    title ("Inbox - Outlook" -> "outlook"), '' when unknown
+    """
+    title = active_window_title() if window_title is None else window_title
+    for separator in (' - ', ' — ', ' | '):
+        if separator in title:
+            title = title.rsplit(separator, 1)[1]
+            break
+    return title.strip().lower()
+
+
+def dominant_text(elements, limit=6, min_length=2):
+    """
+    Most prominent OCR lines: tallest text first (headings, buttons), then
+    confidence, de-duplicated case-insensitively
+    """
+    texts = []
+    for elem in elements:
+        if elem.get('type') != 'text':
+            continue
+        label = str(elem.get('label', ''))
+        if label.startswith('Text: '):
+            label = label[6:]
+        label = re.sub(r'\s+', ' ', label).strip()
+        if len(label) < min_length:
+            continue
+        bbox = elem.get('bbox') or [0, 0, 0, 0]
+        texts.append((bbox[3] - bbox[1], elem.get('confidence', 0), label))
+
+    texts.sort(key=lambda t: (t[0], t[1]), reverse=True)
+    seen = set()
+    result = []
+    for _, _, label in texts:
+        key = label.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        result.append(label)
+        if len(result) >= limit:
+            break
+    return result
+
+
+def local_summary(elements, window_title=''):
+    """One-line summary from the window title and a parse result"""
+    parts = []
+    if window_title:
+        parts.append(f"Window: '{window_title}'")
+
+    if elements:
+        text_count = sum(1 for e in elements if e.get('type') == 'text')
+        parts.append(f"{len(elements)} UI elements ({text_count} text, {len(elements) - text_count} clickable)")
+        prominent = dominant_text(elements)
+        if prominent:
+            parts.append("Main text: " + ", ".join(f"'{t[:40]}'" for t in prominent))
+    elif not window_title:
+        return "Screen active - no parse available"
+
+    return ". ".join(parts) + "."
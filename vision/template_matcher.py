@@ -0,0 +1,229 @@
+"""
+Template Matcher - fast re-location of previously clicked targets
+After a vision click is verified (the screen changed) the pixels of the
+clicked element are kept (per app + target). The next time the same target is requested, a
+multi-scale cv2.matchTemplate search around the last known position is
+tried first; the full YOLO + OCR + Gemini path only runs when no confident
+match is found.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+import cv2
+
+logger = logging.getLogger("TemplateMatcher")
+
+
+def _normalize(text):
+    return re.sub(r'\s+', ' ', str(text or '').lower()).strip()
+
+
+def screen_changed(before_path, after_path, min_fraction=0.002, pixel_delta=25):
+    """
+    True if enough pixels differ between two screenshots (used to verify a click)
+
+    Args:
+        min_fraction: Fraction of pixels that must change
+        pixel_delta: Grey-level difference for a pixel to count as changed
+    """
+    before = cv2.imread(before_path, cv2.IMREAD_GRAYSCALE)
+    after = cv2.imread(after_path, cv2.IMREAD_GRAYSCALE)
+    if before is None or after is None or before.shape != after.shape:
+        # Cannot compare (e.g. resolution changed); treat as a change
+        return True
+    changed = cv2.countNonZero(cv2.threshold(cv2.absdiff(before, after), pixel_delta, 255, cv2.THRESH_BINARY)[1])
+    return changed / before.size >= min_fraction
+
+
+class TargetTemplateStore:
+    """Per-app crops of successful click targets with ROI-first matching"""
+
+    def __init__(self, store_dir, match_threshold=0.9, roi_margin=160,
+                 scales=(0.9, 1.0, 1.1), max_crop=(240, 120), max_templates=200):
+        """
+        Args:
+            store_dir: Directory for template PNGs + index.json
+            match_threshold: Minimum TM_CCOEFF_NORMED score to trust a match
+            roi_margin: Pixels searched around the last click position first
+            scales: Template scales tried (handles DPI / zoom changes)
+            max_crop: (w, h) cap for stored crops
+        """
+        self.store_dir = store_dir
+        self.match_threshold = match_threshold
+        self.roi_margin = roi_margin
+        self.scales = scales
+        self.max_crop = max_crop
+        self.max_templates = max_templates
+        self.templates = {}  # key -> {"file", "x", "y", "w", "h", "hits", "updated"}
+        self._images = {}    # key -> grayscale crop (lazy loaded)
+        self._lock = threading.Lock()
+
+        os.makedirs(store_dir, exist_ok=True)
+        self._index_path = os.path.join(store_dir, 'index.json')
+        self._load_index()
+
+    @staticmethod
+    def make_key(app, target, profile_name=None):
+        return f"{_normalize(app) or 'global'}|{_normalize(target)}|{_normalize(profile_name)}"
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, 'r') as f:
+                self.templates = json.load(f)
+            logger.info(f"✓ Loaded {len(self.templates)} click templates")
+        except FileNotFoundError:
+            self.templates = {}
+        except Exception as e:
+            logger.warning(f"Click template index unreadable ({e}), starting empty")
+            self.templates = {}
+
+    def _save_index(self):
+        tmp_path = f"{self._index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.templates, f, indent=2)
+        os.replace(tmp_path, self._index_path)
+
+    def _get_image(self, key):
+        if key not in self._images:
+            entry = self.templates[key]
+            image = cv2.imread(os.path.join(self.store_dir, entry['file']), cv2.IMREAD_GRAYSCALE)
+            if image is None:
+                return None
+            self._images[key] = image
+        return self._images[key]
+
+    def remember(self, key, screenshot_path, x, y, bbox=None):
+        """
+        Store the crop of a clicked target (call only once the click is verified)
+
+        Args:
+            bbox: [x1, y1, x2, y2] of the clicked element if known, else a
+                  fixed-size box around (x, y) is used
+        """
+        frame = cv2.imread(screenshot_path, cv2.IMREAD_GRAYSCALE)
+        if frame is None:
+            return
+        height, width = frame.shape[:2]
+        max_w, max_h = self.max_crop
+
+        if bbox:
+            x1, y1, x2, y2 = bbox
+            x1, y1, x2, y2 = x1 - 4, y1 - 4, x2 + 4, y2 + 4
+        else:
+            x1, y1, x2, y2 = x - 40, y - 16, x + 40, y + 16
+
+        # Clamp to max size (centred on the click) and to the frame
+        if x2 - x1 > max_w:
+            x1, x2 = x - max_w // 2, x + max_w // 2
+        if y2 - y1 > max_h:
+            y1, y2 = y - max_h // 2, y + max_h // 2
+        x1, y1 = max(0, int(x1)), max(0, int(y1))
+        x2, y2 = min(width, int(x2)), min(height, int(y2))
+        if x2 - x1 < 8 or y2 - y1 < 8:
+            return
+
+        crop = frame[y1:y2, x1:x2].copy()
+        if crop.std() < 2.0:
+            # Flat crops (blank areas) match everywhere; never trust them
+            logger.debug(f"Skipping featureless template for {key}")
+            return
+
+        with self._lock:
+            entry = self.templates.get(key) or {
+                'file': f"tpl_{hashlib.md5(key.encode('utf-8')).hexdigest()[:12]}.png",
+                'hits': 0,
+            }
+            cv2.imwrite(os.path.join(self.store_dir, entry['file']), crop)
+            entry.update({
+                'x': int(x), 'y': int(y),
+                'offset_x': int(x - x1), 'offset_y': int(y - y1),
+                'w': x2 - x1, 'h': y2 - y1,
+                'updated': time.time(),
+            })
+            self.templates[key] = entry
+            self._images[key] = crop
+            self._evict()
+            self._save_index()
+        logger.info(f"📌 Stored click template for {key} ({x2 - x1}x{y2 - y1})")
+
+    def _evict(self):
+        if len(self.templates) <= self.max_templates:
+            return
+        oldest = sorted(self.templates, key=lambda k: self.templates[k].get('updated', 0))
+        for key in oldest[:len(self.templates) - self.max_templates]:
+            entry = self.templates.pop(key)
+            self._images.pop(key, None)
+            try:
+                os.remove(os.path.join(self.store_dir, entry['file']))
+            except OSError:
+                pass
+
+    def _match(self, region, template):
+        """Best (score, x, y, scale) of a multi-scale match inside region"""
+        best = (-1.0, 0, 0, 1.0)
+        for scale in self.scales:
+            if scale == 1.0:
+                scaled = template
+            else:
+                scaled = cv2.resize(template, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            th, tw = scaled.shape[:2]
+            if th > region.shape[0] or tw > region.shape[1] or th < 4 or tw < 4:
+                continue
+            result = cv2.matchTemplate(region, scaled, cv2.TM_CCOEFF_NORMED)
+            _, score, _, location = cv2.minMaxLoc(result)
+            if score > best[0]:
+                best = (score, location[0], location[1], scale)
+        return best
+
+    def locate(self, key, screenshot_path):
+        """
+        Find a stored target in a new screenshot
+
+        Returns:
+            tuple: (x, y, score) click point in screen coordinates, or None
+        """
+        if key not in self.templates:
+            return None
+        template = self._get_image(key)
+        frame = cv2.imread(screenshot_path, cv2.IMREAD_GRAYSCALE)
+        if template is None or frame is None:
+            return None
+
+        start = time.perf_counter()
+        entry = self.templates[key]
+        height, width = frame.shape[:2]
+
+        # 1) ROI around the last click position, 2) whole frame
+        rx1 = max(0, entry['x'] - entry['offset_x'] - self.roi_margin)
+        ry1 = max(0, entry['y'] - entry['offset_y'] - self.roi_margin)
+        rx2 = min(width, rx1 + entry['w'] + 2 * self.roi_margin)
+        ry2 = min(height, ry1 + entry['h'] + 2 * self.roi_margin)
+        searches = [(rx1, ry1, frame[ry1:ry2, rx1:rx2]), (0, 0, frame)]
+
+        for ox, oy, region in searches:
+            score, mx, my, scale = self._match(region, template)
+            if score >= self.match_threshold:
+                x = int(ox + mx + entry['offset_x'] * scale)
+                y = int(oy + my + entry['offset_y'] * scale)
+                entry['hits'] = entry.get('hits', 0) + 1
+                elapsed = (time.perf_counter() - start) * 1000
+                logger.info(f"⚡ Template match for {key}: ({x}, {y}) score={score:.3f} scale={scale} in {elapsed:.0f} ms")
+                return (x, y, score)
+
+        elapsed = (time.perf_counter() - start) * 1000
+        logger.info(f"Template miss for {key} (best below {self.match_threshold}) in {elapsed:.0f} ms")
+        return None
+
+    def forget(self, key):
+        """Drop a template (e.g. after it led to a wrong click)"""
+        with self._lock:
+            entry = self.templates.pop(key, None)
+            self._images.pop(key, None)
+            if entry:
+                self._save_index()
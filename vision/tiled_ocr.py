@@ -0,0 +1,302 @@
+"""
+Tiled OCR - process-parallel EasyOCR for 4K and multi-monitor frames
+Splits the frame into overlapping tiles, reads them on a pool of worker
+processes that each keep a resident EasyOCR reader, then stitches lines
+that were cut at tile seams back together.
+
+Every worker loads its own copy of the EasyOCR models, so the pool costs
+`workers` times the reader's memory. Frozen builds must call
+multiprocessing.freeze_support() before the pool starts (main.py does).
+Measure with `python -m vision.tiled_ocr <screenshot>` on the target machine
+before enabling OCR_TILED_MODE.
+"""
+
+import atexit
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+logger = logging.getLogger("TiledOCR")
+
+# Per-process resident reader (created once by the pool initializer)
+_worker_reader = None
+
+
+def _init_worker(languages, gpu):
+    """Pool initializer: load one EasyOCR reader per worker process"""
+    global _worker_reader
+    import easyocr
+    _worker_reader = easyocr.Reader(languages, gpu=gpu, verbose=False)
+
+
+def _read_tile(shm_name, shape, dtype, tile_index, box):
+    """
+    Worker task: OCR one tile of the shared frame
+
+    Returns:
+        list: [(tile_index, [[x,y] x4], text, conf), ...] in FRAME coordinates
+    """
+    x1, y1, x2, y2 = box
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        tile = np.ascontiguousarray(frame[y1:y2, x1:x2])
+    finally:
+        shm.close()
+
+    detections = []
+    for bbox, text, conf in _worker_reader.readtext(tile, detail=1):
+        points = [[float(p[0]) + x1, float(p[1]) + y1] for p in bbox]
+        detections.append((tile_index, points, text, float(conf)))
+    return detections
+
+
+def compute_tiles(width, height, tile_size=1280, overlap=96):
+    """
+    Split a frame into overlapping tiles
+
+    Returns:
+        list: [(x1, y1, x2, y2), ...] covering the whole frame
+    """
+    step = max(1, tile_size - overlap)
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        positions = list(range(0, length - tile_size, step))
+        positions.append(length - tile_size)  # Last tile flush with the edge
+        return positions
+
+    return [
+        (x, y, min(x + tile_size, width), min(y + tile_size, height))
+        for y in starts(height)
+        for x in starts(width)
+    ]
+
+
+def _bounds(points):
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _containment(inner, outer):
+    """Fraction of `inner` box area covered by `outer`"""
+    ix1, iy1 = max(inner[0], outer[0]), max(inner[1], outer[1])
+    ix2, iy2 = min(inner[2], outer[2]), min(inner[3], outer[3])
+    intersection = max(0.0, ix2 - ix1) * max(0.0, iy2 - iy1)
+    area = max(1e-6, (inner[2] - inner[0]) * (inner[3] - inner[1]))
+    return intersection / area
+
+
+def _vertical_overlap(a, b):
+    """Vertical overlap relative to the shorter box (same text row check)"""
+    overlap = min(a[3], b[3]) - max(a[1], b[1])
+    shorter = max(1e-6, min(a[3] - a[1], b[3] - b[1]))
+    return max(0.0, overlap) / shorter
+
+
+def _join_text(left, right):
+    """Join two fragments, dropping the characters both tiles saw"""
+    max_k = min(len(left), len(right))
+    for k in range(max_k, 0, -1):
+        if left[-k:].lower() == right[:k].lower():
+            return left + right[k:]
+    return f"{left} {right}"
+
+
+def merge_seam_detections(detections, containment_threshold=0.6, row_threshold=0.5):
+    """
+    De-duplicate lines cut at tile seams
+
+    1. A detection mostly inside a longer detection from another tile with
+       the same (or contained) text is a duplicate and is dropped.
+    2. Fragments from different tiles on the same row that overlap
+       horizontally are the two halves of one line and are joined.
+
+    Args:
+        detections: [(tile_index, points, text, conf), ...]
+
+    Returns:
+        list: EasyOCR-format [(points, text, conf), ...]
+    """
+    items = []
+    for tile_index, points, text, conf in detections:
+        text = str(text).strip()
+        if not text:
+            continue
+        items.append({
+            'tile': tile_index,
+            'box': list(_bounds(points)),
+            'text': text,
+            'conf': conf,
+            'tiles': {tile_index},
+        })
+
+    # Step 1: drop duplicates (widest first so full lines win over fragments)
+    items.sort(key=lambda d: d['box'][2] - d['box'][0], reverse=True)
+    kept = []
+    for item in items:
+        duplicate = False
+        for other in kept:
+            if other['tile'] == item['tile']:
+                continue
+            if (_containment(item['box'], other['box']) > containment_threshold
+                    and item['text'].lower() in other['text'].lower()):
+                other['conf'] = max(other['conf'], item['conf'])
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append(item)
+
+    # Step 2: join fragments that cross a seam (left to right)
+    kept.sort(key=lambda d: (d['box'][1], d['box'][0]))
+    merged = []
+    for item in kept:
+        joined = False
+        for other in merged:
+            if item['tile'] in other['tiles']:
+                continue
+            a, b = other['box'], item['box']
+            horizontal_overlap = min(a[2], b[2]) - max(a[0], b[0])
+            if horizontal_overlap > 0 and _vertical_overlap(a, b) > row_threshold:
+                left, right = (other, item) if a[0] <= b[0] else (item, other)
+                other['text'] = _join_text(left['text'], right['text'])
+                other['box'] = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+                other['conf'] = min(other['conf'], item['conf'])
+                other['tiles'].add(item['tile'])
+                joined = True
+                break
+        if not joined:
+            merged.append(item)
+
+    results = []
+    for item in merged:
+        x1, y1, x2, y2 = item['box']
+        results.append(([[x1, y1], [x2, y1], [x2, y2], [x1, y2]], item['text'], item['conf']))
+    return results
+
+
+class TiledOCR:
+    """Process-parallel tiled OCR with resident EasyOCR readers per worker"""
+
+    def __init__(self, tile_size=1280, overlap=96, workers=None, languages=('en',), gpu=False):
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.languages = list(languages)
+        self.gpu = gpu
+        self._pool = None
+
+    def _get_pool(self):
+        """Start the worker pool lazily (readers load once, then stay resident)"""
+        if self._pool is None:
+            logger.info(f"Starting OCR pool: {self.workers} workers, tile={self.tile_size}px, overlap={self.overlap}px")
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.languages, self.gpu),
+            )
+            atexit.register(self.close)
+        return self._pool
+
+    def readtext(self, img_array):
+        """
+        Drop-in replacement for easyocr.Reader.readtext(img, detail=1)
+
+        Returns:
+            list: [(bbox_points, text, confidence), ...] in frame coordinates
+        """
+        frame = np.ascontiguousarray(img_array)
+        height, width = frame.shape[:2]
+        tiles = compute_tiles(width, height, self.tile_size, self.overlap)
+
+        shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        try:
+            shared = np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)
+            shared[:] = frame
+
+            pool = self._get_pool()
+            futures = [
+                pool.submit(_read_tile, shm.name, frame.shape, frame.dtype.str, index, box)
+                for index, box in enumerate(tiles)
+            ]
+            detections = []
+            for future in futures:
+                detections.extend(future.result())
+        finally:
+            shm.close()
+            shm.unlink()
+
+        merged = merge_seam_detections(detections)
+        logger.debug(f"Tiled OCR: {len(tiles)} tiles, {len(detections)} raw -> {len(merged)} lines")
+        return merged
+
+    def close(self):
+        """Shut down the worker pool"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+            atexit.unregister(self.close)
+
+
+def benchmark_speedup(image_path, repeats=3, **tiled_kwargs):
+    """
+    Compare serial EasyOCR against the tiled process pool on one frame
+
+    Returns:
+        dict: {"serial_ms", "tiled_ms", "speedup", "serial_lines", "tiled_lines"}
+    """
+    import easyocr
+    from PIL import Image
+
+    img_array = np.array(Image.open(image_path).convert('RGB'))
+    serial_reader = easyocr.Reader(['en'], gpu=False, verbose=False)
+    tiled = TiledOCR(**tiled_kwargs)
+
+    try:
+        tiled.readtext(img_array)  # Warm-up: spawn workers and load readers
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            serial_result = serial_reader.readtext(img_array, detail=1)
+        serial_ms = (time.perf_counter() - start) * 1000 / repeats
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            tiled_result = tiled.readtext(img_array)
+        tiled_ms = (time.perf_counter() - start) * 1000 / repeats
+    finally:
+        tiled.close()
+
+    return {
+        "serial_ms": serial_ms,
+        "tiled_ms": tiled_ms,
+        "speedup": serial_ms / tiled_ms if tiled_ms else 0.0,
+        "serial_lines": len(serial_result),
+        "tiled_lines": len(tiled_result),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serial vs tiled OCR speedup on a screenshot")
+    parser.add_argument("image", help="Path to a (large) screenshot")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--tile-size", type=int, default=1280)
+    parser.add_argument("--overlap", type=int, default=96)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    report = benchmark_speedup(
+        args.image, repeats=args.repeats,
+        tile_size=args.tile_size, overlap=args.overlap, workers=args.workers,
+    )
+    print(f"Serial: {report['serial_ms']:.0f} ms ({report['serial_lines']} lines)")
+    print(f"Tiled:  {report['tiled_ms']:.0f} ms ({report['tiled_lines']} lines)")
+    print(f"Speedup: {report['speedup']:.2f}x")